@@ -11,10 +11,23 @@ import uuid
 import aiofiles
 import mimetypes
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Form, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Header, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.kb_loader import get_kb_load_stats, reload_knowledge_base
+from app.services.job_queue import get_job_queue
+from app.services.job_runner import get_job_runner
+from app.services.position_query import (
+    InvalidCursor,
+    PositionFilter,
+    filter_positions,
+    parse_fields,
+    query_positions,
+)
+from app.services.position_stream import iter_position_stream, read_stream_state
+from app.services.project_cache import load_field, load_page_index
 from app.services.workflow_a import WorkflowA
 from app.services.workflow_b import WorkflowB
 from app.state.project_store import project_store
@@ -136,6 +149,62 @@ async def _save_file_streaming(
     )
 
 
+def _submit_workflow(
+    project_id: str,
+    workflow: str,
+    generate_summary: bool,
+    enable_enrichment: bool,
+) -> None:
+    """Hand a workflow run to the configured job backend."""
+
+    if settings.JOB_BACKEND == "queue":
+        args = {"generate_summary": generate_summary, "enable_enrichment": enable_enrichment}
+        get_job_queue().enqueue(
+            project_id,
+            "workflow_a" if workflow == 'A' else "workflow_b",
+            {"args": args if workflow == 'A' else {}},
+        )
+        return
+
+    if workflow == 'A':
+        workflow_service = WorkflowA()
+        get_job_runner().submit(
+            project_id,
+            workflow_service.execute,
+            project_id,
+            generate_summary,
+            enable_enrichment,  # ✨ NEW: Pass enrichment flag
+            kind="workflow_a",
+        )
+    elif workflow == 'B':
+        workflow_service = WorkflowB()
+        get_job_runner().submit(
+            project_id,
+            workflow_service.execute,
+            project_id,
+            kind="workflow_b",
+        )
+
+
+def _job_state(project_id: str) -> tuple:
+    """(latest job as dict, 1-based queue position) for the configured backend."""
+
+    if settings.JOB_BACKEND == "queue":
+        queue = get_job_queue()
+        return queue.job_for_project(project_id), queue.queue_position(project_id)
+    runner = get_job_runner()
+    job = runner.job_for_project(project_id)
+    return (job.as_dict() if job else None), runner.queue_position(project_id)
+
+
+def _job_metrics() -> Dict[str, Any]:
+    """Job counters of the configured backend (queue metrics hit the database)."""
+
+    if settings.JOB_BACKEND == "queue":
+        return get_job_queue().metrics()
+    return get_job_runner().stats()
+
+
 @router.get("/", operation_id="get_root_status")
 async def root():
     """Health check endpoint"""
@@ -154,8 +223,6 @@ async def root():
 
 @router.post("/api/upload", response_model=ProjectResponse)
 async def upload_project(
-    background_tasks: BackgroundTasks,
-    
     # Required parameters
     project_name: str = Form(..., description="Project name"),
     workflow: str = Form(..., description="Workflow type: 'A' or 'B'"),
@@ -339,7 +406,7 @@ async def upload_project(
             file_locations[safe_meta["file_id"]] = str(zmena_path)
         
         # Store project metadata
-        project_store[project_id] = {
+        record = {
             "project_id": project_id,
             "project_name": project_name,
             "workflow": workflow,
@@ -387,6 +454,7 @@ async def upload_project(
                 "ocr_pages": [],
             },
         }
+        await run_in_threadpool(project_store.__setitem__, project_id, record)
         
         logger.info(f"✅ Nahrání dokončeno: {project_id}")
         
@@ -397,20 +465,7 @@ async def upload_project(
                 f"(Workflow {workflow}, Enrichment: {'ON' if enable_enrichment else 'OFF'})"
             )
             
-            if workflow == 'A':
-                workflow_service = WorkflowA()
-                background_tasks.add_task(
-                    workflow_service.execute,
-                    project_id,
-                    generate_summary,
-                    enable_enrichment  # ✨ NEW: Pass enrichment flag
-                )
-            elif workflow == 'B':
-                workflow_service = WorkflowB()
-                background_tasks.add_task(
-                    workflow_service.execute,
-                    project_id
-                )
+            _submit_workflow(project_id, workflow, generate_summary, enable_enrichment)
         
         # ✅ Return project_id in response
         return {
@@ -431,7 +486,7 @@ async def upload_project(
             "enrichment_enabled": enable_enrichment,  # ✨ NEW
             "files": safe_files,
             "message": f"Project uploaded successfully. ID: {project_id}",
-            "diagnostics": project_store[project_id].get("diagnostics", {}),
+            "diagnostics": record["diagnostics"],
             "positions_total": 0,
             "positions_raw": 0,
             "positions_skipped": 0,
@@ -460,47 +515,55 @@ async def upload_project(
 async def get_project_status(project_id: str):
     """Get project processing status"""
     
-    if project_id not in project_store:
+    project = await run_in_threadpool(project_store.status, project_id)
+    if project is None:
         raise HTTPException(404, f"Project {project_id} not found")
     
-    project = project_store[project_id]
+    job, queue_position = await run_in_threadpool(_job_state, project_id)
 
     return {
         "project_id": project_id,
         "project_name": project["project_name"],
         "status": project["status"],
+        "queue_position": queue_position,
+        "job": job,
         "workflow": project["workflow"],
         "created_at": project["created_at"],
         "updated_at": project["updated_at"],
-        "progress": project.get("progress", 0),
-        "positions_total": project.get("positions_total", 0),
-        "positions_processed": project.get("positions_processed", 0),
-        "positions_raw": project.get("positions_raw", 0),
-        "positions_skipped": project.get("positions_skipped", 0),
-        "green_count": project.get("green_count", 0),
-        "amber_count": project.get("amber_count", 0),
-        "red_count": project.get("red_count", 0),
-        "diagnostics": project.get("diagnostics", {}),
-        "message": project.get("message"),
-        "error": project.get("error"),
-        "error_message": project.get("error"),
-        "enrichment_enabled": project.get("enable_enrichment")
+        "progress": project["progress"] or 0,
+        "positions_total": project["positions_count"],
+        "positions_processed": project["positions_processed"] or 0,
+        "positions_raw": project["positions_raw"] or 0,
+        "positions_skipped": project["positions_skipped"] or 0,
+        "green_count": project["green_count"],
+        "amber_count": project["amber_count"],
+        "red_count": project["red_count"],
+        "diagnostics": project["diagnostics"] or {},
+        "message": project["message"],
+        "error": project["error"],
+        "error_message": project["error"],
+        "enrichment_enabled": project["enrichment_enabled"]
     }
 
 
 @router.get("/api/projects/{project_id}/results")
-async def get_project_results(project_id: str):
+async def get_project_results(
+    project_id: str,
+    include_positions: bool = Query(
+        default=True,
+        description="False returns the summary and preview only; page positions via /positions",
+    ),
+):
     """
     Get detailed project results including enriched positions
     
     ✨ NEW: Returns enriched positions with technical specifications
     """
     
-    if project_id not in project_store:
+    project = await run_in_threadpool(project_store.get, project_id)
+    if project is None:
         raise HTTPException(404, f"Project {project_id} not found")
     
-    project = project_store[project_id]
-    
     status = project["status"]
 
     if status not in {ProjectStatus.AUDITED, ProjectStatus.COMPLETED}:
@@ -510,7 +573,13 @@ async def get_project_results(project_id: str):
             "message": "Project is still processing",
         }
 
-    audit_payload = project.get("audit_results", {})
+    audit_payload = project.get("audit_results") or {}
+    if include_positions:
+        # Positions live in the paged project cache, not in the record.
+        cached = await run_in_threadpool(load_field, project_id, "audit_results")
+        audit_payload = cached or audit_payload
+    else:
+        audit_payload = {key: value for key, value in audit_payload.items() if key != "positions"}
 
     return {
         "project_id": project_id,
@@ -529,38 +598,128 @@ async def get_project_results(project_id: str):
     }
 
 
+@router.get("/api/projects/{project_id}/positions")
+async def get_project_positions(
+    project_id: str,
+    limit: int = Query(default=50, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    classification: Optional[str] = Query(default=None, description="GREEN, AMBER, RED (comma-separated)"),
+    section: Optional[str] = Query(default=None),
+    amber_reason: Optional[str] = Query(default=None),
+    code_prefix: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description="comma-separated fields to return"),
+):
+    """Audited positions, paginated and filtered server-side from the position cache"""
+
+    if await run_in_threadpool(project_store.summary, project_id) is None:
+        raise HTTPException(404, f"Project {project_id} not found")
+
+    filters = PositionFilter.from_params(classification, section, amber_reason, code_prefix)
+    projection = parse_fields(fields)
+    try:
+        page = await run_in_threadpool(_positions_page, project_id, limit, cursor, filters, projection)
+    except InvalidCursor:
+        raise HTTPException(400, "Invalid cursor")
+
+    return {"project_id": project_id, "limit": limit, **page.as_dict()}
+
+
+def _positions_page(
+    project_id: str,
+    limit: int,
+    cursor: Optional[str],
+    filters: PositionFilter,
+    projection: Optional[List[str]],
+):
+    page = query_positions(project_id, limit, cursor, filters, projection)
+    if page is None:
+        # No paged cache (records written before positions moved to the cache).
+        audit_payload = (project_store.get(project_id) or {}).get("audit_results") or {}
+        page = filter_positions(audit_payload.get("positions") or [], limit, cursor, filters, projection)
+    return page
+
+
+async def _stream_lines(request: Request, project_id: str, run_id: Optional[str], offset: int, fmt: str):
+    current_run = run_id
+    events = iter_position_stream(project_id, run_id=run_id, offset=offset, is_disconnected=request.is_disconnected)
+    async for kind, index, payload in events:
+        if kind != "position":
+            current_run = payload.get("run_id")
+        if fmt == "sse":
+            # The event id is the resume point: "<run_id>:<positions received>".
+            event_id = f"{current_run or ''}:{index + 1 if kind == 'position' else index}"
+            data = json.dumps(payload, ensure_ascii=False, default=str)
+            yield f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n".encode("utf-8")
+        elif kind == "position":
+            yield (json.dumps(payload, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        else:
+            yield (json.dumps({"_stream": {"event": kind, **payload}}) + "\n").encode("utf-8")
+
+
+@router.get("/api/projects/{project_id}/positions/stream")
+async def stream_project_positions(
+    request: Request,
+    project_id: str,
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$"),
+    run_id: Optional[str] = Query(default=None, description="run_id of an interrupted stream"),
+    offset: int = Query(default=0, ge=0, description="positions already received"),
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    Stream audited positions while Workflow A is still running
+
+    NDJSON: a ``{"_stream": {"event": "start", ...}}`` line with the run_id, one
+    position per line, then a ``{"_stream": {"event": "end", ...}}`` line; resume
+    with ``run_id`` and ``offset`` (positions received).
+    SSE: ``start``, ``position`` and ``end`` events; the event id resumes the
+    stream via Last-Event-ID.
+    """
+
+    project = await run_in_threadpool(project_store.summary, project_id)
+    if project is None:
+        raise HTTPException(404, f"Project {project_id} not found")
+    if project["workflow"] == WorkflowType.B.value:
+        raise HTTPException(400, "Position streaming is only available for Workflow A")
+
+    if last_event_id and ":" in last_event_id:
+        event_run, event_offset = last_event_id.rsplit(":", 1)
+        run_id = event_run or run_id
+        offset = int(event_offset) if event_offset.isdigit() else offset
+
+    state = await run_in_threadpool(read_stream_state, project_id)
+    if (
+        state is None
+        and project["status"] == ProjectStatus.FAILED
+        and await run_in_threadpool(load_page_index, project_id) is None
+    ):
+        raise HTTPException(404, "No positions available for this project")
+
+    return StreamingResponse(
+        _stream_lines(request, project_id, run_id, offset, format),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/api/projects")
 async def list_projects(
     limit: int = Query(default=50, le=100),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
 ):
-    """List all projects with pagination"""
-    
-    all_projects = list(project_store.values())
-    total = len(all_projects)
-    
-    # Sort by created_at desc
-    all_projects.sort(key=lambda x: x['created_at'], reverse=True)
+    """List all projects with pagination (newest first)"""
     
-    # Paginate
-    projects = all_projects[offset:offset + limit]
+    try:
+        projects, next_cursor = await run_in_threadpool(project_store.page, limit, offset, cursor)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
     
     return {
-        "projects": [
-            {
-                "project_id": p["project_id"],
-                "project_name": p["project_name"],
-                "workflow": p["workflow"],
-                "status": p["status"],
-                "enrichment_enabled": p.get("enable_enrichment", False),
-                "created_at": p["created_at"],
-                "positions_count": p.get("positions_total", 0)
-            }
-            for p in projects
-        ],
-        "total": total,
+        "projects": projects,
+        "total": await run_in_threadpool(len, project_store),
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor,
     }
 
 
@@ -568,10 +727,10 @@ async def list_projects(
 async def list_project_files(project_id: str):
     """List uploaded files with safe metadata"""
 
-    if project_id not in project_store:
+    project = await run_in_threadpool(project_store.get, project_id)
+    if project is None:
         raise HTTPException(404, f"Project {project_id} not found")
 
-    project = project_store[project_id]
     files_metadata = project.get("files_metadata", [])
 
     return {
@@ -586,11 +745,10 @@ async def list_project_files(project_id: str):
 async def download_project_file(project_id: str, file_id: str):
     """Securely download a project file using logical identifiers"""
 
-    if project_id not in project_store:
+    project = await run_in_threadpool(project_store.get, project_id)
+    if project is None:
         raise HTTPException(404, f"Project {project_id} not found")
 
-    project = project_store[project_id]
-
     # Validate file_id format: project_id:file_type:filename
     try:
         file_project_id, file_type, filename = file_id.split(":", 2)
@@ -641,11 +799,10 @@ async def export_to_excel(project_id: str):
     ✨ NEW: Includes enriched technical specifications in export
     """
     
-    if project_id not in project_store:
+    project = await run_in_threadpool(project_store.get, project_id)
+    if project is None:
         raise HTTPException(404, f"Project {project_id} not found")
     
-    project = project_store[project_id]
-    
     audit_results = project.get("audit_results") or {}
     if not audit_results.get("audit"):
         raise HTTPException(
@@ -673,11 +830,25 @@ async def export_to_excel(project_id: str):
         raise HTTPException(500, f"Export failed: {str(e)}")
 
 
+@router.post("/api/kb/reload")
+async def reload_kb():
+    """
+    Re-parse changed knowledge base files and swap in the new KB generation
+    """
+    try:
+        return await run_in_threadpool(reload_knowledge_base)
+    except Exception as e:
+        logger.error(f"❌ KB reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"KB reload failed: {str(e)}")
+
+
 @router.get("/api/health")
 async def health_check():
     """
     Detailed health check with system status
     """
+    status_counts = await run_in_threadpool(project_store.status_counts)
+    jobs = await run_in_threadpool(_job_metrics)
     return {
         "status": "healthy",
         "version": "2.0.0",
@@ -688,11 +859,13 @@ async def health_check():
             "drawing_enrichment": True,
             "csn_validation": True
         },
+        "knowledge_base": get_kb_load_stats(),
+        "jobs": jobs,
         "stats": {
-            "total_projects": len(project_store),
-            "pending": sum(1 for p in project_store.values() if p["status"] == ProjectStatus.PENDING),
-            "processing": sum(1 for p in project_store.values() if p["status"] == ProjectStatus.PROCESSING),
-            "completed": sum(1 for p in project_store.values() if p["status"] == ProjectStatus.COMPLETED),
-            "failed": sum(1 for p in project_store.values() if p["status"] == ProjectStatus.FAILED)
+            "total_projects": sum(status_counts.values()),
+            "pending": status_counts.get(ProjectStatus.PENDING.value, 0),
+            "processing": status_counts.get(ProjectStatus.PROCESSING.value, 0),
+            "completed": status_counts.get(ProjectStatus.COMPLETED.value, 0),
+            "failed": status_counts.get(ProjectStatus.FAILED.value, 0)
         }
     }
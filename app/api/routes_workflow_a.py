@@ -3,14 +3,23 @@ API Routes for Workflow A - Specialized Endpoints
 POUZE specifické endpointy pro Workflow A (bez upload!)
 """
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import logging
 import json
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.services.position_query import (
+    InvalidCursor,
+    PositionFilter,
+    filter_positions,
+    parse_fields,
+    query_positions,
+)
+from app.state.project_store import project_store
 
 logger = logging.getLogger(__name__)
 
@@ -29,57 +38,83 @@ class AnalyzePositionsRequest(BaseModel):
 # =============================================================================
 
 @router.get("/{project_id}/positions")
-async def get_positions(project_id: str):
+async def get_positions(
+    project_id: str,
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None, description="next_cursor předchozí stránky"),
+    classification: Optional[str] = Query(default=None, description="GREEN, AMBER, RED (oddělené čárkou)"),
+    section: Optional[str] = Query(default=None),
+    amber_reason: Optional[str] = Query(default=None),
+    code_prefix: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description="vrácená pole oddělená čárkou"),
+):
     """
-    Získat všechny pozice z výkazu výměr
+    Získat pozice z výkazu výměr (stránkovaně)
+    
+    Pozice se čtou po stránkách z cache projektu; filtry a výběr polí
+    se aplikují na serveru.
     
     Args:
         project_id: ID projektu
+        limit: Počet pozic na stránku
+        cursor: Pokračování z předchozí odpovědi (next_cursor)
     
     Returns:
-        Seznam všech pozic
+        Stránka pozic a next_cursor
     """
     try:
-        # Načíst project info
-        project_dir = settings.DATA_DIR / "raw" / project_id
-        info_path = project_dir / "project_info.json"
-        
-        if not info_path.exists():
-            raise HTTPException(status_code=404, detail="Projekt nenalezen")
-        
-        with open(info_path, 'r', encoding='utf-8') as f:
-            project_info = json.load(f)
+        project = await run_in_threadpool(project_store.summary, project_id)
+        if project is not None:
+            project_name = project.get("project_name")
+            workflow = project.get("workflow")
+        else:
+            # Načíst project info
+            info_path = settings.DATA_DIR / "raw" / project_id / "project_info.json"
+            if not info_path.exists():
+                raise HTTPException(status_code=404, detail="Projekt nenalezen")
+            with open(info_path, 'r', encoding='utf-8') as f:
+                project_info = json.load(f)
+            project_name = project_info.get("project_name")
+            workflow = project_info.get("workflow")
         
         # Ověřit že je to Workflow A
-        if project_info.get("workflow") != "A":
+        if str(getattr(workflow, "value", workflow)).upper() != "A":
             raise HTTPException(
                 status_code=400,
                 detail="Tento endpoint je pouze pro Workflow A"
             )
         
-        # Načíst parsované pozice
-        curated_dir = settings.DATA_DIR / "curated" / project_id
-        positions_path = curated_dir / "parsed_positions.json"
-        
-        if not positions_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail="Pozice ještě nebyly zpracovány"
-            )
-        
-        with open(positions_path, 'r', encoding='utf-8') as f:
-            positions_data = json.load(f)
+        filters = PositionFilter.from_params(classification, section, amber_reason, code_prefix)
+        projection = parse_fields(fields)
+        page = await run_in_threadpool(
+            query_positions, project_id, limit, cursor, filters, projection, "positions"
+        )
+        if page is None:
+            # Starší projekty: parsované pozice v jednom souboru
+            positions_path = settings.DATA_DIR / "curated" / project_id / "parsed_positions.json"
+            if not positions_path.exists():
+                raise HTTPException(
+                    status_code=404,
+                    detail="Pozice ještě nebyly zpracovány"
+                )
+            with open(positions_path, 'r', encoding='utf-8') as f:
+                positions_data = json.load(f)
+            page = filter_positions(positions_data.get("positions", []), limit, cursor, filters, projection)
         
         return {
             "success": True,
             "project_id": project_id,
-            "project_name": project_info["project_name"],
-            "total_positions": len(positions_data.get("positions", [])),
-            "positions": positions_data.get("positions", [])
+            "project_name": project_name,
+            "total_positions": page.total_positions,
+            "limit": limit,
+            "next_cursor": page.next_cursor,
+            "positions": page.items
         }
         
     except HTTPException:
         raise
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Neplatný cursor")
     except Exception as e:
         logger.error(f"Chyba při získávání pozic: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,310 @@
+"""Process-wide catalog index shared by enrichment and validation.
+
+The index is derived from one knowledge-base generation and never mutated, so
+a single instance can be shared by every ``PositionEnricher`` and
+``SpecificationsValidator`` of a process.  It is cached on the loader object
+itself, which means a KB reload (new generation) naturally gets a fresh index
+while in-flight work keeps using the old one.
+
+Each index carries a ``token`` naming its generation.  Worker processes
+receive a pickled copy once, through their pool initializer; enricher and
+validator pickle only the token and resolve it with ``registered_index`` in
+the worker, so both sides always work against the same generation.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import uuid
+import weakref
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.core.fuzzy_index import FuzzyDescriptionIndex
+from app.core.normalization import extract_entities, normalize_text
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CatalogRecord",
+    "CatalogIndex",
+    "get_catalog_index",
+    "normalise_code",
+    "normalise_unit",
+    "registered_index",
+]
+
+ENRICHMENT_CATALOGS = ("otskp", "urs", "rts")
+
+_CODE_RE = re.compile(r"[^A-Z0-9]")
+_EMPTY: frozenset = frozenset()
+_NO_ENTITIES: Mapping[str, frozenset] = MappingProxyType(
+    {"concretes": _EMPTY, "exposures": _EMPTY, "steel": _EMPTY, "diameters": _EMPTY, "units": _EMPTY}
+)
+_CACHE_ATTRIBUTE = "_catalog_index"
+_build_lock = threading.Lock()
+# Every live index of this process by token, including copies unpickled in workers.
+_registry: "weakref.WeakValueDictionary[str, CatalogIndex]" = weakref.WeakValueDictionary()
+
+
+def normalise_code(code: object) -> str:
+    if not code:
+        return ""
+    return _CODE_RE.sub("", str(code).strip().upper())
+
+
+def normalise_unit(unit: Optional[str]) -> str:
+    return normalize_text(unit or "").replace(" ", "")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CatalogRecord:
+    """Compact, immutable catalog entry with precomputed matching features."""
+
+    code: str
+    catalog: str
+    unit: str
+    description: str
+    tech_spec: str
+    normalized_text: str
+    entities: Mapping[str, frozenset]
+    unit_key: str = ""
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any], catalog: str) -> Optional["CatalogRecord"]:
+        code = str(payload.get("code") or "").strip()
+        if not code:
+            return None
+        description = str(payload.get("name") or payload.get("description") or "").strip()
+        tech_spec = str(payload.get("tech_spec") or "").strip()
+        unit = str(payload.get("unit") or "").strip()
+        return cls(
+            code=code,
+            catalog=catalog,
+            unit=unit,
+            description=description,
+            tech_spec=tech_spec,
+            normalized_text=normalize_text(" ".join(filter(None, [description, tech_spec]))),
+            entities=_freeze_entities(extract_entities(f"{description} {tech_spec}")),
+            unit_key=normalise_unit(unit),
+        )
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        entities = None if self.entities is _NO_ENTITIES else dict(self.entities)
+        return (
+            _restore_record,
+            (
+                self.code,
+                self.catalog,
+                self.unit,
+                self.description,
+                self.tech_spec,
+                self.normalized_text,
+                entities,
+                self.unit_key,
+            ),
+        )
+
+
+def _restore_record(
+    code: str,
+    catalog: str,
+    unit: str,
+    description: str,
+    tech_spec: str,
+    normalized_text: str,
+    entities: Optional[Dict[str, frozenset]],
+    unit_key: str,
+) -> CatalogRecord:
+    return CatalogRecord(
+        code=code,
+        catalog=catalog,
+        unit=unit,
+        description=description,
+        tech_spec=tech_spec,
+        normalized_text=normalized_text,
+        entities=_freeze_entities(entities) if entities else _NO_ENTITIES,
+        unit_key=unit_key,
+    )
+
+
+def _freeze_entities(entities: Dict[str, Iterable[str]]) -> Mapping[str, frozenset]:
+    if not any(entities.values()):
+        return _NO_ENTITIES
+    return MappingProxyType({key: frozenset(values) or _EMPTY for key, values in entities.items()})
+
+
+class CatalogIndex:
+    """Immutable lookup structures over one KB generation."""
+
+    __slots__ = ("records", "by_code", "by_unit", "catalog_present", "otskp_lookup", "token", "_fuzzy", "__weakref__")
+
+    def __init__(
+        self,
+        records: Tuple[CatalogRecord, ...],
+        by_code: Mapping[str, CatalogRecord],
+        by_unit: Mapping[str, Tuple[CatalogRecord, ...]],
+        catalog_present: bool,
+        otskp_lookup: Mapping[str, Mapping[str, Any]],
+        token: Optional[str] = None,
+    ) -> None:
+        self.records = records
+        self.by_code = by_code
+        self.by_unit = by_unit
+        self.catalog_present = catalog_present
+        self.otskp_lookup = otskp_lookup
+        self.token = token or uuid.uuid4().hex
+        self._fuzzy: Optional[FuzzyDescriptionIndex[CatalogRecord]] = None
+        _registry[self.token] = self
+
+    @property
+    def fuzzy(self) -> FuzzyDescriptionIndex[CatalogRecord]:
+        """Description matcher over ``records``, created on first use."""
+
+        if self._fuzzy is None:
+            with _build_lock:
+                if self._fuzzy is None:
+                    positions = {id(record): offset for offset, record in enumerate(self.records)}
+                    self._fuzzy = FuzzyDescriptionIndex(
+                        self.records,
+                        [record.normalized_text for record in self.records],
+                        {
+                            unit: [positions[id(record)] for record in members]
+                            for unit, members in self.by_unit.items()
+                        },
+                    )
+        return self._fuzzy
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Plain data only; the fuzzy matcher is rebuilt on first use.
+        return (
+            _restore_index,
+            (
+                self.records,
+                dict(self.by_code),
+                dict(self.by_unit),
+                self.catalog_present,
+                dict(self.otskp_lookup),
+                self.token,
+            ),
+        )
+
+    @classmethod
+    def build(cls, loader: Any) -> "CatalogIndex":
+        """Build the index from ``loader.kb_b1`` (and ``loader.data`` when present)."""
+
+        kb_b1 = getattr(loader, "kb_b1", None) or {}
+        records: List[CatalogRecord] = []
+        by_code: Dict[str, CatalogRecord] = {}
+        by_unit: Dict[str, List[CatalogRecord]] = {}
+        seen_codes: set[str] = set()
+        catalog_present = False
+
+        # First registration of a code wins across catalogs (OTSKP before ÚRS and RTS).
+        for catalog_key in ENRICHMENT_CATALOGS:
+            catalog = kb_b1.get(catalog_key) or {}
+            if not catalog:
+                continue
+            catalog_present = True
+            for payload in catalog.values():
+                code = str(payload.get("code") or "").strip()
+                if not code or code in seen_codes:
+                    continue
+                record = CatalogRecord.from_payload(payload, catalog_key.upper())
+                seen_codes.add(code)
+                code_key = normalise_code(code)
+                if code_key:
+                    by_code[code_key] = record
+                records.append(record)
+                by_unit.setdefault(record.unit_key, []).append(record)
+
+        data = getattr(loader, "data", None) or {}
+        otskp_payload = data.get("B1_otkskp_codes", {}) if hasattr(data, "get") else {}
+
+        index = cls(
+            records=tuple(records),
+            by_code=MappingProxyType(by_code),
+            by_unit=MappingProxyType({unit: tuple(items) for unit, items in by_unit.items()}),
+            catalog_present=catalog_present,
+            otskp_lookup=MappingProxyType(_build_otskp_lookup(otskp_payload)),
+        )
+        logger.info(
+            "Catalog index built: %s records, %s OTSKP validation codes",
+            len(index.records),
+            len(index.otskp_lookup),
+        )
+        return index
+
+
+def _restore_index(
+    records: Tuple[CatalogRecord, ...],
+    by_code: Dict[str, CatalogRecord],
+    by_unit: Dict[str, Tuple[CatalogRecord, ...]],
+    catalog_present: bool,
+    otskp_lookup: Dict[str, Mapping[str, Any]],
+    token: str,
+) -> CatalogIndex:
+    existing = _registry.get(token)
+    if existing is not None:
+        return existing
+    return CatalogIndex(
+        records=records,
+        by_code=MappingProxyType(by_code),
+        by_unit=MappingProxyType(by_unit),
+        catalog_present=catalog_present,
+        otskp_lookup=MappingProxyType(otskp_lookup),
+        token=token,
+    )
+
+
+def _build_otskp_lookup(category_payload: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Normalised code → {name, unit, unit_price}; later records override earlier ones."""
+
+    lookup: Dict[str, Dict[str, Any]] = {}
+
+    def register(item: Mapping[str, Any]) -> None:
+        code = normalise_code(item.get("code") or item.get("znacka"))
+        if code:
+            lookup[code] = {
+                "name": item.get("name") or item.get("nazev"),
+                "unit": (item.get("unit") or item.get("MJ") or "").strip().lower(),
+                "unit_price": item.get("unit_price") or item.get("jedn_cena"),
+            }
+
+    for payload in category_payload.values():
+        if isinstance(payload, list):
+            for item in payload:
+                if isinstance(item, dict):
+                    register(item)
+        elif isinstance(payload, dict):
+            register(payload)
+    return lookup
+
+
+def get_catalog_index(loader: Any) -> CatalogIndex:
+    """Return the index for ``loader``, building it once per KB generation."""
+
+    index = getattr(loader, _CACHE_ATTRIBUTE, None)
+    if isinstance(index, CatalogIndex):
+        return index
+    with _build_lock:
+        index = getattr(loader, _CACHE_ATTRIBUTE, None)
+        if not isinstance(index, CatalogIndex):
+            index = CatalogIndex.build(loader)
+            setattr(loader, _CACHE_ATTRIBUTE, index)
+    return index
+
+
+def registered_index(token: str) -> CatalogIndex:
+    """Return the live index of generation ``token`` in this process.
+
+    Raises ``LookupError`` when no such index exists, e.g. in a worker whose
+    pool was started for a different KB generation.
+    """
+
+    index = _registry.get(token)
+    if index is None:
+        raise LookupError(f"Catalog index {token} is not loaded in this process")
+    return index
@@ -38,6 +38,11 @@ class Settings(BaseSettings):
     PROMPTS_DIR: Optional[Path] = None
     LOGS_DIR: Optional[Path] = None
     WEB_DIR: Optional[Path] = None
+    KB_SNAPSHOT_DIR: Optional[Path] = None
+    PARSE_CACHE_DIR: Optional[Path] = None
+    OCR_CACHE_DIR: Optional[Path] = None
+    PAGE_TEXT_CACHE_DIR: Optional[Path] = None
+    DATABASE_URL: Optional[str] = None
     
     # ==========================================
     # API KEYS
@@ -100,6 +105,99 @@ class Settings(BaseSettings):
     ENRICH_SCORE_EXACT: float = Field(default=0.9, description="Exact enrichment match threshold")
     ENRICH_SCORE_PARTIAL: float = Field(default=0.6, description="Partial enrichment match threshold")
     ENRICH_MAX_EVIDENCE: int = Field(default=3, description="Maximum evidence items per position")
+
+    # ==========================================
+    # JOB EXECUTION
+    # ==========================================
+    JOB_MAX_CONCURRENT: int = Field(
+        default=2,
+        description="Workflow jobs executed concurrently per API worker; further jobs wait in a FIFO queue",
+    )
+    JOB_BACKEND: str = Field(
+        default="inline",
+        description="'inline' runs jobs inside the API process, 'queue' hands them to `python -m app.worker`",
+    )
+    JOB_MAX_ATTEMPTS: int = Field(default=3, description="Attempts per queued job before it is marked failed")
+    JOB_RETRY_DELAY_SEC: float = Field(default=5.0, description="Delay before a failed job is retried")
+    JOB_HEARTBEAT_SEC: float = Field(default=10.0, description="Worker heartbeat interval for running jobs")
+    JOB_STALE_AFTER_SEC: float = Field(
+        default=60.0,
+        description="Running jobs without a heartbeat for this long are treated as crashed and requeued",
+    )
+    WORKER_POLL_INTERVAL_SEC: float = Field(default=1.0, description="Idle poll interval of queue workers")
+
+    # ==========================================
+    # PROJECT CACHE
+    # ==========================================
+    PROJECT_CACHE_PAGE_SIZE: int = Field(
+        default=1000,
+        description="Positions per cached NDJSON page (data/projects/<id>/pages)",
+    )
+    POSITION_STREAM_POLL_SEC: float = Field(
+        default=0.5,
+        description="How often a position stream checks for newly audited positions",
+    )
+    POSITION_STREAM_IDLE_TIMEOUT_SEC: float = Field(
+        default=600.0,
+        description="Close a position stream when the producing run shows no progress for this long",
+    )
+
+    # ==========================================
+    # POSITION PIPELINE
+    # ==========================================
+    PIPELINE_WORKERS: int = Field(
+        default=2,
+        description="Worker processes for enrichment/validation/audit (0 = CPUs available to the process, 1 = sequential)",
+    )
+    PIPELINE_CHUNK_SIZE: int = Field(default=500, description="Positions per worker chunk")
+    PIPELINE_PARALLEL_MIN_POSITIONS: int = Field(
+        default=2000,
+        description="Minimum number of positions before the pipeline fans out to worker processes",
+    )
+    
+    # ==========================================
+    # DOCUMENT PARSING
+    # ==========================================
+    PARSE_WORKERS: int = Field(
+        default=2,
+        description="Worker processes for parsing cost documents and drawings (0 = CPUs available to the process, 1 = sequential)",
+    )
+    PARSE_FILE_TIMEOUT_SEC: float = Field(
+        default=300.0,
+        description="Kill a parse worker that spends longer than this on a single file (0 = no limit)",
+    )
+
+    # ==========================================
+    # PARSE CACHE
+    # ==========================================
+    PARSE_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Reuse parsed positions of identical cost documents (keyed by file SHA-256 and parser version)",
+    )
+    PARSE_CACHE_MAX_MB: int = Field(
+        default=512,
+        description="Size limit of the parse cache; least recently used entries are evicted",
+    )
+    PAGE_TEXT_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Reuse recovered drawing page text of identical PDFs (keyed by file SHA-256 and extractor versions)",
+    )
+    PAGE_TEXT_CACHE_MAX_MB: int = Field(
+        default=512,
+        description="Size limit of the drawing page text cache; least recently used entries are evicted",
+    )
+    
+    # ==========================================
+    # KNOWLEDGE BASE SNAPSHOT
+    # ==========================================
+    KB_SNAPSHOT_ENABLED: bool = Field(
+        default=True,
+        description="Restore the knowledge base from a compiled snapshot when it is up to date",
+    )
+    KB_WATCH_INTERVAL_SEC: float = Field(
+        default=0.0,
+        description="Poll KB sources for changes and hot-reload them every N seconds (0 = disabled)",
+    )
     
     # ==========================================
     # PRICE MANAGEMENT
@@ -159,6 +257,34 @@ class Settings(BaseSettings):
         default=True,
         description="Enable OCR queuing for pages without usable text",
     )
+    PDF_PRIMARY_EXTRACTOR: str = Field(
+        default="pdfium",
+        description="Extractor run on every page (pdfium|pdfminer); the other one is the fallback for weak pages",
+    )
+    PDF_RECOVERY_WORKERS: int = Field(
+        default=2,
+        description="Worker processes for page-parallel text recovery (0 = CPUs available to the process, 1 = sequential)",
+    )
+    PDF_PAGES_PER_TASK: int = Field(default=16, description="Pages recovered per worker task")
+    PDF_PARALLEL_MIN_PAGES: int = Field(
+        default=32,
+        description="Minimum page count before text recovery fans out to worker processes",
+    )
+    OCR_WORKERS: int = Field(default=2, description="Concurrent OCR jobs (Tesseract processes)")
+    OCR_QUEUE_MAX: int = Field(
+        default=200,
+        description="Maximum queued + running OCR pages; further pages are dropped until the queue drains",
+    )
+    OCR_DPI: int = Field(default=300, description="Render resolution for OCR")
+    OCR_LANG: str = Field(
+        default="eng",
+        description="Tesseract languages, e.g. 'ces+eng' when the Czech traineddata is installed",
+    )
+    OCR_PAGE_TIMEOUT_SEC: int = Field(default=60, description="Tesseract time limit per page")
+    OCR_REENRICH_ENABLED: bool = Field(
+        default=True,
+        description="Re-run Workflow A once OCR text for a project's drawings is available",
+    )
     
     # MinerU Settings
     MINERU_OUTPUT_DIR: Optional[Path] = None
@@ -225,6 +351,16 @@ class Settings(BaseSettings):
             self.LOGS_DIR = base / "logs"
         if self.WEB_DIR is None:
             self.WEB_DIR = base / "web"
+        if self.KB_SNAPSHOT_DIR is None:
+            self.KB_SNAPSHOT_DIR = self.DATA_DIR / "kb_snapshot"
+        if self.PARSE_CACHE_DIR is None:
+            self.PARSE_CACHE_DIR = self.DATA_DIR / "parse_cache"
+        if self.OCR_CACHE_DIR is None:
+            self.OCR_CACHE_DIR = self.DATA_DIR / "ocr_cache"
+        if self.PAGE_TEXT_CACHE_DIR is None:
+            self.PAGE_TEXT_CACHE_DIR = self.DATA_DIR / "page_text_cache"
+        if self.DATABASE_URL is None:
+            self.DATABASE_URL = f"sqlite:///{self.DATA_DIR / 'concrete_agent.db'}"
         if self.MINERU_OUTPUT_DIR is None:
             self.MINERU_OUTPUT_DIR = base / "temp" / "mineru"
         
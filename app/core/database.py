@@ -0,0 +1,105 @@
+"""SQLAlchemy engine and session handling for ``settings.DATABASE_URL``.
+
+The default URL points to a SQLite file under ``DATA_DIR``, which is shared by
+the API processes and queue workers on one host.  SQLite connections are put
+into WAL mode with a busy timeout so readers never block the writer and
+concurrent writers wait instead of failing.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["get_engine", "get_sessionmaker", "init_db", "session_scope"]
+
+_SQLITE_BUSY_TIMEOUT_MS = 30_000
+
+_engines: Dict[str, Engine] = {}
+_sessionmakers: Dict[str, sessionmaker] = {}
+_initialised: set[str] = set()
+_lock = threading.Lock()
+
+
+def _configure_sqlite(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _record) -> None:  # pragma: no cover - driver callback
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={_SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    url = url or settings.DATABASE_URL
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            if url.startswith("sqlite"):
+                engine = create_engine(
+                    url,
+                    connect_args={"check_same_thread": False, "timeout": _SQLITE_BUSY_TIMEOUT_MS / 1000},
+                    future=True,
+                )
+                _configure_sqlite(engine)
+            else:
+                engine = create_engine(url, pool_pre_ping=True, future=True)
+            _engines[url] = engine
+    return engine
+
+
+def init_db(url: Optional[str] = None) -> Engine:
+    """Create missing tables (idempotent, once per process and URL)."""
+
+    from app.models.project import Base
+
+    # Import table modules so they register on ``Base.metadata``.
+    import app.models.job  # noqa: F401
+
+    engine = get_engine(url)
+    key = str(engine.url)
+    if key not in _initialised:
+        with _lock:
+            if key not in _initialised:
+                Base.metadata.create_all(engine)
+                _initialised.add(key)
+                logger.info("Database ready: %s", engine.url.render_as_string(hide_password=True))
+    return engine
+
+
+def get_sessionmaker(url: Optional[str] = None) -> sessionmaker:
+    engine = init_db(url)
+    key = str(engine.url)
+    factory = _sessionmakers.get(key)
+    if factory is None:
+        with _lock:
+            factory = _sessionmakers.setdefault(key, sessionmaker(bind=engine, expire_on_commit=False, future=True))
+    return factory
+
+
+@contextmanager
+def session_scope(url: Optional[str] = None) -> Iterator[Session]:
+    """Transactional session: commit on success, roll back on error."""
+
+    session = get_sessionmaker(url)()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
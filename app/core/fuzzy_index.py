@@ -0,0 +1,207 @@
+"""Exact top-k ``SequenceMatcher`` search over catalog descriptions.
+
+``SequenceMatcher.ratio()`` is ``2 * M / (len(a) + len(b))`` where ``M`` is the
+number of matched characters.  The matching blocks form a common subsequence,
+so ``M`` never exceeds ``min(len(a), len(b))``, the size of the character
+multiset intersection, or the longest common subsequence (LCS) of both
+strings.  The index evaluates these bounds for a whole unit bucket at once with
+numpy (the LCS with a bit-parallel algorithm over a reduced alphabet, which can
+only over-estimate it), then computes the real ratio only for surviving
+candidates in descending bound order and stops as soon as no remaining bound
+can enter the top ``k``.
+
+Results (scores and order, including ties) are identical to scoring every
+candidate and stable-sorting by ratio.
+"""
+from __future__ import annotations
+
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+__all__ = ["FuzzyDescriptionIndex", "DEFAULT_THRESHOLD"]
+
+DEFAULT_THRESHOLD = 0.70
+
+T = TypeVar("T")
+
+# a-z, 0-9 and space get their own bin; every other character shares a hashed
+# bin, which keeps the intersection count an upper bound.
+_BINS = 64
+_BIN_OF = np.full(128, 0, dtype=np.intp)
+for _offset, _char in enumerate("abcdefghijklmnopqrstuvwxyz0123456789 "):
+    _BIN_OF[ord(_char)] = _offset
+_SHARED_BINS = _BINS - 37
+for _code in range(128):
+    if not chr(_code) in "abcdefghijklmnopqrstuvwxyz0123456789 ":
+        _BIN_OF[_code] = 37 + _code % _SHARED_BINS
+
+
+_PAD_BIN = _BINS  # padding after the end of a text; never matches
+_WORD_BITS = 64
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.int64)
+
+
+def _bins(text: str) -> np.ndarray:
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    return np.where(codes < 128, _BIN_OF[np.minimum(codes, 127)], 37 + codes % _SHARED_BINS)
+
+
+def _histogram(text: str) -> np.ndarray:
+    return np.bincount(_bins(text), minlength=_BINS).astype(np.int32)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    return _POPCOUNT[values.view(np.uint8)].reshape(values.shape[0], 8).sum(axis=1)
+
+
+class _Bucket:
+    """Candidates of one unit bucket with precomputed lengths, histograms and bin codes."""
+
+    __slots__ = ("texts", "lengths", "histograms", "columns")
+
+    def __init__(self, texts: Sequence[str]) -> None:
+        self.texts = list(texts)
+        count = len(self.texts)
+        self.lengths = np.fromiter((len(text) for text in self.texts), dtype=np.int64, count=count)
+        self.histograms = np.zeros((count, _BINS), dtype=np.int32)
+        # Column t holds the bin of character t of every text (time-major for the LCS scan).
+        self.columns = np.full((int(self.lengths.max()) if count else 0, count), _PAD_BIN, dtype=np.uint8)
+        for row, text in enumerate(self.texts):
+            if not text:
+                continue
+            bins = _bins(text)
+            self.histograms[row] = np.bincount(bins, minlength=_BINS)
+            self.columns[: len(text), row] = bins
+
+    def lcs_upper_bound(self, query: str, rows: np.ndarray) -> np.ndarray:
+        """Upper bound of ``LCS(query, text)`` for the given rows.
+
+        Uses the bit-vector LCS recurrence (Allison–Dix / Hyyrö) on 64-character
+        slices of the query; the per-slice LCS values add up to an upper bound
+        of the full LCS.
+        """
+
+        total = np.zeros(rows.size, dtype=np.int64)
+        longest = int(self.lengths[rows].max())
+        columns = self.columns[:longest, rows]
+        query_bins = _bins(query)
+        for start in range(0, query_bins.size, _WORD_BITS):
+            chunk = query_bins[start : start + _WORD_BITS]
+            match_masks = np.zeros(_BINS + 1, dtype=np.uint64)
+            for offset, bin_id in enumerate(chunk.tolist()):
+                match_masks[bin_id] |= np.uint64(1 << offset)
+            state = np.full(rows.size, np.iinfo(np.uint64).max, dtype=np.uint64)
+            for column in columns:
+                matched = state & match_masks[column]
+                state = (state + matched) | (state - matched)
+            low_bits = np.uint64((1 << chunk.size) - 1) if chunk.size < _WORD_BITS else np.iinfo(np.uint64).max
+            total += chunk.size - _popcount(state & low_bits)
+        return total
+
+
+class FuzzyDescriptionIndex(Generic[T]):
+    """Top-k fuzzy matching of normalised descriptions against catalog items."""
+
+    def __init__(
+        self,
+        items: Sequence[T],
+        texts: Sequence[str],
+        buckets: Dict[str, Sequence[int]],
+    ) -> None:
+        """
+        Args:
+            items: catalog items in registration order
+            texts: normalised text per item (same order as ``items``)
+            buckets: unit key → item positions, each list in registration order
+        """
+        self._items = list(items)
+        self._texts = list(texts)
+        self._bucket_members: Dict[str, List[int]] = {key: list(members) for key, members in buckets.items()}
+        self._buckets: Dict[Optional[str], _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def top_matches(
+        self,
+        text: str,
+        unit_key: str,
+        limit: int = 3,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> List[Tuple[float, T]]:
+        """Return up to ``limit`` ``(ratio, item)`` pairs with ``ratio >= threshold``.
+
+        Candidates are the items of ``unit_key``'s bucket, or every item when the
+        unit has no bucket.  Ordering matches a stable sort by descending ratio.
+        """
+
+        if not text:
+            return []
+        key: Optional[str] = unit_key if unit_key in self._bucket_members else None
+        members = self._bucket_members[key] if key is not None else None
+        bucket = self._bucket(key)
+        if not bucket.texts:
+            return []
+
+        length = len(text)
+        totals = bucket.lengths + length
+        bounds = 2.0 * np.minimum(bucket.lengths, length) / totals
+        candidates = np.flatnonzero(bounds >= threshold)
+        if candidates.size == 0:
+            return []
+
+        query = _histogram(text)
+        shared = np.minimum(bucket.histograms[candidates], query).sum(axis=1)
+        bounds = 2.0 * np.minimum(shared, np.minimum(bucket.lengths[candidates], length)) / totals[candidates]
+        keep = bounds >= threshold
+        candidates = candidates[keep]
+        if candidates.size == 0:
+            return []
+
+        common = bucket.lcs_upper_bound(text, candidates)
+        bounds = 2.0 * np.minimum(common, shared[keep]) / totals[candidates]
+        keep = bounds >= threshold
+        candidates = candidates[keep]
+        bounds = bounds[keep]
+        if candidates.size == 0:
+            return []
+
+        order = np.lexsort((candidates, -bounds))
+        scored: List[Tuple[float, int]] = []
+        cutoff = threshold
+        matcher = SequenceMatcher(None, text)
+        for position in order:
+            if bounds[position] < cutoff:
+                break
+            local = int(candidates[position])
+            matcher.set_seq2(bucket.texts[local])
+            ratio = matcher.ratio()
+            if ratio < threshold:
+                continue
+            scored.append((ratio, local))
+            if len(scored) >= limit:
+                scored.sort(key=lambda item: (-item[0], item[1]))
+                del scored[limit:]
+                cutoff = max(threshold, scored[-1][0])
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        result: List[Tuple[float, T]] = []
+        for ratio, local in scored[:limit]:
+            item_index = members[local] if members is not None else local
+            result.append((ratio, self._items[item_index]))
+        return result
+
+    def _bucket(self, key: Optional[str]) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            return bucket
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if key is None:
+                    bucket = _Bucket(self._texts)
+                else:
+                    bucket = _Bucket([self._texts[index] for index in self._bucket_members[key]])
+                self._buckets[key] = bucket
+        return bucket
@@ -8,13 +8,23 @@ import csv
 import json
 import logging
 import re
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
 import pandas as pd
 
+from app.core.kb_snapshot import (
+    KnowledgeBaseSnapshot,
+    LazyCategoryMap,
+    compare_sources,
+    fingerprint_sources,
+)
+from app.parsers.otskp_catalog import read_catalog_records
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,28 +53,43 @@ class KnowledgeBaseLoader:
         "B8_company_specific"
     ]
     
-    def __init__(self, kb_dir: Path):
+    # Версия логики парсинга: при изменении инвалидирует сохранённые снимки KB
+    PARSER_VERSION = 2
+
+    def __init__(self, kb_dir: Path, snapshot_dir: Optional[Path] = None):
         """
         Args:
             kb_dir: Путь к app/knowledge_base/
+            snapshot_dir: Каталог снимка KB (None = всегда парсить исходники)
         """
         self.kb_dir = kb_dir
+        self.snapshot_dir = snapshot_dir
         self.data = {}
         self.metadata = {}
         self.loaded_at = None
+        self.generation = 0
+        self.load_stats: Dict[str, Any] = {}
+        self.source_fingerprints: Dict[str, Dict[str, Any]] = {}
+        self._snapshot_manifest: Dict[str, Any] | None = None
         self._kros_index: Dict[str, Dict[str, Any]] | None = None
         self._csn_index: Dict[str, List[Dict[str, str]]] | None = None
         self._code_bridge: Dict[str, List[str]] | None = None
+        self._catalog_index = None  # app.core.catalog_index cache for this generation
         self.kb_b1: Dict[str, Dict[str, Dict[str, Any]]] = {
             "otskp": {},
             "rts": {},
             "urs": {},
         }
         
-    def load_all(self) -> Dict[str, Any]:
+    def load_all(self, rebuild_snapshot: bool = False) -> Dict[str, Any]:
         """
         Главный метод: загружает ВСЮ базу знаний
-        
+
+        Если задан ``snapshot_dir`` и снимок актуален, данные восстанавливаются
+        из снимка (категории подгружаются лениво). Иначе исходники парсятся
+        заново и снимок перестраивается. Путь загрузки записывается в
+        ``load_stats`` (``snapshot`` / ``rebuilt`` / ``cold``).
+
         Returns:
             {
                 "B1_otkskp_codes": {...},
@@ -74,9 +99,62 @@ class KnowledgeBaseLoader:
                 ...
             }
         """
-        logger.info("🔄 Loading Knowledge Base...")
-        start_time = datetime.now()
+        started = time.perf_counter()
+        load_path = "cold"
+        reason = "disabled"
+        snapshot = KnowledgeBaseSnapshot(self.snapshot_dir) if self.snapshot_dir else None
+
+        if snapshot is not None:
+            if rebuild_snapshot:
+                reason = "forced"
+            else:
+                manifest, reason = snapshot.validate(self.kb_dir, self.CATEGORIES, self.PARSER_VERSION)
+                if manifest is not None:
+                    try:
+                        self._restore_snapshot(snapshot, manifest)
+                        load_path = "snapshot"
+                    except Exception as exc:  # noqa: BLE001 - fall back to sources
+                        logger.warning("⚠️  KB snapshot restore failed, parsing sources: %s", exc)
+                        reason = "restore_failed"
+
+        if load_path != "snapshot":
+            # Отпечатки снимаются до парсинга: правка во время загрузки будет замечена при reload
+            self.source_fingerprints = fingerprint_sources(self.kb_dir, self.CATEGORIES)
+            self._load_sources()
+            if snapshot is not None:
+                try:
+                    self._snapshot_manifest = snapshot.write(
+                        self, self.source_fingerprints, self.PARSER_VERSION
+                    )
+                    load_path = "rebuilt"
+                except Exception as exc:  # noqa: BLE001 - snapshot is an optimisation only
+                    logger.warning("⚠️  Failed to write KB snapshot to %s: %s", self.snapshot_dir, exc)
+
+        self.loaded_at = datetime.now()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.load_stats = {
+            "path": load_path,
+            "reason": reason,
+            "elapsed_ms": elapsed_ms,
+            "generation": self.generation,
+            "categories": len(self.data),
+            "snapshot_dir": str(self.snapshot_dir) if self.snapshot_dir else None,
+        }
+
+        logger.info(
+            "✨ Knowledge Base loaded in %.2fs (path=%s, reason=%s)",
+            elapsed_ms / 1000,
+            load_path,
+            reason,
+        )
+        self._print_summary()
         
+        return self.data
+
+    def _load_sources(self) -> None:
+        """Парсит все категории из исходных файлов"""
+        logger.info("🔄 Loading Knowledge Base...")
+
         for category in self.CATEGORIES:
             category_path = self.kb_dir / category
 
@@ -94,14 +172,163 @@ class KnowledgeBaseLoader:
                     self.metadata[category] = json.load(f)
 
             logger.info(f"✅ Loaded: {category}")
-        
-        self.loaded_at = datetime.now()
-        elapsed = (self.loaded_at - start_time).total_seconds()
-        
-        logger.info(f"✨ Knowledge Base loaded in {elapsed:.2f}s")
-        self._print_summary()
-        
-        return self.data
+
+    def _restore_snapshot(self, snapshot: KnowledgeBaseSnapshot, manifest: Dict[str, Any]) -> None:
+        """Восстанавливает KB из снимка; payload категорий читается по требованию"""
+        kb_b1 = snapshot.read_catalogs(manifest)
+        for catalog_key in ("otskp", "rts", "urs"):
+            kb_b1.setdefault(catalog_key, {})
+
+        self.kb_b1 = kb_b1
+        self.metadata = dict(manifest.get("metadata", {}))
+        self.data = LazyCategoryMap(
+            manifest.get("categories", {}).keys(),
+            lambda category: snapshot.read_category(manifest, category),
+        )
+        self._snapshot_manifest = manifest
+        self.source_fingerprints = dict(manifest.get("sources", {}))
+        self._kros_index = None
+        self._csn_index = None
+        self._code_bridge = None
+
+    # ------------------------------------------------------------------
+    # Incremental reload (copy-on-write generations)
+    # ------------------------------------------------------------------
+
+    def next_generation(self) -> Tuple[Optional["KnowledgeBaseLoader"], List[str]]:
+        """
+        Собирает новое поколение KB, перепарсив только изменённые файлы
+
+        Текущий экземпляр не изменяется: незатронутые категории и каталоги B1
+        разделяются по ссылке, затронутые строятся заново. Производные индексы
+        (_kros_index, _csn_index) в новом поколении пустые и строятся по запросу.
+
+        Returns:
+            (новый загрузчик или None, если изменений нет; список изменённых файлов)
+        """
+        changed, refreshed = compare_sources(self.source_fingerprints, self.kb_dir, self.CATEGORIES)
+        if not changed:
+            return None, []
+
+        started = time.perf_counter()
+        successor = KnowledgeBaseLoader(self.kb_dir, snapshot_dir=self.snapshot_dir)
+        successor.generation = self.generation + 1
+        successor.metadata = dict(self.metadata)
+        successor.data = self.data.copy()
+        successor.source_fingerprints = refreshed
+        successor._snapshot_manifest = self._snapshot_manifest
+
+        affected: Dict[str, List[str]] = {}
+        for relpath in changed:
+            category, _, inner = relpath.partition("/")
+            affected.setdefault(category, []).append(inner)
+
+        # Каталоги B1 затронутых категорий строятся с нуля, остальные (включая runtime "tskp") общие
+        rebuilt_catalogs = {self._detect_b1_catalog(Path(category)) for category in affected} - {None}
+        successor.kb_b1 = {
+            key: ({} if key in rebuilt_catalogs else catalog) for key, catalog in self.kb_b1.items()
+        }
+        for catalog_key in rebuilt_catalogs:
+            successor.kb_b1.setdefault(catalog_key, {})
+
+        for category, files in affected.items():
+            successor._reload_category_files(category, files)
+
+        for catalog_key in rebuilt_catalogs:
+            successor._rebuild_b1_catalog(catalog_key)
+
+        successor.loaded_at = datetime.now()
+        successor.load_stats = {
+            "path": "reload",
+            "reason": "sources_changed",
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "generation": successor.generation,
+            "categories": len(successor.data),
+            "changed": changed,
+            "snapshot_dir": str(self.snapshot_dir) if self.snapshot_dir else None,
+        }
+        successor._persist_snapshot(affected.keys())
+
+        logger.info(
+            "🔁 Knowledge Base generation %s: re-parsed %s file(s) in %.2fs",
+            successor.generation,
+            len(changed),
+            successor.load_stats["elapsed_ms"] / 1000,
+        )
+        return successor, changed
+
+    def _reload_category_files(self, category: str, files: Iterable[str]) -> None:
+        """Перепарсивает указанные файлы категории (относительные POSIX-пути)"""
+        category_path = self.kb_dir / category
+        if not category_path.exists():
+            self.data.pop(category, None)
+            self.metadata.pop(category, None)
+            return
+
+        payload = dict(self.data.get(category, {}))
+        for inner in files:
+            file_path = category_path / inner
+            key = str(Path(inner))
+
+            if file_path.name == "metadata.json":
+                if key != "metadata.json":
+                    continue
+                if file_path.exists():
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        self.metadata[category] = json.load(f)
+                else:
+                    self.metadata.pop(category, None)
+                continue
+
+            payload.pop(key, None)
+            if not file_path.is_file():
+                continue
+            try:
+                payload[key] = self._load_file(file_path)
+            except Exception as e:
+                logger.error(f"❌ Failed to load {file_path}: {e}")
+
+        # Тот же порядок файлов, что и при полной загрузке (влияет на приоритет кодов B1)
+        order = [str(path.relative_to(category_path)) for path in category_path.rglob("*") if path.is_file()]
+        self.data[category] = {key: payload[key] for key in order if key in payload}
+
+    def _rebuild_b1_catalog(self, catalog_key: str) -> None:
+        """Строит каталог kb_b1 заново из уже распарсенных XML-файлов категории"""
+        self.kb_b1[catalog_key] = {}
+        for category in self.data:
+            if self._detect_b1_catalog(Path(category)) != catalog_key:
+                continue
+            for relative_path, payload in self.data[category].items():
+                path = Path(relative_path)
+                if path.suffix.lower() == ".xml" and isinstance(payload, list):
+                    self._register_b1_items(payload, path, catalog_key)
+
+    def _persist_snapshot(self, changed_categories: Iterable[str]) -> None:
+        if not self.snapshot_dir:
+            return
+        try:
+            self._snapshot_manifest = KnowledgeBaseSnapshot(self.snapshot_dir).write(
+                self,
+                self.source_fingerprints,
+                self.PARSER_VERSION,
+                changed_categories=changed_categories,
+                previous=self._snapshot_manifest,
+            )
+        except Exception as exc:  # noqa: BLE001 - snapshot is an optimisation only
+            logger.warning("⚠️  Failed to update KB snapshot in %s: %s", self.snapshot_dir, exc)
+
+    def category_sizes(self) -> Dict[str, int]:
+        """Число файлов в каждой категории без принудительной загрузки из снимка"""
+        recorded = (self._snapshot_manifest or {}).get("categories", {})
+        sizes: Dict[str, int] = {}
+        for category in self.data:
+            lazy = isinstance(self.data, LazyCategoryMap) and not self.data.is_loaded(category)
+            if lazy and category in recorded:
+                sizes[category] = int(recorded[category].get("entries", 0))
+                continue
+            payload = self.data[category]
+            sizes[category] = len(payload) if isinstance(payload, (dict, list)) else 1
+        return sizes
     
     def _load_category(self, path: Path) -> Dict[str, Any]:
         """
@@ -251,106 +478,22 @@ class KnowledgeBaseLoader:
             return f.read()
 
     def _load_xml(self, path: Path) -> Any:
-        """Load XML files. For OTSKP data convert to list of dicts."""
+        """Stream catalog records (XC4 Cenové soustavy or flat Polozka lists) from XML.
+
+        Records of B1 categories are registered into ``kb_b1``. XML files without
+        catalog records yield an empty list; the raw document is not kept in memory.
+        """
 
         try:
-            tree = ET.parse(path)
+            items = read_catalog_records(path)
         except ET.ParseError as exc:  # noqa: BLE001
             logger.error("❌ Failed to parse XML %s: %s", path, exc)
             return None
 
-        root = tree.getroot()
         catalog_key = self._detect_b1_catalog(path)
-        items: List[Dict[str, Any]] = []
-
-        if catalog_key == "otskp":
-
-            try:
-                from app.parsers.kros_parser import KROSParser
-
-                parser = KROSParser()
-                explicit_items = parser._parse_xc4_price_lists(root, register_runtime=False)
-                if explicit_items:
-                    self._register_b1_items(explicit_items, path, catalog_key)
-                    return explicit_items
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.debug("Explicit XC4 parsing failed for %s: %s", path, exc)
-
-            for item in root.findall(".//Polozka"):
-                record = {
-                    "code": (item.findtext("Znak") or item.findtext("znak") or item.findtext("znacka") or "").strip(),
-                    "name": (item.findtext("Nazev") or item.findtext("nazev") or item.findtext("name") or "").strip(),
-                    "description": (item.findtext("Popis") or item.findtext("description") or "").strip(),
-                    "unit": (item.findtext("Mj") or item.findtext("MJ") or item.findtext("MJ") or "").strip(),
-                    "section": (item.findtext("Skupina") or item.findtext("skupina") or "").strip(),
-                    "tech_spec": (item.findtext("technicka_specifikace") or "").strip(),
-                }
-                if any(record.values()):
-                    items.append(record)
-
-            if items:
-                self._register_b1_items(items, path, catalog_key)
-                return items
-
-            try:
-                from app.parsers.kros_parser import KROSParser
-
-                parser = KROSParser()
-                payload = parser.parse(path)
-                parsed_positions = payload.get("positions", [])
-                extracted: List[Dict[str, Any]] = []
-                for pos in parsed_positions:
-                    if not isinstance(pos, dict):
-                        continue
-                    extracted.append(
-                        {
-                            "code": str(pos.get("code") or pos.get("Kod") or "").strip(),
-                            "name": pos.get("name") or pos.get("description") or pos.get("Popis") or "",
-                            "description": pos.get("description") or pos.get("Popis") or "",
-                            "unit": pos.get("unit") or pos.get("MJ") or "",
-                            "section": pos.get("section") or "",
-                            "tech_spec": pos.get("tech_spec") or pos.get("technicka_specifikace") or "",
-                            "system": pos.get("system") or "",
-                        }
-                    )
-                if extracted:
-                    self._register_b1_items(extracted, path, catalog_key)
-                    return extracted
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.debug("Fallback KROS parsing failed for %s: %s", path, exc)
-
-        # OTSKP XML structure (Polozky/Polozka)
-        items = []
-        for item in root.findall(".//Polozka"):
-            record = {
-                "code": (item.findtext("znacka") or "").strip(),
-                "name": (item.findtext("nazev") or "").strip(),
-                "unit": (item.findtext("MJ") or "").strip(),
-                "unit_price": (item.findtext("jedn_cena") or "").strip(),
-                "technical_specification": (item.findtext("technicka_specifikace") or "").strip(),
-            }
-            if any(record.values()):
-                items.append(record)
-
-        if items and catalog_key == "otskp":
+        if items and catalog_key:
             self._register_b1_items(items, path, catalog_key)
-
-        if catalog_key in {"rts", "urs"}:
-            extracted: List[Dict[str, Any]] = []
-            for item in root.findall(".//Polozka"):
-                record = {
-                    "code": (item.findtext("Znak") or item.findtext("znacka") or item.findtext("code") or "").strip(),
-                    "name": (item.findtext("Nazev") or item.findtext("name") or "").strip(),
-                    "description": (item.findtext("Popis") or item.findtext("description") or "").strip(),
-                    "unit": (item.findtext("Mj") or item.findtext("MJ") or "").strip(),
-                }
-                if any(record.values()):
-                    extracted.append(record)
-            if extracted:
-                self._register_b1_items(extracted, path, catalog_key)
-            return extracted if extracted else {"xml": path.read_text(encoding="utf-8")}
-
-        return items if items else {"xml": path.read_text(encoding="utf-8")}
+        return items
 
     def _print_summary(self):
         """Выводит статистику загруженной KB"""
@@ -358,9 +501,10 @@ class KnowledgeBaseLoader:
         logger.info("📊 Knowledge Base Summary")
         logger.info("="*60)
         
+        sizes = self.category_sizes()
         for category in self.CATEGORIES:
-            if category in self.data:
-                files_count = len(self.data[category])
+            if category in sizes:
+                files_count = sizes[category]
                 
                 # Информация из metadata
                 meta = self.metadata.get(category, {})
@@ -686,10 +830,20 @@ def get_knowledge_base() -> KnowledgeBaseLoader:
     
     if _kb_instance is None:
         from app.core.config import settings
-        _kb_instance = KnowledgeBaseLoader(settings.KB_DIR)
+        snapshot_dir = settings.KB_SNAPSHOT_DIR if settings.KB_SNAPSHOT_ENABLED else None
+        _kb_instance = KnowledgeBaseLoader(settings.KB_DIR, snapshot_dir=snapshot_dir)
         _kb_instance.load_all()
     
     return _kb_instance
+
+
+def get_kb_load_stats() -> Optional[Dict[str, Any]]:
+    """Статистика загрузки KB (путь snapshot/rebuilt/cold) или None, если KB ещё не загружена"""
+    if _kb_instance is None:
+        return None
+    return dict(_kb_instance.load_stats)
+
+
 kb_loader = None  # Будет инициализирован при первом вызове
 
 def init_kb_loader():
@@ -699,6 +853,60 @@ def init_kb_loader():
         kb_loader = get_knowledge_base()
     return kb_loader
 
+
+_reload_lock = threading.Lock()
+
+
+def reload_knowledge_base() -> Dict[str, Any]:
+    """
+    Подхватывает изменённые файлы KB без перезапуска
+
+    Новое поколение строится в стороне и затем атомарно подменяет синглтоны;
+    запросы, уже получившие старый экземпляр, дорабатывают с ним.
+    """
+    global _kb_instance, kb_loader
+
+    with _reload_lock:
+        current = get_knowledge_base()
+        successor, changed = current.next_generation()
+        if successor is None:
+            return {"reloaded": False, "generation": current.generation, "changed": []}
+
+        _kb_instance = successor
+        if kb_loader is not None:
+            kb_loader = successor
+        return {"reloaded": True, **successor.load_stats}
+
+
+class KnowledgeBaseWatcher:
+    """Фоновый поток, периодически проверяющий изменения файлов KB"""
+
+    def __init__(self, interval_sec: float):
+        self.interval_sec = interval_sec
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+        self._thread.start()
+        logger.info("👀 KB watcher started (interval %.1fs)", self.interval_sec)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_sec + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                reload_knowledge_base()
+            except Exception as exc:  # noqa: BLE001 - keep watching
+                logger.error("❌ KB reload failed: %s", exc)
+
 # === ИСПОЛЬЗОВАНИЕ В КОДЕ ===
 
 def example_usage():
@@ -0,0 +1,563 @@
+"""Pre-compiled knowledge base snapshots.
+
+``KnowledgeBaseLoader.load_all`` parses every XML/Excel/PDF source of the
+knowledge base on each process start.  A snapshot stores the parsed result on
+disk as plain JSON segments so that workers can restore the KB without
+touching the sources again.
+
+Layout of ``settings.KB_SNAPSHOT_DIR``::
+
+    manifest.json                        format/parser version, source fingerprints
+    kb_b1.<digest>.json                  B1 catalogs in columnar form (loaded eagerly)
+    categories/<category>.<digest>.json  parsed payload per category (loaded lazily)
+
+The manifest is written last and acts as the commit marker: a snapshot is only
+used when its format and parser versions match and every source file still
+has the recorded size and modification time (or, when only the mtime moved,
+the same SHA-256 digest).
+
+Segments are named by the digest of their content and never rewritten, so a
+KB generation restored from an older manifest keeps reading its own payloads
+while a newer generation is written next to it.  Segments the live manifest
+no longer references are listed under ``retired`` and deleted once they have
+been unreferenced for ``retention_sec``.
+
+Dates and times parsed from Excel sources (``pandas.Timestamp``, ``datetime``,
+``date``, ``time``) are stored as tagged ISO strings and decoded back to the
+same type on read, so a restored KB compares equal to a freshly parsed one.
+Any other value JSON cannot represent fails the write instead of being
+stringified; the loader then keeps the cold-loaded data.
+
+Usage::
+
+    python -m app.core.kb_snapshot build    # rebuild from sources
+    python -m app.core.kb_snapshot status   # report whether the snapshot is valid
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import hashlib
+import os
+import shutil
+from collections.abc import MutableMapping
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.utils.hashing import sha256_file
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "SNAPSHOT_FORMAT_VERSION",
+    "KnowledgeBaseSnapshot",
+    "LazyCategoryMap",
+    "scan_sources",
+    "fingerprint_sources",
+    "compare_sources",
+]
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+MANIFEST_NAME = "manifest.json"
+CATALOG_SEGMENT = "kb_b1.json"
+CATEGORY_DIR = "categories"
+SEGMENT_RETENTION_SEC = 3600.0
+CATALOG_FIELDS = ("code", "normalized", "name", "unit", "tech_spec", "system", "source")
+IGNORED_FILES = {".gitkeep"}
+TYPE_TAG = "__kb_type__"
+
+
+# ----------------------------------------------------------------------
+# JSON encoding
+# ----------------------------------------------------------------------
+
+
+def _json_default(value: Any) -> Dict[str, str]:
+    # pandas.Timestamp (and NaT) subclass datetime; checked before date.
+    if isinstance(value, datetime):
+        kind = "timestamp" if hasattr(value, "to_pydatetime") else "datetime"
+        return {TYPE_TAG: kind, "value": value.isoformat()}
+    if isinstance(value, date):
+        return {TYPE_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, time):
+        return {TYPE_TAG: "time", "value": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} cannot be stored in a KB snapshot")
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    kind = obj.get(TYPE_TAG)
+    if kind is None or len(obj) != 2:
+        return obj
+    value = obj["value"]
+    if kind == "timestamp":
+        import pandas as pd
+
+        return pd.Timestamp(value)
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "date":
+        return date.fromisoformat(value)
+    if kind == "time":
+        return time.fromisoformat(value)
+    return obj
+
+
+# ----------------------------------------------------------------------
+# Source fingerprints
+# ----------------------------------------------------------------------
+
+
+def scan_sources(kb_dir: Path, categories: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """Return ``relpath → {size, mtime_ns}`` for every KB source file."""
+
+    sources: Dict[str, Dict[str, int]] = {}
+    for category in categories:
+        category_path = kb_dir / category
+        if not category_path.exists():
+            continue
+        for file_path in sorted(category_path.rglob("*")):
+            if not file_path.is_file() or file_path.name in IGNORED_FILES:
+                continue
+            stat = file_path.stat()
+            sources[file_path.relative_to(kb_dir).as_posix()] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+    return sources
+
+
+def fingerprint_sources(
+    kb_dir: Path,
+    categories: Iterable[str],
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Return stat information plus SHA-256 for every KB source file.
+
+    Digests from ``previous`` are reused for files whose size and mtime did
+    not change, so refreshing fingerprints only hashes touched files.
+    """
+
+    previous = previous or {}
+    fingerprints: Dict[str, Dict[str, Any]] = {}
+    for relpath, stat in scan_sources(kb_dir, categories).items():
+        known = previous.get(relpath)
+        if (
+            known
+            and known.get("sha256")
+            and known.get("size") == stat["size"]
+            and known.get("mtime_ns") == stat["mtime_ns"]
+        ):
+            digest = known["sha256"]
+        else:
+            digest = sha256_file(kb_dir / relpath)
+        fingerprints[relpath] = {**stat, "sha256": digest}
+    return fingerprints
+
+
+def compare_sources(
+    recorded: Dict[str, Dict[str, Any]],
+    kb_dir: Path,
+    categories: Iterable[str],
+) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """Compare recorded fingerprints with the files currently on disk.
+
+    Returns the sorted list of changed relative paths (added, removed or with
+    different content) together with the refreshed fingerprints.  Files whose
+    mtime moved but whose size and digest are unchanged are not reported.
+    """
+
+    current = scan_sources(kb_dir, categories)
+    changed: List[str] = sorted(set(recorded) - set(current))
+    refreshed: Dict[str, Dict[str, Any]] = {}
+
+    for relpath, stat in current.items():
+        known = recorded.get(relpath)
+        if known is None or known.get("size") != stat["size"]:
+            changed.append(relpath)
+            refreshed[relpath] = {**stat, "sha256": sha256_file(kb_dir / relpath)}
+            continue
+        if known.get("mtime_ns") == stat["mtime_ns"]:
+            refreshed[relpath] = {**stat, "sha256": known.get("sha256")}
+            continue
+        digest = sha256_file(kb_dir / relpath)
+        if digest != known.get("sha256"):
+            changed.append(relpath)
+        refreshed[relpath] = {**stat, "sha256": digest}
+
+    return sorted(changed), refreshed
+
+
+# ----------------------------------------------------------------------
+# Lazy category payloads
+# ----------------------------------------------------------------------
+
+
+class LazyCategoryMap(MutableMapping):
+    """Mapping of KB categories whose payloads are read from disk on first access."""
+
+    def __init__(self, order: Iterable[str], loader: Callable[[str], Any]) -> None:
+        self._order: List[str] = list(order)
+        self._pending = set(self._order)
+        self._loaded: Dict[str, Any] = {}
+        self._loader = loader
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self._pending:
+            raise KeyError(key)
+        value = self._loader(key)
+        self._pending.discard(key)
+        self._loaded[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._pending and key not in self._loaded:
+            self._order.append(key)
+        self._pending.discard(key)
+        self._loaded[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._pending and key not in self._loaded:
+            raise KeyError(key)
+        self._pending.discard(key)
+        self._loaded.pop(key, None)
+        self._order.remove(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._order))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._loaded or key in self._pending
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._loaded
+
+    def copy(self) -> "LazyCategoryMap":
+        """Shallow copy sharing loaded payloads and the pending segment reader."""
+        clone = LazyCategoryMap(self._order, self._loader)
+        clone._pending = set(self._pending)
+        clone._loaded = dict(self._loaded)
+        return clone
+
+    def __repr__(self) -> str:
+        return f"LazyCategoryMap(loaded={sorted(self._loaded)}, pending={sorted(self._pending)})"
+
+
+# ----------------------------------------------------------------------
+# Snapshot storage
+# ----------------------------------------------------------------------
+
+
+class KnowledgeBaseSnapshot:
+    """Read and write compiled KB snapshots in a directory."""
+
+    def __init__(self, directory: Path, retention_sec: float = SEGMENT_RETENTION_SEC) -> None:
+        self.directory = Path(directory)
+        self.retention_sec = retention_sec
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return None
+        try:
+            manifest = self._read_json(self.manifest_path)
+        except (OSError, ValueError) as exc:
+            logger.warning("⚠️  Unreadable KB snapshot manifest %s: %s", self.manifest_path, exc)
+            return None
+        return manifest if isinstance(manifest, dict) else None
+
+    def validate(
+        self,
+        kb_dir: Path,
+        categories: Iterable[str],
+        parser_version: int,
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return ``(manifest, reason)``; the manifest is ``None`` when stale."""
+
+        manifest = self.read_manifest()
+        if manifest is None:
+            return None, "missing"
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            return None, "format_version"
+        if manifest.get("parser_version") != parser_version:
+            return None, "parser_version"
+
+        segments = [manifest.get("catalog", {}).get("segment", CATALOG_SEGMENT)]
+        segments.extend(entry.get("segment", "") for entry in manifest.get("categories", {}).values())
+        if any(not segment or not (self.directory / segment).exists() for segment in segments):
+            return None, "segment_missing"
+
+        recorded = manifest.get("sources", {})
+        changed, refreshed = compare_sources(recorded, kb_dir, categories)
+        if changed:
+            logger.info("🔁 KB snapshot stale, changed sources: %s", ", ".join(changed[:10]))
+            return None, "sources_changed"
+
+        if refreshed != recorded:
+            # Only mtimes moved (checkout, copy): record them to skip hashing next time.
+            manifest["sources"] = refreshed
+            self._write_json(self.manifest_path, manifest)
+        return manifest, "valid"
+
+    def write(
+        self,
+        loader: Any,
+        sources: Dict[str, Dict[str, Any]],
+        parser_version: int,
+        changed_categories: Optional[Iterable[str]] = None,
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Persist the loader state and return the manifest that was written.
+
+        With ``changed_categories`` and the ``previous`` manifest only the
+        segments of changed categories are written; the others are reused
+        without loading their payloads.  Segments of the replaced manifests
+        are retired, not deleted, see :meth:`collect_garbage`.
+        """
+
+        (self.directory / CATEGORY_DIR).mkdir(parents=True, exist_ok=True)
+        changed = set(changed_categories) if changed_categories is not None else None
+        previous_categories = (previous or {}).get("categories", {})
+        replaced = [manifest for manifest in (self.read_manifest(), previous) if manifest]
+
+        categories: Dict[str, Dict[str, Any]] = {}
+        for category in loader.data:
+            reusable = previous_categories.get(category)
+            if (
+                changed is not None
+                and category not in changed
+                and reusable
+                and (self.directory / reusable.get("segment", "")).is_file()
+            ):
+                categories[category] = reusable
+                continue
+            payload = loader.data[category]
+            segment = self._write_segment(f"{CATEGORY_DIR}/{category}", payload)
+            categories[category] = {
+                "segment": segment,
+                "entries": len(payload) if isinstance(payload, (dict, list)) else 1,
+            }
+
+        catalog = encode_catalogs(loader.kb_b1)
+        catalog_segment = self._write_segment(Path(CATALOG_SEGMENT).stem, catalog)
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "parser_version": parser_version,
+            "created_at": datetime.now().isoformat(),
+            "sources": sources,
+            "metadata": loader.metadata,
+            "categories": categories,
+            "catalog": {
+                "segment": catalog_segment,
+                "records": {key: len(block["aliases"]) for key, block in catalog["catalogs"].items()},
+            },
+        }
+        manifest["retired"] = self._retire(replaced, _segments(manifest))
+        self._write_json(self.manifest_path, manifest)
+        self.collect_garbage(manifest)
+        return manifest
+
+    def collect_garbage(self, manifest: Dict[str, Any]) -> List[str]:
+        """Delete segments unreferenced by ``manifest`` for at least ``retention_sec``.
+
+        Older generations may still load retired segments lazily; files no
+        manifest knows about (interrupted writes, older layouts) age from
+        their modification time.  Returns the removed relative paths.
+        """
+
+        live = _segments(manifest)
+        retired = manifest.get("retired", {})
+        now = datetime.now()
+        paths = [
+            *(self.directory / CATEGORY_DIR).glob("*"),
+            *self.directory.glob(f"{Path(CATALOG_SEGMENT).stem}*"),
+        ]
+        removed: List[str] = []
+        for path in paths:
+            segment = path.relative_to(self.directory).as_posix()
+            if segment in live or not path.is_file():
+                continue
+            try:
+                if segment in retired:
+                    since = datetime.fromisoformat(retired[segment])
+                else:
+                    since = datetime.fromtimestamp(path.stat().st_mtime)
+                if (now - since).total_seconds() < self.retention_sec:
+                    continue
+                path.unlink()
+            except (OSError, ValueError):
+                continue
+            removed.append(segment)
+        if removed:
+            logger.info("🧹 Removed %s unreferenced KB snapshot segment(s)", len(removed))
+        return removed
+
+    def read_category(self, manifest: Dict[str, Any], category: str) -> Any:
+        segment = manifest["categories"][category]["segment"]
+        return self._read_json(self.directory / segment)
+
+    def read_catalogs(self, manifest: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        segment = manifest.get("catalog", {}).get("segment", CATALOG_SEGMENT)
+        return decode_catalogs(self._read_json(self.directory / segment))
+
+    def clear(self) -> None:
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+
+    def _retire(self, replaced: Iterable[Dict[str, Any]], live: set) -> Dict[str, str]:
+        """Carry over retired segments and add those the new manifest drops."""
+
+        now = datetime.now().isoformat()
+        retired: Dict[str, str] = {}
+        for manifest in replaced:
+            retired.update(manifest.get("retired", {}))
+        for manifest in replaced:
+            for segment in _segments(manifest):
+                retired.setdefault(segment, now)
+        return {
+            segment: since
+            for segment, since in sorted(retired.items())
+            if segment not in live and (self.directory / segment).is_file()
+        }
+
+    def _write_segment(self, stem: str, payload: Any) -> str:
+        """Write ``payload`` as ``<stem>.<digest>.json`` unless it exists; returns the segment."""
+
+        tmp_path = self.directory / f"{stem}.{os.getpid()}.tmp"
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, _HashingWriter(handle, digest), ensure_ascii=False, default=_json_default)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        segment = f"{stem}.{digest.hexdigest()[:16]}.json"
+        if (self.directory / segment).is_file():
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, self.directory / segment)
+        return segment
+
+    @staticmethod
+    def _read_json(path: Path) -> Any:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle, object_hook=_json_object_hook)
+
+    @staticmethod
+    def _write_json(path: Path, payload: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, ensure_ascii=False, default=_json_default)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+
+
+class _HashingWriter:
+    """Text sink that feeds everything written through it into ``digest``."""
+
+    def __init__(self, handle: Any, digest: Any) -> None:
+        self._handle = handle
+        self._digest = digest
+
+    def write(self, text: str) -> int:
+        self._digest.update(text.encode("utf-8"))
+        return self._handle.write(text)
+
+
+def _segments(manifest: Dict[str, Any]) -> set:
+    segments = {entry.get("segment", "") for entry in manifest.get("categories", {}).values()}
+    segments.add(manifest.get("catalog", {}).get("segment", CATALOG_SEGMENT))
+    segments.discard("")
+    return segments
+
+
+def encode_catalogs(kb_b1: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Encode ``kb_b1`` column-wise; aliases reference rows instead of repeating them."""
+
+    catalogs: Dict[str, Any] = {}
+    for catalog_key, catalog in kb_b1.items():
+        columns: Dict[str, List[Any]] = {field: [] for field in CATALOG_FIELDS}
+        aliases: Dict[str, int] = {}
+        rows: Dict[int, int] = {}
+        for alias, entry in catalog.items():
+            row = rows.get(id(entry))
+            if row is None:
+                row = len(rows)
+                rows[id(entry)] = row
+                for field in CATALOG_FIELDS:
+                    columns[field].append(entry.get(field, ""))
+            aliases[alias] = row
+        catalogs[catalog_key] = {"columns": columns, "aliases": aliases}
+    return {"fields": list(CATALOG_FIELDS), "catalogs": catalogs}
+
+
+def decode_catalogs(payload: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Inverse of :func:`encode_catalogs`; aliases share the same entry dict."""
+
+    fields = payload.get("fields", list(CATALOG_FIELDS))
+    kb_b1: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for catalog_key, block in payload.get("catalogs", {}).items():
+        columns = block.get("columns", {})
+        entries = [dict(zip(fields, values)) for values in zip(*(columns[field] for field in fields))]
+        kb_b1[catalog_key] = {alias: entries[row] for alias, row in block.get("aliases", {}).items()}
+    return kb_b1
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.core.config import settings
+    from app.core.kb_loader import KnowledgeBaseLoader
+
+    parser = argparse.ArgumentParser(description="Manage the compiled knowledge base snapshot")
+    parser.add_argument("command", choices=["build", "status", "clear"])
+    parser.add_argument("--kb-dir", type=Path, default=settings.KB_DIR)
+    parser.add_argument("--snapshot-dir", type=Path, default=settings.KB_SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+
+    snapshot = KnowledgeBaseSnapshot(args.snapshot_dir)
+
+    if args.command == "clear":
+        snapshot.clear()
+        print(f"Removed {args.snapshot_dir}")
+        return 0
+
+    if args.command == "status":
+        manifest, reason = snapshot.validate(
+            args.kb_dir, KnowledgeBaseLoader.CATEGORIES, KnowledgeBaseLoader.PARSER_VERSION
+        )
+        print(f"snapshot={args.snapshot_dir} status={reason}")
+        if manifest:
+            print(f"created_at={manifest.get('created_at')} sources={len(manifest.get('sources', {}))}")
+        return 0 if manifest else 1
+
+    loader = KnowledgeBaseLoader(args.kb_dir, snapshot_dir=args.snapshot_dir)
+    loader.load_all(rebuild_snapshot=True)
+    print(
+        f"Snapshot written to {args.snapshot_dir} "
+        f"({len(loader.data)} categories, {loader.load_stats['elapsed_ms']} ms)"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    raise SystemExit(main())
@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 import json
 
+from app.utils.number_parsing import parse_number
+
 logger = logging.getLogger(__name__)
 
 
@@ -262,8 +264,4 @@ class MinerUClient:
     
     def _parse_float(self, text: str) -> float:
         """Parse float from text"""
-        try:
-            text = text.strip().replace(' ', '').replace(',', '.')
-            return float(text)
-        except (ValueError, AttributeError):
-            return 0.0
+        return parse_number(text) or 0.0
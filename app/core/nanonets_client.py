@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 from app.core.config import settings
+from app.utils.number_parsing import parse_number
 
 logger = logging.getLogger(__name__)
 
@@ -323,8 +324,4 @@ class NanonetsClient:
     
     def _parse_float(self, text: str) -> float:
         """Parse float from text"""
-        try:
-            text = text.strip().replace(' ', '').replace(',', '.')
-            return float(text)
-        except (ValueError, AttributeError):
-            return 0.0
+        return parse_number(text) or 0.0
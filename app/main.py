@@ -18,6 +18,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_kb_watcher = None
+
 # Create FastAPI app
 app = FastAPI(
     title="Czech Building Audit System",
@@ -50,6 +52,7 @@ if web_dir.exists():
 @app.on_event("startup")
 async def startup_event():
     """Application startup"""
+    global _kb_watcher
     logger.info("=" * 80)
     logger.info("🚀 Czech Building Audit System Starting...")
     logger.info("=" * 80)
@@ -69,16 +72,21 @@ async def startup_event():
         from app.core.kb_loader import init_kb_loader
 
         kb_loader = init_kb_loader()
-        logger.info(f"✅ Knowledge Base loaded: {len(kb_loader.data)} categories")
+        stats = kb_loader.load_stats
+        logger.info(
+            f"✅ Knowledge Base loaded: {len(kb_loader.data)} categories "
+            f"(path={stats.get('path')}, reason={stats.get('reason')}, {stats.get('elapsed_ms')} ms)"
+        )
         
-        # Log each category
-        for category, payload in kb_loader.data.items():
-            if isinstance(payload, list):
-                logger.info(f"   - {category}: {len(payload)} items")
-            elif isinstance(payload, dict):
-                logger.info(f"   - {category}: {len(payload)} entries")
-            else:
-                logger.info(f"   - {category}: loaded")
+        # Log each category (snapshot categories stay unloaded until first use)
+        for category, size in kb_loader.category_sizes().items():
+            logger.info(f"   - {category}: {size} entries")
+
+        if settings.KB_WATCH_INTERVAL_SEC > 0:
+            from app.core.kb_loader import KnowledgeBaseWatcher
+
+            _kb_watcher = KnowledgeBaseWatcher(settings.KB_WATCH_INTERVAL_SEC)
+            _kb_watcher.start()
                 
     except Exception as e:
         logger.error(f"⚠️  KB loading failed: {str(e)}")
@@ -92,6 +100,16 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown"""
     logger.info("🛑 Czech Building Audit System shutting down...")
+    if _kb_watcher is not None:
+        _kb_watcher.stop()
+
+    from app.services.job_runner import shutdown_job_runner
+    from app.services.ocr_service import shutdown_ocr_service
+    from app.services.position_pipeline import shutdown_worker_pools
+
+    shutdown_job_runner()
+    shutdown_ocr_service()
+    shutdown_worker_pools()
 
 
 # REMOVED: Duplicate root endpoint
@@ -28,16 +28,19 @@ from app.models.project import (
     db_project_to_response,
     calculate_audit_summary,
 )
+from app.models.job import Job, JobStatus
 
 __all__ = [
     # === SQLAlchemy ===
     "Project",
+    "Job",
     "Base",
     
     # === Enums ===
     "ProjectStatus",
     "AuditClassification",
     "WorkflowType",
+    "JobStatus",
     
     # === Pydantic Models ===
     "ProjectCreate",
@@ -0,0 +1,49 @@
+"""
+Job model for the durable processing queue
+Rows are written by the API and claimed by `python -m app.worker`
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+
+from app.models.project import Base
+
+
+class JobStatus:
+    """Job states (stored as plain strings)"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """
+    Queued Workflow A/B run (SQLAlchemy)
+    payload/result hold JSON documents
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_available", "status", "available_at"),)
+
+    id = Column(String(32), primary_key=True)
+    project_id = Column(String(255), index=True, nullable=False)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), default=JobStatus.QUEUED, nullable=False)
+
+    payload = Column(Text, nullable=False, default="{}")
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    worker_id = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.id}: {self.kind} {self.project_id} ({self.status})>"
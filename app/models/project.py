@@ -3,7 +3,7 @@ Project models for Czech Building Audit System
 Combines SQLAlchemy (DB) and Pydantic (API) models
 UPDATED: Compatible with routes.py usage patterns
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, Index, Integer, String, Float, DateTime, Text, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List, Dict, Any, Union
@@ -58,6 +58,7 @@ class Project(Base):
     Stores project metadata and processing status
     """
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_created_at_project_id", "created_at", "project_id"),)
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -68,8 +69,9 @@ class Project(Base):
     description = Column(Text, nullable=True)
     
     # Status tracking
-    status = Column(SQLEnum(ProjectStatus), default=ProjectStatus.UPLOADED, nullable=False)
+    status = Column(SQLEnum(ProjectStatus), default=ProjectStatus.UPLOADED, nullable=False, index=True)
     workflow = Column(SQLEnum(WorkflowType), nullable=True)
+    enrichment_enabled = Column(Boolean, nullable=True)
     
     # File paths (ETL pipeline)
     raw_file_path = Column(String(1000), nullable=True)
@@ -78,6 +80,8 @@ class Project(Base):
     audit_report_path = Column(String(1000), nullable=True)
     
     # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     processed_at = Column(DateTime, nullable=True)
     audit_completed_at = Column(DateTime, nullable=True)
@@ -90,11 +94,25 @@ class Project(Base):
     
     # Error tracking
     error_message = Column(Text, nullable=True)
+
+    # Full project record as used by the API and workflows (JSON)
+    record = Column(Text, nullable=True)
     
     def __repr__(self):
         return f"<Project {self.project_id}: {self.name} ({self.status.value})>"
 
 
+class ProjectStatusCounter(Base):
+    """
+    Number of projects per status (SQLAlchemy)
+    Maintained by the project store in the same transaction as the project row
+    """
+    __tablename__ = "project_status_counters"
+
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+
 # =============================================================================
 # PYDANTIC API MODELS
 # =============================================================================
@@ -217,6 +235,10 @@ class ProjectStatusResponse(BaseModel):
     # Processing info
     positions_processed: int = 0
     positions_total: int = 0
+
+    # Job queue (None once the job has started)
+    queue_position: Optional[int] = Field(None, description="1-based position in the job queue")
+    job: Optional[Dict[str, Any]] = Field(None, description="Latest workflow job of the project")
     
     # Audit results (optional)
     green_count: int = 0
@@ -37,11 +37,24 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from app.services.parallel_files import run_file_tasks
 from app.services.pdf_text_recovery import PdfRecoverySummary, PdfTextRecovery
 
 logger = logging.getLogger(__name__)
 
 
+def _line_scanner(triggers: Iterable[Tuple[str, str]]) -> Tuple[re.Pattern[str], Tuple[str, ...]]:
+    """Compile ``(family, trigger)`` rules into one alternation.
+
+    Each alternative ends with an empty group, so ``match.lastindex`` names the
+    rule that fired: group ``i`` belongs to ``families[i - 1]``.
+    """
+
+    triggers = tuple(triggers)
+    pattern = re.compile("|".join(f"{trigger}()" for _, trigger in triggers))
+    return pattern, tuple(family for family, _ in triggers)
+
+
 @dataclass(frozen=True)
 class DrawingSpecification:
     """Parsed specification snippet coming from a drawing."""
@@ -108,6 +121,41 @@ class DrawingSpecsParser:
         "bridge_tokens",
     )
 
+    # Single-pass prefilter for ``_line_to_spec``.  Every trigger is a
+    # necessary condition for its family's patterns above, written against the
+    # case-folded line, and starts with a literal character so the regex engine
+    # rejects most positions on the first character.  Triggers consume only
+    # their first character (or a run of digits), so one family never hides
+    # another; keep them in step with the patterns (tests/test_drawing_specs_parser.py).
+    _NO_WORD_BEFORE = r"(?<!\w.)"
+    LINE_SCANNER, LINE_TRIGGER_FAMILIES = _line_scanner(
+        (
+            ("concrete", r"c(?=\d{2}/\d{2})"),
+            ("surface", r"c" + _NO_WORD_BEFORE + r"(?=[12][a-d]?\b)"),
+            ("steel", r"b(?=\d{3})"),
+            ("surface", r"b" + _NO_WORD_BEFORE + r"(?=[a-d]?\b)"),
+            ("steel", r"s(?=\d{3})"),
+            ("exposure", r"x(?=[acdfs]\d)"),
+            ("radii", r"r(?=\s*(?:=\s*)?\d)"),
+            ("bridge", r"r(?=ims)"),
+            ("cover", r"k(?=ryt)"),
+            ("bridge", r"k(?=loub)"),
+            ("norm", r"č(?=sn)"),
+            ("norm", r"t(?=k?p\s*\d)"),
+            ("norm", r"v(?=l4)"),
+            ("bridge", r"v(?=rubov)"),
+            ("surface", r"a" + _NO_WORD_BEFORE + r"(?=[a-d]?\b)"),
+            ("surface", r"d" + _NO_WORD_BEFORE + r"(?=[ab]?\b)"),
+            ("surface", r"e" + _NO_WORD_BEFORE + r"\b"),
+            ("bridge", r"p(?=ilot)"),
+            ("bridge", r"n(?=ivelet)"),
+            ("bridge", r"o(?=p[ěe]r)"),
+            ("bridge", r"ř(?=ímsa)"),
+            ("numeric", r"[ø⌀\d]+"),
+        )
+    )
+    LINE_FAMILIES = frozenset(LINE_TRIGGER_FAMILIES)
+
     ADDITIONAL_MARKERS = (
         "vodostavebni",
         "vodostavební",
@@ -120,45 +168,46 @@ class DrawingSpecsParser:
     def __init__(self, text_recovery: Optional[PdfTextRecovery] = None) -> None:
         self.text_recovery = text_recovery or PdfTextRecovery()
 
-    def parse_files(self, drawing_files: Iterable[Dict[str, object]]) -> Dict[str, object]:
+    def parse_files(
+        self,
+        drawing_files: Iterable[Dict[str, object]],
+        workers: int = 1,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, object]:
         """Parse all provided drawing files.
 
         Parameters
         ----------
         drawing_files:
             Iterable of dictionaries coming from :func:`WorkflowA._resolve_uploads`.
+        workers:
+            Number of drawings analysed concurrently in worker processes
+            (``1`` keeps everything in the current process).
+        timeout:
+            Per-drawing limit in seconds; a worker exceeding it is killed and
+            the drawing is reported in ``diagnostics["errors"]``.
 
         Returns
         -------
         dict
-            Dictionary with parsed specifications and diagnostics.
+            Dictionary with parsed specifications and diagnostics.  The result
+            does not depend on ``workers``: per-file results are merged in input
+            order.
         """
 
         specifications: List[DrawingSpecification] = []
         diagnostics = {"files_processed": 0, "specifications_found": 0, "errors": []}
-        pattern_hits = {
-            "concrete": 0,
-            "exposure": 0,
-            "steel": 0,
-            "mesh": 0,
-            "cover": 0,
-            "radii": 0,
-            "composite": 0,
-            "surface": 0,
-            "norm": 0,
-            "geometry": 0,
-            "bridge": 0,
-        }
-        marker_registry: Dict[str, Dict[str, Dict[str, str]]] = {
-            marker_type: {} for marker_type in self.MARKER_TYPES
-        }
+        pattern_hits = self._empty_pattern_hits()
+        marker_registry = self._empty_marker_registry()
 
         pages_state: List[Dict[str, object]] = []
         summary_counters = {"good_text": 0, "encoded_text": 0, "image_only": 0}
         pdfium_total = 0
         poppler_total = 0
+        ocr_total = 0
         ocr_plan: List[Dict[str, object]] = []
 
+        pdf_paths: List[Path] = []
         for file_meta in drawing_files:
             if not file_meta.get("exists"):
                 continue
@@ -167,19 +216,30 @@ class DrawingSpecsParser:
             if file_path.suffix.lower() != ".pdf":
                 logger.debug("Skipping non-PDF drawing: %s", file_path)
                 continue
+            pdf_paths.append(file_path)
 
-            try:
-                specs, recovery = self._parse_single_pdf(file_path, pattern_hits, marker_registry)
-            except Exception as exc:  # noqa: BLE001 - logged for diagnostics
-                logger.exception("Failed to parse drawing %s: %s", file_path.name, exc)
+        outcomes = run_file_tasks(self._parse_pdf_isolated, pdf_paths, workers=workers, timeout=timeout)
+
+        for file_path, outcome in zip(pdf_paths, outcomes):
+            if not outcome.ok:
+                logger.error("Failed to parse drawing %s: %s", file_path.name, outcome.error)
                 diagnostics["errors"].append(
                     {
                         "file": file_path.name,
-                        "error": str(exc),
+                        "error": outcome.error,
                     }
                 )
                 continue
 
+            specs, recovery, file_hits, file_markers = outcome.value
+            for key, value in file_hits.items():
+                pattern_hits[key] = pattern_hits.get(key, 0) + value
+            for marker_type, values in file_markers.items():
+                store = marker_registry.setdefault(marker_type, {})
+                for value, marker in values.items():
+                    if value not in store:
+                        store[value] = marker
+
             if specs:
                 specifications.extend(specs)
 
@@ -192,11 +252,13 @@ class DrawingSpecsParser:
 
             pdfium_total += recovery.used_pdfium
             poppler_total += recovery.used_poppler
+            ocr_total += recovery.used_ocr
 
             if recovery.queued_ocr_pages:
                 ocr_plan.append(
                     {
                         "file": file_path.name,
+                        "path": str(file_path),
                         "pages": recovery.queued_ocr_pages,
                     }
                 )
@@ -224,6 +286,7 @@ class DrawingSpecsParser:
         diagnostics["page_states"] = summary_counters
         diagnostics["used_pdfium"] = pdfium_total
         diagnostics["used_poppler"] = poppler_total
+        diagnostics["used_ocr"] = ocr_total
         diagnostics["ocr_pages_total"] = sum(len(item["pages"]) for item in ocr_plan)
 
         return {
@@ -234,6 +297,7 @@ class DrawingSpecsParser:
             "pages_state": pages_state,
             "used_pdfium": pdfium_total,
             "used_poppler": poppler_total,
+            "used_ocr": ocr_total,
             "ocr_pages": ocr_plan,
         }
 
@@ -241,6 +305,40 @@ class DrawingSpecsParser:
     # Internal helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _empty_pattern_hits() -> Dict[str, int]:
+        return {
+            "concrete": 0,
+            "exposure": 0,
+            "steel": 0,
+            "mesh": 0,
+            "cover": 0,
+            "radii": 0,
+            "composite": 0,
+            "surface": 0,
+            "norm": 0,
+            "geometry": 0,
+            "bridge": 0,
+        }
+
+    def _empty_marker_registry(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        return {marker_type: {} for marker_type in self.MARKER_TYPES}
+
+    def _parse_pdf_isolated(
+        self, file_path: Path
+    ) -> Tuple[
+        List[DrawingSpecification],
+        PdfRecoverySummary,
+        Dict[str, int],
+        Dict[str, Dict[str, Dict[str, str]]],
+    ]:
+        """Parse one drawing with its own counters so it can run in a worker."""
+
+        pattern_hits = self._empty_pattern_hits()
+        marker_registry = self._empty_marker_registry()
+        specs, recovery = self._parse_single_pdf(file_path, pattern_hits, marker_registry)
+        return specs, recovery, pattern_hits, marker_registry
+
     def _parse_single_pdf(
         self,
         file_path: Path,
@@ -252,39 +350,19 @@ class DrawingSpecsParser:
         logger.info("📐 Analysing drawing %s", file_path.name)
         collected: List[DrawingSpecification] = []
 
-        recovery = self.text_recovery.recover(file_path)
-
-        counters = recovery.page_state_counters()
-        logger.info(
-            "drawing_detector: pages=%s pdfium_used=%s poppler_used=%s ocr_pages=%s",
-            counters,
-            recovery.used_pdfium,
-            recovery.used_poppler,
-            len(recovery.queued_ocr_pages),
-        )
-
-        for page in recovery.pages:
-            pdfium_info = page.fallbacks.get("pdfium")
-            poppler_info = page.fallbacks.get("poppler")
-
-            pdfium_state = "n/a"
-            if pdfium_info:
-                accepted = "accepted" if page.extractor == "pdfium" else "candidate"
-                pdfium_state = f"{accepted}(valid={pdfium_info.valid_ratio:.2f})"
-
-            poppler_state = "n/a"
-            if poppler_info:
-                accepted = "accepted" if page.extractor == "poppler" else "candidate"
-                poppler_state = f"{accepted}(valid={poppler_info.valid_ratio:.2f})"
-
+        pages = []
+        # Pages arrive as soon as their range is recovered; markers are
+        # extracted while the rest of the document is still being read.
+        for page in self.text_recovery.recover_iter(file_path):
+            pages.append(page)
             logger.debug(
-                "p%s: state=%s miner=valid=%.2f pua=%.2f pdfium=%s poppler=%s ocr=%s",
+                "p%s: state=%s primary=valid=%.2f pua=%.2f accepted=%s fallbacks=%s ocr=%s",
                 page.page_number,
                 page.state,
                 page.miner.valid_ratio,
                 page.miner.pua_ratio,
-                pdfium_state,
-                poppler_state,
+                page.extractor,
+                {name: round(metrics.valid_ratio, 2) for name, metrics in page.fallbacks.items()} or "n/a",
                 "queued" if page.queued_for_ocr else "no",
             )
 
@@ -302,6 +380,14 @@ class DrawingSpecsParser:
                     collected.append(spec)
                     self._register_markers(marker_registry, spec)
 
+        recovery = PdfRecoverySummary.from_pages(pages)
+        logger.info(
+            "drawing_detector: pages=%s pdfium_used=%s poppler_used=%s ocr_pages=%s",
+            recovery.page_state_counters(),
+            recovery.used_pdfium,
+            recovery.used_poppler,
+            len(recovery.queued_ocr_pages),
+        )
         return collected, recovery
 
     def _register_markers(
@@ -421,23 +507,47 @@ class DrawingSpecsParser:
     ) -> Optional[DrawingSpecification]:
         """Convert a single line of text into a specification if possible."""
 
-        concrete_matches = [match.upper() for match in self._unique_matches(self.CONCRETE_PATTERN, line)]
-        reinforcement_matches = [
-            match.upper() for match in self._unique_matches(self.REINFORCEMENT_PATTERN, line)
-        ]
-        steel_matches = [match.upper() for match in self._unique_matches(self.STEEL_PATTERN, line)]
-        exposure_matches = [
-            match.upper() for match in self._unique_matches(self.EXPOSURE_PATTERN, line)
-        ]
-        mesh_matches = self._collect_mesh(line)
-        radii_matches = self._collect_radii(line)
-        cover_matches = self._collect_cover(line)
-        composite_matches = self._collect_composite_codes(line)
-        surface_matches = self._collect_surface_categories(line)
-        norm_matches = self._collect_norm_refs(line)
-        geometry_matches = self._collect_geometry_tokens(line)
-        bridge_matches = self._collect_bridge_tokens(line)
-        unit = self._first_match(self.UNIT_PATTERN, line)
+        families = self._scan_line(line)
+        if not families and not self._has_additional_marker(line):
+            return None
+
+        concrete_matches: List[str] = []
+        reinforcement_matches: List[str] = []
+        steel_matches: List[str] = []
+        exposure_matches: List[str] = []
+        mesh_matches: List[str] = []
+        radii_matches: List[str] = []
+        cover_matches: List[Dict[str, str]] = []
+        composite_matches: List[str] = []
+        surface_matches: List[str] = []
+        norm_matches: List[str] = []
+        geometry_matches: List[str] = []
+        bridge_matches: List[str] = []
+        if "concrete" in families:
+            concrete_matches = [match.upper() for match in self._unique_matches(self.CONCRETE_PATTERN, line)]
+        if "steel" in families:
+            reinforcement_matches = [
+                match.upper() for match in self._unique_matches(self.REINFORCEMENT_PATTERN, line)
+            ]
+            steel_matches = [match.upper() for match in self._unique_matches(self.STEEL_PATTERN, line)]
+        if "exposure" in families:
+            exposure_matches = [
+                match.upper() for match in self._unique_matches(self.EXPOSURE_PATTERN, line)
+            ]
+        if "numeric" in families:
+            mesh_matches = self._collect_mesh(line)
+            composite_matches = self._collect_composite_codes(line)
+            geometry_matches = self._collect_geometry_tokens(line)
+        if "radii" in families:
+            radii_matches = self._collect_radii(line)
+        if "cover" in families:
+            cover_matches = self._collect_cover(line)
+        if "surface" in families:
+            surface_matches = self._collect_surface_categories(line)
+        if "norm" in families:
+            norm_matches = self._collect_norm_refs(line)
+        if "bridge" in families:
+            bridge_matches = self._collect_bridge_tokens(line)
 
         if concrete_matches:
             pattern_hits["concrete"] += len(concrete_matches)
@@ -473,8 +583,7 @@ class DrawingSpecsParser:
 
         if not anchor_candidates:
             # Check for general markers to avoid missing textual specs.
-            lower_line = line.lower()
-            if not any(marker in lower_line for marker in self.ADDITIONAL_MARKERS):
+            if not self._has_additional_marker(line):
                 return None
 
             anchor_candidates.append(self._derive_anchor_from_text(line))
@@ -482,6 +591,7 @@ class DrawingSpecsParser:
         anchor = anchor_candidates[0]
         if not anchor:
             return None
+        unit = self._first_match(self.UNIT_PATTERN, line)
 
         technical_specs: Dict[str, object] = {}
         if concrete_matches:
@@ -545,6 +655,16 @@ class DrawingSpecsParser:
             technical_specs=technical_specs,
         )
 
+    def _scan_line(self, line: str) -> frozenset[str]:
+        """Marker families that may occur in ``line`` (see ``LINE_SCANNER``)."""
+
+        families = self.LINE_TRIGGER_FAMILIES
+        return frozenset(families[match.lastindex - 1] for match in self.LINE_SCANNER.finditer(line.casefold()))
+
+    def _has_additional_marker(self, line: str) -> bool:
+        lower_line = line.lower()
+        return any(marker in lower_line for marker in self.ADDITIONAL_MARKERS)
+
     @staticmethod
     def _first_match(pattern: re.Pattern[str], text: str) -> Optional[str]:
         match = pattern.search(text)
@@ -1,19 +1,38 @@
 """
 Excel Parser - ИСПРАВЛЕНО
 Теперь использует универсальный нормализатор для всех форматов
+
+Workbooks are opened read-only and every sheet is consumed row by row through
+``iter_rows(values_only=True)``, so memory stays bounded whatever the file
+size and no cell object model is built.
 """
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 import openpyxl
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
 from openpyxl.worksheet.worksheet import Worksheet
 import re
 import unicodedata
 
+from app.utils.parsed_rows import ParsedRow, RowSchema
 from app.utils.position_normalizer import normalize_positions
 
 logger = logging.getLogger(__name__)
 
+AnyWorksheet = Union[Worksheet, ReadOnlyWorksheet]
+
+
+def _reset_dimensions(sheet: Optional[AnyWorksheet]) -> None:
+    """Make a read-only sheet read up to its last row instead of its ``<dimension>`` tag.
+
+    Read-only worksheets trust the dimension recorded by the writing
+    application; exporters that leave a stale ``ref="A1"`` would otherwise
+    cut the sheet off after its first cell.
+    """
+    if isinstance(sheet, ReadOnlyWorksheet):
+        sheet.reset_dimensions()
+
 
 class ExcelParser:
     """Parse construction estimates from Excel files"""
@@ -35,8 +54,11 @@ class ExcelParser:
 
         logger.info("%s📊 Parsing Excel: %s", project_prefix, file_path.name)
         
+        workbook = None
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
+            # Read-only mode streams rows from the sheet XML instead of
+            # materialising every cell.
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
             
             logger.info(
                 "%sExcel has %s sheet(s): %s",
@@ -136,33 +158,25 @@ class ExcelParser:
                     "header_detection": []
                 }
             }
+        finally:
+            if workbook is not None:
+                # Read-only workbooks keep the archive open until closed.
+                workbook.close()
     
     def _parse_sheet(
-        self, sheet: Worksheet, sheet_name: str
+        self, sheet: AnyWorksheet, sheet_name: str
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Parse a single Excel sheet
         
         Args:
-            sheet: openpyxl Worksheet object
+            sheet: openpyxl worksheet (read-only or regular)
             sheet_name: Name of the sheet
             
         Returns:
-            Tuple of raw position dicts (not normalized yet) and diagnostics
+            Tuple of raw rows (not normalized yet) and diagnostics
         """
-        if not sheet or sheet.max_row < 1:
-            logger.debug(f"Sheet '{sheet_name}' is empty or too small")
-            diagnostics = {
-                "header_found": False,
-                "header_row": None,
-                "header_values": [],
-                "matched_keywords": [],
-                "searched_rows": sheet.max_row if sheet else 0,
-                "reason": "Sheet is empty or too small",
-            }
-            return [], diagnostics
-        
-        positions: List[Dict[str, Any]] = []
+        positions: List[ParsedRow] = []
         skipped_entries: List[Dict[str, Any]] = []
         header_blocks: List[Dict[str, Any]] = []
 
@@ -173,6 +187,8 @@ class ExcelParser:
         active_header_keys: List[str] = []
         field_to_column: Dict[str, int] = {}
         active_header_raw_map: Dict[str, str] = {}
+        active_fields: List[Optional[str]] = []
+        active_schema: Optional[RowSchema] = None
 
         first_header: Optional[Dict[str, Any]] = None
         best_candidate: Optional[Dict[str, Any]] = None
@@ -198,26 +214,29 @@ class ExcelParser:
                 f" ({extra_info})" if extra_info else "",
             )
 
-        for row_idx in range(1, sheet.max_row + 1):
-            row = sheet[row_idx]
+        rows_scanned = 0
+        _reset_dimensions(sheet)
+        rows = sheet.iter_rows(values_only=True) if sheet is not None else ()
+        for row_idx, row in enumerate(rows, start=1):
+            rows_scanned = row_idx
 
             raw_values: List[str] = []
             normalized_values: List[str] = []
             has_values = False
 
-            for cell in row:
+            for value in row:
                 raw_value = ""
-                if cell.value is not None:
-                    if isinstance(cell.value, str):
-                        raw_value = cell.value.strip()
+                if value is not None:
+                    if isinstance(value, str):
+                        raw_value = value.strip()
                     else:
-                        raw_value = str(cell.value).strip()
+                        raw_value = str(value).strip()
 
                 if raw_value:
                     has_values = True
 
                 raw_values.append(raw_value)
-                normalized_values.append(ExcelParser._normalize_header_value(cell.value))
+                normalized_values.append(ExcelParser._normalize_header_value(value))
 
             if len(sample_rows) < 5:
                 sample_rows.append(raw_values)
@@ -261,11 +280,15 @@ class ExcelParser:
                     if raw_header:
                         active_header_raw_map[header_key] = raw_header
 
+                # One schema per header block, shared by all rows below it.
+                active_schema = RowSchema.create(sheet_name, active_header_keys, active_header_raw_map)
+                active_fields = [info["field"] for info in active_header_info]
+
                 header_block = {
                     "row": row_idx,
                     "raw_headers": raw_values,
                     "normalized_headers": normalized_values,
-                    "canonical_fields": [info["field"] for info in active_header_info],
+                    "canonical_fields": list(active_fields),
                     "field_mapping": field_to_column.copy(),
                     "matched_fields": candidate["matched_fields"],
                 }
@@ -304,36 +327,18 @@ class ExcelParser:
                 record_skip(row_idx, "service_keyword", keyword=keyword_reason)
                 continue
 
-            position: Dict[str, Any] = {}
+            parsed_row = ParsedRow(
+                schema=active_schema,
+                row_index=row_idx,
+                values=tuple(self._clean_cell_value(value) for value in row),
+            )
+            position = parsed_row.cells()
             canonical_row: Dict[str, Any] = {}
 
-            for col_idx, cell in enumerate(row):
-                header_key = (
-                    active_header_keys[col_idx]
-                    if col_idx < len(active_header_keys)
-                    else f"col_{col_idx}"
-                )
-
-                cleaned_value = self._clean_cell_value(cell.value)
-                if cleaned_value is None:
+            for col_idx, cleaned_value in enumerate(parsed_row.values):
+                if cleaned_value is None or col_idx >= len(active_fields):
                     continue
-
-                if header_key in position:
-                    existing_value = position[header_key]
-                    if isinstance(existing_value, list):
-                        existing_value.append(cleaned_value)
-                    else:
-                        position[header_key] = [existing_value, cleaned_value]
-                else:
-                    position[header_key] = cleaned_value
-
-                header_info = (
-                    active_header_info[col_idx]
-                    if col_idx < len(active_header_info)
-                    else None
-                )
-                canonical_field = header_info["field"] if header_info else None
-
+                canonical_field = active_fields[col_idx]
                 if canonical_field and canonical_field not in canonical_row:
                     canonical_row[canonical_field] = cleaned_value
 
@@ -367,15 +372,7 @@ class ExcelParser:
                     sheet_name,
                 )
 
-            position['_source'] = f"sheet_{sheet_name}_row_{row_idx}"
-            position['_sheet_name'] = sheet_name
-            position['_row_values'] = list(raw_values)
-            if raw_values:
-                position['_row_first_value'] = raw_values[0]
-            if active_header_raw_map:
-                position['_header_map'] = dict(active_header_raw_map)
-
-            positions.append(position)
+            positions.append(parsed_row)
             last_data_row = row_idx
 
             logger.debug(
@@ -385,6 +382,18 @@ class ExcelParser:
                 sorted(canonical_row.keys()),
             )
 
+        if not rows_scanned:
+            logger.debug(f"Sheet '{sheet_name}' is empty or too small")
+            diagnostics = {
+                "header_found": False,
+                "header_row": None,
+                "header_values": [],
+                "matched_keywords": [],
+                "searched_rows": 0,
+                "reason": "Sheet is empty or too small",
+            }
+            return [], diagnostics
+
         logger.debug(f"Extracted {len(positions)} raw positions from sheet")
 
         sheet_diagnostics = {
@@ -392,14 +401,14 @@ class ExcelParser:
             "header_row": first_header["row"] if first_header else None,
             "header_values": first_header["raw_headers"] if first_header else [],
             "matched_keywords": first_header["matched_fields"] if first_header else [],
-            "searched_rows": sheet.max_row,
+            "searched_rows": rows_scanned,
             "header_blocks": header_blocks,
             "skipped": skipped_entries,
             "summary": {
                 "positions_found": len(positions),
                 "positions_skipped": positions_skipped,
                 "last_data_row": last_data_row,
-                "rows_scanned": sheet.max_row,
+                "rows_scanned": rows_scanned,
             },
         }
 
@@ -433,7 +442,7 @@ class ExcelParser:
         return normalized.strip()
 
     @staticmethod
-    def _find_header_row(sheet: Worksheet) -> Dict[str, Any]:
+    def _find_header_row(sheet: AnyWorksheet) -> Dict[str, Any]:
         """
         Find the row that contains column headers
 
@@ -480,24 +489,25 @@ class ExcelParser:
         }
         normalized_keywords.discard("")
 
-        search_limit = min(100, sheet.max_row)
+        search_limit = 0
         sample_rows: List[List[str]] = []
         best_candidate: Optional[Dict[str, Any]] = None
 
-        for row_idx in range(1, search_limit + 1):
-            row = sheet[row_idx]
+        _reset_dimensions(sheet)
+        for row_idx, row in enumerate(sheet.iter_rows(max_row=100, values_only=True), start=1):
+            search_limit = row_idx
             raw_values = [
-                str(cell.value).strip() if cell.value is not None else ""
-                for cell in row
+                str(value).strip() if value is not None else ""
+                for value in row
             ]
 
             if len(sample_rows) < 5:
                 sample_rows.append(raw_values)
 
             normalized_cells = [
-                ExcelParser._normalize_header_value(cell.value)
-                for cell in row
-                if cell.value is not None
+                ExcelParser._normalize_header_value(value)
+                for value in row
+                if value is not None
             ]
 
             row_text = " ".join(value for value in normalized_cells if value)
@@ -1,18 +1,136 @@
-"""KROS Parser - explicit XC4/OTSKP ingestion and fallbacks."""
+"""KROS Parser - explicit XC4/OTSKP ingestion and fallbacks.
+
+The parser streams: the dialect is sniffed from the first ``SNIFF_BYTES`` of
+the file, then positions are read with ``iterparse`` and every consumed
+element is cleared and detached, so memory stays bounded by one position
+element no matter how large the export is.  Raw positions are handed to the
+normaliser as a generator.
+"""
 
 from __future__ import annotations
 
 import logging
 import re
+from collections import Counter
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
-from app.parsers.xc4_parser import parse_xml_tree as parse_aspe_xml_tree
+from app.parsers.otskp_catalog import iter_catalog_records, iter_tree_catalog_records
+from app.parsers.xc4_parser import iter_parse_results as iter_aspe_positions
 from app.utils.position_normalizer import normalize_positions
 
 logger = logging.getLogger(__name__)
 
+# XC4 containers and the first position elements sit near the top of every
+# KROS/ASPE export; only when none show up here is the whole file scanned.
+SNIFF_BYTES = 64 * 1024
+
+_TAG_NAME = re.compile(rb"<(?:[A-Za-z_][\w.\-]*:)?([A-Za-z_][\w.\-]*)")
+_MARKER_TAGS = frozenset({"XC4", "Polozky", "Polozka", "TZ", "Row", "objekty", "polozka"})
+
+# Position element tags, in order of preference.
+UNIXML_ITEM_TAGS = ("Polozka", "polozka", "Position", "Item")
+TABULAR_ROW_TAGS = ("Row", "row")
+
+# Column letters used by KROS tabular exports.
+TABULAR_COLUMNS = {
+    'A': 'number',
+    'B': 'code',
+    'C': 'description',
+    'D': 'additional_info',
+    'E': 'unit',
+    'F': 'quantity',
+    'G': 'unit_price',
+    'H': 'total_price',
+    'I': 'note'
+}
+
+RecordMatcher = Callable[[str, int], bool]
+
+
+def _format_from_tags(tags: FrozenSet[str], *, include_xc4: bool = True) -> str:
+    """Map the marker tags present in a document to its KROS dialect."""
+
+    if include_xc4 and "XC4" in tags:
+        return "OTSKP_XC4"
+    if "Polozky" in tags or "Polozka" in tags:
+        return "KROS_UNIXML"
+    if "TZ" in tags or "Row" in tags:
+        return "KROS_TABULAR"
+    if "objekty" in tags and "polozka" in tags:
+        return "ASPE_XC4"
+    return "UNKNOWN"
+
+
+def _iter_elements(file_path: Path, is_record: RecordMatcher) -> Iterator[ET.Element]:
+    """Yield complete record elements from ``file_path`` with bounded memory.
+
+    ``is_record(tag, depth)`` is asked for every element that starts.  A record
+    keeps its children until it has been yielded; every element is cleared and
+    detached from its parent once it ends.  Records nested inside a record are
+    detached from it and yielded after it, in document order, like
+    ``findall(".//tag")`` would return them.
+    """
+
+    stack: List[ET.Element] = []
+    open_records: List[Tuple[int, int]] = []  # (depth, start order) of records being read
+    nested: List[Tuple[int, ET.Element]] = []
+    started = 0
+
+    for event, element in ET.iterparse(str(file_path), events=("start", "end")):
+        if event == "start":
+            if is_record(element.tag, len(stack)):
+                open_records.append((len(stack), started))
+                started += 1
+            stack.append(element)
+            continue
+
+        stack.pop()
+        depth = len(stack)
+        if open_records and open_records[-1][0] == depth:
+            _, order = open_records.pop()
+            if open_records:
+                # Hold nested records apart so the enclosing one keeps only its own fields.
+                stack[-1].remove(element)
+                nested.append((order, element))
+                continue
+            yield element
+            nested.sort(key=lambda item: item[0])
+            for _, record in nested:
+                yield record
+                record.clear()
+            nested.clear()
+        elif open_records:
+            continue
+
+        element.clear()
+        # iterparse reads ahead, so later siblings may already be attached;
+        # finished elements are detached in order and are always the first child.
+        if stack and len(stack[-1]) and stack[-1][0] is element:
+            del stack[-1][0]
+
+
+def _child_texts(element: ET.Element) -> Dict[str, str]:
+    return {child.tag: child.text.strip() for child in element if child.text}
+
+
+def _preferred_tag(candidates: Tuple[str, ...], seen: FrozenSet[str]) -> RecordMatcher:
+    """Match the first candidate seen while sniffing, else the first one streamed."""
+
+    chosen = [tag for tag in candidates if tag in seen][:1]
+
+    def is_record(tag: str, depth: int) -> bool:
+        if chosen:
+            return tag == chosen[0]
+        if tag in candidates:
+            chosen.append(tag)
+            return True
+        return False
+
+    return is_record
+
 
 class KROSParser:
     """Parse KROS XML files (UNIXML, Tabulární and AspeEsticon XC4 formats)"""
@@ -37,54 +155,53 @@ class KROSParser:
         kros_format = "UNKNOWN"
 
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-
-            if self._has_xc4_prices(root):
-                kros_format = "OTSKP_XC4"
-            else:
-                # Detect KROS format only if explicit XC4 subtree is missing
-                kros_format = self._detect_format(root)
+            tags = self._sniff_tags(file_path)
+            kros_format = _format_from_tags(tags)
             logger.info("%sDetected KROS format: %s", project_prefix, kros_format)
 
             # Parse based on format
             parser_diagnostics: Dict[str, Any] = {}
-            positions: List[Dict[str, Any]] = []
+            positions: Iterator[Dict[str, Any]] = iter(())
 
             if kros_format == "OTSKP_XC4":
-                positions = self._parse_xc4_price_lists(root, register_runtime=True)
-
-            if not positions:
-                if self._has_xc4_prices(root):
+                positions = self._iter_xc4_price_lists(file_path, register_runtime=True)
+                first = next(positions, None)
+                if first is None:
                     logger.info(
                         "%sXC4 subtree detected but explicit parse returned 0 items",
                         project_prefix,
                     )
-                if kros_format == "KROS_UNIXML":
-                    positions = self._parse_unixml(root)
-                elif kros_format == "KROS_TABULAR":
-                    positions = self._parse_tabular(root)
-                elif kros_format == "ASPE_XC4":
-                    positions, parser_diagnostics = self._parse_aspe_xc4(root)
+                    # Fall back to the dialect the document has besides XC4
+                    kros_format = _format_from_tags(tags, include_xc4=False)
                 else:
-                    logger.warning("Unknown KROS format, trying generic XML parsing")
-                    positions = self._parse_generic(root)
-
-            logger.info(
-                "%sExtracted %s raw positions from KROS XML", project_prefix, len(positions)
-            )
-
-            # Normalize positions and capture statistics
+                    positions = chain((first,), positions)
+
+            if kros_format == "KROS_UNIXML":
+                positions = self._iter_unixml(file_path, tags)
+            elif kros_format == "KROS_TABULAR":
+                positions = self._iter_tabular(file_path, tags)
+            elif kros_format == "ASPE_XC4":
+                positions = self._iter_aspe_xc4(file_path, parser_diagnostics)
+            elif kros_format == "UNKNOWN":
+                logger.warning("Unknown KROS format, trying generic XML parsing")
+                positions = self._iter_generic(file_path)
+
+            # Normalize positions (consumed lazily) and capture statistics
             normalized_positions, normalization_stats = normalize_positions(
                 positions,
                 return_stats=True
             )
 
+            logger.info(
+                "%sExtracted %s raw positions from KROS XML",
+                project_prefix,
+                normalization_stats["raw_total"],
+            )
             parsed_total = normalization_stats["normalized_total"]
             logger.info("Parsed KROS XML: %s positions", parsed_total)
 
             parser_diagnostics = parser_diagnostics or {
-                "parsed": len(positions),
+                "parsed": normalization_stats["raw_total"],
                 "skipped": []
             }
 
@@ -121,61 +238,74 @@ class KROSParser:
                     "parsing": {"parsed": 0, "skipped": []}
                 }
             }
-    
+
     @staticmethod
-    def _detect_format(root: ET.Element) -> str:
-        """
-        Detect KROS XML format
-        
-        Returns:
-            "KROS_UNIXML", "KROS_TABULAR", or "UNKNOWN"
+    def _sniff_tags(file_path: Path) -> FrozenSet[str]:
         """
-        # Check for UNIXML markers
-        if root.find(".//Polozky") is not None or root.find(".//Polozka") is not None:
-            return "KROS_UNIXML"
-
-        # Check for Tabular markers
-        if root.find(".//TZ") is not None or root.find(".//Row") is not None:
-            return "KROS_TABULAR"
-
-        # Check for AspeEsticon XC4 markers
-        if root.find(".//objekty") is not None and root.find(".//polozka") is not None:
-            source = root.findtext(".//zdroj")
-            if source and source.strip().lower() == "aspeesticon":
-                return "ASPE_XC4"
-            return "ASPE_XC4"
+        Collect the format marker tags of a KROS XML file
 
-        return "UNKNOWN"
+        Tag names are taken from the first ``SNIFF_BYTES`` with a regex.  When
+        they decide nothing and the file is longer, all element tags are
+        streamed once instead (bounded memory, no tree is built).
+        """
+        with open(file_path, "rb") as handle:
+            head = handle.read(SNIFF_BYTES)
+            truncated = bool(handle.read(1))
 
-    @staticmethod
-    def _has_xc4_prices(root: ET.Element) -> bool:
-        """Return True if the XML tree contains XC4 price-list nodes."""
+        tags = frozenset(match.decode("ascii") for match in _TAG_NAME.findall(head))
+        markers = tags & _MARKER_TAGS
+        if not truncated or _format_from_tags(markers) != "UNKNOWN":
+            return tags
 
-        def _local(tag: str) -> str:
-            return tag.split("}")[-1] if tag else ""
+        seen = set(tags)
 
-        if _local(root.tag) == "XC4":
-            return True
+        def collect(tag: str, depth: int) -> bool:
+            seen.add(tag)
+            return False
 
-        return root.find(".//XC4") is not None
+        for _ in _iter_elements(file_path, collect):
+            pass
+        return frozenset(seen)
 
     # ------------------------------------------------------------------
     # XC4 Cenové soustavy (TSKP / OTSKP)
     # ------------------------------------------------------------------
 
+    def _iter_xc4_price_lists(
+        self,
+        file_path: Path,
+        *,
+        register_runtime: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream XC4 Cenové soustavy (TSKP / OTSKP) records from a file."""
+
+        yield from self._register_xc4_records(
+            iter_catalog_records(file_path, include_generic=False),
+            register_runtime=register_runtime,
+        )
+
     def _parse_xc4_price_lists(
         self,
         root: ET.Element,
         *,
         register_runtime: bool = True,
     ) -> List[Dict[str, Any]]:
-        """Parse XC4 Cenové soustavy (TSKP / OTSKP) structures."""
+        """Parse XC4 Cenové soustavy (TSKP / OTSKP) structures from a tree."""
 
-        cenove_nodes = list(self._iter_cenove_soustavy(root))
-        if not cenove_nodes:
-            return []
+        return list(
+            self._register_xc4_records(
+                iter_tree_catalog_records(root), register_runtime=register_runtime
+            )
+        )
+
+    def _register_xc4_records(
+        self,
+        records: Iterable[Dict[str, Any]],
+        *,
+        register_runtime: bool,
+    ) -> Iterator[Dict[str, Any]]:
+        """Pass XC4 records through, registering their codes in the runtime KB."""
 
-        positions: List[Dict[str, Any]] = []
         runtime_registered = 0
         runtime_catalog: Dict[str, Dict[str, Any]] | None = None
         runtime_loader = None
@@ -188,52 +318,23 @@ class KROSParser:
                 runtime_catalog = runtime_loader.kb_b1.setdefault("tskp", {})
             except Exception:  # pragma: no cover - runtime KB may not be available yet
                 runtime_catalog = None
-        for cs_node in cenove_nodes:
-            cs_type = self._find_text(cs_node, "typ_CS") or self._find_text(cs_node, "typ_cs")
-            cs_type = (cs_type or "").strip().upper()
-            if cs_type and cs_type not in {"TSKP", "OTSKP"}:
-                continue
 
-            polozky = self._find_child(cs_node, "Polozky")
-            if polozky is None:
-                continue
-
-            for item in self._iter_children(polozky, "Polozka"):
-                code = (self._find_text(item, "znacka") or "").strip()
-                name = (self._find_text(item, "nazev") or "").strip()
-                unit = (self._find_text(item, "MJ") or "").strip()
-                tech_spec = (self._find_text(item, "technicka_specifikace") or "").strip()
-                unit_price = (self._find_text(item, "jedn_cena") or "").strip()
-
-                if not code and not name:
-                    continue
-
-                position: Dict[str, Any] = {
-                    "code": code,
-                    "name": name,
-                    "unit": unit,
-                    "tech_spec": tech_spec,
-                    "unit_price": unit_price,
-                    "system": cs_type or "TSKP",
-                }
+        for position in records:
+            if runtime_catalog is not None and position["code"]:
+                runtime_registered += self._register_runtime_position(
+                    runtime_catalog,
+                    position["code"],
+                    position["name"],
+                    position["unit"],
+                    position["tech_spec"],
+                    position["system"],
+                )
 
-                positions.append(position)
-
-                if runtime_catalog is not None and code:
-                    runtime_registered += self._register_runtime_position(
-                        runtime_catalog,
-                        code,
-                        name,
-                        unit,
-                        tech_spec,
-                        cs_type or "TSKP",
-                    )
+            yield position
 
         if runtime_registered and runtime_loader is not None:
             runtime_loader._kros_index = None  # invalidate cached index so new codes are visible
 
-        return positions
-
     @staticmethod
     def _register_runtime_position(
         catalog: Dict[str, Dict[str, Any]],
@@ -262,100 +363,27 @@ class KROSParser:
 
         return registered
 
-    # Helper utilities -------------------------------------------------
-
-    @staticmethod
-    def _iter_cenove_soustavy(root: ET.Element) -> Iterable[ET.Element]:
-        """Yield <CenoveSoustavy> nodes using the explicit XC4 structure."""
-
-        visited: set[int] = set()
-
-        def _local(tag: str) -> str:
-            return tag.split("}")[-1] if tag else ""
-
-        def _children(element: Optional[ET.Element], tag: str) -> Iterable[ET.Element]:
-            if element is None:
-                return []
-            return [child for child in element if _local(child.tag).lower() == tag.lower()]
-
-        building_info = None
-        if _local(root.tag).lower() == "buildinginformation":
-            building_info = root
-        else:
-            for candidate in root.iter():
-                if _local(candidate.tag).lower() == "buildinginformation":
-                    building_info = candidate
-                    break
-
-        if building_info is not None:
-            for classification in _children(building_info, "Classification"):
-                for system in _children(classification, "System"):
-                    for items in _children(system, "Items"):
-                        for item in _children(items, "Item"):
-                            for children in _children(item, "Children"):
-                                for nested in _children(children, "Item"):
-                                    xc4 = next(iter(_children(nested, "XC4")), None)
-                                    if xc4 is None:
-                                        continue
-                                    for cs_node in _children(xc4, "CenoveSoustavy"):
-                                        identifier = id(cs_node)
-                                        if identifier not in visited:
-                                            visited.add(identifier)
-                                            yield cs_node
-
-        # Fallback for simplified XC4 exports (rooted at <XC4>)
-        for xc4 in root.iter():
-            if _local(xc4.tag).lower() != "xc4":
-                continue
-            for cs_node in _children(xc4, "CenoveSoustavy"):
-                identifier = id(cs_node)
-                if identifier not in visited:
-                    visited.add(identifier)
-                    yield cs_node
-
-    @staticmethod
-    def _find_child(element: Optional[ET.Element], tag: str) -> Optional[ET.Element]:
-        if element is None:
-            return None
-        tag_lower = tag.lower()
-        for child in element:
-            if child.tag.split("}")[-1].lower() == tag_lower:
-                return child
-        return None
-
-    @staticmethod
-    def _iter_children(element: Optional[ET.Element], tag: str) -> Iterable[ET.Element]:
-        if element is None:
-            return []
-        tag_lower = tag.lower()
-        for child in element:
-            if child.tag.split("}")[-1].lower() == tag_lower:
-                yield child
-
-    @staticmethod
-    def _find_text(element: Optional[ET.Element], tag: str) -> Optional[str]:
-        if element is None:
-            return None
-        child = KROSParser._find_child(element, tag)
-        if child is None:
-            return None
-        return child.text
+    # ------------------------------------------------------------------
+    # Position dialects
+    # ------------------------------------------------------------------
 
-    def _parse_aspe_xc4(self, root: ET.Element) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        """Parse AspeEsticon XC4 XML format."""
+    def _iter_aspe_xc4(
+        self, file_path: Path, diagnostics: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream AspeEsticon XC4 positions; ``diagnostics`` fills while iterating."""
 
         logger.info("Parsing AspeEsticon XC4 format")
-        positions, diagnostics = parse_aspe_xml_tree(root)
+        elements = _iter_elements(file_path, lambda tag, depth: tag == "polozka")
+        yield from iter_aspe_positions(enumerate(elements, start=1), diagnostics)
         logger.info(
             "Parsed %s positions (%s skipped)",
-            len(positions),
-            len(diagnostics.get("skipped", []))
+            diagnostics["parsed"],
+            len(diagnostics["skipped"])
         )
-        return positions, diagnostics
-    
-    def _parse_unixml(self, root: ET.Element) -> List[Dict[str, Any]]:
+
+    def _iter_unixml(self, file_path: Path, tags: FrozenSet[str]) -> Iterator[Dict[str, Any]]:
         """
-        Parse KROS UNIXML format
+        Stream KROS UNIXML positions
         
         Structure:
         <UNIXML>
@@ -371,48 +399,26 @@ class KROSParser:
         </UNIXML>
         """
         logger.info("Parsing KROS UNIXML format")
-        
-        positions = []
-        
-        # Find all position elements
-        # Try different possible paths
-        position_elements = (
-            root.findall(".//Polozka") or
-            root.findall(".//polozka") or
-            root.findall(".//Position") or
-            root.findall(".//Item")
-        )
-        
-        if not position_elements:
-            logger.warning("No position elements found in UNIXML")
-            return []
-        
-        logger.info(f"Found {len(position_elements)} position elements")
-        
-        for idx, element in enumerate(position_elements, start=1):
-            position = {}
-            
-            # Extract all child elements
-            for child in element:
-                tag = child.tag
-                value = child.text
-                
-                if value:
-                    position[tag] = value.strip()
-            
+
+        idx = 0
+        for idx, element in enumerate(
+            _iter_elements(file_path, _preferred_tag(UNIXML_ITEM_TAGS, tags)), start=1
+        ):
+            position = _child_texts(element)
+
             # Add index if Cislo not present
             if 'Cislo' not in position and 'cislo' not in position:
                 position['number'] = str(idx)
-            
-            if position:
-                positions.append(position)
-        
-        logger.info(f"Extracted {len(positions)} positions from UNIXML")
-        return positions
-    
-    def _parse_tabular(self, root: ET.Element) -> List[Dict[str, Any]]:
+
+            yield position
+
+        if not idx:
+            logger.warning("No position elements found in UNIXML")
+        logger.info(f"Extracted {idx} positions from UNIXML")
+
+    def _iter_tabular(self, file_path: Path, tags: FrozenSet[str]) -> Iterator[Dict[str, Any]]:
         """
-        Parse KROS Tabular format
+        Stream KROS Tabular rows
         
         Structure:
         <TZ>
@@ -427,108 +433,60 @@ class KROSParser:
         </TZ>
         """
         logger.info("Parsing KROS Tabular format")
-        
-        positions = []
-        
-        # Find all row elements
-        row_elements = root.findall(".//Row") or root.findall(".//row")
-        
-        if not row_elements:
-            logger.warning("No row elements found in Tabular format")
-            return []
-        
-        logger.info(f"Found {len(row_elements)} row elements")
-        
-        # Column mapping for tabular format
-        # These are common KROS column letters
-        column_map = {
-            'A': 'number',
-            'B': 'code',
-            'C': 'description',
-            'D': 'additional_info',
-            'E': 'unit',
-            'F': 'quantity',
-            'G': 'unit_price',
-            'H': 'total_price',
-            'I': 'note'
-        }
-        
-        for element in row_elements:
-            position = {}
-            
-            # Extract all column values
-            for child in element:
-                tag = child.tag
-                value = child.text
-                
-                if value:
-                    # Map column letter to field name
-                    field_name = column_map.get(tag, tag.lower())
-                    position[field_name] = value.strip()
-            
+
+        extracted = 0
+        for element in _iter_elements(file_path, _preferred_tag(TABULAR_ROW_TAGS, tags)):
+            position = {
+                TABULAR_COLUMNS.get(tag, tag.lower()): value
+                for tag, value in _child_texts(element).items()
+            }
+
             # Skip empty rows
             if not position:
                 continue
-            
+
             # Skip header rows (often have text like "Popis" in description)
             if position.get('description', '').lower() in ['popis', 'description', 'nazev']:
                 continue
-            
-            positions.append(position)
-        
-        logger.info(f"Extracted {len(positions)} positions from Tabular format")
-        return positions
-    
-    def _parse_generic(self, root: ET.Element) -> List[Dict[str, Any]]:
+
+            extracted += 1
+            yield position
+
+        logger.info(f"Extracted {extracted} positions from Tabular format")
+
+    def _iter_generic(self, file_path: Path) -> Iterator[Dict[str, Any]]:
         """
         Generic XML parser for unknown KROS formats
         
-        Tries to find any repeating element that might contain positions
+        Uses the most repeated child element of the root as position
+        container.  Two streaming passes: one counts the root's children,
+        the second extracts the winning ones.
         """
         logger.info("Trying generic XML parsing")
-        
-        positions = []
-        
-        # Find all leaf elements (elements with text but no children)
-        def find_repeated_elements(element):
-            """Find elements that repeat (likely position records)"""
-            child_tags = {}
-            for child in element:
-                tag = child.tag
-                if tag not in child_tags:
-                    child_tags[tag] = []
-                child_tags[tag].append(child)
-            
-            # Return tags that appear multiple times
-            return {
-                tag: elements 
-                for tag, elements in child_tags.items() 
-                if len(elements) > 1
-            }
-        
-        repeated = find_repeated_elements(root)
-        
+
+        counts = Counter(
+            element.tag for element in _iter_elements(file_path, lambda tag, depth: depth == 1)
+        )
+        repeated = {tag: count for tag, count in counts.items() if count > 1}
+
         if not repeated:
             logger.warning("No repeated elements found in XML")
-            return []
-        
+            return
+
         # Use the most common repeated element as position container
-        most_common_tag = max(repeated.keys(), key=lambda k: len(repeated[k]))
-        logger.info(f"Using <{most_common_tag}> as position elements ({len(repeated[most_common_tag])} found)")
-        
-        for element in repeated[most_common_tag]:
-            position = {}
-            
-            # Extract all child text
-            for child in element:
-                if child.text:
-                    position[child.tag] = child.text.strip()
-            
+        most_common_tag = max(repeated, key=repeated.get)
+        logger.info(f"Using <{most_common_tag}> as position elements ({repeated[most_common_tag]} found)")
+
+        extracted = 0
+        for element in _iter_elements(
+            file_path, lambda tag, depth: depth == 1 and tag == most_common_tag
+        ):
+            position = _child_texts(element)
             if position:
-                positions.append(position)
-        
-        logger.info(f"Extracted {len(positions)} positions from generic parsing")
-        return positions
+                extracted += 1
+                yield position
+
+        logger.info(f"Extracted {extracted} positions from generic parsing")
     
     def get_supported_extensions(self) -> set:
         """Return supported file extensions"""
@@ -9,7 +9,8 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Iterator
 import xml.etree.ElementTree as ET
-import re
+
+from app.utils.number_parsing import parse_number, parse_numbers
 
 logger = logging.getLogger(__name__)
 
@@ -191,6 +192,7 @@ class MemoryEfficientExcelParser:
             if position:
                 positions.append(position)
         
+        self._parse_numeric_columns(positions)
         return positions
     
     def _is_header_row(self, row: tuple) -> bool:
@@ -258,22 +260,18 @@ class MemoryEfficientExcelParser:
             "code": str(get_cell('code', '')).strip(),
             "description": str(description).strip(),
             "unit": str(get_cell('unit', '')).strip(),
-            "quantity": self._parse_czech_number(get_cell('quantity', '0')),
-            "unit_price": self._parse_czech_number(get_cell('unit_price', '0')),
-            "total_price": self._parse_czech_number(get_cell('total_price', '0')),
+            # Raw cells; converted per sheet in _parse_numeric_columns
+            "quantity": get_cell('quantity', None),
+            "unit_price": get_cell('unit_price', None),
+            "total_price": get_cell('total_price', None),
             "row_number": row_idx + 1
         }
         
-        # Calculate total if missing
-        if position["quantity"] and position["unit_price"] and not position["total_price"]:
-            position["total_price"] = position["quantity"] * position["unit_price"]
-        
         return position
     
-    def _parse_czech_number(self, value) -> float:
+    def _parse_numeric_columns(self, positions: List[Dict[str, Any]]) -> None:
         """
-        Parse Czech number format
-        ✅ УЛУЧШЕННЫЙ: обрабатывает ВСЕ варианты
+        Parse Czech numbers column by column (one vectorised pass per column)
         
         Examples:
         - "1 220,168" → 1220.168
@@ -282,56 +280,20 @@ class MemoryEfficientExcelParser:
         - "15,50" → 15.50
         - "1 000" → 1000.0
         """
-        if isinstance(value, (int, float)):
-            return float(value)
-        
-        if not value:
-            return 0.0
+        for field in ('quantity', 'unit_price', 'total_price'):
+            values = parse_numbers([position[field] for position in positions])
+            for position, value in zip(positions, values):
+                position[field] = value or 0.0
         
-        try:
-            text = str(value).strip()
-            
-            # Удалить пробелы (разделители тысяч)
-            text = text.replace(' ', '').replace('\xa0', '')
-            
-            # Удалить валюту
-            text = text.replace('Kč', '').replace('CZK', '').replace('EUR', '').replace('€', '')
-            text = text.strip()
-            
-            # Определить формат числа
-            # Если есть И точка И запятая → европейский формат
-            if '.' in text and ',' in text:
-                # Европейский: 1.220,168 → запятая = десятичная
-                text = text.replace('.', '')  # Удалить точки (тысячи)
-                text = text.replace(',', '.')  # Запятая → точка (десятичная)
-            elif ',' in text:
-                # Только запятая → может быть десятичная (чешский формат)
-                # Проверить: если после запятой 3+ цифры → это тысячи, иначе десятичная
-                parts = text.split(',')
-                if len(parts) == 2 and len(parts[1]) <= 2:
-                    # Десятичная: 15,50
-                    text = text.replace(',', '.')
-                else:
-                    # Тысячи: 1,220 → просто удалить
-                    text = text.replace(',', '')
-            # Если только точка → может быть десятичная (английский) или тысячи
-            # Оставляем как есть
-            
-            # Удалить все кроме цифр, точки и минуса
-            text = re.sub(r'[^\d.-]', '', text)
-            
-            if not text or text == '-':
-                return 0.0
-            
-            return float(text)
-        except (ValueError, AttributeError) as e:
-            logger.debug(f"Failed to parse number '{value}': {e}")
-            return 0.0
+        # Calculate total if missing
+        for position in positions:
+            if position["quantity"] and position["unit_price"] and not position["total_price"]:
+                position["total_price"] = position["quantity"] * position["unit_price"]
     
     def _parse_int(self, value) -> int:
         """Parse integer"""
         try:
-            return int(self._parse_czech_number(value))
+            return int(parse_number(value) or 0)
         except:
             return 0
 
@@ -501,11 +463,7 @@ class MemoryEfficientXMLParser:
     
     def _parse_float(self, text: str) -> float:
         """Parse float from text"""
-        try:
-            text = text.strip().replace(' ', '').replace(',', '.')
-            return float(text) if text else 0.0
-        except:
-            return 0.0
+        return parse_number(text) or 0.0
 
 
 # ============================================================================
@@ -641,9 +599,4 @@ class MemoryEfficientPDFParser:
     
     def _parse_float(self, text: str) -> float:
         """Parse float"""
-        try:
-            text = str(text).strip().replace(' ', '').replace(',', '.')
-            text = text.replace('Kč', '').replace('CZK', '')
-            return float(text) if text else 0.0
-        except:
-            return 0.0
+        return parse_number(text) or 0.0
@@ -0,0 +1,218 @@
+"""Streaming reader for OTSKP/TSKP price-list catalogs.
+
+Two catalog layouts are recognised in a single ``iterparse`` pass:
+
+* XC4 Cenové soustavy – ``<XC4><CenoveSoustavy><typ_CS/><Polozky><Polozka>``
+  (optionally nested inside a ``BuildingInformation`` classification tree);
+  only ``TSKP``/``OTSKP`` systems are kept.
+* Flat price lists – any ``<Polozka>`` with ``Znak``/``znacka``/``Nazev``/``MJ``
+  style children.  These are used only when the file has no XC4 records.
+
+Elements are cleared and detached from their parent as soon as they have been
+consumed, so peak memory is bounded by a single ``<Polozka>`` rather than by
+the size of the catalog.
+"""
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+__all__ = [
+    "CATALOG_SYSTEMS",
+    "iter_catalog_records",
+    "iter_tree_catalog_records",
+    "read_catalog_records",
+]
+
+CATALOG_SYSTEMS = {"TSKP", "OTSKP"}
+
+Record = Dict[str, str]
+Source = Union[str, Path, IO[bytes]]
+
+# Fallback chains for flat price lists (exact, case-sensitive tag names).
+_GENERIC_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("code", ("Znak", "znak", "znacka", "code")),
+    ("name", ("Nazev", "nazev", "name")),
+    ("description", ("Popis", "description")),
+    ("unit", ("Mj", "MJ")),
+    ("section", ("Skupina", "skupina")),
+    ("tech_spec", ("technicka_specifikace",)),
+    ("unit_price", ("jedn_cena",)),
+)
+
+# XC4 item children (case-insensitive local names).
+_XC4_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("code", "znacka"),
+    ("name", "nazev"),
+    ("unit", "mj"),
+    ("tech_spec", "technicka_specifikace"),
+    ("unit_price", "jedn_cena"),
+)
+
+
+def _local(tag: object) -> str:
+    return tag.split("}")[-1] if isinstance(tag, str) else ""
+
+
+class _PriceSystem:
+    """State of one open ``<CenoveSoustavy>`` element."""
+
+    __slots__ = ("depth", "system", "pending")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.system: Optional[str] = None
+        self.pending: List[Record] = []
+
+    def accept(self, record: Record) -> Iterator[Record]:
+        if self.system is None:
+            self.pending.append(record)
+            return
+        if self.system and self.system not in CATALOG_SYSTEMS:
+            return
+        record["system"] = self.system or "TSKP"
+        yield record
+
+    def resolve(self, system: str) -> Iterator[Record]:
+        self.system = system
+        pending, self.pending = self.pending, []
+        for record in pending:
+            yield from self.accept(record)
+
+
+def _child_texts(element: ET.Element) -> Tuple[Dict[str, Optional[str]], Dict[str, Optional[str]]]:
+    exact: Dict[str, Optional[str]] = {}
+    folded: Dict[str, Optional[str]] = {}
+    for child in element:
+        name = _local(child.tag)
+        exact.setdefault(name, child.text)
+        folded.setdefault(name.lower(), child.text)
+    return exact, folded
+
+
+def _xc4_record(folded: Dict[str, Optional[str]]) -> Optional[Record]:
+    record = {field: (folded.get(tag) or "").strip() for field, tag in _XC4_FIELDS}
+    if not record["code"] and not record["name"]:
+        return None
+    return record
+
+
+def _generic_record(exact: Dict[str, Optional[str]]) -> Optional[Record]:
+    record: Record = {}
+    for field, tags in _GENERIC_FIELDS:
+        value = ""
+        for tag in tags:
+            value = exact.get(tag) or ""
+            if value:
+                break
+        record[field] = value.strip()
+    return record if any(record.values()) else None
+
+
+def _records_from_events(
+    events: Iterable[Tuple[str, ET.Element]],
+    *,
+    release: bool,
+    include_generic: bool,
+) -> Iterator[Record]:
+    stack: List[ET.Element] = []
+    names: List[str] = []
+    item_depth: Optional[int] = None
+    systems: List[_PriceSystem] = []
+    generic: List[Record] = []
+    xc4_found = False
+
+    for event, element in events:
+        if event == "start":
+            name = _local(element.tag).lower()
+            stack.append(element)
+            names.append(name)
+            depth = len(stack) - 1
+            if item_depth is None and name == "polozka":
+                item_depth = depth
+            elif name == "cenovesoustavy" and depth and names[depth - 1] == "xc4":
+                systems.append(_PriceSystem(depth))
+            continue
+
+        depth = len(stack) - 1
+        if item_depth is not None and depth > item_depth:
+            # Children of an open <Polozka> stay attached until the item is complete.
+            stack.pop()
+            names.pop()
+            continue
+
+        system = systems[-1] if systems else None
+        if depth == item_depth:
+            item_depth = None
+            exact, folded = _child_texts(element)
+            if system is not None and depth == system.depth + 2 and names[depth - 1] == "polozky":
+                record = _xc4_record(folded)
+                if record is not None:
+                    for accepted in system.accept(record):
+                        xc4_found = True
+                        yield accepted
+            if xc4_found:
+                generic.clear()
+            elif include_generic and _local(element.tag) == "Polozka":
+                record = _generic_record(exact)
+                if record is not None:
+                    generic.append(record)
+        elif system is not None and depth == system.depth + 1 and names[depth] == "typ_cs":
+            for accepted in system.resolve((element.text or "").strip().upper()):
+                xc4_found = True
+                yield accepted
+        elif system is not None and depth == system.depth:
+            systems.pop()
+            if system.system is None:
+                for accepted in system.resolve(""):
+                    xc4_found = True
+                    yield accepted
+
+        stack.pop()
+        names.pop()
+        if release:
+            element.clear()
+            # Earlier siblings are gone, so this is the first child; iterparse may
+            # already have attached later ones after it.
+            if stack and len(stack[-1]) and stack[-1][0] is element:
+                del stack[-1][0]
+
+    if include_generic and not xc4_found:
+        yield from generic
+
+
+def _walk(root: ET.Element) -> Iterator[Tuple[str, ET.Element]]:
+    """Emit ``iterparse``-style start/end events for an already parsed tree."""
+
+    yield "start", root
+    pending: List[Tuple[ET.Element, Iterator[ET.Element]]] = [(root, iter(root))]
+    while pending:
+        element, children = pending[-1]
+        child = next(children, None)
+        if child is None:
+            pending.pop()
+            yield "end", element
+            continue
+        yield "start", child
+        pending.append((child, iter(child)))
+
+
+def iter_catalog_records(source: Source, *, include_generic: bool = True) -> Iterator[Record]:
+    """Stream catalog records from an XML file with bounded memory.
+
+    Raises ``xml.etree.ElementTree.ParseError`` for malformed XML.
+    """
+
+    events = ET.iterparse(str(source) if isinstance(source, Path) else source, events=("start", "end"))
+    yield from _records_from_events(events, release=True, include_generic=include_generic)
+
+
+def iter_tree_catalog_records(root: ET.Element, *, include_generic: bool = False) -> Iterator[Record]:
+    """Extract catalog records from an existing tree without modifying it."""
+
+    yield from _records_from_events(_walk(root), release=False, include_generic=include_generic)
+
+
+def read_catalog_records(source: Source, *, include_generic: bool = True) -> List[Record]:
+    return list(iter_catalog_records(source, include_generic=include_generic))
@@ -3,8 +3,10 @@ Smart Parser - автоматический выбор оптимального
 БЕЗ CLAUDE FALLBACK - только локальные парсеры
 
 Логика:
-- Файл < 20MB → Стандартные парсеры (pandas, pdfplumber)
-- Файл > 20MB → Streaming парсеры (memory-efficient)
+- Excel → ExcelParser (read-only streaming для любого размера)
+- XML → KROSParser (iterparse streaming для любого размера)
+- PDF < 20MB → Стандартный парсер (pdfplumber)
+- PDF > 20MB → Streaming парсер (memory-efficient)
 - Автовыбор формата (Excel, PDF, XML)
 """
 import logging
@@ -37,6 +39,9 @@ class SmartParser:
     - Простой API
     """
     
+    # Версия логики парсинга: при изменении (любой парсер) инвалидирует кэш парсинга
+    PARSER_VERSION = 3
+    
     def __init__(self):
         # Стандартные парсеры (быстрые, удобные)
         self.excel_parser = ExcelParser()
@@ -72,7 +77,8 @@ class SmartParser:
     
     def parse_excel(self, file_path: Path, project_id: Optional[str] = None) -> Dict[str, Any]:
         """
-        Parse Excel с автоматическим выбором метода
+        Parse Excel - ExcelParser streams rows in read-only mode, so one
+        parser handles every file size
         
         Args:
             file_path: Path to Excel file
@@ -91,18 +97,11 @@ class SmartParser:
             size_mb,
         )
         
-        if size_mb < SIZE_THRESHOLD_MB:
-            # Небольшой файл → стандартный парсер
-            logger.info("%s✅ Using standard pandas parser", project_prefix)
-            try:
-                return self.excel_parser.parse(file_path, project_id=project_id)
-            except Exception as e:
-                logger.warning("%sStandard parser failed: %s", project_prefix, e)
-                logger.info("%s⚠️ Falling back to streaming parser", project_prefix)
-                return self.streaming_excel.parse(file_path)
-        else:
-            # Большой файл → streaming парсер
-            logger.info("%s✅ Using streaming parser (large file)", project_prefix)
+        try:
+            return self.excel_parser.parse(file_path, project_id=project_id)
+        except Exception as e:
+            logger.warning("%sStandard parser failed: %s", project_prefix, e)
+            logger.info("%s⚠️ Falling back to streaming parser", project_prefix)
             return self.streaming_excel.parse(file_path)
     
     def parse_pdf(self, file_path: Path, project_id: Optional[str] = None) -> Dict[str, Any]:
@@ -161,18 +160,13 @@ class SmartParser:
             size_mb,
         )
         
-        if size_mb < SIZE_THRESHOLD_MB:
-            # Небольшой файл → стандартный KROS парсер
-            logger.info("%s✅ Using standard KROS parser", project_prefix)
-            try:
-                return self.kros_parser.parse(file_path, project_id=project_id)
-            except Exception as e:
-                logger.warning("%sStandard parser failed: %s", project_prefix, e)
-                logger.info("%s⚠️ Falling back to streaming parser", project_prefix)
-                return self.streaming_xml.parse(file_path)
-        else:
-            # Большой файл → streaming парсер
-            logger.info("%s✅ Using streaming parser (large file)", project_prefix)
+        # KROS парсер сам читает XML потоково (iterparse) при любом размере
+        logger.info("%s✅ Using streaming KROS parser", project_prefix)
+        try:
+            return self.kros_parser.parse(file_path, project_id=project_id)
+        except Exception as e:
+            logger.warning("%sKROS parser failed: %s", project_prefix, e)
+            logger.info("%s⚠️ Falling back to generic streaming parser", project_prefix)
             return self.streaming_xml.parse(file_path)
     
     def get_file_info(self, file_path: Path) -> Dict[str, Any]:
@@ -188,7 +182,8 @@ class SmartParser:
         size_bytes = file_path.stat().st_size
         size_mb = size_bytes / (1024 * 1024)
         
-        will_use_streaming = size_mb >= SIZE_THRESHOLD_MB
+        # Excel and XML are always streamed by ExcelParser/KROSParser themselves.
+        will_use_streaming = size_mb >= SIZE_THRESHOLD_MB and file_path.suffix.lower() not in {'.xlsx', '.xls', '.xml'}
         
         return {
             "filename": file_path.name,
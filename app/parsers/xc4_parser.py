@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterator, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
+from app.utils.number_parsing import parse_number
+
 
 # ----------------------------------------------------------------------------
 # Data structures
@@ -47,14 +49,7 @@ def _text_or_none(element: Optional[ET.Element]) -> Optional[str]:
 def _parse_quantity(raw_quantity: Optional[str]) -> Optional[float]:
     """Convert textual quantity into a float value if possible."""
 
-    if raw_quantity is None:
-        return None
-
-    normalized = raw_quantity.replace(" ", "").replace(",", ".")
-    try:
-        return float(normalized)
-    except ValueError:
-        return None
+    return parse_number(raw_quantity)
 
 
 def parse_polozka(element: ET.Element) -> ParseResult:
@@ -100,36 +95,49 @@ def parse_polozka(element: ET.Element) -> ParseResult:
 
 
 def _iter_polozky(element: ET.Element) -> Iterator[Tuple[int, ET.Element]]:
-    """Yield ``(row_index, element)`` for every ``<polozka>`` in the subtree."""
+    """Yield ``(row_index, element)`` for every ``<polozka>`` in the subtree.
 
-    row_index = 0
+    Nested ``<polozka>`` elements are not descended into.
+    """
 
-    def _traverse(node: ET.Element) -> Iterator[ET.Element]:
-        if node.tag == "polozka":
-            yield node
-            return
-
-        for child in list(node):
-            yield from _traverse(child)
-
-    for polozka in _traverse(element):
-        row_index += 1
-        yield row_index, polozka
+    row_index = 0
+    pending: List[Iterator[ET.Element]] = [iter((element,))]
+    while pending:
+        node = next(pending[-1], None)
+        if node is None:
+            pending.pop()
+        elif node.tag == "polozka":
+            row_index += 1
+            yield row_index, node
+        else:
+            pending.append(iter(node))
 
 
-def parse_xml_tree(root: ET.Element) -> Tuple[List[Dict[str, object]], Dict[str, object]]:
-    """Traverse the XC4 XML tree and collect position dictionaries."""
+def iter_parse_results(
+    polozky: Iterable[Tuple[int, ET.Element]],
+    diagnostics: Dict[str, object],
+) -> Iterator[Dict[str, object]]:
+    """Yield valid positions from ``(row_index, element)`` pairs.
 
-    positions: List[Dict[str, object]] = []
-    diagnostics: Dict[str, object] = {"parsed": 0, "skipped": []}
+    Skipped rows are appended to ``diagnostics["skipped"]`` and
+    ``diagnostics["parsed"]`` is kept current while iterating, so the
+    elements may come from a streaming source and be discarded afterwards.
+    """
 
-    for row_index, polozka_element in _iter_polozky(root):
+    diagnostics.setdefault("parsed", 0)
+    diagnostics.setdefault("skipped", [])
+    for row_index, polozka_element in polozky:
         result = parse_polozka(polozka_element)
         if result.position is not None:
-            positions.append(result.position)
+            diagnostics["parsed"] += 1
+            yield result.position
         else:
             diagnostics["skipped"].append({"row": row_index, "reason": result.reason})
 
-    diagnostics["parsed"] = len(positions)
-    return positions, diagnostics
 
+def parse_xml_tree(root: ET.Element) -> Tuple[List[Dict[str, object]], Dict[str, object]]:
+    """Traverse the XC4 XML tree and collect position dictionaries."""
+
+    diagnostics: Dict[str, object] = {"parsed": 0, "skipped": []}
+    positions = list(iter_parse_results(_iter_polozky(root), diagnostics))
+    return positions, diagnostics
@@ -12,22 +12,32 @@ class AuditClassifier:
         self, positions: Iterable[Dict[str, object]]
     ) -> Tuple[List[Dict[str, object]], Dict[str, int]]:
         audited: List[Dict[str, object]] = []
-        stats = {"green": 0, "amber": 0, "red": 0, "amber_by_reason": {}}
+        stats = self.new_stats()
 
         for position in positions:
-            payload = dict(position)
-            audit_label = self._classify_single(payload)
-            payload["audit"] = audit_label
-            stats[audit_label.lower()] += 1
-            if audit_label == "AMBER":
-                reason = str(payload.get("amber_reason") or "unspecified")
-                stats["amber_by_reason"][reason] = (
-                    stats["amber_by_reason"].get(reason, 0) + 1
-                )
-            audited.append(payload)
+            audited.append(self.classify_in_place(dict(position), stats))
 
         return audited, stats
 
+    @staticmethod
+    def new_stats() -> Dict[str, object]:
+        return {"green": 0, "amber": 0, "red": 0, "amber_by_reason": {}}
+
+    def classify_in_place(
+        self, payload: Dict[str, object], stats: Dict[str, object]
+    ) -> Dict[str, object]:
+        """Label ``payload`` without copying it and count the label into ``stats``."""
+
+        audit_label = self._classify_single(payload)
+        payload["audit"] = audit_label
+        stats[audit_label.lower()] += 1
+        if audit_label == "AMBER":
+            reason = str(payload.get("amber_reason") or "unspecified")
+            stats["amber_by_reason"][reason] = (
+                stats["amber_by_reason"].get(reason, 0) + 1
+            )
+        return payload
+
     # ------------------------------------------------------------------
 
     @staticmethod
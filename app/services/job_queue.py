@@ -0,0 +1,279 @@
+"""Durable workflow job queue stored in ``settings.DATABASE_URL``.
+
+The API enqueues jobs; worker processes (``python -m app.worker``) claim them
+with a conditional ``UPDATE`` so a job is owned by exactly one worker, send
+heartbeats while it runs, and report success or failure.  Failed jobs are
+retried after ``JOB_RETRY_DELAY_SEC`` until ``JOB_MAX_ATTEMPTS`` is reached;
+running jobs whose heartbeat is older than ``JOB_STALE_AFTER_SEC`` (crashed or
+killed workers) are put back into the queue by the next worker that polls.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DurableJobQueue", "get_job_queue"]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _job_to_dict(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "project_id": job.project_id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "worker_id": job.worker_id,
+        "submitted_at": _isoformat(job.created_at),
+        "started_at": _isoformat(job.started_at),
+        "heartbeat_at": _isoformat(job.heartbeat_at),
+        "finished_at": _isoformat(job.finished_at),
+        "error": job.error,
+    }
+
+
+class DurableJobQueue:
+    """Claim/heartbeat/retry protocol over the ``jobs`` table."""
+
+    def __init__(self, database_url: Optional[str] = None) -> None:
+        self.database_url = database_url
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        project_id: str,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        now = _utcnow()
+        job = Job(
+            id=uuid.uuid4().hex,
+            project_id=project_id,
+            kind=kind,
+            status=JobStatus.QUEUED,
+            payload=json.dumps(payload or {}, ensure_ascii=False, default=str),
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            created_at=now,
+            available_at=now,
+        )
+        with session_scope(self.database_url) as session:
+            session.add(job)
+        logger.info("Job %s queued for project %s (%s)", job.id, project_id, kind)
+        return _job_to_dict(job)
+
+    def job_for_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with session_scope(self.database_url) as session:
+            job = session.scalars(
+                select(Job).where(Job.project_id == project_id).order_by(Job.created_at.desc()).limit(1)
+            ).first()
+            return _job_to_dict(job) if job else None
+
+    def result_for_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Result document of the project's latest succeeded job."""
+
+        with session_scope(self.database_url) as session:
+            raw = session.scalars(
+                select(Job.result)
+                .where(Job.project_id == project_id, Job.status == JobStatus.SUCCEEDED)
+                .order_by(Job.finished_at.desc())
+                .limit(1)
+            ).first()
+        return json.loads(raw) if raw else None
+
+    def queue_position(self, project_id: str) -> Optional[int]:
+        """1-based FIFO position of the project's queued job, ``None`` if not queued."""
+
+        with session_scope(self.database_url) as session:
+            created_at = session.scalars(
+                select(Job.created_at)
+                .where(Job.project_id == project_id, Job.status == JobStatus.QUEUED)
+                .order_by(Job.created_at)
+                .limit(1)
+            ).first()
+            if created_at is None:
+                return None
+            ahead = session.scalar(
+                select(func.count()).select_from(Job).where(
+                    Job.status == JobStatus.QUEUED, Job.created_at < created_at
+                )
+            )
+        return int(ahead or 0) + 1
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest available job; returns it with its payload."""
+
+        while True:
+            now = _utcnow()
+            with session_scope(self.database_url) as session:
+                job_id = session.scalars(
+                    select(Job.id)
+                    .where(Job.status == JobStatus.QUEUED, Job.available_at <= now)
+                    .order_by(Job.created_at)
+                    .limit(1)
+                ).first()
+                if job_id is None:
+                    return None
+                claimed = session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                    .values(
+                        status=JobStatus.RUNNING,
+                        worker_id=worker_id,
+                        attempts=Job.attempts + 1,
+                        started_at=now,
+                        heartbeat_at=now,
+                        error=None,
+                    )
+                ).rowcount
+                if not claimed:
+                    # Another worker won the race; try the next job.
+                    continue
+                job = session.get(Job, job_id)
+                data = _job_to_dict(job)
+                data["payload"] = json.loads(job.payload or "{}")
+                return data
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Refresh the heartbeat; ``False`` means the job is no longer ours."""
+
+        with session_scope(self.database_url) as session:
+            updated = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.worker_id == worker_id, Job.status == JobStatus.RUNNING)
+                .values(heartbeat_at=_utcnow())
+            ).rowcount
+        return bool(updated)
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        with session_scope(self.database_url) as session:
+            updated = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.worker_id == worker_id, Job.status == JobStatus.RUNNING)
+                .values(
+                    status=JobStatus.SUCCEEDED,
+                    result=json.dumps(result or {}, ensure_ascii=False, default=str),
+                    finished_at=_utcnow(),
+                )
+            ).rowcount
+        return bool(updated)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[str]:
+        """Record a failure; requeues the job while attempts remain. Returns the new status."""
+
+        with session_scope(self.database_url) as session:
+            job = session.get(Job, job_id)
+            if job is None or job.worker_id != worker_id or job.status != JobStatus.RUNNING:
+                return None
+            self._record_failure(job, error)
+            return job.status
+
+    def requeue_stale(self, stale_after_sec: Optional[float] = None) -> int:
+        """Recover running jobs whose worker stopped sending heartbeats."""
+
+        timeout = settings.JOB_STALE_AFTER_SEC if stale_after_sec is None else stale_after_sec
+        cutoff = _utcnow() - timedelta(seconds=timeout)
+        recovered = 0
+        with session_scope(self.database_url) as session:
+            stale = session.scalars(
+                select(Job).where(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff)
+            ).all()
+            for job in stale:
+                logger.warning("Job %s lost its worker %s (last heartbeat %s)", job.id, job.worker_id, job.heartbeat_at)
+                self._record_failure(job, f"worker {job.worker_id} stopped sending heartbeats")
+                recovered += 1
+        return recovered
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def metrics(self, window_sec: float = 300.0) -> Dict[str, Any]:
+        now = _utcnow()
+        since = now - timedelta(seconds=window_sec)
+        with session_scope(self.database_url) as session:
+            counts = dict(session.execute(select(Job.status, func.count()).group_by(Job.status)).all())
+            oldest_queued = session.scalar(
+                select(func.min(Job.created_at)).where(Job.status == JobStatus.QUEUED)
+            )
+            finished = session.execute(
+                select(Job.status, Job.started_at, Job.finished_at).where(
+                    Job.finished_at.is_not(None), Job.finished_at >= since
+                )
+            ).all()
+            workers = session.scalar(
+                select(func.count(func.distinct(Job.worker_id))).where(Job.status == JobStatus.RUNNING)
+            )
+
+        durations = [
+            (finished_at - started_at).total_seconds()
+            for _, started_at, finished_at in finished
+            if started_at and finished_at
+        ]
+        succeeded_recent = sum(1 for status, _, _ in finished if status == JobStatus.SUCCEEDED)
+        return {
+            "queue_depth": int(counts.get(JobStatus.QUEUED, 0)),
+            "running": int(counts.get(JobStatus.RUNNING, 0)),
+            "succeeded": int(counts.get(JobStatus.SUCCEEDED, 0)),
+            "failed": int(counts.get(JobStatus.FAILED, 0)),
+            "active_workers": int(workers or 0),
+            "oldest_queued_age_sec": round((now - oldest_queued).total_seconds(), 1) if oldest_queued else 0.0,
+            "window_sec": window_sec,
+            "throughput_per_min": round(succeeded_recent * 60.0 / window_sec, 3) if window_sec else 0.0,
+            "avg_duration_sec": round(sum(durations) / len(durations), 3) if durations else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _record_failure(job: Job, error: str) -> None:
+        now = _utcnow()
+        job.error = error
+        job.worker_id = None
+        if job.attempts < job.max_attempts:
+            job.status = JobStatus.QUEUED
+            job.available_at = now + timedelta(seconds=settings.JOB_RETRY_DELAY_SEC)
+            logger.info("Job %s will be retried (attempt %s/%s)", job.id, job.attempts, job.max_attempts)
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = now
+            logger.error("Job %s failed permanently after %s attempt(s): %s", job.id, job.attempts, error)
+
+
+_queue: Optional[DurableJobQueue] = None
+
+
+def get_job_queue() -> DurableJobQueue:
+    global _queue
+    if _queue is None:
+        _queue = DurableJobQueue()
+    return _queue
@@ -0,0 +1,183 @@
+"""Bounded execution of workflow jobs outside the API event loop.
+
+Workflow A/B ``execute`` coroutines do most of their work synchronously
+(openpyxl, pdfplumber, ElementTree, enrichment).  Awaiting them on the API
+event loop, which is what FastAPI ``BackgroundTasks`` does for coroutines,
+stalls every other request on the worker.  ``JobRunner`` instead runs each job
+on its own event loop in a bounded thread pool; CPU-heavy stages such as the
+position pipeline fan out to processes from there.
+
+Jobs beyond ``JOB_MAX_CONCURRENT`` wait in FIFO order, and their position in
+the queue is reported by ``/api/projects/{id}/status``.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.project import ProjectStatus
+from app.state.project_store import project_store
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["JobInfo", "JobRunner", "get_job_runner", "shutdown_job_runner"]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class JobInfo:
+    """Bookkeeping for one submitted job."""
+
+    job_id: str
+    project_id: str
+    kind: str
+    status: str = QUEUED
+    submitted_at: str = ""
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobRunner:
+    """Run workflow jobs in a bounded pool and track their queue position."""
+
+    def __init__(self, max_concurrent: Optional[int] = None, history_limit: int = 500) -> None:
+        self.max_concurrent = max(1, max_concurrent or settings.JOB_MAX_CONCURRENT)
+        self.history_limit = history_limit
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="workflow-job")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, JobInfo]" = OrderedDict()
+        self._queue: List[str] = []
+        self._latest_by_project: Dict[str, str] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, project_id: str, func: Callable[..., Any], *args: Any, kind: str = "workflow", **kwargs: Any) -> JobInfo:
+        """Queue ``func(*args, **kwargs)``; coroutine functions get their own event loop."""
+
+        job = JobInfo(
+            job_id=uuid.uuid4().hex,
+            project_id=project_id,
+            kind=kind,
+            submitted_at=datetime.now().isoformat(),
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._queue.append(job.job_id)
+            self._latest_by_project[project_id] = job.job_id
+            self._trim_history()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        logger.info(
+            "Job %s queued for project %s (%s), queue position %s",
+            job.job_id,
+            project_id,
+            kind,
+            self.queue_position(project_id),
+        )
+        return job
+
+    def job_for_project(self, project_id: str) -> Optional[JobInfo]:
+        with self._lock:
+            job_id = self._latest_by_project.get(project_id)
+            return self._jobs.get(job_id) if job_id else None
+
+    def queue_position(self, project_id: str) -> Optional[int]:
+        """1-based position of the project's queued job, ``None`` if not queued."""
+
+        with self._lock:
+            job_id = self._latest_by_project.get(project_id)
+            if job_id in self._queue:
+                return self._queue.index(job_id) + 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+            return {"max_concurrent": self.max_concurrent, "queued": len(self._queue), "running": running}
+
+    def shutdown(self, wait: bool = False, cancel_pending: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _run(self, job: JobInfo, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> None:
+        with self._lock:
+            if job.job_id in self._queue:
+                self._queue.remove(job.job_id)
+            job.status = RUNNING
+            job.started_at = datetime.now().isoformat()
+
+        try:
+            if inspect.iscoroutinefunction(func):
+                asyncio.run(func(*args, **kwargs))
+            else:
+                func(*args, **kwargs)
+        except Exception as exc:  # noqa: BLE001 - recorded on the job and the project
+            logger.exception("Job %s for project %s failed", job.job_id, job.project_id)
+            with self._lock:
+                job.status = FAILED
+                job.error = str(exc)
+                job.finished_at = datetime.now().isoformat()
+            _mark_project_failed(job.project_id, str(exc))
+            return
+
+        with self._lock:
+            job.status = SUCCEEDED
+            job.finished_at = datetime.now().isoformat()
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > self.history_limit:
+            job_id, job = next(iter(self._jobs.items()))
+            if job.status in (QUEUED, RUNNING):
+                break
+            del self._jobs[job_id]
+            if self._latest_by_project.get(job.project_id) == job_id:
+                del self._latest_by_project[job.project_id]
+
+
+def _mark_project_failed(project_id: str, error: str) -> None:
+    project_store.update_fields(
+        project_id,
+        {"status": ProjectStatus.FAILED, "error": error, "updated_at": datetime.now().isoformat()},
+    )
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner()
+    return _runner
+
+
+def shutdown_job_runner(wait: bool = False) -> None:
+    global _runner
+    with _runner_lock:
+        runner, _runner = _runner, None
+    if runner is not None:
+        runner.shutdown(wait=wait)
@@ -0,0 +1,229 @@
+"""OCR of image-only drawing pages with a persistent worker pool.
+
+``PdfTextRecovery`` marks pages without a usable text layer as queued for OCR
+and reads finished OCR text from :class:`OcrCache`.  Workflow A hands the
+queued pages to :class:`OcrService`, which
+
+* runs OCR jobs (render with pdfium, recognise with Tesseract) on a bounded,
+  long-lived thread pool — Tesseract runs as a subprocess, so threads give
+  real parallelism, while pdfium rendering is serialised by the process-wide
+  :data:`~app.utils.pdfium_lock.pdfium_lock`;
+* de-duplicates jobs by ``(PDF hash, page)`` and drops jobs beyond
+  ``OCR_QUEUE_MAX`` instead of blocking the workflow;
+* stores the text under a key of PDF hash, page and OCR settings, so every
+  later recovery of the same drawing merges it into the page;
+* calls a batch's ``on_complete`` callback once all of its jobs are done,
+  which Workflow A uses to schedule a re-enrichment run.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.utils.hashing import sha256_bytes
+from app.utils.pdfium_lock import pdfium_lock
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["OCR_VERSION", "OcrCache", "OcrService", "get_ocr_service", "shutdown_ocr_service"]
+
+# Bump when rendering/recognition changes so cached OCR text is recomputed.
+OCR_VERSION = 1
+
+OcrJob = Tuple[Path, str, int]  # (pdf path, pdf sha256, 1-based page)
+
+
+class OcrCache:
+    """OCR text per (PDF hash, page, OCR settings) on disk."""
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> Path:
+        return Path(self._cache_dir or settings.OCR_CACHE_DIR)
+
+    @staticmethod
+    def key_for(file_hash: str, page_number: int) -> str:
+        material = {
+            "version": OCR_VERSION,
+            "file": file_hash,
+            "page": page_number,
+            "dpi": settings.OCR_DPI,
+            "lang": settings.OCR_LANG,
+        }
+        return sha256_bytes(json.dumps(material, sort_keys=True).encode("utf-8"))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, file_hash: str, page_number: int) -> Optional[str]:
+        path = self._entry_path(self.key_for(file_hash, page_number))
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                return json.load(handle)["text"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("OCR cache entry %s is unreadable (%s); ignoring it", path.name, exc)
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, file_hash: str, page_number: int, text: str) -> None:
+        path = self._entry_path(self.key_for(file_hash, page_number))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(
+            json.dumps({"text": text, "page": page_number, "file": file_hash}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+
+class _Batch:
+    def __init__(self, size: int, on_complete: Optional[Callable[[int], None]]) -> None:
+        self.remaining = size
+        self.recognised = 0
+        self.on_complete = on_complete
+
+
+class OcrService:
+    """Bounded OCR worker pool writing its results to :class:`OcrCache`."""
+
+    def __init__(
+        self,
+        cache: Optional[OcrCache] = None,
+        workers: Optional[int] = None,
+        recognise: Optional[Callable[[Path, int], str]] = None,
+    ) -> None:
+        self.cache = cache or OcrCache()
+        self.max_pending = max(1, settings.OCR_QUEUE_MAX)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers or settings.OCR_WORKERS), thread_name_prefix="ocr"
+        )
+        self._recognise = recognise or _recognise_page
+        self._lock = threading.Lock()
+        # Batches waiting for each queued or running (PDF hash, page).
+        self._pending: Dict[Tuple[str, int], List[_Batch]] = {}
+
+    def submit_batch(
+        self,
+        jobs: Sequence[OcrJob],
+        on_complete: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, int]:
+        """Queue OCR for ``jobs``; ``on_complete(recognised_pages)`` runs after the last one.
+
+        Returns ``{"queued", "in_progress", "dropped"}``.  Pages already being
+        recognised for another batch count as ``in_progress``; this batch waits
+        for them too, so its callback runs once all of its pages are done.
+        """
+
+        accepted: List[OcrJob] = []
+        counts = {"queued": 0, "in_progress": 0, "dropped": 0}
+        batch = _Batch(0, on_complete)
+        with self._lock:
+            for job in jobs:
+                _, file_hash, page_number = job
+                waiting = self._pending.get((file_hash, page_number))
+                if waiting is not None:
+                    counts["in_progress"] += 1
+                    if batch not in waiting:
+                        waiting.append(batch)
+                        batch.remaining += 1
+                elif len(self._pending) >= self.max_pending:
+                    counts["dropped"] += 1
+                else:
+                    accepted.append(job)
+                    self._pending[(file_hash, page_number)] = [batch]
+                    batch.remaining += 1
+
+            # Workers finish a job under the same lock, so the batch is complete
+            # before any of its jobs can be counted down.
+            for job in accepted:
+                self._executor.submit(self._run, job)
+        counts["queued"] = len(accepted)
+        if counts["dropped"]:
+            logger.warning("OCR queue full (%s pending); dropped %s page(s)", self.max_pending, counts["dropped"])
+        return counts
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job: OcrJob) -> None:
+        file_path, file_hash, page_number = job
+        recognised = False
+        try:
+            text = self._recognise(file_path, page_number)
+            if text is not None:
+                self.cache.put(file_hash, page_number, text)
+                recognised = True
+                logger.info("OCR finished for %s page %s (%s chars)", file_path.name, page_number, len(text))
+        except Exception:  # noqa: BLE001 - one page must not stop the pool
+            logger.exception("OCR failed for %s page %s", file_path.name, page_number)
+        finally:
+            completed: List[_Batch] = []
+            with self._lock:
+                for batch in self._pending.pop((file_hash, page_number), ()):
+                    batch.remaining -= 1
+                    batch.recognised += int(recognised)
+                    if batch.remaining == 0:
+                        completed.append(batch)
+        for batch in completed:
+            if batch.on_complete is None:
+                continue
+            try:
+                batch.on_complete(batch.recognised)
+            except Exception:  # noqa: BLE001 - callback errors are logged only
+                logger.exception("OCR batch completion callback failed")
+
+
+def _recognise_page(file_path: Path, page_number: int) -> Optional[str]:
+    """Render one page at ``OCR_DPI`` and run Tesseract; ``None`` if OCR is unavailable."""
+
+    try:
+        import pypdfium2 as pdfium
+        import pytesseract
+    except ImportError:  # pragma: no cover - optional dependencies missing
+        logger.debug("OCR needs pypdfium2 and pytesseract; skipping %s page %s", file_path.name, page_number)
+        return None
+
+    with pdfium_lock:
+        with pdfium.PdfDocument(str(file_path)) as document:
+            page = document.get_page(page_number - 1)
+            try:
+                image = page.render(scale=settings.OCR_DPI / 72).to_pil()
+            finally:
+                page.close()
+
+    return pytesseract.image_to_string(image, lang=settings.OCR_LANG, timeout=settings.OCR_PAGE_TIMEOUT_SEC)
+
+
+_service: Optional[OcrService] = None
+_service_lock = threading.Lock()
+
+
+def get_ocr_service() -> OcrService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = OcrService()
+    return _service
+
+
+def shutdown_ocr_service(wait: bool = False) -> None:
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.shutdown(wait=wait)
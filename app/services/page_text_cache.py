@@ -0,0 +1,119 @@
+"""Recovered drawing text per PDF page, keyed by PDF content hash.
+
+Drawing sets are re-uploaded with every project revision, mostly unchanged.
+``PdfTextRecovery`` stores the per-page recovery result (accepted text,
+extractor and the quality metrics of every candidate) under a key derived from
+
+* the SHA-256 of the PDF bytes,
+* ``PAGE_TEXT_CACHE_VERSION`` and the installed pdfium/pdfminer versions,
+* the recovery settings that change the outcome (``PAGE_TEXT_SETTINGS``),
+
+so an unchanged drawing costs a hash and one file read.  OCR results are not
+part of the entry — they live in the OCR cache and are merged on every
+recovery.  Entries are ``<key[:2]>/<key>.json`` under
+``settings.PAGE_TEXT_CACHE_DIR``, written atomically and evicted LRU once the
+cache exceeds ``PAGE_TEXT_CACHE_MAX_MB``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.parse_cache import evict_lru
+from app.utils.hashing import sha256_bytes
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PAGE_TEXT_CACHE_VERSION", "PAGE_TEXT_SETTINGS", "PageTextCache"]
+
+# Bump when the recovery cascade changes in a way that alters page text.
+PAGE_TEXT_CACHE_VERSION = 1
+
+PAGE_TEXT_SETTINGS = (
+    "PDF_PRIMARY_EXTRACTOR",
+    "PDF_VALID_CHAR_RATIO",
+    "PDF_FALLBACK_VALID_RATIO",
+    "PDF_PUA_RATIO",
+    "PDF_ENABLE_POPPLER",
+    "PDF_MAX_PAGES_FOR_FALLBACK",
+)
+
+
+@lru_cache(maxsize=1)
+def _extractor_versions() -> Dict[str, Optional[str]]:
+    versions: Dict[str, Optional[str]] = {}
+    for package in ("pypdfium2", "pdfminer.six"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    versions["pdftotext"] = "present" if shutil.which("pdftotext") else None
+    return versions
+
+
+class PageTextCache:
+    """Lookup and store per-page recovery records by PDF hash."""
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> Path:
+        return Path(self._cache_dir or settings.PAGE_TEXT_CACHE_DIR)
+
+    @staticmethod
+    def key_for(file_hash: str) -> str:
+        material = {
+            "version": PAGE_TEXT_CACHE_VERSION,
+            "file": file_hash,
+            "extractors": _extractor_versions(),
+            "settings": {name: getattr(settings, name) for name in PAGE_TEXT_SETTINGS},
+        }
+        return sha256_bytes(json.dumps(material, sort_keys=True, default=str).encode("utf-8"))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, file_hash: str) -> Optional[List[Dict[str, Any]]]:
+        if not settings.PAGE_TEXT_CACHE_ENABLED:
+            return None
+        path = self._entry_path(self.key_for(file_hash))
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                pages = json.load(handle)["pages"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Page text cache entry %s is unreadable (%s); ignoring it", path.name, exc)
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        return pages
+
+    def put(self, file_hash: str, pages: List[Dict[str, Any]]) -> None:
+        if not settings.PAGE_TEXT_CACHE_ENABLED:
+            return
+        path = self._entry_path(self.key_for(file_hash))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(
+                json.dumps({"file": file_hash, "pages": pages}, ensure_ascii=False, separators=(",", ":")),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not store page text for %s: %s", file_hash[:12], exc)
+            return
+        evict_lru(self.cache_dir, settings.PAGE_TEXT_CACHE_MAX_MB * 1024 * 1024)
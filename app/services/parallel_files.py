@@ -0,0 +1,135 @@
+"""Run independent per-file tasks (document parsing) in worker processes.
+
+Each file is handled by its own worker process, at most ``workers`` at a
+time, so a parser that hangs or crashes on one file can be killed after
+``timeout`` seconds without affecting the others.  Workers come from
+:func:`~app.services.worker_processes.worker_context` (never a plain fork of
+the threaded parent): the task function and its item are pickled to the
+child and only the result travels back through a pipe, so ``func`` must be a
+module-level function, a bound method of a picklable object or a
+``functools.partial`` of either.
+
+Results are returned in input order as :class:`FileTaskResult`; failures and
+timeouts are reported per file instead of raised.  With ``workers <= 1``
+tasks run one at a time: in a child process when ``timeout`` is set, so that
+it is enforced even for a single file, otherwise in-process.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.services.worker_processes import worker_context
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FileTaskResult", "run_file_tasks"]
+
+
+@dataclass
+class FileTaskResult:
+    value: Any = None
+    error: Optional[str] = None
+    duration_sec: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_inline(func: Callable[[Any], Any], item: Any) -> FileTaskResult:
+    started = time.perf_counter()
+    try:
+        value = func(item)
+    except Exception as exc:  # noqa: BLE001 - reported per file
+        logger.exception("File task failed")
+        return FileTaskResult(error=str(exc), duration_sec=time.perf_counter() - started)
+    return FileTaskResult(value=value, duration_sec=time.perf_counter() - started)
+
+
+def _child_main(conn, func: Callable[[Any], Any], item: Any) -> None:
+    try:
+        result = ("ok", func(item))
+    except Exception as exc:  # noqa: BLE001 - sent to the parent
+        logger.exception("File task failed in worker %s", os.getpid())
+        result = ("error", str(exc) or exc.__class__.__name__)
+    try:
+        conn.send(result)
+    finally:
+        conn.close()
+
+
+def run_file_tasks(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    workers: int,
+    timeout: Optional[float] = None,
+) -> List[FileTaskResult]:
+    """Apply ``func`` to every item; results are in input order."""
+
+    workers = max(1, min(workers, len(items)))
+    if workers == 1 and not timeout:
+        return [_run_inline(func, item) for item in items]
+
+    context = worker_context()
+
+    results: List[Optional[FileTaskResult]] = [None] * len(items)
+    pending = list(range(len(items)))
+    pending.reverse()
+    running: Dict[Any, tuple] = {}  # connection -> (index, process, started)
+
+    def _finish(conn, result: FileTaskResult) -> None:
+        index, process, _ = running.pop(conn)
+        conn.close()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        results[index] = result
+
+    while pending or running:
+        while pending and len(running) < workers:
+            index = pending.pop()
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_child_main, args=(writer, func, items[index]), name=f"file-task-{index}", daemon=True
+            )
+            process.start()
+            writer.close()
+            running[reader] = (index, process, time.monotonic())
+
+        now = time.monotonic()
+        wait_for = None
+        if timeout:
+            wait_for = max(0.0, min(started + timeout for _, _, started in running.values()) - now)
+        for conn in wait(list(running), timeout=wait_for):
+            started = running[conn][2]
+            try:
+                status, payload = conn.recv()
+            except EOFError:
+                process = running[conn][1]
+                process.join(timeout=1)
+                status, payload = "error", f"worker exited unexpectedly (exit code {process.exitcode})"
+            duration = time.monotonic() - started
+            if status == "ok":
+                _finish(conn, FileTaskResult(value=payload, duration_sec=duration))
+            else:
+                _finish(conn, FileTaskResult(error=payload, duration_sec=duration))
+
+        if timeout:
+            now = time.monotonic()
+            for conn, (index, process, started) in list(running.items()):
+                if now - started >= timeout:
+                    logger.warning("File task %s exceeded %.0fs; terminating worker %s", index, timeout, process.pid)
+                    process.kill()
+                    _finish(
+                        conn,
+                        FileTaskResult(error=f"timed out after {timeout:g}s", duration_sec=now - started, timed_out=True),
+                    )
+
+    return results  # type: ignore[return-value] - every slot is filled
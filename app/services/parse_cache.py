@@ -0,0 +1,146 @@
+"""Content-addressed cache of parsed cost documents.
+
+Estimators often resubmit the same výkaz výměr with only the drawings changed.
+Parsing results are therefore stored under a key derived from
+
+* the SHA-256 of the file bytes and its suffix (the suffix selects the parser),
+* ``SmartParser.PARSER_VERSION`` and ``NORMALIZER_VERSION``,
+* the settings that change parser output (``PARSE_CACHE_SETTINGS``),
+
+so a hit is only possible for byte-identical input processed by the same
+parsing logic.  Entries live in ``settings.PARSE_CACHE_DIR`` as
+``<key[:2]>/<key>.json``, are written atomically, and the least recently used
+ones are evicted once the cache exceeds ``PARSE_CACHE_MAX_MB``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.parsers.smart_parser import SmartParser
+from app.utils.hashing import sha256_bytes, sha256_file
+from app.utils.position_normalizer import NORMALIZER_VERSION
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PARSE_CACHE_FORMAT_VERSION", "PARSE_CACHE_SETTINGS", "ParseCache", "evict_lru", "get_parse_cache"]
+
+PARSE_CACHE_FORMAT_VERSION = 1
+
+# Settings that influence parsed/normalised positions.
+PARSE_CACHE_SETTINGS = ("PARSER_H_ENABLE",)
+
+# Parts of the SmartParser result that Workflow A consumes.
+CACHED_KEYS = ("positions", "document_info", "diagnostics")
+
+
+class ParseCache:
+    """Lookup and store parser results by content key."""
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> Path:
+        return Path(self._cache_dir or settings.PARSE_CACHE_DIR)
+
+    def key_for(self, file_path: Path) -> str:
+        material = {
+            "format": PARSE_CACHE_FORMAT_VERSION,
+            "content": sha256_file(file_path),
+            "suffix": file_path.suffix.lower(),
+            "parser": SmartParser.PARSER_VERSION,
+            "normalizer": NORMALIZER_VERSION,
+            "settings": {name: getattr(settings, name) for name in PARSE_CACHE_SETTINGS},
+        }
+        return sha256_bytes(json.dumps(material, sort_keys=True, default=str).encode("utf-8"))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._entry_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Parse cache entry %s is unreadable (%s); ignoring it", path.name, exc)
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, parsed: Dict[str, Any]) -> bool:
+        """Store the consumed parts of ``parsed``; skipped if they are not plain JSON or cannot be written."""
+
+        entry = {name: parsed.get(name) for name in CACHED_KEYS}
+        try:
+            payload = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError):
+            logger.debug("Parse result for %s is not JSON-serialisable; not cached", key[:12])
+            return False
+        if json.loads(payload) != entry:
+            # Tuples, non-string keys, ... would come back different on a hit.
+            logger.debug("Parse result for %s does not round-trip through JSON; not cached", key[:12])
+            return False
+
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not store parse result for %s: %s", key[:12], exc)
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return False
+        self._evict()
+        return True
+
+    def _evict(self) -> None:
+        evict_lru(self.cache_dir, settings.PARSE_CACHE_MAX_MB * 1024 * 1024)
+
+
+def evict_lru(cache_dir: Path, limit: int) -> None:
+    """Delete the least recently used ``<prefix>/<key>.json`` entries until ``cache_dir`` fits ``limit`` bytes."""
+
+    entries = []
+    total = 0
+    for path in cache_dir.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total += stat.st_size
+    if total <= limit:
+        return
+    for _, size, path in sorted(entries):
+        path.unlink(missing_ok=True)
+        total -= size
+        logger.info("%s: evicted %s", cache_dir.name, path.name)
+        if total <= limit:
+            break
+
+
+_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    global _cache
+    if _cache is None:
+        _cache = ParseCache()
+    return _cache
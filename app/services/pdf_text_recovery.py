@@ -1,29 +1,44 @@
 """PDF text layer recovery with cascading extractors.
 
 This module implements Task F2 requirements.  It analyses each page of a PDF
-document using multiple extractors (pdfminer, pypdfium2 and optionally
+document using multiple extractors (pypdfium2, pdfminer and optionally
 Poppler/pdftotext) and classifies the text layer quality.  When regular text
 extraction fails due to broken ToUnicode CMaps or subset fonts, the fallback
 extractors recover legible text which is then used for technical marker
 extraction.
 
+The primary extractor (``PDF_PRIMARY_EXTRACTOR``, pdfium by default) reads
+every page; the other in-process extractor only re-reads the pages where the
+primary text is weak, and Poppler is run once per page range for what is
+still unreadable.  Large documents are split into page ranges that are
+recovered in worker processes, and :meth:`PdfTextRecovery.recover_iter`
+yields pages in order as soon as their range is done.
+
 If all extractors fail to provide a usable text layer the page is queued for
-OCR which is expected to be executed asynchronously by the orchestration
-layer.  The recovery process tracks diagnostics for logging and caching.
+OCR, which the orchestration layer hands to :mod:`app.services.ocr_service`.
+Once OCR text for a page is in the OCR cache, later recoveries of the same
+PDF merge it into the page instead of queueing it again.  The recovery
+process tracks diagnostics for logging and caching.
 """
 
 from __future__ import annotations
 
-import concurrent.futures
 import logging
+import multiprocessing
 import subprocess
-import threading
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
 
 from app.core.config import settings
+from app.services.ocr_service import OcrCache
+from app.services.page_text_cache import PageTextCache
+from app.services.worker_processes import resolve_workers, worker_context
+from app.utils.hashing import sha256_file
+from app.utils.pdfium_lock import pdfium_lock
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +101,35 @@ class PageRecovery:
 
         return payload
 
+    def to_record(self) -> Dict[str, object]:
+        """Cache record: accepted text plus the metrics of every candidate (without their text)."""
+
+        def _metrics(metrics: TextMetrics) -> Dict[str, object]:
+            return {"valid_ratio": metrics.valid_ratio, "pua_ratio": metrics.pua_ratio, "state": metrics.state}
+
+        return {
+            "page": self.page_number,
+            "state": self.state,
+            "extractor": self.extractor,
+            "text": self.accepted.text,
+            "accepted": _metrics(self.accepted),
+            "miner": _metrics(self.miner),
+            "fallbacks": {name: _metrics(metrics) for name, metrics in self.fallbacks.items()},
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "PageRecovery":
+        accepted = TextMetrics(text=record["text"], **record["accepted"])
+        miner = accepted if record["miner"] == record["accepted"] else TextMetrics(text="", **record["miner"])
+        return cls(
+            page_number=record["page"],
+            state=record["state"],
+            miner=miner,
+            accepted=accepted,
+            extractor=record["extractor"],
+            fallbacks={name: TextMetrics(text="", **metrics) for name, metrics in record["fallbacks"].items()},
+        )
+
 
 @dataclass(slots=True)
 class PdfRecoverySummary:
@@ -95,15 +139,27 @@ class PdfRecoverySummary:
     used_pdfium: int = 0
     used_poppler: int = 0
     queued_ocr_pages: List[int] = field(default_factory=list)
+    used_ocr: int = 0
 
     def to_dict(self) -> Dict[str, object]:
         return {
             "pages": [page.to_dict() for page in self.pages],
             "used_pdfium": self.used_pdfium,
             "used_poppler": self.used_poppler,
+            "used_ocr": self.used_ocr,
             "ocr_pages": self.queued_ocr_pages,
         }
 
+    @classmethod
+    def from_pages(cls, pages: List[PageRecovery]) -> "PdfRecoverySummary":
+        return cls(
+            pages=pages,
+            used_pdfium=sum(1 for page in pages if page.extractor == "pdfium"),
+            used_poppler=sum(1 for page in pages if page.extractor == "poppler"),
+            queued_ocr_pages=[page.page_number for page in pages if page.queued_for_ocr],
+            used_ocr=sum(1 for page in pages if page.extractor == "ocr"),
+        )
+
     def page_state_counters(self) -> Dict[str, int]:
         counters = {"good_text": 0, "encoded_text": 0, "image_only": 0}
         for page in self.pages:
@@ -184,6 +240,111 @@ def _is_better(candidate: TextMetrics, baseline: TextMetrics) -> bool:
     return False
 
 
+# ---------------------------------------------------------------------------
+# In-process extractors (module level so worker processes can run them)
+# ---------------------------------------------------------------------------
+
+
+def _pdfium_texts(file_path: Path, pages: Optional[Sequence[int]]) -> Dict[int, str]:
+    """Text of the given 1-based ``pages`` (all pages for ``None``) via pypdfium2."""
+
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:  # pragma: no cover - optional dependency missing
+        return {}
+
+    texts: Dict[int, str] = {}
+    try:
+        with pdfium_lock, pdfium.PdfDocument(str(file_path)) as document:
+            numbers = pages if pages is not None else range(1, len(document) + 1)
+            for page_number in numbers:
+                try:
+                    page = document.get_page(page_number - 1)
+                except (ValueError, IndexError):
+                    continue
+                textpage = page.get_textpage()
+                try:
+                    texts[page_number] = textpage.get_text_range() or ""
+                finally:
+                    textpage.close()
+                    page.close()
+    except Exception as exc:  # noqa: BLE001 - broken documents fall back to other extractors
+        logger.warning("pdfium failed on %s: %s", file_path.name, exc)
+    return texts
+
+
+def _pdfminer_texts(file_path: Path, pages: Optional[Sequence[int]]) -> Dict[int, str]:
+    """Text of the given 1-based ``pages`` (all pages for ``None``) via pdfminer."""
+
+    try:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+    except ImportError:  # pragma: no cover - environment without pdfminer
+        logger.warning("pdfminer.six is not installed. Skipping pdfminer extraction.")
+        return {}
+
+    wanted = sorted(pages) if pages is not None else None
+    page_numbers = {number - 1 for number in wanted} if wanted is not None else None
+    texts: Dict[int, str] = {}
+    try:
+        # ``extract_pages`` yields the selected pages in document order.
+        for index, page_layout in enumerate(extract_pages(str(file_path), page_numbers=page_numbers)):
+            page_number = wanted[index] if wanted is not None else index + 1
+            texts[page_number] = "".join(
+                element.get_text() for element in page_layout if isinstance(element, LTTextContainer)
+            )
+    except Exception as exc:  # pragma: no cover - pdfminer edge cases
+        logger.warning("pdfminer failed on %s: %s", file_path.name, exc)
+    return texts
+
+
+_EXTRACTORS: Dict[str, Callable[[Path, Optional[Sequence[int]]], Dict[int, str]]] = {
+    "pdfium": _pdfium_texts,
+    "pdfminer": _pdfminer_texts,
+}
+
+
+def _recover_page_range(
+    file_path: Path,
+    pages: Optional[Sequence[int]],
+    primary: str,
+    secondary: Optional[str],
+) -> List[PageRecovery]:
+    """Primary extraction of ``pages`` plus the secondary extractor for weak ones."""
+
+    primary_texts = _EXTRACTORS[primary](file_path, pages)
+    numbers = list(pages) if pages is not None else sorted(primary_texts)
+
+    recovery: List[PageRecovery] = []
+    weak: List[PageRecovery] = []
+    for page_number in numbers:
+        metrics = _analyse_text(primary_texts.get(page_number, ""))
+        page = PageRecovery(
+            page_number=page_number,
+            state=metrics.state,
+            miner=metrics,
+            accepted=metrics,
+            extractor=primary,
+        )
+        recovery.append(page)
+        if metrics.state != "good_text":
+            weak.append(page)
+
+    if weak and secondary:
+        secondary_texts = _EXTRACTORS[secondary](file_path, [page.page_number for page in weak])
+        for page in weak:
+            text = secondary_texts.get(page.page_number)
+            if text is None:
+                continue
+            metrics = _analyse_text(text)
+            page.fallbacks[secondary] = metrics
+            if metrics.valid_ratio >= settings.PDF_FALLBACK_VALID_RATIO and _is_better(metrics, page.accepted):
+                page.accepted = metrics
+                page.extractor = secondary
+
+    return recovery
+
+
 # ---------------------------------------------------------------------------
 # Recovery engine
 # ---------------------------------------------------------------------------
@@ -192,10 +353,15 @@ def _is_better(candidate: TextMetrics, baseline: TextMetrics) -> bool:
 class PdfTextRecovery:
     """Recover usable text layers from PDF pages using multiple extractors."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        ocr_cache: Optional[OcrCache] = None,
+        page_cache: Optional[PageTextCache] = None,
+    ) -> None:
         self._pdfium_available: Optional[bool] = None
         self._poppler_available: Optional[bool] = None
-        self._ocr_lock = threading.Lock()
+        self.ocr_cache = ocr_cache or OcrCache()
+        self.page_cache = page_cache or PageTextCache()
 
     # ------------------------------------------------------------------
     # Public API
@@ -204,257 +370,222 @@ class PdfTextRecovery:
     def recover(self, file_path: Path) -> PdfRecoverySummary:
         """Run the recovery cascade for ``file_path``."""
 
-        miner_pages = list(self._extract_pdfminer(file_path))
-        total_pages = len(miner_pages)
-
-        if total_pages == 0:
-            total_pages = self._estimate_page_count(file_path)
-            miner_pages = [""] * total_pages
+        return PdfRecoverySummary.from_pages(list(self.recover_iter(file_path)))
 
-        recovery: List[PageRecovery] = []
-
-        fallback_candidates: List[int] = []
-        pdfium_results: Dict[int, TextMetrics] = {}
-        poppler_results: Dict[int, TextMetrics] = {}
-
-        for index, text in enumerate(miner_pages, start=1):
-            metrics = _analyse_text(text)
-
-            if metrics.state != "good_text":
-                fallback_candidates.append(index)
-
-            page_recovery = PageRecovery(
-                page_number=index,
-                state=metrics.state,
-                miner=metrics,
-                accepted=metrics,
-                extractor="pdfminer",
-            )
-            recovery.append(page_recovery)
-
-        if fallback_candidates:
-            pdfium_results = self._recover_with_pdfium(file_path, fallback_candidates)
-
-        for page_number in fallback_candidates:
-            page = recovery[page_number - 1]
-            pdfium_metrics = pdfium_results.get(page_number)
-            if pdfium_metrics and pdfium_metrics.valid_ratio >= settings.PDF_FALLBACK_VALID_RATIO:
-                page.fallbacks["pdfium"] = pdfium_metrics
-                page.accepted = pdfium_metrics
-                page.extractor = "pdfium"
-                continue
+    def recover_iter(self, file_path: Path) -> Iterator[PageRecovery]:
+        """Yield the recovered pages of ``file_path`` in page order.
 
-            if pdfium_metrics:
-                page.fallbacks["pdfium"] = pdfium_metrics
+        Pages are produced range by range, so callers can start consuming the
+        first pages while later ranges are still being recovered.  A PDF that
+        was recovered before (same content hash) is served from the page text
+        cache; only the OCR merge runs again.
+        """
 
-            if not settings.PDF_ENABLE_POPPLER:
-                continue
-
-            poppler_metrics = self._recover_with_poppler(file_path, page_number)
-            if poppler_metrics:
-                page.fallbacks["poppler"] = poppler_metrics
-                if _is_better(poppler_metrics, page.accepted) and poppler_metrics.valid_ratio >= settings.PDF_FALLBACK_VALID_RATIO:
-                    page.accepted = poppler_metrics
-                    page.extractor = "poppler"
-
-        queued_for_ocr: List[int] = []
+        file_hash = sha256_file(file_path)
         ocr_budget = settings.PDF_MAX_PAGES_FOR_OCR
+        produced = 0
 
-        for page in recovery:
-            if page.accepted.valid_ratio >= settings.PDF_VALID_CHAR_RATIO:
-                continue
+        for pages in self._iter_recovered_ranges(file_path, file_hash):
+            for page in pages:
+                if self._needs_ocr(page):
+                    if not self._apply_ocr_text(page, file_hash) and ocr_budget > 0:
+                        page.queued_for_ocr = True
+                        ocr_budget -= 1
+                produced += 1
+                yield page
 
-            if page.extractor in {"pdfium", "poppler"} and page.accepted.valid_ratio >= settings.PDF_FALLBACK_VALID_RATIO:
-                continue
-
-            if not settings.PDF_ENABLE_OCR or ocr_budget <= 0:
-                continue
-
-            if self._enqueue_ocr(file_path, page.page_number):
-                page.queued_for_ocr = True
-                queued_for_ocr.append(page.page_number)
-                ocr_budget -= 1
-
-        used_pdfium = sum(1 for page in recovery if page.extractor == "pdfium")
-        used_poppler = sum(1 for page in recovery if page.extractor == "poppler")
-
-        return PdfRecoverySummary(
-            pages=recovery,
-            used_pdfium=used_pdfium,
-            used_poppler=used_poppler,
-            queued_ocr_pages=queued_for_ocr,
-        )
+        if produced == 0:
+            logger.warning("No text layer could be read from %s", file_path.name)
 
     # ------------------------------------------------------------------
-    # Extractors
+    # Page ranges
     # ------------------------------------------------------------------
 
-    def _extract_pdfminer(self, file_path: Path) -> Iterable[str]:
-        try:
-            from pdfminer.high_level import extract_pages
-            from pdfminer.layout import LTTextContainer
-        except ImportError:  # pragma: no cover - environment without pdfminer
-            logger.warning("pdfminer.six is not installed. Skipping primary extraction.")
-            return []
+    def _iter_recovered_ranges(self, file_path: Path, file_hash: str) -> Iterator[List[PageRecovery]]:
+        """Extractor cascade (without OCR) per page range, through the page text cache."""
+
+        cached = self.page_cache.get(file_hash)
+        if cached is not None:
+            logger.info("Page text cache hit for %s (%s pages)", file_path.name, len(cached))
+            yield [PageRecovery.from_record(record) for record in cached]
+            return
+
+        primary, secondary = self._extractor_order()
+        page_count = self._estimate_page_count(file_path) if self._pdfium_ready() else 0
+        poppler_budget = settings.PDF_MAX_PAGES_FOR_FALLBACK
+        records: List[Dict[str, object]] = []
+
+        for pages in self._iter_page_ranges(file_path, page_count, primary, secondary):
+            if settings.PDF_ENABLE_POPPLER and poppler_budget > 0:
+                poppler_budget -= self._apply_poppler(file_path, pages, poppler_budget)
+            # Recorded before the OCR merge mutates the pages.
+            records.extend(page.to_record() for page in pages)
+            yield pages
+
+        if records:
+            self.page_cache.put(file_hash, records)
+
+    def _extractor_order(self) -> tuple[str, Optional[str]]:
+        primary = settings.PDF_PRIMARY_EXTRACTOR.lower()
+        if primary not in _EXTRACTORS:
+            logger.warning("Unknown PDF_PRIMARY_EXTRACTOR %r; using pdfium", primary)
+            primary = "pdfium"
+        if not self._pdfium_ready():
+            return "pdfminer", None
+        return primary, ("pdfminer" if primary == "pdfium" else "pdfium")
+
+    def _iter_page_ranges(
+        self, file_path: Path, page_count: int, primary: str, secondary: Optional[str]
+    ) -> Iterator[List[PageRecovery]]:
+        if page_count == 0:
+            # Page count unknown (no pdfium): one pass over the whole document.
+            yield _recover_page_range(file_path, None, primary, secondary)
+            return
+
+        size = max(1, settings.PDF_PAGES_PER_TASK)
+        ranges = [list(range(first, min(first + size, page_count + 1))) for first in range(1, page_count + 1, size)]
+        workers = min(resolve_workers(settings.PDF_RECOVERY_WORKERS), len(ranges))
+        parallel = (
+            workers > 1
+            and page_count >= settings.PDF_PARALLEL_MIN_PAGES
+            # Daemonic workers (e.g. per-file parse workers) cannot start children.
+            and not multiprocessing.current_process().daemon
+        )
+        if not parallel:
+            for pages in ranges:
+                yield _recover_page_range(file_path, pages, primary, secondary)
+            return
 
-        def _iter_pages() -> Iterable[str]:
+        done = 0
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
+        try:
+            results = pool.map(
+                _recover_page_range,
+                repeat(file_path),
+                ranges,
+                repeat(primary),
+                repeat(secondary),
+            )
             try:
-                for page_layout in extract_pages(str(file_path)):
-                    strings: List[str] = []
-                    for element in page_layout:
-                        if isinstance(element, LTTextContainer):
-                            strings.append(element.get_text())
-                    yield "".join(strings)
-            except Exception as exc:  # pragma: no cover - pdfminer edge cases
-                logger.warning("pdfminer failed on %s: %s", file_path.name, exc)
-
-        return list(_iter_pages())
-
-    def _recover_with_pdfium(self, file_path: Path, pages: Sequence[int]) -> Dict[int, TextMetrics]:
-        if not pages:
-            return {}
-
-        if not self._pdfium_available:
-            self._pdfium_available = self._check_pdfium()
-
-        if not self._pdfium_available:
-            return {}
+                for recovered in results:
+                    done += 1
+                    yield recovered
+            except Exception:  # noqa: BLE001 - fall back to in-process recovery
+                logger.exception("Parallel text recovery of %s failed, continuing in-process", file_path.name)
+                for pages in ranges[done:]:
+                    yield _recover_page_range(file_path, pages, primary, secondary)
+        finally:
+            # Also reached when the consumer stops early: drop ranges not started yet.
+            pool.shutdown(wait=True, cancel_futures=True)
 
-        try:
-            import pypdfium2 as pdfium
-        except ImportError:  # pragma: no cover - optional dependency missing
-            logger.warning("pypdfium2 not installed. Skipping fallback extraction.")
-            self._pdfium_available = False
-            return {}
+    # ------------------------------------------------------------------
+    # Poppler fallback
+    # ------------------------------------------------------------------
 
-        limited_pages = pages[: settings.PDF_MAX_PAGES_FOR_FALLBACK]
-        results: Dict[int, TextMetrics] = {}
+    def _apply_poppler(self, file_path: Path, pages: List[PageRecovery], budget: int) -> int:
+        """Run Poppler once for the weak pages of ``pages``; returns pages attempted."""
 
-        with pdfium.PdfDocument(str(file_path)) as document:
-            for page_number in limited_pages:
-                try:
-                    page = document.get_page(page_number - 1)
-                except ValueError:
-                    continue
-                textpage = page.get_textpage()
-                try:
-                    text = textpage.get_text_range()
-                finally:
-                    textpage.close()
-                    page.close()
+        candidates = [
+            page
+            for page in pages
+            if page.accepted.state != "good_text" and page.accepted.valid_ratio < settings.PDF_FALLBACK_VALID_RATIO
+        ][:budget]
+        if not candidates:
+            return 0
 
-                metrics = _analyse_text(text or "")
-                results[page_number] = metrics
+        texts = self._recover_with_poppler(
+            file_path, candidates[0].page_number, candidates[-1].page_number
+        )
+        for page in candidates:
+            text = texts.get(page.page_number, "")
+            if not text.strip():
+                continue
+            metrics = _analyse_text(text)
+            page.fallbacks["poppler"] = metrics
+            if _is_better(metrics, page.accepted) and metrics.valid_ratio >= settings.PDF_FALLBACK_VALID_RATIO:
+                page.accepted = metrics
+                page.extractor = "poppler"
+        return len(candidates)
 
-        return results
+    def _recover_with_poppler(self, file_path: Path, first_page: int, last_page: int) -> Dict[int, str]:
+        """Text of pages ``first_page``..``last_page`` from a single pdftotext call."""
 
-    def _recover_with_poppler(self, file_path: Path, page_number: int) -> Optional[TextMetrics]:
         if not self._poppler_available:
             self._poppler_available = self._check_poppler()
 
         if not self._poppler_available:
-            return None
+            return {}
 
         command = [
             "pdftotext",
             "-layout",
-            "-nopgbrk",
             "-f",
-            str(page_number),
+            str(first_page),
             "-l",
-            str(page_number),
+            str(last_page),
             str(file_path),
             "-",
         ]
 
+        page_total = last_page - first_page + 1
         try:
             completed = subprocess.run(
                 command,
                 capture_output=True,
                 text=True,
-                timeout=settings.PDF_PAGE_TIMEOUT_SEC,
+                timeout=settings.PDF_PAGE_TIMEOUT_SEC * page_total,
                 check=False,
             )
         except FileNotFoundError:  # pragma: no cover - poppler missing
             logger.debug("pdftotext command not found. Disabling Poppler fallback.")
             self._poppler_available = False
-            return None
+            return {}
         except subprocess.TimeoutExpired:
-            logger.warning("pdftotext timed out on %s page %s", file_path.name, page_number)
-            return None
+            logger.warning("pdftotext timed out on %s pages %s-%s", file_path.name, first_page, last_page)
+            return {}
 
         if completed.returncode != 0:
             logger.debug(
-                "pdftotext failed on %s page %s with code %s", file_path.name, page_number, completed.returncode
+                "pdftotext failed on %s pages %s-%s with code %s",
+                file_path.name,
+                first_page,
+                last_page,
+                completed.returncode,
             )
-            return None
-
-        text = completed.stdout or ""
-        if not text.strip():
-            return None
+            return {}
 
-        return _analyse_text(text)
+        # Pages are separated by form feeds.
+        chunks = (completed.stdout or "").split("\f")
+        return {first_page + offset: text for offset, text in enumerate(chunks[:page_total])}
 
     # ------------------------------------------------------------------
-    # OCR queue (placeholder implementation)
+    # OCR selection
     # ------------------------------------------------------------------
 
-    def _enqueue_ocr(self, file_path: Path, page_number: int) -> bool:
+    @staticmethod
+    def _needs_ocr(page: PageRecovery) -> bool:
         if not settings.PDF_ENABLE_OCR:
             return False
+        return page.accepted.valid_ratio < settings.PDF_VALID_CHAR_RATIO
 
-        if not self._pdfium_available:
-            self._pdfium_available = self._check_pdfium()
+    def _apply_ocr_text(self, page: PageRecovery, file_hash: str) -> bool:
+        """Merge cached OCR text into ``page``; ``False`` if it has not been recognised yet."""
 
-        if not self._pdfium_available:
-            logger.debug("Cannot queue OCR for %s page %s without pdfium", file_path.name, page_number)
+        text = self.ocr_cache.get(file_hash, page.page_number)
+        if text is None:
             return False
-
-        def _worker() -> str:
-            try:
-                import pypdfium2 as pdfium
-            except ImportError:  # pragma: no cover - optional dependency missing
-                return ""
-
-            try:
-                from PIL import Image
-            except ImportError:  # pragma: no cover - optional dependency missing
-                return ""
-
-            try:
-                import pytesseract
-            except ImportError:  # pragma: no cover - optional dependency missing
-                return ""
-
-            with pdfium.PdfDocument(str(file_path)) as document:
-                try:
-                    page = document.get_page(page_number - 1)
-                except ValueError:
-                    return ""
-
-                pil_image = page.render(scale=2.0).to_pil()
-                page.close()
-
-            if not isinstance(pil_image, Image.Image):  # pragma: no cover - safety guard
-                pil_image = Image.fromarray(pil_image)
-
-            ocr_text = pytesseract.image_to_string(pil_image)
-            return ocr_text
-
-        with self._ocr_lock:
-            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            future = executor.submit(_worker)
-        try:
-            future.result(timeout=settings.PDF_PAGE_TIMEOUT_SEC)
-        except concurrent.futures.TimeoutError:
-            logger.warning("OCR timed out for %s page %s", file_path.name, page_number)
-            return False
-        finally:
-            executor.shutdown(wait=False)
-
-        # Real OCR text is stored asynchronously elsewhere; we just signal enqueue.
+        metrics = _analyse_text(text)
+        page.fallbacks["ocr"] = metrics
+        if _is_better(metrics, page.accepted):
+            page.accepted = metrics
+            page.extractor = "ocr"
         return True
 
+    def _pdfium_ready(self) -> bool:
+        if self._pdfium_available is None:
+            self._pdfium_available = self._check_pdfium()
+        return bool(self._pdfium_available)
+
     # ------------------------------------------------------------------
     # Utilities
     # ------------------------------------------------------------------
@@ -466,8 +597,12 @@ class PdfTextRecovery:
         except ImportError:  # pragma: no cover - optional dependency missing
             return 0
 
-        with pdfium.PdfDocument(str(file_path)) as document:
-            return len(document)
+        try:
+            with pdfium_lock, pdfium.PdfDocument(str(file_path)) as document:
+                return len(document)
+        except Exception as exc:  # noqa: BLE001 - unreadable for pdfium, pdfminer may still cope
+            logger.warning("pdfium cannot open %s: %s", file_path.name, exc)
+            return 0
 
     @staticmethod
     def _check_pdfium() -> bool:
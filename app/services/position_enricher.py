@@ -3,31 +3,25 @@
 from __future__ import annotations
 
 import logging
-import re
-from dataclasses import dataclass
-from difflib import SequenceMatcher
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
-
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app.core.catalog_index import (
+    CatalogIndex,
+    CatalogRecord,
+    get_catalog_index,
+    normalise_code,
+    normalise_unit,
+    registered_index,
+)
 from app.core.config import settings
+from app.core.fuzzy_index import FuzzyDescriptionIndex
 from app.core.kb_loader import KnowledgeBaseLoader, get_knowledge_base
 from app.core.normalization import extract_entities, normalize_text
 
 logger = logging.getLogger(__name__)
 
-_CODE_RE = re.compile(r"[^A-Z0-9]")
-
-
-@dataclass(frozen=True)
-class CatalogEntry:
-    """Simplified representation of a KB record."""
-
-    code: str
-    catalog: str
-    unit: str
-    description: str
-    tech_spec: str
-    normalized_text: str
-    entities: Dict[str, set[str]]
+# Backwards compatible name for the shared catalog record type.
+CatalogEntry = CatalogRecord
 
 
 class PositionEnricher:
@@ -39,9 +33,12 @@ class PositionEnricher:
         self.score_partial = settings.ENRICH_SCORE_PARTIAL
         self.max_evidence = settings.ENRICH_MAX_EVIDENCE
 
-        self._code_index: Dict[str, CatalogEntry] = {}
-        self._entries_by_unit: Dict[str, List[CatalogEntry]] = {}
-        self._entries: List[CatalogEntry] = []
+        self._catalog: Optional[CatalogIndex] = None
+        self._code_index: Mapping[str, CatalogEntry] = {}
+        self._entries_by_unit: Mapping[str, Sequence[CatalogEntry]] = {}
+        self._entries: Sequence[CatalogEntry] = ()
+        self._fuzzy: Optional[FuzzyDescriptionIndex[CatalogEntry]] = None
+        self._fuzzy_cache: Dict[Tuple[str, str], List[Tuple[float, CatalogEntry]]] = {}
         self.catalog_present = False
 
         if not self.enabled:
@@ -54,6 +51,33 @@ class PositionEnricher:
             logger.exception("Failed to initialise enrichment catalog")
             self.enabled = False
 
+    @property
+    def catalog_index(self) -> Optional[CatalogIndex]:
+        """Catalog index the enricher matches against, if enabled."""
+
+        return self._catalog if self.enabled else None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The catalog index travels as its generation token; the worker
+        # already holds that index (see ``registered_index``).
+        catalog = self.catalog_index
+        return {
+            "enabled": self.enabled,
+            "catalog": catalog.token if catalog is not None else None,
+            "score_exact": self.score_exact,
+            "score_partial": self.score_partial,
+            "max_evidence": self.max_evidence,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(enabled=False)
+        self.score_exact = state["score_exact"]
+        self.score_partial = state["score_partial"]
+        self.max_evidence = state["max_evidence"]
+        if state["enabled"] and state["catalog"] is not None:
+            self.enabled = True
+            self._use_catalog(registered_index(state["catalog"]))
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -63,37 +87,48 @@ class PositionEnricher:
         positions: Iterable[Dict[str, Any]],
         drawing_payload: Any,
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        drawing_texts = self._collect_drawing_texts(drawing_payload)
+        drawing_texts = self.collect_drawing_texts(drawing_payload)
 
         enriched_positions: List[Dict[str, Any]] = []
-        stats = {"enabled": self.enabled, "matched": 0, "partial": 0, "unmatched": 0}
+        stats = self.new_stats()
+        for position in positions:
+            enriched_positions.append(self.enrich_in_place(dict(position), drawing_texts, stats))
 
-        if not self.enabled or not self.catalog_present:
-            for position in positions:
-                enriched_positions.append(self._fallback_payload(dict(position)))
-                stats["unmatched"] += 1
-            logger.info(
-                "enrichment: matched=%s partial=%s unmatched=%s thresholds={%.2f,%.2f}",
-                stats["matched"],
-                stats["partial"],
-                stats["unmatched"],
-                self.score_exact,
-                self.score_partial,
-            )
-            stats["catalog_present"] = self.catalog_present
-            return enriched_positions, stats
+        self.log_stats(stats)
+        return enriched_positions, stats
 
-        for position in positions:
-            enriched = self._enrich_single(dict(position), drawing_texts)
-            label = enriched.get("enrichment", {}).get("match", "none")
-            if label == "exact":
-                stats["matched"] += 1
-            elif label == "partial":
-                stats["partial"] += 1
-            else:
-                stats["unmatched"] += 1
-            enriched_positions.append(enriched)
+    def new_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "matched": 0,
+            "partial": 0,
+            "unmatched": 0,
+            "catalog_present": self.catalog_present,
+        }
+
+    def enrich_in_place(
+        self,
+        position: Dict[str, Any],
+        drawing_texts: Sequence[str],
+        stats: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Enrich ``position`` without copying it and count the result into ``stats``."""
 
+        if not self.enabled or not self.catalog_present:
+            stats["unmatched"] += 1
+            return self._fallback_payload(position)
+
+        enriched = self._enrich_single(position, drawing_texts)
+        label = enriched.get("enrichment", {}).get("match", "none")
+        if label == "exact":
+            stats["matched"] += 1
+        elif label == "partial":
+            stats["partial"] += 1
+        else:
+            stats["unmatched"] += 1
+        return enriched
+
+    def log_stats(self, stats: Mapping[str, Any]) -> None:
         logger.info(
             "enrichment: matched=%s partial=%s unmatched=%s thresholds={%.2f,%.2f}",
             stats["matched"],
@@ -102,50 +137,21 @@ class PositionEnricher:
             self.score_exact,
             self.score_partial,
         )
-        stats["catalog_present"] = self.catalog_present
-        return enriched_positions, stats
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
     def _bootstrap_catalog(self, loader: KnowledgeBaseLoader) -> None:
-        seen_codes: set[str] = set()
-
-        def register(entry: CatalogEntry) -> None:
-            if entry.code in seen_codes:
-                return
-            seen_codes.add(entry.code)
-            code_key = self._normalise_code(entry.code)
-            if code_key:
-                self._code_index[code_key] = entry
-            self._entries.append(entry)
-            unit_key = self._normalise_unit(entry.unit)
-            self._entries_by_unit.setdefault(unit_key, []).append(entry)
-
-        for catalog_key in ("otskp", "urs", "rts"):
-            records = loader.kb_b1.get(catalog_key, {}) if hasattr(loader, "kb_b1") else {}
-            if not records:
-                continue
-            self.catalog_present = True
-            for payload in records.values():
-                code = str(payload.get("code") or "").strip()
-                if not code:
-                    continue
-                description = str(payload.get("name") or payload.get("description") or "").strip()
-                tech_spec = str(payload.get("tech_spec") or "").strip()
-                unit = str(payload.get("unit") or "").strip()
-                normalized = normalize_text(" ".join(filter(None, [description, tech_spec])))
-                entry = CatalogEntry(
-                    code=code,
-                    catalog=catalog_key.upper(),
-                    unit=unit,
-                    description=description,
-                    tech_spec=tech_spec,
-                    normalized_text=normalized,
-                    entities=extract_entities(f"{description} {tech_spec}"),
-                )
-                register(entry)
+        self._use_catalog(get_catalog_index(loader))
+
+    def _use_catalog(self, index: CatalogIndex) -> None:
+        self._catalog = index
+        self._code_index = index.by_code
+        self._entries = index.records
+        self._entries_by_unit = index.by_unit
+        self._fuzzy = index.fuzzy
+        self.catalog_present = index.catalog_present
 
         if not self.catalog_present:
             self.enabled = False
@@ -251,7 +257,7 @@ class PositionEnricher:
         return ""
 
     @staticmethod
-    def _collect_drawing_texts(payload: Any) -> List[str]:
+    def collect_drawing_texts(payload: Any) -> List[str]:
         if isinstance(payload, dict):
             specs = payload.get("specifications") or []
         elif isinstance(payload, list):
@@ -321,16 +327,14 @@ class PositionEnricher:
         unit: Optional[str],
     ) -> List[Tuple[float, CatalogEntry]]:
         normalized_description = normalize_text(description)
-        if not normalized_description:
+        if not normalized_description or self._fuzzy is None:
             return []
-        candidates = self._entries_by_unit.get(self._normalise_unit(unit), self._entries)
-        matches: List[Tuple[float, CatalogEntry]] = []
-        for entry in candidates:
-            ratio = SequenceMatcher(None, normalized_description, entry.normalized_text).ratio()
-            if ratio >= 0.70:
-                matches.append((ratio, entry))
-        matches.sort(key=lambda item: item[0], reverse=True)
-        return matches[:3]
+        key = (normalized_description, self._normalise_unit(unit))
+        matches = self._fuzzy_cache.get(key)
+        if matches is None:
+            matches = self._fuzzy.top_matches(normalized_description, key[1], limit=3, threshold=0.70)
+            self._fuzzy_cache[key] = matches
+        return list(matches)
 
     @staticmethod
     def _candidate_payload(entry: CatalogEntry, score: float) -> Dict[str, Any]:
@@ -344,8 +348,8 @@ class PositionEnricher:
 
     @staticmethod
     def _normalise_code(code: str) -> str:
-        return _CODE_RE.sub("", code.upper())
+        return normalise_code(code)
 
     @staticmethod
     def _normalise_unit(unit: Optional[str]) -> str:
-        return normalize_text(unit or "").replace(" ", "")
+        return normalise_unit(unit)
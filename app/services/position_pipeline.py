@@ -0,0 +1,347 @@
+"""Fused enrichment → validation → audit pass over cost positions.
+
+``PositionPipeline`` runs the three per-position stages of Workflow A in a
+single pass with one copy of every position (the stages used to copy each
+position dict in turn).  Large estimates are split into chunks and fanned out
+to a process pool started from
+:func:`~app.services.worker_processes.worker_context`.  The pool is long-lived
+and belongs to one KB generation: its initializer hands every worker a copy of
+the catalog index once, and each task carries the pipeline pickled with only
+the index token (see :mod:`app.core.catalog_index`).  A run against a newer
+generation retires the previous pool, which shuts down once its last run is
+done.
+
+Chunk results are collected in submission order and their statistics are
+merged in that order, so the output (positions, counters and the key order of
+reason breakdowns) is identical to a sequential run.  ``iter_chunks`` is the
+generator form: it pulls positions lazily, keeps only a bounded number of
+chunks in flight and yields each processed chunk while statistics accumulate
+on the side; ``run`` collects its output.  An optional ``on_chunk`` callback
+receives each chunk's positions, in order, as soon as it is done.
+"""
+from __future__ import annotations
+
+import logging
+import pickle
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.catalog_index import CatalogIndex
+from app.core.config import settings
+from app.services.audit_classifier import AuditClassifier
+from app.services.position_enricher import PositionEnricher
+from app.services.specifications_validator import SpecificationsValidator
+from app.services.worker_processes import resolve_workers, worker_context
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ChunkCallback", "PipelineResult", "PositionPipeline", "shutdown_worker_pools"]
+
+ChunkCallback = Callable[[List[Dict[str, Any]]], None]
+
+# Failures of the process pool itself: a dead worker, a payload that cannot
+# be pickled (pickle raises TypeError for most such objects) or no processes
+# available.  The affected chunks are then processed in-process, where a
+# genuine processing error is raised again.
+_POOL_ERRORS = (BrokenProcessPool, pickle.PicklingError, TypeError, OSError)
+
+
+@dataclass
+class PipelineResult:
+    """Positions and per-stage statistics of one pipeline run."""
+
+    positions: List[Dict[str, Any]] = field(default_factory=list)
+    enrichment_stats: Dict[str, Any] = field(default_factory=dict)
+    validation_stats: Dict[str, Any] = field(default_factory=dict)
+    audit_stats: Dict[str, Any] = field(default_factory=dict)
+    workers: int = 1
+    chunks: int = 1
+
+
+class PositionPipeline:
+    """Run enrichment, validation and audit classification per position."""
+
+    def __init__(
+        self,
+        enricher: PositionEnricher,
+        validator: SpecificationsValidator,
+        classifier: AuditClassifier,
+        *,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        parallel_min_positions: Optional[int] = None,
+    ) -> None:
+        self.enricher = enricher
+        self.validator = validator
+        self.classifier = classifier
+        self.workers = resolve_workers(settings.PIPELINE_WORKERS if workers is None else workers)
+        self.chunk_size = max(1, settings.PIPELINE_CHUNK_SIZE if chunk_size is None else chunk_size)
+        self.parallel_min_positions = (
+            settings.PIPELINE_PARALLEL_MIN_POSITIONS if parallel_min_positions is None else parallel_min_positions
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        positions: Iterable[Dict[str, Any]],
+        drawing_payload: Any,
+        on_chunk: Optional[ChunkCallback] = None,
+    ) -> PipelineResult:
+        result = self.new_result()
+        for chunk in self.iter_chunks(positions, drawing_payload, result):
+            _notify(chunk, on_chunk)
+            result.positions.extend(chunk)
+        return result
+
+    def iter_chunks(
+        self,
+        positions: Iterable[Dict[str, Any]],
+        drawing_payload: Any,
+        stats: PipelineResult,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield processed chunks in input order, consuming ``positions`` lazily.
+
+        Statistics are merged into ``stats`` as chunks are yielded (its
+        ``positions`` are left alone), so callers keep only what they store.
+        """
+
+        drawing_texts = self.enricher.collect_drawing_texts(drawing_payload)
+        chunks = _iter_chunked(positions, self.chunk_size)
+
+        # Buffer just enough chunks to decide whether a process pool pays off.
+        buffered: List[List[Dict[str, Any]]] = []
+        buffered_total = 0
+        if self.workers > 1:
+            for chunk in chunks:
+                buffered.append(chunk)
+                buffered_total += len(chunk)
+                if buffered_total >= self.parallel_min_positions and len(buffered) > 1:
+                    break
+        parallel = len(buffered) > 1 and buffered_total >= self.parallel_min_positions
+        chunks = chain(buffered, chunks)
+        del buffered
+
+        if parallel:
+            partials = self._iter_parallel(chunks, drawing_texts, stats)
+        else:
+            partials = (self.process_chunk(chunk, drawing_texts) for chunk in chunks)
+
+        processed = 0
+        for partial in partials:
+            self._merge_stats(stats, partial)
+            processed += len(partial.positions)
+            yield partial.positions
+
+        self.enricher.log_stats(stats.enrichment_stats)
+        self.validator.log_stats(stats.validation_stats)
+        logger.info(
+            "Position pipeline: %s positions, %s chunk(s), %s worker(s)",
+            processed,
+            stats.chunks,
+            stats.workers,
+        )
+
+    def new_result(self) -> PipelineResult:
+        """Empty result with zeroed statistics, ready for ``iter_chunks``."""
+
+        return PipelineResult(
+            enrichment_stats=self.enricher.new_stats(),
+            validation_stats=self.validator.new_stats(),
+            audit_stats=self.classifier.new_stats(),
+            chunks=0,
+        )
+
+    def process_chunk(self, positions: Sequence[Dict[str, Any]], drawing_texts: Sequence[str]) -> PipelineResult:
+        """Process ``positions`` sequentially, copying each position once."""
+
+        enrichment_stats = self.enricher.new_stats()
+        validation_stats = self.validator.new_stats()
+        audit_stats = self.classifier.new_stats()
+        processed: List[Dict[str, Any]] = []
+        for position in positions:
+            payload = self.enricher.enrich_in_place(dict(position), drawing_texts, enrichment_stats)
+            payload = self.validator.validate_in_place(payload, validation_stats)
+            processed.append(self.classifier.classify_in_place(payload, audit_stats))
+        return PipelineResult(processed, enrichment_stats, validation_stats, audit_stats)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _iter_parallel(
+        self,
+        chunks: Iterator[List[Dict[str, Any]]],
+        drawing_texts: List[str],
+        stats: PipelineResult,
+    ) -> Iterator[PipelineResult]:
+        # At most two chunks per worker are in flight, so neither the input
+        # nor the output is held in full.  Only pool failures fall back to
+        # the sequential path; errors of the input iterator propagate.
+        in_flight: Deque[Tuple[Optional[Future], List[Dict[str, Any]]]] = deque()
+        parallel = True
+
+        def _fall_back() -> None:
+            nonlocal parallel
+            logger.exception("Parallel position pipeline failed, falling back to sequential processing")
+            parallel = False
+            stats.workers = 1
+            _discard_pool(pool)
+
+        def _submit(chunk: List[Dict[str, Any]]) -> Optional[Future]:
+            if parallel:
+                try:
+                    return pool.executor.submit(_process_chunk_in_worker, self, chunk, drawing_texts)
+                except _POOL_ERRORS:
+                    _fall_back()
+            return None
+
+        def _result(future: Optional[Future], chunk: List[Dict[str, Any]]) -> PipelineResult:
+            if parallel and future is not None:
+                try:
+                    return future.result()
+                except _POOL_ERRORS:
+                    _fall_back()
+            # Chunks already yielded are kept; only the rest is recomputed.
+            return self.process_chunk(chunk, drawing_texts)
+
+        with _borrow_pool(self.workers, self._catalog_indexes()) as pool:
+            stats.workers = self.workers
+            try:
+                for chunk in chunks:
+                    in_flight.append((_submit(chunk), chunk))
+                    if len(in_flight) >= 2 * self.workers:
+                        yield _result(*in_flight.popleft())
+                while in_flight:
+                    yield _result(*in_flight.popleft())
+            finally:
+                # Also reached when the consumer stops early: drop chunks not started yet.
+                for future, _ in in_flight:
+                    if future is not None:
+                        future.cancel()
+
+    def _catalog_indexes(self) -> Tuple[CatalogIndex, ...]:
+        indexes: Dict[str, CatalogIndex] = {}
+        for index in (self.enricher.catalog_index, self.validator.catalog_index):
+            if index is not None:
+                indexes.setdefault(index.token, index)
+        return tuple(indexes.values())
+
+    @staticmethod
+    def _merge_stats(merged: PipelineResult, partial: PipelineResult) -> None:
+        merged.chunks += 1
+        _merge_counts(merged.enrichment_stats, partial.enrichment_stats)
+        _merge_counts(merged.validation_stats, partial.validation_stats)
+        _merge_counts(merged.audit_stats, partial.audit_stats)
+
+
+def _iter_chunked(positions: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    items = iter(positions)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _notify(chunk: List[Dict[str, Any]], on_chunk: Optional[ChunkCallback]) -> None:
+    if on_chunk is not None:
+        on_chunk(chunk)
+
+
+def _merge_counts(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    for key, value in source.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float, dict)):
+            target.setdefault(key, value)
+        elif isinstance(value, dict):
+            _merge_counts(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+class _WorkerPool:
+    """Process pool whose workers hold one set of catalog indexes."""
+
+    def __init__(self, key: Tuple[int, Tuple[str, ...]], indexes: Tuple[CatalogIndex, ...]) -> None:
+        self.key = key
+        self.executor = ProcessPoolExecutor(
+            max_workers=key[0],
+            mp_context=worker_context(),
+            initializer=_init_worker,
+            initargs=(indexes,),
+        )
+        self.users = 0
+        self.retired = False
+
+
+_pools: Dict[Tuple[int, Tuple[str, ...]], _WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+@contextmanager
+def _borrow_pool(workers: int, indexes: Tuple[CatalogIndex, ...]) -> Iterator[_WorkerPool]:
+    key = (workers, tuple(index.token for index in indexes))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # New KB generation (or worker count): the previous pools retire.
+            _retire_pools_locked()
+            pool = _pools[key] = _WorkerPool(key, indexes)
+        pool.users += 1
+    try:
+        yield pool
+    finally:
+        with _pools_lock:
+            pool.users -= 1
+            finished = pool.retired and pool.users == 0
+        if finished:
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_pool(pool: _WorkerPool) -> None:
+    # A broken pool is replaced on the next run; it shuts down when released.
+    with _pools_lock:
+        if _pools.get(pool.key) is pool:
+            del _pools[pool.key]
+        pool.retired = True
+
+
+def _retire_pools_locked() -> None:
+    for pool in _pools.values():
+        pool.retired = True
+        if pool.users == 0:
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
+
+
+def shutdown_worker_pools() -> None:
+    """Retire every worker pool; pools in use shut down after their run."""
+
+    with _pools_lock:
+        _retire_pools_locked()
+
+
+# Worker-side state: keeps the catalog indexes of the pool alive, so that
+# ``registered_index`` resolves the tokens of unpickled enrichers and validators.
+_worker_indexes: Tuple[CatalogIndex, ...] = ()
+
+
+def _init_worker(indexes: Tuple[CatalogIndex, ...]) -> None:
+    global _worker_indexes
+    _worker_indexes = indexes
+
+
+def _process_chunk_in_worker(
+    pipeline: PositionPipeline,
+    chunk: List[Dict[str, Any]],
+    drawing_texts: List[str],
+) -> PipelineResult:
+    return pipeline.process_chunk(chunk, drawing_texts)
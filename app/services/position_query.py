@@ -0,0 +1,232 @@
+"""Filtered, paginated reads of cached project positions.
+
+Positions are served straight from the paged project cache
+(``app.services.project_cache``): the manifest records per-page facet values
+and code ranges, so pages that cannot match the filters are skipped without
+being opened, and only the pages needed to fill ``limit`` rows are decoded.
+
+Cursors are opaque tokens encoding ``(page, row)`` of the next row to examine;
+they stay valid as long as the cached segment is not rewritten.
+"""
+from __future__ import annotations
+
+import base64
+import logging
+from itertools import islice
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services import project_cache
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "InvalidCursor",
+    "PositionFilter",
+    "PositionPage",
+    "parse_fields",
+    "query_positions",
+    "filter_positions",
+]
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not issued by this module."""
+
+
+def _encode_cursor(page: int, row: int) -> str:
+    return base64.urlsafe_b64encode(f"{page}:{row}".encode("ascii")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        page, row = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":", 1)
+        page_no, row_no = int(page), int(row)
+    except (ValueError, UnicodeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if page_no < 0 or row_no < 0:
+        raise InvalidCursor("Invalid cursor")
+    return page_no, row_no
+
+
+def _split(value: Optional[str]) -> Optional[frozenset]:
+    if value is None:
+        return None
+    items = frozenset(item.strip() for item in value.split(",") if item.strip())
+    return items or None
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """``"code,description"`` → ``["code", "description"]``; ``None`` keeps every field."""
+    if not value:
+        return None
+    fields = [item.strip() for item in value.split(",") if item.strip()]
+    return fields or None
+
+
+@dataclass(frozen=True)
+class PositionFilter:
+    """Server-side position filters; comma-separated values match any of them."""
+
+    classification: Optional[frozenset] = None
+    section: Optional[frozenset] = None
+    amber_reason: Optional[frozenset] = None
+    code_prefix: Optional[str] = None
+
+    @classmethod
+    def from_params(
+        cls,
+        classification: Optional[str] = None,
+        section: Optional[str] = None,
+        amber_reason: Optional[str] = None,
+        code_prefix: Optional[str] = None,
+    ) -> "PositionFilter":
+        classes = _split(classification)
+        return cls(
+            classification=frozenset(item.upper() for item in classes) if classes else None,
+            section=_split(section),
+            amber_reason=_split(amber_reason),
+            code_prefix=code_prefix or None,
+        )
+
+    def _facet_filters(self) -> Iterable[Tuple[str, frozenset]]:
+        for facet in project_cache.PAGE_FACETS:
+            wanted = getattr(self, facet)
+            if wanted is not None:
+                yield facet, wanted
+
+    def may_match_page(self, page: Dict[str, Any]) -> bool:
+        """``False`` only if the page index proves that no row matches."""
+        facets = page.get("facets")
+        if facets is not None:
+            for facet, wanted in self._facet_filters():
+                values = facets.get(facet)
+                if values is not None and facet == "classification":
+                    values = [value.upper() for value in values]
+                if values is not None and wanted.isdisjoint(values):
+                    return False
+        code_range = page.get("code_range")
+        if self.code_prefix and code_range:
+            lowest, highest = code_range
+            prefix = self.code_prefix
+            if highest < prefix or lowest[: len(prefix)] > prefix:
+                return False
+        return True
+
+    def matches(self, position: Any) -> bool:
+        if not isinstance(position, dict):
+            return False
+        for facet, wanted in self._facet_filters():
+            value = str(position.get(facet) or "")
+            if facet == "classification":
+                value = value.upper()
+            if value not in wanted:
+                return False
+        if self.code_prefix and not str(position.get("code") or "").startswith(self.code_prefix):
+            return False
+        return True
+
+
+@dataclass
+class PositionPage:
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total_positions: int = 0
+    pages_scanned: int = 0
+    pages_skipped: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "count": len(self.items),
+            "next_cursor": self.next_cursor,
+            "total_positions": self.total_positions,
+        }
+
+
+def _project(position: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return position
+    return {name: position.get(name) for name in fields}
+
+
+def filter_positions(
+    positions: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    filters: Optional[PositionFilter] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> PositionPage:
+    """Same contract as :func:`query_positions` for an in-memory list (single page)."""
+
+    filters = filters or PositionFilter()
+    start = _decode_cursor(cursor)[1] if cursor else 0
+    result = PositionPage(total_positions=len(positions), pages_scanned=1)
+    for row_no in range(start, len(positions)):
+        position = positions[row_no]
+        if not filters.matches(position):
+            continue
+        if len(result.items) == limit:
+            result.next_cursor = _encode_cursor(0, row_no)
+            break
+        result.items.append(_project(position, fields))
+    return result
+
+
+def _scan(
+    project_id: str,
+    segment_entry: Dict[str, Any],
+    limit: int,
+    start: Tuple[int, int],
+    filters: PositionFilter,
+    fields: Optional[Sequence[str]],
+) -> PositionPage:
+    pages = segment_entry.get("pages") or []
+    result = PositionPage(total_positions=int(segment_entry.get("count") or 0))
+    start_page, start_row = start
+    for page_no in range(start_page, len(pages)):
+        page = pages[page_no]
+        first_row = start_row if page_no == start_page else 0
+        if first_row >= int(page.get("count") or 0) or not filters.may_match_page(page):
+            result.pages_skipped += 1
+            continue
+        result.pages_scanned += 1
+        rows = islice(project_cache.iter_page(project_id, page), first_row, None)
+        for row_no, position in enumerate(rows, start=first_row):
+            if not filters.matches(position):
+                continue
+            if len(result.items) == limit:
+                result.next_cursor = _encode_cursor(page_no, row_no)
+                return result
+            result.items.append(_project(position, fields))
+    return result
+
+
+def query_positions(
+    project_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    filters: Optional[PositionFilter] = None,
+    fields: Optional[Sequence[str]] = None,
+    segment: str = "audit_results.positions",
+) -> Optional[PositionPage]:
+    """One page of cached positions, or ``None`` if the project has no cached segment.
+
+    Raises :class:`InvalidCursor` for a malformed cursor.
+    """
+
+    start = _decode_cursor(cursor) if cursor else (0, 0)
+    filters = filters or PositionFilter()
+    segment_entry = project_cache.load_page_index(project_id, segment)
+    if segment_entry is None:
+        return None
+    # Pages of the manifest just read stay on disk through concurrent saves.
+    result = _scan(project_id, segment_entry, limit, start, filters, fields)
+    logger.debug(
+        "Project %s: %s query scanned %s page(s), skipped %s",
+        project_id,
+        segment,
+        result.pages_scanned,
+        result.pages_skipped,
+    )
+    return result
@@ -0,0 +1,258 @@
+"""Live stream of audited positions while Workflow A runs.
+
+The workflow appends every finished pipeline chunk to an NDJSON spool in the
+project cache directory::
+
+    data/projects/{project_id}/stream/state.json                 run id, status, count
+    data/projects/{project_id}/stream/positions.<run_id>.ndjson  audited positions
+
+``state.json`` is replaced atomically after the spool has been flushed, so a
+reader that sees a final status has every line of that run.  Readers tail the
+spool from any row offset (the API, queue workers and the workflow may be
+separate processes on one host), hold at most one batch of lines in memory,
+and stop when the run completes, fails, is superseded by a new run, stalls
+for ``POSITION_STREAM_IDLE_TIMEOUT_SEC`` or the client disconnects.  Projects audited before streaming
+existed are served from the paged cache instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.project_cache import _atomic_write, get_cache_path, iter_cached_positions, load_page_index
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["StreamStatus", "PositionStreamWriter", "read_stream_state", "iter_position_stream"]
+
+STATE_NAME = "state.json"
+# Spool lines (or cached positions) read per worker-thread call.
+_READ_BATCH = 256
+
+
+class StreamStatus:
+    """Stream run states (stored as plain strings)"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    # End-of-stream reasons reported to readers only
+    RESTARTED = "restarted"
+    TIMEOUT = "timeout"
+
+    FINAL = frozenset({COMPLETED, FAILED})
+
+
+def _stream_dir(project_id: str) -> Path:
+    return get_cache_path(project_id) / "stream"
+
+
+def read_stream_state(project_id: str) -> Optional[Dict[str, Any]]:
+    path = _stream_dir(project_id) / STATE_NAME
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("Project %s: Unreadable stream state (%s)", project_id, exc)
+        return None
+
+
+class PositionStreamWriter:
+    """Append audited positions of one workflow run to the project's spool."""
+
+    def __init__(self, project_id: str) -> None:
+        self.project_id = project_id
+        self.directory = _stream_dir(project_id)
+        self.run_id: Optional[str] = None
+        self.count = 0
+        self._handle = None
+
+    @property
+    def spool_name(self) -> str:
+        return f"positions.{self.run_id}.ndjson"
+
+    def begin(self) -> str:
+        """Start a new run; readers of the previous run are told it was restarted."""
+
+        self.run_id = uuid.uuid4().hex
+        self.count = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / self.spool_name).write_bytes(b"")
+        self._write_state(StreamStatus.PENDING)
+        for path in self.directory.glob("positions.*.ndjson"):
+            if path.name != self.spool_name:
+                path.unlink(missing_ok=True)
+        logger.info("Project %s: Position stream %s started", self.project_id, self.run_id)
+        return self.run_id
+
+    def append(self, positions: List[Dict[str, Any]]) -> None:
+        if self.run_id is None or not positions:
+            return
+        try:
+            if self._handle is None:
+                self._handle = (self.directory / self.spool_name).open("ab")
+            self._handle.write(
+                b"".join(
+                    json.dumps(position, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+                    + b"\n"
+                    for position in positions
+                )
+            )
+            self._handle.flush()
+            self.count += len(positions)
+            self._write_state(StreamStatus.RUNNING)
+        except OSError:
+            # Streaming is best effort; the audit itself must not fail because of it.
+            logger.exception("Project %s: Cannot append to position stream", self.project_id)
+
+    def finish(self, status: str = StreamStatus.COMPLETED) -> None:
+        if self.run_id is None:
+            return
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        try:
+            self._write_state(status)
+        except OSError:
+            logger.exception("Project %s: Cannot finish position stream", self.project_id)
+        logger.info("Project %s: Position stream %s %s (%s positions)", self.project_id, self.run_id, status, self.count)
+
+    def _write_state(self, status: str) -> None:
+        state = {
+            "run_id": self.run_id,
+            "status": status,
+            "count": self.count,
+            "file": self.spool_name,
+            "updated_at": datetime.now().isoformat(),
+        }
+        _atomic_write(self.directory / STATE_NAME, json.dumps(state).encode("utf-8"))
+
+
+StreamEvent = Tuple[str, int, Dict[str, Any]]
+
+
+def _end(status: str, count: int, run_id: Optional[str]) -> StreamEvent:
+    return "end", count, {"status": status, "count": count, "run_id": run_id}
+
+
+async def iter_position_stream(
+    project_id: str,
+    run_id: Optional[str] = None,
+    offset: int = 0,
+    poll_interval: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> AsyncIterator[StreamEvent]:
+    """Yield ``("start", offset, info)``, ``("position", index, position)`` events and ``("end", count, info)``.
+
+    ``offset`` skips positions a client already received; with ``run_id`` the
+    stream ends immediately as ``restarted`` if that run is no longer current.
+    File reads run in worker threads and waits are ``asyncio.sleep``, so an
+    idle stream holds no thread; ``is_disconnected`` is checked on every poll
+    and ends the stream silently once it returns true.
+    """
+
+    poll_interval = settings.POSITION_STREAM_POLL_SEC if poll_interval is None else poll_interval
+    idle_timeout = settings.POSITION_STREAM_IDLE_TIMEOUT_SEC if idle_timeout is None else idle_timeout
+    last_progress = time.monotonic()
+
+    async def _wait() -> bool:
+        # True when the client went away.
+        if is_disconnected is not None and await is_disconnected():
+            return True
+        await asyncio.sleep(poll_interval)
+        return False
+
+    state = await asyncio.to_thread(read_stream_state, project_id)
+    while state is None:
+        if await asyncio.to_thread(load_page_index, project_id) is not None:
+            yield "start", offset, {"status": StreamStatus.COMPLETED, "run_id": None}
+            async for event in _iter_cached(project_id, offset):
+                yield event
+            return
+        if time.monotonic() - last_progress > idle_timeout:
+            yield _end(StreamStatus.TIMEOUT, offset, None)
+            return
+        if await _wait():
+            return
+        state = await asyncio.to_thread(read_stream_state, project_id)
+
+    current_run = state["run_id"]
+    if run_id and run_id != current_run:
+        yield _end(StreamStatus.RESTARTED, offset, current_run)
+        return
+
+    yield "start", offset, {"status": state.get("status"), "run_id": current_run}
+    index = 0
+    finished: Optional[str] = None
+    try:
+        handle = await asyncio.to_thread((_stream_dir(project_id) / state["file"]).open, "rb")
+    except FileNotFoundError:
+        yield _end(StreamStatus.RESTARTED, offset, current_run)
+        return
+    try:
+        while True:
+            lines = await asyncio.to_thread(_read_lines, handle, _READ_BATCH)
+            if lines:
+                for line in lines:
+                    if index >= offset:
+                        yield "position", index, json.loads(line)
+                    index += 1
+                last_progress = time.monotonic()
+                continue
+            if finished is not None:
+                yield _end(finished, index, current_run)
+                return
+            state = await asyncio.to_thread(read_stream_state, project_id)
+            if state is None or state.get("run_id") != current_run:
+                yield _end(StreamStatus.RESTARTED, index, current_run)
+                return
+            if state.get("status") in StreamStatus.FINAL:
+                # Lines are flushed before the final state, so one more pass drains them.
+                finished = state["status"]
+                continue
+            if time.monotonic() - last_progress > idle_timeout:
+                yield _end(StreamStatus.TIMEOUT, index, current_run)
+                return
+            if await _wait():
+                return
+    finally:
+        handle.close()
+
+
+def _read_lines(handle: BinaryIO, limit: int) -> List[bytes]:
+    """Up to ``limit`` complete lines; a partially written last line is left for the next read."""
+
+    lines: List[bytes] = []
+    while len(lines) < limit:
+        where = handle.tell()
+        line = handle.readline()
+        if not line.endswith(b"\n"):
+            handle.seek(where)
+            break
+        lines.append(line)
+    return lines
+
+
+async def _iter_cached(project_id: str, offset: int) -> AsyncIterator[StreamEvent]:
+    positions = islice(iter_cached_positions(project_id), offset, None)
+    count = offset
+    while True:
+        batch = await asyncio.to_thread(list, islice(positions, _READ_BATCH))
+        if not batch:
+            break
+        for position in batch:
+            yield "position", count, position
+            count += 1
+    yield _end(StreamStatus.COMPLETED, count, None)
@@ -1,16 +1,59 @@
-"""Project cache utilities for Workflow A."""
+"""Project cache utilities for Workflow A.
+
+Each project cache is a directory ``data/projects/{project_id}/``::
+
+    manifest.json                          field → segment, page lists, digests, page facets
+    fields/<field>.<digest>.json           one compact JSON document per field
+    pages/<segment>.<n>.<digest>.ndjson    position pages, one JSON object per line
+
+Positions (``positions`` and ``audit_results.positions``) are split into pages
+of ``PROJECT_CACHE_PAGE_SIZE`` rows.  Segment files are content-addressed and
+written atomically; a save writes only the segments whose digest changed and
+then replaces the manifest, so a crash never leaves a half-written cache and
+``save_field`` touches a single field.  Segments the new manifest drops are
+listed under ``retired`` and deleted only after ``SEGMENT_RETENTION_SEC``, so
+a reader that took an older manifest (a position stream, an export, another
+process) can still read every page of it.  Each page entry in the manifest also
+records the distinct values of ``PAGE_FACETS`` and the range of position codes
+on that page, so filtered reads (see ``app.services.position_query``) can skip
+pages without opening them.  Legacy single-file caches
+(``data/projects/{project_id}.json``) are migrated on first load.
+"""
 from __future__ import annotations
 
 import json
 import logging
+import os
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from app.core.config import settings
+from app.utils.hashing import sha256_bytes
 
 logger = logging.getLogger(__name__)
 
+CACHE_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+# How long a segment dropped by a save stays readable for older manifests.
+SEGMENT_RETENTION_SEC = 3600.0
+
+# Paged list fields: segment name → (top-level field, nested key or None).
+PAGED_SEGMENTS: Dict[str, Tuple[str, Optional[str]]] = {
+    "positions": ("positions", None),
+    "audit_results.positions": ("audit_results", "positions"),
+}
+
+# Position keys whose distinct values are recorded per page for filtering.
+PAGE_FACETS: Tuple[str, ...] = ("classification", "section", "amber_reason")
+
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+_locks: Dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+
 
 def _ensure_cache_dir() -> Path:
     """Ensure the project cache directory exists."""
@@ -20,47 +63,354 @@ def _ensure_cache_dir() -> Path:
 
 
 def get_cache_path(project_id: str) -> Path:
-    """Return the cache path for a project."""
+    """Return the cache directory for a project."""
+    return _ensure_cache_dir() / project_id
+
+
+def _legacy_cache_path(project_id: str) -> Path:
     return _ensure_cache_dir() / f"{project_id}.json"
 
 
+def _project_lock(project_id: str) -> threading.RLock:
+    with _locks_guard:
+        return _locks.setdefault(project_id, threading.RLock())
+
+
+# ---------------------------------------------------------------------------
+# Segment I/O
+# ---------------------------------------------------------------------------
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(cache_dir: Path) -> Optional[Dict[str, Any]]:
+    manifest_path = cache_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    with manifest_path.open("r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format_version") != CACHE_FORMAT_VERSION:
+        raise ValueError(f"unsupported cache format {manifest.get('format_version')!r}")
+    return manifest
+
+
+def _write_segment(cache_dir: Path, kind: str, name: str, payload: bytes, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    digest = sha256_bytes(payload)
+    if previous and previous.get("sha256") == digest and (cache_dir / previous["file"]).exists():
+        return previous
+    extension = "ndjson" if kind == "pages" else "json"
+    relative = f"{kind}/{_SAFE_NAME_RE.sub('_', name)}.{digest[:16]}.{extension}"
+    _atomic_write(cache_dir / relative, payload)
+    return {"file": relative, "sha256": digest}
+
+
+def _page_index(rows: List[Any]) -> Dict[str, Any]:
+    """Facet values and code range of one page of positions."""
+
+    facets: Dict[str, set] = {facet: set() for facet in PAGE_FACETS}
+    codes: List[str] = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        for facet, values in facets.items():
+            values.add(str(row.get(facet) or ""))
+        codes.append(str(row.get("code") or ""))
+    index: Dict[str, Any] = {"facets": {facet: sorted(values) for facet, values in facets.items()}}
+    if codes:
+        index["code_range"] = [min(codes), max(codes)]
+    return index
+
+
+def _write_pages(
+    cache_dir: Path,
+    segment: str,
+    rows: List[Any],
+    previous: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    page_size = max(1, settings.PROJECT_CACHE_PAGE_SIZE)
+    previous_pages = (previous or {}).get("pages") or []
+    if (previous or {}).get("page_size") != page_size:
+        previous_pages = []
+    pages: List[Dict[str, Any]] = []
+    for number, start in enumerate(range(0, len(rows), page_size)):
+        chunk = rows[start : start + page_size]
+        payload = b"".join(_dumps(row) + b"\n" for row in chunk)
+        entry = _write_segment(
+            cache_dir,
+            "pages",
+            f"{segment}.{number:05d}",
+            payload,
+            previous_pages[number] if number < len(previous_pages) else None,
+        )
+        pages.append({"file": entry["file"], "sha256": entry["sha256"], "count": len(chunk), **_page_index(chunk)})
+    return {"page_size": page_size, "count": len(rows), "pages": pages}
+
+
+def _iter_page_file(cache_dir: Path, page: Dict[str, Any]) -> Iterator[Any]:
+    with (cache_dir / page["file"]).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_page_rows(cache_dir: Path, segment_entry: Dict[str, Any]) -> Iterator[Any]:
+    for page in segment_entry.get("pages") or []:
+        yield from _iter_page_file(cache_dir, page)
+
+
+def _read_field(cache_dir: Path, manifest: Dict[str, Any], field: str) -> Any:
+    entry = manifest["fields"][field]
+    with (cache_dir / entry["file"]).open("r", encoding="utf-8") as handle:
+        value = json.load(handle)
+    for segment, (top_level, nested) in PAGED_SEGMENTS.items():
+        if top_level != field or segment not in manifest.get("pages", {}):
+            continue
+        rows = list(_iter_page_rows(cache_dir, manifest["pages"][segment]))
+        if nested is None:
+            value = rows
+        elif isinstance(value, dict):
+            value[nested] = rows
+    return value
+
+
+def _split_paged(field: str, value: Any) -> Tuple[Any, Dict[str, List[Any]]]:
+    """Separate paged lists from ``value``; returns (remaining document, segment → rows)."""
+
+    paged: Dict[str, List[Any]] = {}
+    for segment, (top_level, nested) in PAGED_SEGMENTS.items():
+        if top_level != field:
+            continue
+        if nested is None and isinstance(value, list):
+            paged[segment] = value
+            value = None
+        elif nested is not None and isinstance(value, dict) and isinstance(value.get(nested), list):
+            paged[segment] = value[nested]
+            value = {key: item for key, item in value.items() if key != nested}
+    return value, paged
+
+
+def _store_fields(cache_dir: Path, manifest: Dict[str, Any], fields: Dict[str, Any]) -> int:
+    """Write changed segments of ``fields`` into ``manifest``; returns the number of files written."""
+
+    written = 0
+    for field, value in fields.items():
+        document, paged = _split_paged(field, value)
+        previous = manifest["fields"].get(field)
+        entry = _write_segment(cache_dir, "fields", field, _dumps(document), previous)
+        written += entry is not previous
+        manifest["fields"][field] = entry
+        for segment, (top_level, _) in PAGED_SEGMENTS.items():
+            if top_level != field:
+                continue
+            if segment in paged:
+                before = manifest["pages"].get(segment)
+                after = _write_pages(cache_dir, segment, paged[segment], before)
+                before_pages = (before or {}).get("pages") or []
+                written += sum(
+                    1 for index, page in enumerate(after["pages"])
+                    if index >= len(before_pages) or page["file"] != before_pages[index]["file"]
+                )
+                manifest["pages"][segment] = after
+            else:
+                manifest["pages"].pop(segment, None)
+    return written
+
+
+def _commit_manifest(cache_dir: Path, manifest: Dict[str, Any]) -> None:
+    """Replace the manifest, then delete segments unreferenced for ``SEGMENT_RETENTION_SEC``."""
+
+    referenced = {entry["file"] for entry in manifest["fields"].values()}
+    for segment in manifest["pages"].values():
+        referenced.update(page["file"] for page in segment.get("pages") or [])
+
+    now = datetime.now()
+    previous = manifest.get("retired") or {}
+    retired: Dict[str, str] = {}
+    expired: List[Path] = []
+    for kind in ("fields", "pages"):
+        directory = cache_dir / kind
+        if not directory.exists():
+            continue
+        for path in sorted(directory.iterdir()):
+            relative = f"{kind}/{path.name}"
+            if relative in referenced or path.name.endswith(".tmp"):
+                continue
+            since = previous.get(relative) or now.isoformat()
+            try:
+                age = (now - datetime.fromisoformat(since)).total_seconds()
+            except ValueError:
+                since, age = now.isoformat(), 0.0
+            if age >= SEGMENT_RETENTION_SEC:
+                expired.append(path)
+            else:
+                retired[relative] = since
+    manifest["retired"] = retired
+
+    _atomic_write(cache_dir / MANIFEST_NAME, _dumps(manifest))
+    for path in expired:
+        path.unlink(missing_ok=True)
+
+
+def _field_version(manifest: Dict[str, Any], field: str) -> str:
+    digests = [manifest["fields"][field]["sha256"]]
+    for segment, (top_level, _) in PAGED_SEGMENTS.items():
+        if top_level == field:
+            pages = manifest.get("pages", {}).get(segment) or {}
+            digests.extend(page["sha256"] for page in pages.get("pages") or [])
+    return sha256_bytes("|".join(digests).encode("ascii"))
+
+
+def _empty_manifest(project_id: str) -> Dict[str, Any]:
+    return {"format_version": CACHE_FORMAT_VERSION, "project_id": project_id, "fields": {}, "pages": {}}
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
 def load_project_cache(project_id: str) -> Tuple[Optional[Dict[str, Any]], Path]:
     """Load the cache for a project if it exists."""
     cache_path = get_cache_path(project_id)
-    if cache_path.exists():
+    with _project_lock(project_id):
         try:
-            with cache_path.open("r", encoding="utf-8") as fp:
-                data = json.load(fp)
-            logger.info("Project %s: Loaded cache from %s", project_id, cache_path)
-            audit_payload = data.get("audit_results")
-            migrated = _migrate_legacy_audit_results(audit_payload)
-            if migrated != audit_payload:
-                data["audit_results"] = migrated
-                save_project_cache(project_id, data)
-            return data, cache_path
-        except json.JSONDecodeError as exc:
+            manifest = _read_manifest(cache_path)
+            if manifest is None:
+                data = _migrate_legacy_cache(project_id)
+                if data is None:
+                    return None, cache_path
+            else:
+                data = {field: _read_field(cache_path, manifest, field) for field in manifest["fields"]}
+                logger.info("Project %s: Loaded cache from %s", project_id, cache_path)
+        except (OSError, ValueError, KeyError) as exc:
             logger.warning(
                 "Project %s: Cache at %s is corrupt (%s). Re-initialising.",
                 project_id,
                 cache_path,
                 exc,
             )
-    return None, cache_path
+            return None, cache_path
+
+        audit_payload = data.get("audit_results")
+        migrated = _migrate_legacy_audit_results(audit_payload)
+        if migrated != audit_payload:
+            data["audit_results"] = migrated
+            save_field(project_id, "audit_results", migrated)
+        return data, cache_path
+
+
+def load_field(project_id: str, field: str, default: Any = None) -> Any:
+    """Read a single cached field without loading the rest of the cache."""
+    cache_path = get_cache_path(project_id)
+    with _project_lock(project_id):
+        manifest = _read_manifest(cache_path)
+        if manifest is None or field not in manifest["fields"]:
+            return default
+        return _read_field(cache_path, manifest, field)
+
+
+def iter_cached_positions(project_id: str, segment: str = "audit_results.positions") -> Iterator[Dict[str, Any]]:
+    """Stream cached positions page by page (``segment`` is a key of ``PAGED_SEGMENTS``)."""
+    cache_path = get_cache_path(project_id)
+    with _project_lock(project_id):
+        manifest = _read_manifest(cache_path)
+    if manifest is None or segment not in manifest.get("pages", {}):
+        return iter(())
+    return _iter_page_rows(cache_path, manifest["pages"][segment])
+
+
+def load_page_index(project_id: str, segment: str = "audit_results.positions") -> Optional[Dict[str, Any]]:
+    """Manifest entry of a paged segment (page files, counts, facets), or ``None``."""
+    cache_path = get_cache_path(project_id)
+    with _project_lock(project_id):
+        try:
+            manifest = _read_manifest(cache_path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Project %s: Cannot read cache manifest (%s)", project_id, exc)
+            return None
+    if manifest is None:
+        return None
+    return manifest.get("pages", {}).get(segment)
+
+
+def field_version(project_id: str, field: str) -> Optional[str]:
+    """Digest over a cached field and its position pages; changes whenever the field does."""
+    cache_path = get_cache_path(project_id)
+    with _project_lock(project_id):
+        try:
+            manifest = _read_manifest(cache_path)
+        except (OSError, ValueError):
+            return None
+    if manifest is None or field not in manifest["fields"]:
+        return None
+    return _field_version(manifest, field)
+
+
+def load_field_view(project_id: str, field: str) -> Optional[Dict[str, Any]]:
+    """A cached field as saved together: document, version and page entries from one manifest.
+
+    Returns ``{"document": ..., "version": ..., "pages": {segment: entry}}``
+    where ``document`` is the field without its paged lists and ``pages``
+    holds the :func:`load_page_index` entries of its paged segments, or
+    ``None`` when the field is not cached.  Use it when totals and the
+    positions they describe must not come from two different saves.
+    """
+    cache_path = get_cache_path(project_id)
+    with _project_lock(project_id):
+        try:
+            manifest = _read_manifest(cache_path)
+            if manifest is None or field not in manifest["fields"]:
+                return None
+            with (cache_path / manifest["fields"][field]["file"]).open("r", encoding="utf-8") as handle:
+                document = json.load(handle)
+        except (OSError, ValueError) as exc:
+            logger.warning("Project %s: Cannot read cached field '%s' (%s)", project_id, field, exc)
+            return None
+    pages = {
+        segment: manifest["pages"][segment]
+        for segment, (top_level, _) in PAGED_SEGMENTS.items()
+        if top_level == field and segment in manifest.get("pages", {})
+    }
+    return {"document": document, "version": _field_version(manifest, field), "pages": pages}
+
+
+def iter_page(project_id: str, page: Dict[str, Any]) -> Iterator[Any]:
+    """Rows of one page entry returned by :func:`load_page_index`."""
+    return _iter_page_file(get_cache_path(project_id), page)
 
 
 def save_project_cache(project_id: str, cache_data: Dict[str, Any]) -> Path:
-    """Persist project cache to disk."""
+    """Persist project cache to disk, rewriting only changed segments."""
     cache_path = get_cache_path(project_id)
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
 
     cache_data = dict(cache_data)
     cache_data.setdefault("project_id", project_id)
     cache_data["updated_at"] = cache_data.get("updated_at") or datetime.now().isoformat()
 
-    with cache_path.open("w", encoding="utf-8") as fp:
-        json.dump(cache_data, fp, ensure_ascii=False, indent=2)
+    with _project_lock(project_id):
+        try:
+            manifest = _read_manifest(cache_path) or _empty_manifest(project_id)
+        except (OSError, ValueError):
+            manifest = _empty_manifest(project_id)
+        for field in set(manifest["fields"]) - set(cache_data):
+            manifest["fields"].pop(field)
+            for segment, (top_level, _) in PAGED_SEGMENTS.items():
+                if top_level == field:
+                    manifest["pages"].pop(segment, None)
+        written = _store_fields(cache_path, manifest, cache_data)
+        _commit_manifest(cache_path, manifest)
 
-    logger.info("Project %s: Cache saved to %s", project_id, cache_path)
+    logger.info("Project %s: Cache saved to %s (%s segment(s) written)", project_id, cache_path, written)
     return cache_path
 
 
@@ -86,20 +436,35 @@ def load_or_create_project_cache(
 def save_field(project_id: str, field: str, value: Any) -> None:
     """Persist a single field update to the project cache."""
 
-    cache_payload, cache_path = load_project_cache(project_id)
-    if cache_payload is None:
-        cache_payload = {"project_id": project_id}
-
-    cache_payload[field] = value
-    save_project_cache(project_id, cache_payload)
+    cache_path = get_cache_path(project_id)
+    with _project_lock(project_id):
+        try:
+            manifest = _read_manifest(cache_path) or _empty_manifest(project_id)
+        except (OSError, ValueError):
+            manifest = _empty_manifest(project_id)
+        written = _store_fields(cache_path, manifest, {field: value})
+        _commit_manifest(cache_path, manifest)
     logger.info(
-        "Project %s: Cache field '%s' updated via save_field (path=%s)",
+        "Project %s: Cache field '%s' updated via save_field (path=%s, %s segment(s) written)",
         project_id,
         field,
         cache_path,
+        written,
     )
 
 
+def _migrate_legacy_cache(project_id: str) -> Optional[Dict[str, Any]]:
+    legacy_path = _legacy_cache_path(project_id)
+    if not legacy_path.exists():
+        return None
+    with legacy_path.open("r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    save_project_cache(project_id, data)
+    legacy_path.unlink()
+    logger.info("Project %s: Migrated legacy cache %s to segmented layout", project_id, legacy_path)
+    return data
+
+
 def _is_new_audit_format(audit_results: Dict[str, Any] | None) -> bool:
     try:
         if not isinstance(audit_results, dict):
@@ -5,8 +5,9 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from app.core.catalog_index import CatalogIndex, get_catalog_index, registered_index
 from app.core.config import settings
 from app.core.kb_loader import init_kb_loader
 
@@ -48,9 +49,36 @@ class SpecificationsValidator:
 
     def __init__(self) -> None:
         kb = init_kb_loader()
-        self.otskp_index = self._build_otskp_index(kb.data.get("B1_otkskp_codes", {}))
+        self._catalog: Optional[CatalogIndex] = get_catalog_index(kb)
+        self.otskp_index = self._catalog.otskp_lookup
         self.soft_match_threshold = max(0.7, settings.AUDIT_AMBER_THRESHOLD)
 
+    @property
+    def catalog_index(self) -> Optional[CatalogIndex]:
+        """Catalog index backing ``otskp_index``, unless it was replaced."""
+
+        catalog = self._catalog
+        if catalog is not None and self.otskp_index is catalog.otskp_lookup:
+            return catalog
+        return None
+
+    def __getstate__(self) -> Dict[str, object]:
+        # A shared catalog index travels as its generation token; the worker
+        # already holds that index (see ``registered_index``).
+        catalog = self.catalog_index
+        state = dict(self.__dict__)
+        state["_catalog"] = catalog.token if catalog is not None else None
+        if catalog is not None:
+            state["otskp_index"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        token = state["_catalog"]
+        self._catalog = registered_index(token) if token else None
+        if self._catalog is not None:
+            self.otskp_index = self._catalog.otskp_lookup
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -61,34 +89,50 @@ class SpecificationsValidator:
         """Validate all positions and append validation metadata."""
 
         validated_positions: List[Dict[str, object]] = []
-        stats = {"passed": 0, "warning": 0, "failed": 0, "amber_reasons": {}}
+        stats = self.new_stats()
 
         for position in positions:
-            result = self._validate_single(dict(position))
-            position_payload = result.position
-            position_payload["validation_status"] = result.status
-            validation_block = {
-                "errors": result.errors,
-                "warnings": result.warnings,
-            }
-            if result.extras:
-                validation_block.update(result.extras)
-                amber_reason = result.extras.get("amber_reason")
-                if amber_reason and result.status == "warning":
-                    reason_key = str(amber_reason)
-                    stats["amber_reasons"][reason_key] = (
-                        stats["amber_reasons"].get(reason_key, 0) + 1
-                    )
-                    position_payload["amber_reason"] = reason_key
-                    if result.extras.get("advice"):
-                        position_payload["validation_advice"] = result.extras["advice"]
-                    if result.extras.get("candidates"):
-                        position_payload["validation_candidates"] = result.extras["candidates"]
-            position_payload["validation_results"] = validation_block
-
-            stats[result.status] += 1
-            validated_positions.append(position_payload)
+            validated_positions.append(self.validate_in_place(dict(position), stats))
+
+        self.log_stats(stats)
+        return validated_positions, stats
+
+    @staticmethod
+    def new_stats() -> Dict[str, object]:
+        return {"passed": 0, "warning": 0, "failed": 0, "amber_reasons": {}}
+
+    def validate_in_place(
+        self, position: Dict[str, object], stats: Dict[str, object]
+    ) -> Dict[str, object]:
+        """Validate ``position`` without copying it and count the result into ``stats``."""
+
+        result = self._validate_single(position)
+        position_payload = result.position
+        position_payload["validation_status"] = result.status
+        validation_block = {
+            "errors": result.errors,
+            "warnings": result.warnings,
+        }
+        if result.extras:
+            validation_block.update(result.extras)
+            amber_reason = result.extras.get("amber_reason")
+            if amber_reason and result.status == "warning":
+                reason_key = str(amber_reason)
+                stats["amber_reasons"][reason_key] = (
+                    stats["amber_reasons"].get(reason_key, 0) + 1
+                )
+                position_payload["amber_reason"] = reason_key
+                if result.extras.get("advice"):
+                    position_payload["validation_advice"] = result.extras["advice"]
+                if result.extras.get("candidates"):
+                    position_payload["validation_candidates"] = result.extras["candidates"]
+        position_payload["validation_results"] = validation_block
 
+        stats[result.status] += 1
+        return position_payload
+
+    @staticmethod
+    def log_stats(stats: Dict[str, object]) -> None:
         logger.info(
             "Validation summary → passed=%s, warning=%s, failed=%s",
             stats["passed"],
@@ -96,8 +140,6 @@ class SpecificationsValidator:
             stats["failed"],
         )
 
-        return validated_positions, stats
-
     # ------------------------------------------------------------------
     # Single position validation
     # ------------------------------------------------------------------
@@ -149,31 +191,6 @@ class SpecificationsValidator:
     # Knowledge base helpers
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _build_otskp_index(category_payload: Dict[str, object]) -> Dict[str, Dict[str, object]]:
-        index: Dict[str, Dict[str, object]] = {}
-
-        for data in category_payload.values():
-            if isinstance(data, list):
-                for item in data:
-                    code = SpecificationsValidator._normalise_code(item.get("code") or item.get("znacka"))
-                    if code:
-                        index[code] = {
-                            "name": item.get("name") or item.get("nazev"),
-                            "unit": (item.get("unit") or item.get("MJ") or "").strip().lower(),
-                            "unit_price": item.get("unit_price") or item.get("jedn_cena"),
-                        }
-            elif isinstance(data, dict):
-                code = SpecificationsValidator._normalise_code(data.get("code") or data.get("znacka"))
-                if code:
-                    index[code] = {
-                        "name": data.get("name") or data.get("nazev"),
-                        "unit": (data.get("unit") or data.get("MJ") or "").strip().lower(),
-                        "unit_price": data.get("unit_price") or data.get("jedn_cena"),
-                    }
-
-        return index
-
     def _lookup_otskp(self, code: str) -> Dict[str, object] | None:
         normalised = self._normalise_code(code)
         if not normalised:
@@ -0,0 +1,86 @@
+"""Start method and pool size shared by every worker-process helper.
+
+The API process runs threads (threadpool handlers, the job runner, OCR
+pools), and a child forked from a multi-threaded process can block forever on
+a lock another thread held at fork time.  Worker processes are therefore
+started from a ``forkserver`` (a single-threaded server that forks a clean
+child per worker) or, where that start method is missing, spawned.  Tasks,
+their arguments and pool initializer arguments reach the worker pickled.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Optional
+
+__all__ = ["available_cpus", "resolve_workers", "worker_context"]
+
+# Imported once by the fork server, so each worker starts with them loaded.
+WORKER_PRELOAD = (
+    "app.parsers.smart_parser",
+    "app.parsers.drawing_specs_parser",
+    "app.services.pdf_text_recovery",
+    "app.services.position_pipeline",
+)
+
+_context: Optional[BaseContext] = None
+_context_lock = threading.Lock()
+
+
+_CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def resolve_workers(configured: int) -> int:
+    """Worker count for a ``*_WORKERS`` setting: ``0`` means one per available CPU."""
+
+    if configured and configured > 0:
+        return configured
+    return available_cpus()
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask capped by the cgroup quota.
+
+    ``os.cpu_count()`` reports the host's cores, which inside a container can
+    be far more than the container is allowed to use.
+    """
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(1, cpus)
+
+
+def _cgroup_cpu_quota() -> Optional[int]:
+    # cgroup v2 "cpu.max": "<quota> <period>" in microseconds, or "max <period>".
+    try:
+        quota, period = _CGROUP_CPU_MAX.read_text().split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    try:
+        return max(1, int(quota) // int(period))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def worker_context() -> BaseContext:
+    """Thread-safe multiprocessing context for worker processes."""
+
+    global _context
+    with _context_lock:
+        if _context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                _context = multiprocessing.get_context("forkserver")
+                _context.set_forkserver_preload(list(WORKER_PRELOAD))
+            else:
+                _context = multiprocessing.get_context("spawn")
+        return _context
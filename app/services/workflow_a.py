@@ -1,25 +1,40 @@
 """Workflow A - Steps 1–6 implementation (upload → audit)."""
 from __future__ import annotations
 
+import asyncio
+import copy
 import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from app.core.config import settings
 from app.models.project import ProjectStatus
 from app.parsers.smart_parser import SmartParser
 from app.parsers.drawing_specs_parser import DrawingSpecsParser
 from app.services.audit_classifier import AuditClassifier
+from app.services.job_queue import get_job_queue
+from app.services.job_runner import get_job_runner
+from app.services.ocr_service import get_ocr_service
+from app.services.parallel_files import FileTaskResult, run_file_tasks
+from app.services.parse_cache import get_parse_cache
 from app.services.position_enricher import PositionEnricher
+from app.services.position_pipeline import PositionPipeline
+from app.services.position_stream import PositionStreamWriter, StreamStatus
 from app.services.project_cache import (
     load_or_create_project_cache,
     save_field,
     save_project_cache,
 )
 from app.services.specifications_validator import SpecificationsValidator
+from app.services.worker_processes import resolve_workers
 from app.validators import PositionValidator
 from app.state.project_store import project_store
+from app.utils.hashing import sha256_file
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +59,87 @@ def _classify_position(position: Dict[str, Any]) -> str:
     return "AMBER"
 
 
+def _normalize_audit_positions(positions: Optional[Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Audit-result entries for ``positions`` (preview rows are dropped).
+
+    Entries are completed in place: the pipeline hands over its own copies.
+    """
+
+    normalized_positions: List[Dict[str, Any]] = []
+    for raw in positions or []:
+        if not isinstance(raw, dict):
+            continue
+        if raw.get("is_preview") or raw.get("preview"):
+            continue
+        entry = raw
+        entry["position_id"] = (
+            raw.get("position_id")
+            or raw.get("id")
+            or raw.get("position_number")
+            or raw.get("code")
+            or "unknown"
+        )
+        entry["code"] = raw.get("code", "")
+        entry["description"] = raw.get("description", "")
+        entry["unit"] = raw.get("unit", "")
+        entry["quantity"] = raw.get("quantity", 0)
+        entry["section"] = raw.get("section", "")
+        entry["classification"] = _classify_position(raw)
+        entry["notes"] = (
+            raw.get("notes")
+            or raw.get("validation_message")
+            or raw.get("validation_notes")
+            or ""
+        )
+        normalized_positions.append(entry)
+    return normalized_positions
+
+
+def _drain(items: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield ``items`` in order, releasing each from the list as it goes."""
+
+    items.reverse()
+    while items:
+        yield items.pop()
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(time.perf_counter() - started, 3)
+
+
+def _schedule_ocr_rerun(
+    project_id: str, generate_summary: bool, enable_enrichment: bool, recognised_pages: int
+) -> None:
+    """Re-run Workflow A after OCR; parse cache and OCR cache make it cheap."""
+
+    if project_id not in project_store:
+        return
+    logger.info("Project %s: OCR recognised %s page(s); scheduling re-enrichment", project_id, recognised_pages)
+    if settings.JOB_BACKEND == "queue":
+        args = {"generate_summary": generate_summary, "enable_enrichment": enable_enrichment}
+        get_job_queue().enqueue(project_id, "workflow_a", {"args": args, "reason": "ocr"})
+        return
+    get_job_runner().submit(
+        project_id,
+        WorkflowA().execute,
+        project_id,
+        generate_summary,
+        enable_enrichment,
+        kind="workflow_a_ocr",
+    )
+
+
 class WorkflowA:
     """Handle Workflow A initialisation and parsing steps."""
 
     def __init__(self) -> None:
         self.smart_parser = SmartParser()
+        self.parse_cache = get_parse_cache()
         self.drawing_parser = DrawingSpecsParser()
         self.validator = SpecificationsValidator()
         self.audit_classifier = AuditClassifier()
@@ -60,81 +151,60 @@ class WorkflowA:
         generate_summary: bool = False,
         enable_enrichment: Optional[bool] = None,
     ) -> Dict[str, Any]:
-        """Run upload handling and parsing for Workflow A."""
-        logger.info(
-            "Project %s: Starting Workflow A Step 1 (upload handling)",
-            project_id,
-        )
-
-        project_meta = self._load_project_metadata(project_id)
-        uploads = self._resolve_uploads(project_id, project_meta)
-
-        base_cache = {
-            "project_id": project_id,
-            "workflow": "A",
-            "files": uploads["files_by_type"],
-        }
-        cache_data, cache_path, cache_created = load_or_create_project_cache(
-            project_id, base_cache
-        )
-
-        logger.info(
-            "Project %s: Cache %s at %s",
-            project_id,
-            "created" if cache_created else "loaded",
-            cache_path,
-        )
-
+        """Run upload handling and parsing for Workflow A.
+
+        Audited positions are streamed to the project's position spool
+        (``app.services.position_stream``) as pipeline chunks finish.  Drawing
+        pages without a text layer are handed to the OCR pool once the run is
+        complete; when their text is available the workflow is run again so
+        the drawings' OCR text takes part in enrichment.
+        """
         if enable_enrichment is None:
             enable_enrichment = settings.ENRICHMENT_ENABLED
 
-        cache_data["enable_enrichment"] = enable_enrichment
+        stream = PositionStreamWriter(project_id)
+        stream.begin()
+        try:
+            result = await self._execute(project_id, generate_summary, enable_enrichment, stream)
+        except BaseException:
+            stream.finish(StreamStatus.FAILED)
+            raise
+        stream.finish(StreamStatus.COMPLETED)
+        result["ocr"] = self._queue_ocr(project_id, result.pop("ocr_pages", []), generate_summary, enable_enrichment)
+        return result
 
+    async def _execute(
+        self,
+        project_id: str,
+        generate_summary: bool,
+        enable_enrichment: bool,
+        stream: PositionStreamWriter,
+    ) -> Dict[str, Any]:
         logger.info(
-            "Project %s: Starting Workflow A Step 2 (parsing)",
+            "Project %s: Starting Workflow A Step 1 (upload handling)",
             project_id,
         )
-        parsing_summary = self._parse_cost_documents(
-            project_id, uploads["cost_documents"]
-        )
-
-        schema_result = self.schema_validator.validate(parsing_summary["positions"])
 
-        logger.info(
-            "Project %s: Step 3 schema validation deduplicated=%s invalid=%s duplicates_removed=%s",
-            project_id,
-            schema_result.stats.get("deduplicated_total", 0),
-            schema_result.stats.get("invalid_total", 0),
-            schema_result.stats.get("duplicates_removed", 0),
-        )
-
-        cache_data["project_id"] = project_id
-        cache_data["workflow"] = "A"
-        cache_data["files"] = uploads["files_by_type"]
-        parsing_summary["diagnostics"]["schema_validation"] = schema_result.stats
-
-        cache_data.setdefault("diagnostics", {})
-        cache_data["diagnostics"]["parsing"] = parsing_summary["diagnostics"]
-        cache_data["diagnostics"]["schema_validation"] = schema_result.stats
-
-        positions = schema_result.positions
-        cache_data["positions"] = positions
-        cache_data["documents"] = parsing_summary["documents"]
-        cache_data["updated_at"] = datetime.now().isoformat()
-
-        save_project_cache(project_id, cache_data)
-
-        self._update_project_store(
-            project_id, parsing_summary, cache_path, uploads
-        )
-
-        # ------------------------------------------------------------------
-        # Steps 3–6: Drawing enrichment → validation → audit
-        # ------------------------------------------------------------------
-
-        drawing_summary = self._extract_drawing_specs(
-            project_id, uploads.get("drawing_files", [])
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        with _timed(timings, "uploads"):
+            project_meta = self._load_project_metadata(project_id)
+            uploads = self._resolve_uploads(project_id, project_meta)
+
+        # Drawing text recovery does not depend on the estimate; it runs while
+        # the cost documents are parsed and validated and is awaited right
+        # before enrichment.
+        drawings_task = asyncio.ensure_future(
+            asyncio.to_thread(self._timed_drawing_specs, project_id, uploads.get("drawing_files", []), timings)
         )
+        try:
+            parsing_summary, schema_result, cache_data, cache_path = await asyncio.to_thread(
+                self._parse_and_validate, project_id, uploads, enable_enrichment, timings
+            )
+            drawing_summary = await drawings_task
+        except BaseException:
+            await asyncio.gather(drawings_task, return_exceptions=True)
+            raise
 
         logger.info(
             "Project %s: Drawing specs detected=%s",
@@ -142,18 +212,30 @@ class WorkflowA:
             len(drawing_summary["specifications"]),
         )
 
-        enricher = PositionEnricher(enabled=enable_enrichment)
-        enriched_positions, enrichment_stats = enricher.enrich(
-            positions, drawing_summary["specifications"]
-        )
-
-        validated_positions, validation_stats = self.validator.validate(
-            enriched_positions
-        )
+        # ------------------------------------------------------------------
+        # Steps 3–6: Drawing enrichment → validation → audit
+        # ------------------------------------------------------------------
 
-        audited_positions, audit_stats = self.audit_classifier.classify(
-            validated_positions
-        )
+        # Validated positions are already persisted (Step 3); the pipeline
+        # drains them chunk by chunk and the audited entries below are the
+        # only list that is built.
+        with _timed(timings, "pipeline"):
+            enricher = PositionEnricher(enabled=enable_enrichment)
+            pipeline = PositionPipeline(enricher, self.validator, self.audit_classifier)
+            pipeline_result = pipeline.new_result()
+            audited_positions: List[Dict[str, Any]] = []
+            for chunk in pipeline.iter_chunks(
+                _drain(schema_result.positions),
+                drawing_summary["specifications"],
+                pipeline_result,
+            ):
+                entries = _normalize_audit_positions(chunk)
+                stream.append(entries)
+                audited_positions.extend(entries)
+
+        enrichment_stats = pipeline_result.enrichment_stats
+        validation_stats = pipeline_result.validation_stats
+        audit_stats = pipeline_result.audit_stats
 
         logger.info(
             "Project %s: Audit summary GREEN=%s, AMBER=%s, RED=%s",
@@ -189,18 +271,22 @@ class WorkflowA:
             "Parsed + Enriched + Validated + Audited (Steps 1–6). Ready to export."
         )
         cache_data["updated_at"] = datetime.now().isoformat()
+        cache_data.setdefault("diagnostics", {})["stage_timings"] = timings
 
-        save_field(project_id, "audit_results", audit_payload)
+        with _timed(timings, "audit_save"):
+            save_field(project_id, "audit_results", audit_payload)
 
-        logger.info(
-            "audit_results normalized: total=%d g=%d a=%d r=%d",
-            audit_payload["total_positions"],
-            audit_payload["green"],
-            audit_payload["amber"],
-            audit_payload["red"],
-        )
+            logger.info(
+                "audit_results normalized: total=%d g=%d a=%d r=%d",
+                audit_payload["total_positions"],
+                audit_payload["green"],
+                audit_payload["amber"],
+                audit_payload["red"],
+            )
+
+            save_project_cache(project_id, cache_data)
 
-        save_project_cache(project_id, cache_data)
+        timings["total"] = round(time.perf_counter() - started, 3)
 
         self._update_project_store_after_audit(
             project_id=project_id,
@@ -211,14 +297,17 @@ class WorkflowA:
             parsing_diagnostics=parsing_summary["diagnostics"],
             drawing_diagnostics=drawing_summary["diagnostics"],
             drawing_summary=drawing_summary,
+            stage_timings=timings,
         )
 
         diagnostics = parsing_summary["diagnostics"]
         logger.info(
-            "Project %s: Completed Steps 1–6 → %s document(s), %s positions",
+            "Project %s: Completed Steps 1–6 → %s document(s), %s positions in %.2fs (stages: %s)",
             project_id,
             diagnostics["documents_processed"],
             diagnostics["normalized_total"],
+            timings["total"],
+            timings,
         )
 
         return {
@@ -236,10 +325,125 @@ class WorkflowA:
             "audit": audit_payload.get("audit", audit_stats),
             "audit_results": audit_payload,
             "drawing_specs": drawing_summary["diagnostics"],
+            "stage_timings": timings,
+            "ocr_pages": drawing_summary.get("ocr_pages", []),
             "progress": 90,
             "message": "Parsed + Enriched + Validated + Audited (Steps 1–6). Ready to export.",
         }
 
+    def _queue_ocr(
+        self,
+        project_id: str,
+        ocr_pages: List[Dict[str, Any]],
+        generate_summary: bool,
+        enable_enrichment: bool,
+    ) -> Dict[str, int]:
+        """Submit the drawing pages queued for OCR; schedule a re-run when they are done."""
+
+        jobs = []
+        for entry in ocr_pages:
+            path = Path(entry.get("path") or "")
+            try:
+                file_hash = sha256_file(path)
+            except OSError as exc:
+                logger.warning("Project %s: Cannot queue OCR for %s: %s", project_id, entry.get("file"), exc)
+                continue
+            jobs.extend((path, file_hash, page_number) for page_number in entry.get("pages", []))
+        if not jobs:
+            return {"queued": 0, "in_progress": 0, "dropped": 0}
+
+        def _on_complete(recognised: int) -> None:
+            if recognised and settings.OCR_REENRICH_ENABLED:
+                _schedule_ocr_rerun(project_id, generate_summary, enable_enrichment, recognised)
+
+        counts = get_ocr_service().submit_batch(jobs, on_complete=_on_complete)
+        logger.info(
+            "Project %s: OCR queued=%s in_progress=%s dropped=%s",
+            project_id,
+            counts["queued"],
+            counts["in_progress"],
+            counts["dropped"],
+        )
+        return counts
+
+    def _parse_and_validate(
+        self,
+        project_id: str,
+        uploads: Dict[str, Any],
+        enable_enrichment: bool,
+        timings: Dict[str, float],
+    ) -> Tuple[Dict[str, Any], Any, Dict[str, Any], Path]:
+        """Steps 2–3: parse cost documents, validate the schema, save the cache."""
+
+        base_cache = {
+            "project_id": project_id,
+            "workflow": "A",
+            "files": uploads["files_by_type"],
+        }
+        cache_data, cache_path, cache_created = load_or_create_project_cache(
+            project_id, base_cache
+        )
+
+        logger.info(
+            "Project %s: Cache %s at %s",
+            project_id,
+            "created" if cache_created else "loaded",
+            cache_path,
+        )
+
+        cache_data["enable_enrichment"] = enable_enrichment
+
+        logger.info(
+            "Project %s: Starting Workflow A Step 2 (parsing)",
+            project_id,
+        )
+        with _timed(timings, "parsing"):
+            parsing_summary = self._parse_cost_documents(
+                project_id, uploads["cost_documents"]
+            )
+
+        with _timed(timings, "schema_validation"):
+            # Raw parser rows are released as soon as they are validated.
+            parsing_summary["diagnostics"].setdefault("total_positions", len(parsing_summary["positions"]))
+            schema_result = self.schema_validator.validate(_drain(parsing_summary["positions"]))
+
+        logger.info(
+            "Project %s: Step 3 schema validation deduplicated=%s invalid=%s duplicates_removed=%s",
+            project_id,
+            schema_result.stats.get("deduplicated_total", 0),
+            schema_result.stats.get("invalid_total", 0),
+            schema_result.stats.get("duplicates_removed", 0),
+        )
+
+        cache_data["project_id"] = project_id
+        cache_data["workflow"] = "A"
+        cache_data["files"] = uploads["files_by_type"]
+        parsing_summary["diagnostics"]["schema_validation"] = schema_result.stats
+
+        cache_data.setdefault("diagnostics", {})
+        cache_data["diagnostics"]["parsing"] = parsing_summary["diagnostics"]
+        cache_data["diagnostics"]["schema_validation"] = schema_result.stats
+
+        positions = schema_result.positions
+        cache_data["positions"] = positions
+        cache_data["documents"] = parsing_summary["documents"]
+        cache_data["updated_at"] = datetime.now().isoformat()
+
+        with _timed(timings, "parse_cache_save"):
+            save_project_cache(project_id, cache_data)
+
+        self._update_project_store(
+            project_id, parsing_summary, cache_path, uploads
+        )
+
+        return parsing_summary, schema_result, cache_data, cache_path
+
+    def _timed_drawing_specs(
+        self, project_id: str, drawing_files: List[Dict[str, Any]], timings: Dict[str, float]
+    ) -> Dict[str, Any]:
+        with _timed(timings, "drawings"):
+            return self._extract_drawing_specs(project_id, drawing_files)
+
     def _build_audit_payload(
         self,
         positions: List[Dict[str, Any]],
@@ -248,51 +452,17 @@ class WorkflowA:
         audit_stats: Dict[str, Any],
         schema_stats: Dict[str, Any],
     ) -> Dict[str, Any]:
-        """Normalise audit output for cache, API and export."""
+        """Assemble the audit payload for cache, API and export.
 
-        non_preview_positions: List[Dict[str, Any]] = []
-        for pos in positions or []:
-            if not isinstance(pos, dict):
-                continue
-            if pos.get("is_preview") or pos.get("preview"):
-                continue
-            non_preview_positions.append(pos)
-
-        normalized_positions: List[Dict[str, Any]] = []
-        for raw in non_preview_positions:
-            entry = dict(raw)
-            entry["position_id"] = (
-                raw.get("position_id")
-                or raw.get("id")
-                or raw.get("position_number")
-                or raw.get("code")
-                or "unknown"
-            )
-            entry["code"] = raw.get("code", "")
-            entry["description"] = raw.get("description", "")
-            entry["unit"] = raw.get("unit", "")
-            entry["quantity"] = raw.get("quantity", 0)
-            entry["section"] = raw.get("section", "")
-            classification = _classify_position(raw)
-            entry["classification"] = classification
-            entry["notes"] = (
-                raw.get("notes")
-                or raw.get("validation_message")
-                or raw.get("validation_notes")
-                or ""
-            )
-            normalized_positions.append(entry)
+        ``positions`` are audit-result entries (``_normalize_audit_positions``);
+        the payload references them without copying.
+        """
 
-        total_positions = len(normalized_positions)
-        green_total = sum(
-            1 for item in normalized_positions if item.get("classification") == "GREEN"
-        )
-        amber_total = sum(
-            1 for item in normalized_positions if item.get("classification") == "AMBER"
-        )
-        red_total = sum(
-            1 for item in normalized_positions if item.get("classification") == "RED"
-        )
+        counts = Counter(item.get("classification") for item in positions)
+        total_positions = len(positions)
+        green_total = counts["GREEN"]
+        amber_total = counts["AMBER"]
+        red_total = counts["RED"]
 
         audit_summary = {
             "green": audit_stats.get("green", green_total),
@@ -305,8 +475,8 @@ class WorkflowA:
             "green": green_total,
             "amber": amber_total,
             "red": red_total,
-            "positions": normalized_positions,
-            "positions_preview": normalized_positions[:100],
+            "positions": positions,
+            "positions_preview": positions[:100],
             "enrichment_stats": dict(enrichment_stats or {}),
             "validation_stats": dict(validation_stats or {}),
             "schema_validation": dict(schema_stats or {}),
@@ -433,6 +603,7 @@ class WorkflowA:
             "total_positions": 0,
             "files": [],
             "errors": [],
+            "parse_cache": {"hits": 0, "misses": 0},
         }
 
         if not cost_documents:
@@ -446,7 +617,9 @@ class WorkflowA:
                 "diagnostics": diagnostics,
             }
 
-        for doc in cost_documents:
+        parse_results = self._parse_files(project_id, cost_documents, diagnostics["parse_cache"])
+
+        for doc, outcome in zip(cost_documents, parse_results):
             if not doc.get("exists"):
                 diagnostics["errors"].append(
                     {
@@ -457,33 +630,24 @@ class WorkflowA:
                 )
                 continue
 
-            file_path = Path(doc["path"])
-            logger.info(
-                "Project %s: Parsing %s (%s)",
-                project_id,
-                doc.get("filename"),
-                doc.get("file_type"),
-            )
-
-            try:
-                parsed = self.smart_parser.parse(file_path, project_id=project_id)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception(
+            if not outcome.ok:
+                logger.error(
                     "Project %s: Failed parsing %s (%s): %s",
                     project_id,
                     doc.get("filename"),
                     doc.get("file_type"),
-                    exc,
+                    outcome.error,
                 )
                 diagnostics["errors"].append(
                     {
                         "filename": doc.get("filename"),
                         "file_type": doc.get("file_type"),
-                        "error": str(exc),
+                        "error": outcome.error,
                     }
                 )
                 continue
 
+            parsed = outcome.value
             file_positions = parsed.get("positions") or []
             doc_info = parsed.get("document_info") or {}
             doc_diag = parsed.get("diagnostics") or {}
@@ -504,6 +668,7 @@ class WorkflowA:
                     "document_info": doc_info,
                     "diagnostics": doc_diag,
                     "positions_count": len(file_positions),
+                    "parse_seconds": round(outcome.duration_sec, 3),
                 }
             )
 
@@ -533,6 +698,91 @@ class WorkflowA:
             "diagnostics": diagnostics,
         }
 
+    def _parse_files(
+        self,
+        project_id: str,
+        cost_documents: List[Dict[str, Any]],
+        cache_stats: Dict[str, int],
+    ) -> List[FileTaskResult]:
+        """Parse the documents in worker processes; one result per document, in order.
+
+        Parse cache hits are served in this process and identical files are
+        parsed only once.  Missing documents get an empty placeholder result.
+        """
+
+        results: List[FileTaskResult] = [FileTaskResult() for _ in cost_documents]
+        jobs: List[Path] = []
+        job_keys: List[Optional[str]] = []
+        job_of_document: Dict[int, int] = {}
+        job_of_key: Dict[str, int] = {}
+        reused: set[int] = set()
+
+        for index, doc in enumerate(cost_documents):
+            if not doc.get("exists"):
+                continue
+            file_path = Path(doc["path"])
+            key: Optional[str] = None
+            if settings.PARSE_CACHE_ENABLED:
+                try:
+                    key = self.parse_cache.key_for(file_path)
+                except OSError as exc:
+                    results[index] = FileTaskResult(error=str(exc))
+                    continue
+                cached = self.parse_cache.get(key)
+                if cached is not None:
+                    cache_stats["hits"] += 1
+                    results[index] = FileTaskResult(value=self._from_cache(project_id, file_path, cached))
+                    continue
+                if key in job_of_key:
+                    cache_stats["hits"] += 1
+                    job_of_document[index] = job_of_key[key]
+                    reused.add(index)
+                    continue
+                cache_stats["misses"] += 1
+                job_of_key[key] = len(jobs)
+            logger.info(
+                "Project %s: Parsing %s (%s)",
+                project_id,
+                doc.get("filename"),
+                doc.get("file_type"),
+            )
+            job_of_document[index] = len(jobs)
+            jobs.append(file_path)
+            job_keys.append(key)
+
+        job_results = run_file_tasks(
+            partial(self.smart_parser.parse, project_id=project_id),
+            jobs,
+            workers=resolve_workers(settings.PARSE_WORKERS),
+            timeout=settings.PARSE_FILE_TIMEOUT_SEC,
+        )
+        for key, outcome in zip(job_keys, job_results):
+            if key and outcome.ok and not (outcome.value.get("document_info") or {}).get("error"):
+                self.parse_cache.put(key, outcome.value)
+
+        for index, job in job_of_document.items():
+            outcome = job_results[job]
+            if index in reused and outcome.ok:
+                # Same content as an earlier document: give it its own copy.
+                file_path = Path(cost_documents[index]["path"])
+                outcome = FileTaskResult(value=self._from_cache(project_id, file_path, copy.deepcopy(outcome.value)))
+            results[index] = outcome
+        return results
+
+    @staticmethod
+    def _from_cache(project_id: str, file_path: Path, cached: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(
+            "Project %s: Parse cache hit for %s (%s positions)",
+            project_id,
+            file_path.name,
+            len(cached.get("positions") or []),
+        )
+        document_info = dict(cached.get("document_info") or {})
+        if "filename" in document_info:
+            document_info["filename"] = file_path.name
+        cached["document_info"] = document_info
+        return cached
+
     def _update_project_store(
         self,
         project_id: str,
@@ -542,10 +792,27 @@ class WorkflowA:
     ) -> None:
         now_iso = datetime.now().isoformat()
         diagnostics = parsing_summary["diagnostics"]
-        total_positions = len(parsing_summary["positions"])
-
-        project_meta = project_store.get(project_id)
-        if not project_meta:
+        total_positions = diagnostics["total_positions"]
+
+        def _apply(project_meta: Dict[str, Any]) -> None:
+            project_meta["status"] = ProjectStatus.PARSED
+            project_meta["progress"] = max(project_meta.get("progress", 0), 50)
+            project_meta["positions_total"] = total_positions
+            project_meta["positions_processed"] = total_positions
+            project_meta["positions_raw"] = diagnostics.get(
+                "raw_total", total_positions
+            )
+            project_meta["positions_skipped"] = diagnostics.get("skipped_total", 0)
+            project_meta["updated_at"] = now_iso
+            project_meta["cache_path"] = str(cache_path)
+            project_meta.setdefault("diagnostics", {})
+            project_meta["diagnostics"]["parsing"] = diagnostics
+            project_meta["files_snapshot"] = uploads["files_by_type"]
+            project_meta["missing_files"] = uploads["missing_files"]
+            project_meta["message"] = "Cost documents parsed"
+            project_meta["error"] = None
+
+        if project_store.modify(project_id, _apply) is None:
             project_store[project_id] = {
                 "project_id": project_id,
                 "workflow": "A",
@@ -567,24 +834,6 @@ class WorkflowA:
                 "message": "Cost documents parsed",
                 "error": None,
             }
-            return
-
-        project_meta["status"] = ProjectStatus.PARSED
-        project_meta["progress"] = max(project_meta.get("progress", 0), 50)
-        project_meta["positions_total"] = total_positions
-        project_meta["positions_processed"] = total_positions
-        project_meta["positions_raw"] = diagnostics.get(
-            "raw_total", total_positions
-        )
-        project_meta["positions_skipped"] = diagnostics.get("skipped_total", 0)
-        project_meta["updated_at"] = now_iso
-        project_meta["cache_path"] = str(cache_path)
-        project_meta.setdefault("diagnostics", {})
-        project_meta["diagnostics"]["parsing"] = diagnostics
-        project_meta["files_snapshot"] = uploads["files_by_type"]
-        project_meta["missing_files"] = uploads["missing_files"]
-        project_meta["message"] = "Cost documents parsed"
-        project_meta["error"] = None
 
     @staticmethod
     def _safe_relative_path(path: Path) -> str:
@@ -606,7 +855,11 @@ class WorkflowA:
             len(drawing_files),
         )
 
-        result = self.drawing_parser.parse_files(drawing_files)
+        result = self.drawing_parser.parse_files(
+            drawing_files,
+            workers=resolve_workers(settings.PARSE_WORKERS),
+            timeout=settings.PARSE_FILE_TIMEOUT_SEC,
+        )
 
         return result
 
@@ -620,9 +873,9 @@ class WorkflowA:
         parsing_diagnostics: Dict[str, Any],
         drawing_diagnostics: Dict[str, Any],
         drawing_summary: Optional[Dict[str, Any]] = None,
+        stage_timings: Optional[Dict[str, float]] = None,
     ) -> None:
         now_iso = datetime.now().isoformat()
-        project_meta = project_store.setdefault(project_id, {})
 
         positions = audit_payload.get("positions", [])
         enrichment_stats = audit_payload.get("enrichment_stats", {})
@@ -636,41 +889,6 @@ class WorkflowA:
         positions_preview = audit_payload.get("positions_preview") or positions[:100]
         total_positions = audit_payload.get("total_positions", len(positions))
 
-        project_meta.update(
-            {
-                "project_id": project_id,
-                "workflow": "A",
-                "status": ProjectStatus.AUDITED,
-                "updated_at": now_iso,
-                "progress": 90,
-                "cache_path": str(cache_path),
-                "files_snapshot": uploads.get("files_by_type", {}),
-                "missing_files": uploads.get("missing_files", []),
-                "positions_total": total_positions,
-                "positions_processed": total_positions,
-                "green_count": audit_stats.get("green", 0),
-                "amber_count": audit_stats.get("amber", 0),
-                "red_count": audit_stats.get("red", 0),
-                "enable_enrichment": enable_enrichment,
-                "message": "Parsed + Enriched + Validated + Audited (Steps 1–6). Ready to export.",
-            }
-        )
-
-        project_meta.setdefault("diagnostics", {})
-        project_meta["diagnostics"].update(
-            {
-                "parsing": parsing_diagnostics,
-                "drawing_specs": drawing_diagnostics,
-                "enrichment": enrichment_stats,
-                "validation": validation_stats,
-                "audit": audit_stats,
-                "schema_validation": schema_stats,
-            }
-        )
-
-        project_meta["audit_results"] = audit_payload
-        project_meta["positions_preview"] = positions_preview
-
         drawing_summary = drawing_summary or {}
         drawing_spec_count = len(drawing_summary.get("specifications", []))
         page_states = dict(drawing_summary.get("diagnostics", {}).get("page_states", {}))
@@ -681,19 +899,64 @@ class WorkflowA:
             "ocr_pages": drawing_summary.get("ocr_pages", []),
         }
 
-        project_meta["drawing_specs_detected"] = drawing_spec_count
-        project_meta["drawing_page_states"] = {
-            "good_text": page_states.get("good_text", 0),
-            "encoded_text": page_states.get("encoded_text", 0),
-            "image_only": page_states.get("image_only", 0),
-            "status": page_states.get("status", "completed"),
-        }
-        project_meta["drawing_text_recovery"] = recovery_meta
+        audit_summary = {key: value for key, value in audit_payload.items() if key != "positions"}
 
-        project_meta["summary"] = {
-            "positions_total": total_positions,
-            "green": audit_stats.get("green", 0),
-            "amber": audit_stats.get("amber", 0),
-            "red": audit_stats.get("red", 0),
-        }
+        def _apply(project_meta: Dict[str, Any]) -> None:
+            project_meta.update(
+                {
+                    "project_id": project_id,
+                    "workflow": "A",
+                    "status": ProjectStatus.AUDITED,
+                    "updated_at": now_iso,
+                    "progress": 90,
+                    "cache_path": str(cache_path),
+                    "files_snapshot": uploads.get("files_by_type", {}),
+                    "missing_files": uploads.get("missing_files", []),
+                    "positions_total": total_positions,
+                    "positions_processed": total_positions,
+                    "green_count": audit_stats.get("green", 0),
+                    "amber_count": audit_stats.get("amber", 0),
+                    "red_count": audit_stats.get("red", 0),
+                    "enable_enrichment": enable_enrichment,
+                    "message": "Parsed + Enriched + Validated + Audited (Steps 1–6). Ready to export.",
+                }
+            )
+
+            project_meta.setdefault("diagnostics", {})
+            project_meta["diagnostics"].update(
+                {
+                    "parsing": parsing_diagnostics,
+                    "drawing_specs": drawing_diagnostics,
+                    "enrichment": enrichment_stats,
+                    "validation": validation_stats,
+                    "audit": audit_stats,
+                    "schema_validation": schema_stats,
+                    "stage_timings": dict(stage_timings or {}),
+                }
+            )
+
+            # Positions stay in the paged project cache; the record keeps the summary.
+            project_meta["audit_results"] = audit_summary
+            project_meta["positions_preview"] = positions_preview
+
+            project_meta["drawing_specs_detected"] = drawing_spec_count
+            project_meta["drawing_page_states"] = {
+                "good_text": page_states.get("good_text", 0),
+                "encoded_text": page_states.get("encoded_text", 0),
+                "image_only": page_states.get("image_only", 0),
+                "status": page_states.get("status", "completed"),
+            }
+            project_meta["drawing_text_recovery"] = recovery_meta
+
+            project_meta["summary"] = {
+                "positions_total": total_positions,
+                "green": audit_stats.get("green", 0),
+                "amber": audit_stats.get("amber", 0),
+                "red": audit_stats.get("red", 0),
+            }
+
+        if project_store.modify(project_id, _apply) is None:
+            project_meta: Dict[str, Any] = {}
+            _apply(project_meta)
+            project_store[project_id] = project_meta
 
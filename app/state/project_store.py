@@ -1,6 +1,358 @@
-"""In-memory project store shared across services and API routes."""
-from typing import Any, Dict
+"""Persistent project store shared across services, API workers and queue workers.
 
-# Centralized in-memory store for project metadata/state.
+``project_store`` keeps its dict-like interface, but records now live in the
+``projects`` table of ``settings.DATABASE_URL``: the full record as JSON plus
+indexed summary columns (status, created_at, counts) so that listing and
+health checks never decode or scan every project.  Per-status counters are
+kept in ``project_status_counters`` and updated in the same transaction as the
+project row.
+
+Records hold project metadata and summaries only; audited positions live in
+the paged project cache (``app.services.project_cache``).  Reads return a
+detached copy of the record; mutate it and assign it back
+(``project_store[project_id] = record``), or use
+:meth:`ProjectStore.update_fields` / :meth:`ProjectStore.modify`, which merge
+the change inside the write transaction so concurrent writers (API, job
+runner, queue workers, OCR re-runs) do not overwrite each other's fields.
+Everything here is blocking I/O: async handlers call it through
+``run_in_threadpool``.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, or_, select, update
+
+from app.core.database import session_scope
+from app.models.project import Project, ProjectStatus, ProjectStatusCounter, WorkflowType
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ProjectStore", "project_store"]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _utc_datetime(value: Any) -> Optional[datetime]:
+    """``value`` as naive UTC, the form of every stored timestamp column.
+
+    Records carry local naive times (``datetime.now().isoformat()``); naive
+    values are therefore read as local time, aware ones are converted.
+    """
+
+    parsed = _parse_datetime(value)
+    if parsed is None:
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _status(value: Any) -> Optional[ProjectStatus]:
+    if isinstance(value, ProjectStatus):
+        return value
+    try:
+        return ProjectStatus(str(value))
+    except ValueError:
+        return None
+
+
+def _workflow(value: Any) -> Optional[WorkflowType]:
+    try:
+        return WorkflowType(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+_SUMMARY_COLUMNS = (
+    Project.project_id,
+    Project.name,
+    Project.workflow,
+    Project.status,
+    Project.enrichment_enabled,
+    Project.created_at,
+    Project.total_positions,
+)
+
+_STATUS_COLUMNS = (
+    *_SUMMARY_COLUMNS,
+    Project.updated_at,
+    Project.green_count,
+    Project.amber_count,
+    Project.red_count,
+    Project.error_message,
+)
+
+# Record fields of the status response that have no column of their own.
+_STATUS_RECORD_FIELDS = (
+    "progress",
+    "positions_processed",
+    "positions_raw",
+    "positions_skipped",
+    "diagnostics",
+    "message",
+)
+
+
+def _encode_cursor(created_at: datetime, project_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{project_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, project_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(created_at), project_id
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+class ProjectStore(MutableMapping):
+    """Dict-like access to project records stored in the database."""
+
+    def __init__(self, database_url: Optional[str] = None) -> None:
+        self.database_url = database_url
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, project_id: str) -> Dict[str, Any]:
+        with session_scope(self.database_url) as session:
+            raw = session.scalar(select(Project.record).where(Project.project_id == project_id))
+        if raw is None:
+            raise KeyError(project_id)
+        return self._load(raw)
+
+    def __contains__(self, project_id: object) -> bool:
+        if not isinstance(project_id, str):
+            return False
+        with session_scope(self.database_url) as session:
+            return session.scalar(select(Project.id).where(Project.project_id == project_id)) is not None
+
+    def __setitem__(self, project_id: str, record: Dict[str, Any]) -> None:
+        with session_scope(self.database_url) as session:
+            row = self._lock_row(session, project_id)
+            if row is None:
+                row = Project(project_id=project_id)
+                session.add(row)
+            self._store(session, row, record)
+
+    def __delitem__(self, project_id: str) -> None:
+        with session_scope(self.database_url) as session:
+            self._adjust_counter_of_current(session, project_id, -1)
+            deleted = session.execute(delete(Project).where(Project.project_id == project_id)).rowcount
+            if not deleted:
+                raise KeyError(project_id)
+
+    def __iter__(self) -> Iterator[str]:
+        with session_scope(self.database_url) as session:
+            project_ids = session.scalars(select(Project.project_id).order_by(Project.id)).all()
+        return iter(project_ids)
+
+    def __len__(self) -> int:
+        return sum(self.status_counts().values())
+
+    def clear(self) -> None:
+        with session_scope(self.database_url) as session:
+            session.execute(delete(Project))
+            session.execute(delete(ProjectStatusCounter))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def update_fields(self, project_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge ``changes`` into the stored record; returns it, or ``None`` if missing."""
+
+        return self.modify(project_id, lambda record: record.update(changes))
+
+    def modify(self, project_id: str, apply: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """Let ``apply`` change the stored record in place, within one write transaction.
+
+        The record is read after the row is locked, so a concurrent writer's
+        fields are seen and kept.  Returns the new record, or ``None`` (and
+        ``apply`` is not called) if the project does not exist.
+        """
+
+        with session_scope(self.database_url) as session:
+            row = self._lock_row(session, project_id)
+            if row is None:
+                return None
+            record = self._load(row.record or "{}")
+            apply(record)
+            self._store(session, row, record)
+        return record
+
+    def status_counts(self) -> Dict[str, int]:
+        with session_scope(self.database_url) as session:
+            rows = session.execute(select(ProjectStatusCounter.status, ProjectStatusCounter.count)).all()
+        return {status: count for status, count in rows if count}
+
+    def summary(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Indexed summary columns of one project (as in :meth:`page`), without decoding the record."""
+
+        with session_scope(self.database_url) as session:
+            row = session.execute(select(*_SUMMARY_COLUMNS).where(Project.project_id == project_id)).first()
+        return self._summary(row) if row is not None else None
+
+    def status(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Fields of the status response: indexed columns plus the few record-only fields."""
+
+        with session_scope(self.database_url) as session:
+            row = session.execute(
+                select(*_STATUS_COLUMNS, Project.record).where(Project.project_id == project_id)
+            ).first()
+        if row is None:
+            return None
+        record = json.loads(row.record or "{}")
+        status = self._summary(row)
+        status.update(
+            updated_at=row.updated_at.isoformat() if row.updated_at else None,
+            green_count=row.green_count or 0,
+            amber_count=row.amber_count or 0,
+            red_count=row.red_count or 0,
+            error=row.error_message,
+        )
+        status.update((field, record.get(field)) for field in _STATUS_RECORD_FIELDS)
+        return status
+
+    def page(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Project summaries, newest first.
+
+        ``cursor`` (from a previous page) uses the ``(created_at, project_id)``
+        index directly; ``offset`` is kept for backwards compatibility.
+        """
+
+        query = select(*_SUMMARY_COLUMNS).order_by(Project.created_at.desc(), Project.project_id.desc())
+        if cursor:
+            created_at, project_id = _decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    Project.created_at < created_at,
+                    and_(Project.created_at == created_at, Project.project_id < project_id),
+                )
+            )
+        elif offset:
+            query = query.offset(offset)
+
+        with session_scope(self.database_url) as session:
+            rows = session.execute(query.limit(limit + 1)).all()
+
+        items = [self._summary(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and rows[limit - 1].created_at is not None:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(last.created_at, last.project_id)
+        return items, next_cursor
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _summary(row: Any) -> Dict[str, Any]:
+        return {
+            "project_id": row.project_id,
+            "project_name": row.name,
+            "workflow": row.workflow.value if row.workflow else None,
+            "status": row.status,
+            "enrichment_enabled": bool(row.enrichment_enabled),
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "positions_count": row.total_positions or 0,
+        }
+
+    def _lock_row(self, session, project_id: str) -> Optional[Project]:
+        # The first statement is a write, which takes SQLite's write lock (as
+        # BEGIN IMMEDIATE would) before the row is read; elsewhere FOR UPDATE
+        # locks the row.  The counter of the current status is released here
+        # and the new one counted by ``_store``.
+        self._adjust_counter_of_current(session, project_id, -1)
+        return session.scalars(select(Project).where(Project.project_id == project_id).with_for_update()).first()
+
+    def _store(self, session, row: Project, record: Dict[str, Any]) -> None:
+        status = _status(record.get("status")) or ProjectStatus.UPLOADED
+        now = _utcnow()
+        row.name = str(record.get("project_name") or record.get("name") or row.project_id)
+        row.status = status
+        row.workflow = _workflow(record.get("workflow"))
+        row.enrichment_enabled = record.get("enable_enrichment")
+        row.created_at = _utc_datetime(record.get("created_at")) or row.created_at or now
+        row.updated_at = _utc_datetime(record.get("updated_at")) or now
+        row.uploaded_at = row.uploaded_at or row.created_at
+        row.total_positions = int(record.get("positions_total") or 0)
+        row.green_count = int(record.get("green_count") or 0)
+        row.amber_count = int(record.get("amber_count") or 0)
+        row.red_count = int(record.get("red_count") or 0)
+        row.error_message = record.get("error")
+        row.record = json.dumps(record, ensure_ascii=False, default=_json_default)
+        session.flush()
+        self._adjust_counter(session, status.value, +1)
+
+    @staticmethod
+    def _load(raw: str) -> Dict[str, Any]:
+        record = json.loads(raw)
+        status = _status(record.get("status"))
+        if status is not None:
+            record["status"] = status
+        return record
+
+    @staticmethod
+    def _adjust_counter_of_current(session, project_id: str, delta: int) -> None:
+        current = select(Project.status).where(Project.project_id == project_id).scalar_subquery()
+        # Enum columns store member names, which equal the values for ProjectStatus.
+        session.execute(
+            update(ProjectStatusCounter)
+            .where(ProjectStatusCounter.status == current)
+            .values(count=ProjectStatusCounter.count + delta)
+        )
+
+    @staticmethod
+    def _adjust_counter(session, status: str, delta: int) -> None:
+        updated = session.execute(
+            update(ProjectStatusCounter)
+            .where(ProjectStatusCounter.status == status)
+            .values(count=ProjectStatusCounter.count + delta)
+        ).rowcount
+        if not updated:
+            session.add(ProjectStatusCounter(status=status, count=max(delta, 0)))
+
+
+# Centralized project store for project metadata/state.
 # Imported by both API routes and background workflows.
-project_store: Dict[str, Dict[str, Any]] = {}
+project_store = ProjectStore()
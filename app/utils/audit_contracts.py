@@ -1,24 +1,14 @@
 """Utilities to normalise audit result payloads."""
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 from app.core.config import settings
+from app.utils.number_parsing import parse_number
 
 
 def _to_float(value: Any) -> float:
-    if isinstance(value, (int, float)):
-        return float(value)
-    if value is None:
-        return 0.0
-    text = str(value).strip().replace(" ", "")
-    if not text:
-        return 0.0
-    text = text.replace(",", ".")
-    try:
-        return float(text)
-    except ValueError:
-        return 0.0
+    return parse_number(value) or 0.0
 
 
 def _normalise_classification(value: Any) -> str:
@@ -107,7 +97,12 @@ def _ensure_enrichment_block(position: Dict[str, Any]) -> Dict[str, Any]:
 def build_flat_positions(positions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Convert raw position list into the export contract structure."""
 
-    flattened: List[Dict[str, Any]] = []
+    return list(iter_flat_positions(positions))
+
+
+def iter_flat_positions(positions: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Lazily convert positions into the export contract structure."""
+
     for index, raw_position in enumerate(positions or [], start=1):
         if not isinstance(raw_position, dict):
             continue
@@ -144,19 +139,18 @@ def build_flat_positions(positions: Iterable[Dict[str, Any]]) -> List[Dict[str,
             entry["enrichment_status"] = "unmatched"
         entry["enrichment_score"] = enrichment_block.get("score", 0.0)
 
-        flattened.append(entry)
-
-    return flattened
+        yield entry
 
 
 def summarise_totals(positions: Iterable[Dict[str, Any]]) -> Dict[str, int]:
-    positions_list = list(positions)
     totals = {"green": 0, "amber": 0, "red": 0}
-    for position in positions_list:
+    count = 0
+    for position in positions:
+        count += 1
         label = _normalise_classification(position.get("classification"))
         if label in totals:
             totals[label.lower()] += 1
-    totals["total_positions"] = len(positions_list)
+    totals["total_positions"] = count
     return totals
 
 
@@ -1,76 +1,205 @@
-"""Excel exporter for audit results."""
+"""Excel exporter for audit results.
+
+Workbooks are written with xlsxwriter in ``constant_memory`` mode: rows are
+flushed to disk as they are written and every cell style is a shared format
+created once per workbook, so memory stays flat regardless of the number of
+positions.  Positions are read page by page from the project cache.
+
+Exports are cached under ``data/exports/{project_id}/`` keyed by the audit
+version (digest of the cached audit segments plus the summary inputs);
+repeated downloads of an unchanged audit are served from disk.  Totals,
+positions and the key all come from one cache manifest, so an export taken
+while a new audit is being saved never mixes two runs.  Superseded exports
+are deleted once they have not been served for ``EXPORT_RETENTION_SEC``, as a
+download may still be streaming them.
+"""
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import math
+import os
+import threading
+import time
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
+import xlsxwriter
 
 from app.core.config import settings
-from app.services.project_cache import _is_new_audit_format, _migrate_legacy_audit_results
+from app.services.project_cache import (
+    _is_new_audit_format,
+    _migrate_legacy_audit_results,
+    iter_page,
+    load_field_view,
+)
+from app.utils.hashing import sha256_bytes
 
 logger = logging.getLogger(__name__)
 
+# Bump when the workbook layout changes so cached exports are regenerated.
+EXPORT_FORMAT_VERSION = 2
+
+# Superseded exports younger than this (by last use) are kept for running downloads.
+EXPORT_RETENTION_SEC = 600.0
+
+POSITION_HEADERS = (
+    "Position ID",
+    "Code",
+    "Description",
+    "Unit",
+    "Quantity",
+    "Section",
+    "Classification",
+    "Notes",
+)
+POSITION_COLUMN_WIDTHS = (18, 14, 50, 10, 12, 18, 14, 40)
+
 
 class AuditExcelExporter:
     """Create a workbook with audit summary and full position listing."""
 
-    SUMMARY_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    HEADER_FILL = PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid")
+    SUMMARY_COLOR = "#4472C4"
+    HEADER_COLOR = "#B4C7E7"
     CLASS_COLORS = {
-        "GREEN": PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),
-        "AMBER": PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid"),
-        "RED": PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid"),
+        "GREEN": "#C6EFCE",
+        "AMBER": "#FFEB9C",
+        "RED": "#FFC7CE",
     }
 
-    def __init__(self) -> None:
-        self.workbook = openpyxl.Workbook()
-        # Remove default sheet to control ordering explicitly
-        default_sheet = self.workbook.active
-        self.workbook.remove(default_sheet)
-
     async def export(self, project: Dict[str, Any], output_path: Path | None = None) -> Path:
-        raw_audit = project.get("audit_results")
-        is_new_contract = _is_new_audit_format(raw_audit)
-        audit_results = _migrate_legacy_audit_results(raw_audit)
+        return await asyncio.to_thread(self.export_sync, project, output_path)
 
-        self._create_summary_sheet(project, audit_results)
-        self._create_positions_sheet(audit_results)
+    def export_sync(self, project: Dict[str, Any], output_path: Path | None = None) -> Path:
+        """Write (or reuse) the export; ``output_path`` bypasses the export cache."""
+
+        project_id = project["project_id"]
+        view = load_field_view(project_id, "audit_results")
+        segment_entry = (view or {}).get("pages", {}).get("audit_results.positions")
+        from_cache = segment_entry is not None
+        if from_cache:
+            # Totals, positions and cache key of the same save.
+            audit_results = view["document"] or {}
+            audit_version = view["version"]
+            is_new_contract = True
+            positions = chain.from_iterable(iter_page(project_id, page) for page in segment_entry["pages"])
+        else:
+            raw_audit = project.get("audit_results")
+            is_new_contract = _is_new_audit_format(raw_audit)
+            audit_results = _migrate_legacy_audit_results(raw_audit)
+            audit_version = sha256_bytes(
+                json.dumps(audit_results, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+            )
+            positions = iter(audit_results.get("positions", []))
 
         if output_path is None:
-            export_dir = settings.DATA_DIR / "exports" / project["project_id"]
-            export_dir.mkdir(parents=True, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{project['project_name']}_audit_{timestamp}.xlsx"
-            output_path = export_dir / filename
+            output_path = self._cached_path(project, audit_version)
+            if output_path.exists():
+                _touch(output_path)
+                logger.info("excel_export: project=%s served cached %s", project_id, output_path.name)
+                return output_path
 
-        self.workbook.save(output_path)
+        tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            written = self._write_workbook(tmp_path, project, audit_results, positions)
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._prune_exports(output_path)
 
         logger.info(
-            "excel_export: positions=%d totals={g:%d,a:%d,r:%d} source_contract=%s",
-            audit_results.get("total_positions", 0),
+            "excel_export: positions=%d totals={g:%d,a:%d,r:%d} source_contract=%s source=%s",
+            written,
             audit_results.get("green", 0),
             audit_results.get("amber", 0),
             audit_results.get("red", 0),
             "normalized" if is_new_contract else "legacy-migrated",
+            "cache-pages" if from_cache else "project-record",
         )
 
         return output_path
 
+    # ------------------------------------------------------------------
+    # Export cache
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _cached_path(project: Dict[str, Any], audit_version: str) -> Path:
+        project_id = project["project_id"]
+        key_source = {
+            "format": EXPORT_FORMAT_VERSION,
+            "audit": audit_version,
+            "project_name": project.get("project_name"),
+            "workflow": str(project.get("workflow")),
+            "enrichment": bool(project.get("enable_enrichment")),
+        }
+        key = sha256_bytes(json.dumps(key_source, sort_keys=True).encode("utf-8"))[:16]
+        return settings.DATA_DIR / "exports" / project_id / f"audit_{key}.xlsx"
+
+    @staticmethod
+    def _prune_exports(current: Path) -> None:
+        cutoff = time.time() - EXPORT_RETENTION_SEC
+        for path in current.parent.glob("audit_*.xlsx"):
+            if path == current:
+                continue
+            try:
+                if path.stat().st_mtime <= cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
     # ------------------------------------------------------------------
     # Sheet builders
     # ------------------------------------------------------------------
 
-    def _create_summary_sheet(self, project: Dict[str, Any], audit_results: Dict[str, Any]) -> None:
-        sheet = self.workbook.create_sheet("Summary", 0)
-        sheet["A1"] = "AUDIT SUMMARY"
-        sheet["A1"].font = Font(bold=True, color="FFFFFF", size=15)
-        sheet["A1"].fill = self.SUMMARY_FILL
-        sheet.merge_cells("A1:D1")
+    def _write_workbook(
+        self,
+        path: Path,
+        project: Dict[str, Any],
+        audit_results: Dict[str, Any],
+        positions: Iterable[Dict[str, Any]],
+    ) -> int:
+        workbook = xlsxwriter.Workbook(
+            str(path),
+            {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False},
+        )
+        try:
+            formats = self._formats(workbook)
+            self._create_summary_sheet(workbook, formats, project, audit_results)
+            return self._create_positions_sheet(workbook, formats, positions)
+        finally:
+            workbook.close()
+
+    def _formats(self, workbook: xlsxwriter.Workbook) -> Dict[str, Any]:
+        formats = {
+            "title": workbook.add_format(
+                {"bold": True, "font_color": "#FFFFFF", "font_size": 15, "bg_color": self.SUMMARY_COLOR}
+            ),
+            "bold": workbook.add_format({"bold": True}),
+            "section": workbook.add_format({"bold": True, "bg_color": self.HEADER_COLOR}),
+            "header": workbook.add_format(
+                {"bold": True, "font_color": "#000000", "bg_color": self.HEADER_COLOR, "align": "center"}
+            ),
+            "notes": workbook.add_format({"text_wrap": True, "valign": "top"}),
+        }
+        for classification, color in self.CLASS_COLORS.items():
+            formats[classification] = workbook.add_format({"bg_color": color})
+        return formats
+
+    def _create_summary_sheet(
+        self,
+        workbook: xlsxwriter.Workbook,
+        formats: Dict[str, Any],
+        project: Dict[str, Any],
+        audit_results: Dict[str, Any],
+    ) -> None:
+        sheet = workbook.add_worksheet("Summary")
+        sheet.set_column(0, 3, 24)
+        sheet.merge_range(0, 0, 0, 3, "AUDIT SUMMARY", formats["title"])
 
         info_rows = [
             ("Project ID", project.get("project_id")),
@@ -80,83 +209,86 @@ class AuditExcelExporter:
             ("Enrichment", "Enabled" if project.get("enable_enrichment") else "Disabled"),
         ]
 
-        row = 3
+        row = 2
         for label, value in info_rows:
-            sheet[f"A{row}"] = label
-            sheet[f"A{row}"].font = Font(bold=True)
-            sheet[f"B{row}"] = value
+            sheet.write_string(row, 0, label, formats["bold"])
+            _write_value(sheet, row, 1, getattr(value, "value", value))
             row += 1
 
         row += 1
-        sheet[f"A{row}"] = "Totals"
-        sheet[f"A{row}"].font = Font(bold=True)
-        sheet[f"A{row}"].fill = self.HEADER_FILL
-        sheet.merge_cells(f"A{row}:D{row}")
+        sheet.merge_range(row, 0, row, 3, "Totals", formats["section"])
         row += 1
 
         totals = [
             ("Total positions", audit_results.get("total_positions", 0), None),
-            ("GREEN", audit_results.get("green", 0), self.CLASS_COLORS["GREEN"]),
-            ("AMBER", audit_results.get("amber", 0), self.CLASS_COLORS["AMBER"]),
-            ("RED", audit_results.get("red", 0), self.CLASS_COLORS["RED"]),
+            ("GREEN", audit_results.get("green", 0), formats["GREEN"]),
+            ("AMBER", audit_results.get("amber", 0), formats["AMBER"]),
+            ("RED", audit_results.get("red", 0), formats["RED"]),
         ]
 
         total_positions = audit_results.get("total_positions", 0) or 1
-        for label, value, fill in totals:
-            sheet[f"A{row}"] = label
-            sheet[f"A{row}"].font = Font(bold=True)
-            sheet[f"B{row}"] = value
-            if fill:
-                sheet[f"B{row}"].fill = fill
+        for label, value, cell_format in totals:
+            sheet.write_string(row, 0, label, formats["bold"])
+            _write_value(sheet, row, 1, value, cell_format)
             percentage = (value / total_positions) * 100 if total_positions else 0
-            sheet[f"C{row}"] = f"{percentage:.1f}%"
+            sheet.write_string(row, 2, f"{percentage:.1f}%")
             row += 1
 
-        for col in ("A", "B", "C", "D"):
-            sheet.column_dimensions[col].width = 24
-
-    def _create_positions_sheet(self, audit_results: Dict[str, Any]) -> None:
-        sheet = self.workbook.create_sheet("Positions")
-        headers = [
-            "Position ID",
-            "Code",
-            "Description",
-            "Unit",
-            "Quantity",
-            "Section",
-            "Classification",
-            "Notes",
-        ]
+    def _create_positions_sheet(
+        self,
+        workbook: xlsxwriter.Workbook,
+        formats: Dict[str, Any],
+        positions: Iterable[Dict[str, Any]],
+    ) -> int:
+        sheet = workbook.add_worksheet("Positions")
+        for index, width in enumerate(POSITION_COLUMN_WIDTHS):
+            sheet.set_column(index, index, width)
+        sheet.freeze_panes(1, 0)
+        for column, title in enumerate(POSITION_HEADERS):
+            sheet.write_string(0, column, title, formats["header"])
+
+        row_index = 0
+        for row_index, (values, classification, notes) in enumerate(_position_rows(positions), start=1):
+            for column, value in enumerate(values):
+                _write_value(sheet, row_index, column, value)
+            sheet.write_string(row_index, 6, classification, formats.get(classification))
+            _write_value(sheet, row_index, 7, notes, formats["notes"])
+        return row_index
+
+
+def _position_rows(positions: Iterable[Any]) -> Iterator[Tuple[Tuple[Any, ...], str, Any]]:
+    for position in positions:
+        if not isinstance(position, dict):
+            continue
+        values = (
+            position.get("position_id", ""),
+            position.get("code", ""),
+            position.get("description", ""),
+            position.get("unit", ""),
+            position.get("quantity", 0),
+            position.get("section", ""),
+        )
+        yield values, (position.get("classification") or "").upper(), position.get("notes", "")
+
+
+def _touch(path: Path) -> None:
+    """Mark a cached export as just served so pruning keeps it for a running download."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
 
-        for column, title in enumerate(headers, start=1):
-            cell = sheet.cell(row=1, column=column)
-            cell.value = title
-            cell.font = Font(bold=True, color="000000")
-            cell.fill = self.HEADER_FILL
-            cell.alignment = Alignment(horizontal="center")
-
-        for row_index, position in enumerate(audit_results.get("positions", []), start=2):
-            sheet.cell(row=row_index, column=1).value = position.get("position_id", "")
-            sheet.cell(row=row_index, column=2).value = position.get("code", "")
-            sheet.cell(row=row_index, column=3).value = position.get("description", "")
-            sheet.cell(row=row_index, column=4).value = position.get("unit", "")
-            sheet.cell(row=row_index, column=5).value = position.get("quantity", 0)
-            sheet.cell(row=row_index, column=6).value = position.get("section", "")
-
-            classification = (position.get("classification") or "").upper()
-            class_cell = sheet.cell(row=row_index, column=7)
-            class_cell.value = classification
-            class_cell.fill = self.CLASS_COLORS.get(classification, PatternFill())
-
-            notes_cell = sheet.cell(row=row_index, column=8)
-            notes_cell.value = position.get("notes", "")
-            notes_cell.alignment = Alignment(wrap_text=True, vertical="top")
-
-        column_widths = [18, 14, 50, 10, 12, 18, 14, 40]
-        for index, width in enumerate(column_widths, start=1):
-            sheet.column_dimensions[get_column_letter(index)].width = width
-
-        sheet.freeze_panes = "A2"
+def _write_value(sheet: Any, row: int, column: int, value: Any, cell_format: Optional[Any] = None) -> None:
+    if value is None or value == "":
+        if cell_format is not None:
+            sheet.write_blank(row, column, None, cell_format)
+    elif isinstance(value, bool):
+        sheet.write_boolean(row, column, value, cell_format)
+    elif isinstance(value, (int, float)) and math.isfinite(value):
+        sheet.write_number(row, column, value, cell_format)
+    else:
+        sheet.write_string(row, column, str(value), cell_format)
 
 
 async def export_enriched_results(project: Dict[str, Any]) -> Path:
@@ -0,0 +1,26 @@
+"""Content hashing helpers shared by the on-disk caches."""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Union
+
+__all__ = ["sha256_file", "sha256_bytes"]
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path: Union[str, Path], chunk_size: int = _CHUNK_SIZE) -> str:
+    """Return the hex SHA-256 digest of a file, read in fixed-size chunks."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_bytes(payload: bytes) -> str:
+    """Return the hex SHA-256 digest of an in-memory payload."""
+
+    return hashlib.sha256(payload).hexdigest()
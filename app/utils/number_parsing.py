@@ -0,0 +1,193 @@
+"""Batch parsing of Czech-formatted numbers and OTSKP codes.
+
+Estimate exports mix native numbers with text such as ``"1 220,168"``,
+``"1.220,168 Kč"`` or ``"15,50"``.  Every parser used to carry its own
+replace chain for these and applied it cell by cell.  This module is the one
+implementation: :func:`parse_numbers` and :func:`parse_codes` take a whole
+column of raw cells and convert it in a handful of NumPy string operations,
+:func:`parse_number` and :func:`parse_code` apply the same rules to a single
+value.
+
+Separator rules (Czech conventions first):
+
+* whitespace (including NBSP and narrow NBSP) and currency marks
+  (``Kč``, ``CZK``, ``EUR`` in upper or lower case, ``€``, trailing ``,-``)
+  are dropped;
+* a single comma is the decimal separator, also after dot thousands
+  (``"1.220,168"``);
+* several commas, or commas before the last dot, are thousands separators
+  (``"1,220,168.5"``);
+* a single dot is a decimal separator, several dots are thousands
+  separators (``"1.220.168"``).
+
+Anything that is not a number after that (``"-"``, ``"n/a"``) parses to
+``None``.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+__all__ = [
+    "CODE_PATTERN",
+    "parse_number",
+    "parse_numbers",
+    "parse_code",
+    "parse_codes",
+]
+
+CODE_PATTERN = re.compile(r"^\d{4,6}(?:[.\-][A-Z0-9])?$")
+
+_WHITESPACE = (" ", "\xa0", "\u202f", "\u2009", "\t", "\r", "\n")
+_CURRENCY_MARKS = ("Kč", "kč", "KČ", "CZK", "czk", "EUR", "eur", "€")
+_SEPARATOR = "\x00"
+_WHITESPACE_RE = re.compile("[" + "".join(_WHITESPACE) + "]+")
+_CODE_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"[+-]?\d*\.?\d*")
+
+# Below this many text cells the per-call overhead of the NumPy operations
+# outweighs the per-cell loop.
+_BATCH_THRESHOLD = 64
+
+
+# ---------------------------------------------------------------------------
+# Numbers
+# ---------------------------------------------------------------------------
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Parse one cell; native numbers pass through, unparseable text is ``None``."""
+
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = _WHITESPACE_RE.sub("", str(value))
+    for mark in _CURRENCY_MARKS:
+        if mark in text:
+            text = text.replace(mark, "")
+    if text.endswith((",-", ".-")):
+        text = text.rstrip("-").rstrip(",.")
+
+    commas = text.count(",")
+    if commas == 1 and text.rfind(",") > text.rfind("."):
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", "")
+        if text.count(".") > 1:
+            text = text.replace(".", "")
+
+    if not any(char.isdecimal() for char in text) or not _NUMBER_RE.fullmatch(text):
+        return None
+    return float(text)
+
+
+def parse_numbers(values: Sequence[Any]) -> List[Optional[float]]:
+    """Parse a column of cells in one vectorised pass; see :func:`parse_number`."""
+
+    if all(isinstance(value, str) for value in values):
+        texts = list(values)
+        text_index = None
+        result: List[Optional[float]] = []
+    else:
+        result = [None] * len(values)
+        text_index = []
+        texts = []
+        for index, value in enumerate(values):
+            if value is None or isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                result[index] = float(value)
+            else:
+                text_index.append(index)
+                texts.append(str(value))
+
+    if len(texts) < _BATCH_THRESHOLD:
+        parsed = [parse_number(text) for text in texts]
+        return _merge(result, text_index, parsed)
+
+    # Separator-independent clean-up runs once over the joined column.
+    buffer = _SEPARATOR.join(texts)
+    for char in _WHITESPACE + _CURRENCY_MARKS:
+        if char in buffer:
+            buffer = buffer.replace(char, "")
+    parts = buffer.split(_SEPARATOR)
+    if len(parts) != len(texts):  # a cell contained the separator itself
+        return _merge(result, text_index, [parse_number(text) for text in texts])
+    cells = np.array(parts, dtype=str)
+
+    dash_suffix = np.char.endswith(cells, ",-") | np.char.endswith(cells, ".-")
+    if dash_suffix.any():
+        cells[dash_suffix] = np.char.rstrip(np.char.rstrip(cells[dash_suffix], "-"), ",.")
+
+    commas = np.char.count(cells, ",")
+    comma_decimal = (commas == 1) & (np.char.rfind(cells, ",") > np.char.rfind(cells, "."))
+    if comma_decimal.any():
+        cells[comma_decimal] = np.char.replace(np.char.replace(cells[comma_decimal], ".", ""), ",", ".")
+    comma_thousands = ~comma_decimal & (commas > 0)
+    if comma_thousands.any():
+        cells[comma_thousands] = np.char.replace(cells[comma_thousands], ",", "")
+    dot_thousands = ~comma_decimal & (np.char.count(cells, ".") > 1)
+    if dot_thousands.any():
+        cells[dot_thousands] = np.char.replace(cells[dot_thousands], ".", "")
+
+    # Valid: optional sign, digits with at most one dot, at least one digit.
+    unsigned = np.char.lstrip(cells, "+-")
+    digits = np.char.replace(unsigned, ".", "", count=1)
+    valid = np.char.isdecimal(digits) & (np.char.str_len(cells) - np.char.str_len(unsigned) <= 1)
+
+    numbers = np.zeros(len(texts))
+    numbers[valid] = cells[valid].astype(np.float64)
+    parsed = [number if ok else None for number, ok in zip(numbers.tolist(), valid.tolist())]
+    return _merge(result, text_index, parsed)
+
+
+def _merge(
+    result: List[Optional[float]],
+    text_index: Optional[List[int]],
+    parsed: List[Optional[float]],
+) -> List[Optional[float]]:
+    if text_index is None:
+        return parsed
+    for index, number in zip(text_index, parsed):
+        result[index] = number
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Codes
+# ---------------------------------------------------------------------------
+
+
+def _code_text(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parse_code(value: Any) -> Optional[str]:
+    """Normalise one OTSKP code cell (``"272 325"`` → ``"272325"``); ``None`` if invalid."""
+
+    if value is None:
+        return None
+    code = _CODE_SPACE_RE.sub("", _code_text(value).upper())
+    return code if CODE_PATTERN.match(code) else None
+
+
+def parse_codes(values: Sequence[Any]) -> List[Optional[str]]:
+    """Normalise a column of code cells; see :func:`parse_code`.
+
+    The column is joined into one buffer so whitespace removal and case
+    folding run once over all cells.
+    """
+
+    texts = ["" if value is None else _code_text(value).replace("\x00", "") for value in values]
+    buffer = _CODE_SPACE_RE.sub("", "\x00".join(texts).upper())
+    match = CODE_PATTERN.match
+    return [
+        code if value is not None and match(code) else None
+        for value, code in zip(values, buffer.split("\x00"))
+    ]
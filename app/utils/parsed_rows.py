@@ -0,0 +1,97 @@
+"""Compact intermediate rows passed from table parsers to the normaliser.
+
+A raw estimate row used to be a dict carrying its own copy of the header map,
+a list of raw cell strings and a source string.  :class:`ParsedRow` keeps only
+its row number and a tuple of cleaned cell values; everything the rows under
+one header block have in common lives once in a :class:`RowSchema`.  The
+legacy dict form (``_source``, ``_row_values``, ``_header_map`` …) is built by
+:meth:`ParsedRow.to_dict` only where a consumer still needs it.
+"""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+__all__ = ["RowSchema", "ParsedRow"]
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RowSchema:
+    """Column layout shared by every row under one header block."""
+
+    sheet_name: str
+    keys: Tuple[str, ...]  # header key per column
+    header_map: Mapping[str, str]  # header key -> raw header text
+
+    @classmethod
+    def create(cls, sheet_name: str, keys: Iterable[str], header_map: Mapping[str, str]) -> "RowSchema":
+        return cls(
+            sheet_name=sys.intern(sheet_name),
+            keys=tuple(sys.intern(key) for key in keys),
+            header_map=dict(header_map),
+        )
+
+    def key_for(self, column: int) -> str:
+        return self.keys[column] if column < len(self.keys) else f"col_{column}"
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ParsedRow:
+    """One data row: cleaned cell values (``None`` for empty cells) under a schema."""
+
+    schema: RowSchema
+    row_index: int
+    values: Tuple[Any, ...]
+
+    @property
+    def sheet_name(self) -> str:
+        return self.schema.sheet_name
+
+    @property
+    def source(self) -> str:
+        return f"sheet_{self.schema.sheet_name}_row_{self.row_index}"
+
+    @property
+    def raw_values(self) -> List[str]:
+        # Cleaned strings are already stripped; other values are rendered as text.
+        return [
+            "" if value is None else value if isinstance(value, str) else str(value).strip()
+            for value in self.values
+        ]
+
+    @property
+    def first_value(self) -> Optional[str]:
+        return self.raw_values[0] if self.values else None
+
+    def cells(self) -> Dict[str, Any]:
+        """Non-empty cells by header key; a repeated key collects its values in a list."""
+
+        cells: Dict[str, Any] = {}
+        for column, value in enumerate(self.values):
+            if value is None:
+                continue
+            key = self.schema.key_for(column)
+            if key in cells:
+                existing = cells[key]
+                if isinstance(existing, list):
+                    existing.append(value)
+                else:
+                    cells[key] = [existing, value]
+            else:
+                cells[key] = value
+        return cells
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Legacy raw-position dict as produced by the parsers before ``ParsedRow``."""
+
+        position = self.cells()
+        position["_source"] = self.source
+        position["_sheet_name"] = self.schema.sheet_name
+        raw_values = self.raw_values
+        position["_row_values"] = raw_values
+        if raw_values:
+            position["_row_first_value"] = raw_values[0]
+        if self.schema.header_map:
+            position["_header_map"] = dict(self.schema.header_map)
+        return position
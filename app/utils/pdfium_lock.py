@@ -0,0 +1,14 @@
+"""Process-wide lock around pypdfium2.
+
+pdfium is not thread-safe: two threads using it at the same time, even on
+different documents, can crash the process.  Every in-process pdfium call
+(text extraction, page counting, OCR rendering) holds this lock; worker
+processes each have their own copy.
+"""
+from __future__ import annotations
+
+import threading
+
+__all__ = ["pdfium_lock"]
+
+pdfium_lock = threading.RLock()
@@ -6,12 +6,18 @@ import logging
 import re
 import unicodedata
 from dataclasses import dataclass
+from itertools import islice
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from app.core.config import settings
+from app.utils.number_parsing import parse_codes, parse_number, parse_numbers
+from app.utils.parsed_rows import ParsedRow
 
 logger = logging.getLogger(__name__)
 
+# Bump when normalised output changes; part of the parse cache key.
+NORMALIZER_VERSION = 2
+
 
 # ---------------------------------------------------------------------------
 # Header aliases (case-insensitive, diacritics ignored)
@@ -64,15 +70,15 @@ HEADER_ALIASES: Dict[str, set[str]] = {
 }
 
 
-CODE_PATTERN = re.compile(r"^\d{4,6}(?:[.\-][A-Z0-9])?$")
 SECTION_PREFIX = re.compile(r"^(?:\d+[.)]?|[IVXLCDM]+\.)\s+")
 RESOURCE_KEYWORDS = (
     "kalkulace s rozbory",
     "rozbory",
     "tov",
 )
-EMPTY_NUMERIC_TOKENS = {"", "-", "–", "—"}
-NBSP = "\xa0"
+NUMERIC_FIELDS = ("quantity", "unit_price", "total_price")
+# Rows are collected per batch so codes and numbers are parsed column-wise.
+NORMALISE_BATCH_SIZE = 1024
 
 
 def _strip_diacritics(value: str) -> str:
@@ -216,25 +222,11 @@ class _LegacyPositionNormalizer:
     @staticmethod
     def _convert_types(position: Dict[str, Any]) -> Dict[str, Any]:
         if "quantity" in position:
-            try:
-                qty_str = str(position["quantity"]).replace(",", ".").replace(" ", "")
-                position["quantity"] = float(qty_str)
-            except (ValueError, TypeError):
-                position["quantity"] = 0.0
-
-        if "unit_price" in position:
-            try:
-                price_str = str(position["unit_price"]).replace(",", ".").replace(" ", "")
-                position["unit_price"] = float(price_str)
-            except (ValueError, TypeError):
-                position["unit_price"] = None
-
-        if "total_price" in position:
-            try:
-                total_str = str(position["total_price"]).replace(",", ".").replace(" ", "")
-                position["total_price"] = float(total_str)
-            except (ValueError, TypeError):
-                position["total_price"] = None
+            position["quantity"] = parse_number(position["quantity"]) or 0.0
+
+        for field in ("unit_price", "total_price"):
+            if field in position:
+                position[field] = parse_number(position[field])
 
         return position
 
@@ -252,11 +244,14 @@ class _LegacyPositionNormalizer:
     def normalize_list(
         cls, positions: Iterable[Dict[str, Any]], return_stats: bool = False
     ) -> Tuple[List[Dict[str, Any]], Dict[str, int]] | List[Dict[str, Any]]:
-        source = list(positions)
         normalized: List[Dict[str, Any]] = []
         skipped = 0
+        raw_total = 0
 
-        for idx, pos in enumerate(source):
+        for idx, pos in enumerate(positions):
+            raw_total += 1
+            if isinstance(pos, ParsedRow):
+                pos = pos.to_dict()
             result = cls.normalize(pos)
             if result:
                 if "position_number" not in result:
@@ -266,7 +261,7 @@ class _LegacyPositionNormalizer:
                 skipped += 1
 
         stats = {
-            "raw_total": len(source),
+            "raw_total": raw_total,
             "normalized_total": len(normalized),
             "skipped_total": skipped,
         }
@@ -293,8 +288,10 @@ class OTSKPEstimateNormalizer:
 
     alias_lookup: Dict[str, str] = {}
 
-    def __init__(self, rows: Iterable[Dict[str, Any]]):
-        self.rows = list(rows or [])
+    def __init__(self, rows: Iterable[Dict[str, Any] | ParsedRow]):
+        # Consumed lazily in batches; generators are never materialised.
+        self.rows = rows or []
+        self.raw_total = 0
         if not self.alias_lookup:
             self.alias_lookup = self._build_alias_lookup()
 
@@ -304,6 +301,8 @@ class OTSKPEstimateNormalizer:
         self.code_samples: List[str] = []
         self.section_rows = 0
         self.resource_rows = 0
+        # Rows of one header block repeat the same headers; resolve each once.
+        self._field_cache: Dict[str, Optional[str]] = {}
 
     # ------------------------------------------------------------------
     # Public API
@@ -312,22 +311,34 @@ class OTSKPEstimateNormalizer:
     def normalize(self) -> NormalisationResult:
         normalized_positions: List[Dict[str, Any]] = []
 
-        for raw_row in self.rows:
-            if not isinstance(raw_row, dict):
-                continue
-
-            normalized = self._normalize_row(raw_row)
-            if normalized is None:
-                continue
-
-            if normalized.pop("section_row", False):
-                self.section_rows += 1
-                continue
-
-            if normalized.get("resource_row"):
-                self.resource_rows += 1
-
-            normalized_positions.append(normalized)
+        rows = iter(self.rows)
+        while True:
+            chunk = list(islice(rows, NORMALISE_BATCH_SIZE))
+            if not chunk:
+                break
+            self.raw_total += len(chunk)
+            batch = []
+            for raw_row in chunk:
+                if not isinstance(raw_row, (dict, ParsedRow)):
+                    continue
+                collected = self._collect_row(raw_row)
+                if collected is not None:
+                    batch.append(collected)
+            self._parse_columns(batch)
+
+            for payload, first_value, row_values in batch:
+                normalized = self._finish_row(payload, first_value, row_values)
+                if normalized is None:
+                    continue
+
+                if normalized.pop("section_row", False):
+                    self.section_rows += 1
+                    continue
+
+                if normalized.get("resource_row"):
+                    self.resource_rows += 1
+
+                normalized_positions.append(normalized)
 
         stats = self._build_stats(normalized_positions)
 
@@ -337,16 +348,29 @@ class OTSKPEstimateNormalizer:
     # Row handling
     # ------------------------------------------------------------------
 
-    def _normalize_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        header_lookup = row.get("_header_map") if isinstance(row.get("_header_map"), dict) else {}
-        sheet_name = row.get("_sheet_name") if isinstance(row.get("_sheet_name"), str) else None
-        row_values = row.get("_row_values") if isinstance(row.get("_row_values"), list) else []
-        first_value = row.get("_row_first_value")
-        source_ref = row.get("_source")
+    def _collect_row(
+        self, row: Dict[str, Any] | ParsedRow
+    ) -> Optional[Tuple[Dict[str, Any], Any, List[Any]]]:
+        """Map a raw row onto canonical fields; values are still cell text."""
+
+        if isinstance(row, ParsedRow):
+            cells = row.cells()
+            header_lookup = row.schema.header_map
+            sheet_name = row.sheet_name
+            row_values = row.raw_values
+            first_value = row.first_value
+            source_ref = row.source
+        else:
+            cells = row
+            header_lookup = row.get("_header_map") if isinstance(row.get("_header_map"), dict) else {}
+            sheet_name = row.get("_sheet_name") if isinstance(row.get("_sheet_name"), str) else None
+            row_values = row.get("_row_values") if isinstance(row.get("_row_values"), list) else []
+            first_value = row.get("_row_first_value")
+            source_ref = row.get("_source")
 
         canonical_payload: Dict[str, Any] = {}
 
-        for key, value in row.items():
+        for key, value in cells.items():
             if key.startswith("_"):
                 continue
 
@@ -371,35 +395,45 @@ class OTSKPEstimateNormalizer:
         if not canonical_payload:
             return None
 
+        if source_ref:
+            canonical_payload["source_ref"] = source_ref
+        if sheet_name:
+            canonical_payload["sheet_name"] = sheet_name
+        return canonical_payload, first_value, row_values
+
+    @staticmethod
+    def _parse_columns(batch: List[Tuple[Dict[str, Any], Any, List[Any]]]) -> None:
+        """Convert code and numeric text of a batch of payloads column by column."""
+
+        for field in ("code", *NUMERIC_FIELDS):
+            payloads = [payload for payload, _, _ in batch if field in payload]
+            if not payloads:
+                continue
+            raw = [payload[field] for payload in payloads]
+            parsed = parse_codes(raw) if field == "code" else parse_numbers(raw)
+            for payload, value in zip(payloads, parsed):
+                if value is None:
+                    del payload[field]
+                else:
+                    payload[field] = value
+
+    def _finish_row(
+        self,
+        canonical_payload: Dict[str, Any],
+        first_value: Any,
+        row_values: List[Any],
+    ) -> Optional[Dict[str, Any]]:
         description = canonical_payload.get("description")
         if description:
             canonical_payload["description"] = self._normalise_description(description)
 
-        code = canonical_payload.get("code")
-        parsed_code = self._parse_code(code) if code else None
-        if parsed_code:
-            canonical_payload["code"] = parsed_code
-            if parsed_code not in self.code_samples and len(self.code_samples) < 12:
-                self.code_samples.append(parsed_code)
-        elif "code" in canonical_payload:
-            canonical_payload.pop("code", None)
-
-        for numeric_field in ("quantity", "unit_price", "total_price"):
-            if numeric_field in canonical_payload:
-                parsed_number = self._parse_number(canonical_payload[numeric_field])
-                if parsed_number is None:
-                    canonical_payload.pop(numeric_field, None)
-                else:
-                    canonical_payload[numeric_field] = parsed_number
+        parsed_code = canonical_payload.get("code")
+        if parsed_code and parsed_code not in self.code_samples and len(self.code_samples) < 12:
+            self.code_samples.append(parsed_code)
 
         if "unit" in canonical_payload:
             canonical_payload["unit"] = canonical_payload["unit"].upper()
 
-        if source_ref:
-            canonical_payload["source_ref"] = source_ref
-        if sheet_name:
-            canonical_payload["sheet_name"] = sheet_name
-
         description_text = canonical_payload.get("description", "")
         if self._is_section_row(description_text, first_value, canonical_payload):
             return {"section_row": True, "description": description_text}
@@ -417,7 +451,7 @@ class OTSKPEstimateNormalizer:
     # ------------------------------------------------------------------
 
     def _build_stats(self, positions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        raw_total = len(self.rows)
+        raw_total = self.raw_total
         normalized_total = len(positions)
         skipped_total = raw_total - normalized_total
 
@@ -475,55 +509,19 @@ class OTSKPEstimateNormalizer:
     def _resolve_field(self, header: str) -> Optional[str]:
         if not header:
             return None
-        normalized = _normalise_header_key(str(header))
-        if not normalized:
-            return None
-        return self.alias_lookup.get(normalized)
+        header = str(header)
+        if header in self._field_cache:
+            return self._field_cache[header]
+        normalized = _normalise_header_key(header)
+        field = self.alias_lookup.get(normalized) if normalized else None
+        self._field_cache[header] = field
+        return field
 
     @staticmethod
     def _normalise_description(value: str) -> str:
         text = re.sub(r"\s+", " ", value).strip()
         return text
 
-    def _parse_code(self, value: Any) -> Optional[str]:
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            if float(value).is_integer():
-                digits = str(int(value))
-            else:
-                digits = str(value)
-        else:
-            digits = str(value)
-
-        digits = digits.replace(NBSP, " ")
-        digits = re.sub(r"\s+", "", digits.upper())
-        if CODE_PATTERN.match(digits):
-            return digits
-        return None
-
-    def _parse_number(self, value: Any) -> Optional[float]:
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            return float(value)
-
-        text = str(value).strip()
-        if not text:
-            return None
-        text = text.replace(NBSP, " ")
-        if text in EMPTY_NUMERIC_TOKENS:
-            return None
-
-        cleaned = text.replace(" ", "")
-        cleaned = cleaned.replace(".", "")
-        cleaned = cleaned.replace(",", ".")
-
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
-
     def _is_section_row(
         self,
         description: str,
@@ -5,11 +5,12 @@ import json
 import logging
 import re
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 
 from app.core.config import settings
+from app.utils.number_parsing import parse_number
 
 logger = logging.getLogger(__name__)
 
@@ -70,14 +71,12 @@ class PositionSchema(BaseModel):
             return None
         if isinstance(value, (int, float)):
             return float(value)
-        text = str(value).strip()
-        if not text:
+        if not str(value).strip():
             return None
-        text = text.replace(" ", "").replace(",", ".")
-        try:
-            return float(text)
-        except ValueError as exc:  # pragma: no cover - logged for diagnostics
-            raise ValueError("not_a_number") from exc
+        number = parse_number(value)
+        if number is None:  # pragma: no cover - logged for diagnostics
+            raise ValueError("not_a_number")
+        return number
 
 
 @dataclass(slots=True)
@@ -101,8 +100,13 @@ class PositionValidator:
     def validate(self, positions: Iterable[Dict[str, Any]]) -> SchemaValidationResult:
         """Validate raw positions and return clean list with statistics."""
 
-        validated: List[Dict[str, Any]] = []
-        stats = {
+        stats = self.new_stats()
+        validated = list(self.iter_validate(positions, stats))
+        return SchemaValidationResult(positions=validated, stats=stats)
+
+    @staticmethod
+    def new_stats() -> Dict[str, Any]:
+        return {
             "input_total": 0,
             "validated_total": 0,
             "invalid_total": 0,
@@ -110,6 +114,12 @@ class PositionValidator:
             "sections_classified": 0,
             "deduplicated_total": 0,
         }
+
+    def iter_validate(
+        self, positions: Iterable[Dict[str, Any]], stats: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield validated positions lazily; ``stats`` is updated as they pass."""
+
         dedup_index: set[Tuple[str, str, str, str]] = set()
 
         for raw_position in positions:
@@ -139,10 +149,9 @@ class PositionValidator:
                 payload.update(section_meta)
                 stats["sections_classified"] += 1
 
-            validated.append(payload)
-
-        stats["validated_total"] = len(validated)
-        stats["deduplicated_total"] = len(validated)
+            stats["validated_total"] += 1
+            stats["deduplicated_total"] += 1
+            yield payload
 
         logger.info(
             "Schema validation complete → input=%s, valid=%s, duplicates_removed=%s, invalid=%s",
@@ -152,8 +161,6 @@ class PositionValidator:
             stats["invalid_total"],
         )
 
-        return SchemaValidationResult(positions=validated, stats=stats)
-
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
@@ -0,0 +1,175 @@
+"""
+Queue worker for Workflow A/B jobs
+
+Run next to the API when JOB_BACKEND=queue:
+
+    python -m app.worker --processes 2
+
+Each process claims jobs from the durable queue, heartbeats while a job runs,
+and records the outcome; the project record itself lives in the shared
+project store.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.models.job import JobStatus
+from app.models.project import ProjectStatus
+from app.services.job_queue import DurableJobQueue, get_job_queue
+from app.state.project_store import project_store
+
+logger = logging.getLogger(__name__)
+
+
+def _run_workflow_a(project_id: str, args: Dict[str, Any]) -> None:
+    from app.services.workflow_a import WorkflowA
+
+    asyncio.run(
+        WorkflowA().execute(
+            project_id,
+            args.get("generate_summary", False),
+            args.get("enable_enrichment"),
+        )
+    )
+
+
+def _run_workflow_b(project_id: str, args: Dict[str, Any]) -> None:
+    from app.services.workflow_b import WorkflowB
+
+    asyncio.run(WorkflowB().execute(project_id))
+
+
+JOB_HANDLERS: Dict[str, Callable[[str, Dict[str, Any]], None]] = {
+    "workflow_a": _run_workflow_a,
+    "workflow_b": _run_workflow_b,
+}
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue: DurableJobQueue, job_id: str, worker_id: str, interval: float) -> None:
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id):
+                    logger.warning("Job %s is no longer owned by %s", self.job_id, self.worker_id)
+                    return
+            except Exception:  # noqa: BLE001 - keep heartbeating after transient DB errors
+                logger.exception("Heartbeat for job %s failed", self.job_id)
+
+
+class JobWorker:
+    """Claim and execute queued jobs until stopped."""
+
+    def __init__(
+        self,
+        queue: Optional[DurableJobQueue] = None,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+    ) -> None:
+        self.queue = queue or get_job_queue()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = settings.WORKER_POLL_INTERVAL_SEC if poll_interval is None else poll_interval
+        self.stopping = threading.Event()
+        self.processed = 0
+
+    def run_forever(self) -> None:
+        logger.info("Worker %s started", self.worker_id)
+        while not self.stopping.is_set():
+            if not self.run_once():
+                self.stopping.wait(self.poll_interval)
+        logger.info("Worker %s stopped after %s job(s)", self.worker_id, self.processed)
+
+    def run_once(self) -> bool:
+        """Process at most one job; returns ``False`` when the queue was empty."""
+
+        self.queue.requeue_stale()
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+
+        job_id = job["job_id"]
+        project_id = job["project_id"]
+        payload = job.get("payload") or {}
+        handler = JOB_HANDLERS.get(job["kind"])
+        logger.info("Worker %s running job %s (%s, attempt %s)", self.worker_id, job_id, job["kind"], job["attempts"])
+
+        heartbeat = _Heartbeat(self.queue, job_id, self.worker_id, settings.JOB_HEARTBEAT_SEC)
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            handler(project_id, payload.get("args") or {})
+        except Exception as exc:  # noqa: BLE001 - reported to the queue for retry
+            logger.exception("Job %s failed", job_id)
+            if self.queue.fail(job_id, self.worker_id, str(exc)) == JobStatus.FAILED:
+                project_store.update_fields(
+                    project_id,
+                    {"status": ProjectStatus.FAILED, "error": str(exc), "updated_at": datetime.now().isoformat()},
+                )
+        else:
+            project = project_store.get(project_id) or {}
+            self.queue.complete(job_id, self.worker_id, {"status": project.get("status")})
+        finally:
+            heartbeat.stopped.set()
+            heartbeat.join()
+            self.processed += 1
+        return True
+
+    def stop(self, *_: Any) -> None:
+        self.stopping.set()
+
+
+def _worker_main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    worker = JobWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Process queued Workflow A/B jobs")
+    parser.add_argument("--processes", type=int, default=1, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _worker_main()
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_main, name=f"app-worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def _terminate(*_: Any) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, _terminate)
+    signal.signal(signal.SIGINT, _terminate)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark: single-pass line scanner vs. running every drawing-marker regex.
+
+Collects drawing text from PDFs (``--pdf``, recovered with ``PdfTextRecovery``),
+from plain-text dumps (``--text``) or from a synthetic corpus of drawing-like
+lines, then runs ``DrawingSpecsParser._line_to_spec`` over every line twice:
+with the ``LINE_SCANNER`` prefilter and with all marker families forced on (the
+previous behaviour).  Specifications and pattern hit counters must be
+identical.
+
+    python benchmarks/bench_drawing_scanner.py --pdf data/raw/proj_x/drawings/*.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.parsers.drawing_specs_parser import DrawingSpecsParser  # noqa: E402
+from app.services.pdf_text_recovery import PdfTextRecovery  # noqa: E402
+
+SPEC_LINES = (
+    "Beton C30/37 XC4 XF3 XD3 krytí 50 mm",
+    "Výztuž B500B Ø12@150 při obou površích",
+    "Římsa beton C30/37 XF4 XD3, povrch B, ČSN EN 206+A2",
+    "Pilota Ø1200 beton C25/30 XA2, krytí 75 mm",
+    "Opěra O1 - dřík, vrubový kloub dle TKP 18",
+    "Podkladní beton C12/15 X0 tl. 150 mm",
+    "Ložisko R=2,5 m, niveleta 245,32 m n.m.",
+    "Ocel S355 J2, kotvy M24 dl. 500 mm",
+    "Položka 272-32-500 dle VL4 210.01",
+    "vodostavební beton, mrazuvzdorný, pohledová plocha",
+)
+PLAIN_LINES = (
+    "Investor: Ředitelství silnic a dálnic ČR",
+    "Zhotovitel projektové dokumentace",
+    "Stupeň dokumentace: PDPS",
+    "Vypracoval / Kontroloval / Schválil",
+    "Datum: 03/2024",
+    "Formát: 6xA4",
+    "Změna č. 2 - úprava dle připomínek",
+    "Všechny rozměry jsou uvedeny v metrech",
+    "Souřadnicový systém S-JTSK, výškový systém Bpv",
+    "Poznámky:",
+    "Příčný řez",
+    "Půdorys 1:100",
+    "Číslo přílohy",
+    "Odpovědný projektant Ing. Jan Novák",
+)
+
+
+def synthetic_corpus(lines: int, rng: random.Random) -> list:
+    corpus = []
+    for _ in range(lines):
+        # Title blocks and notes dominate drawing text; specs are a minority.
+        source = SPEC_LINES if rng.random() < 0.25 else PLAIN_LINES
+        corpus.append(rng.choice(source))
+    return corpus
+
+
+def pdf_corpus(paths: list) -> list:
+    recovery = PdfTextRecovery()
+    corpus = []
+    for path in paths:
+        for page in recovery.recover_iter(path):
+            corpus.extend((page.accepted.text or "").splitlines())
+    return corpus
+
+
+def text_corpus(paths: list) -> list:
+    corpus = []
+    for path in paths:
+        corpus.extend(path.read_text(encoding="utf-8", errors="replace").splitlines())
+    return corpus
+
+
+class ExhaustiveParser(DrawingSpecsParser):
+    """Runs every marker family on every line (behaviour before the scanner)."""
+
+    def _scan_line(self, line: str) -> frozenset:
+        return self.LINE_FAMILIES
+
+
+def run(parser: DrawingSpecsParser, lines: list, rounds: int):
+    best = float("inf")
+    for _ in range(rounds):
+        pattern_hits = parser._empty_pattern_hits()
+        started = time.perf_counter()
+        specs = [parser._line_to_spec("bench.pdf", 1, line, pattern_hits) for line in lines]
+        best = min(best, time.perf_counter() - started)
+    return best, specs, pattern_hits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", type=Path, nargs="*", default=[], help="drawing PDFs to recover text from")
+    parser.add_argument("--text", type=Path, nargs="*", default=[], help="plain-text drawing dumps")
+    parser.add_argument("--lines", type=int, default=50000, help="synthetic corpus size")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.pdf or args.text:
+        corpus = pdf_corpus(args.pdf) + text_corpus(args.text)
+    else:
+        corpus = synthetic_corpus(args.lines, random.Random(args.seed))
+    # Same filtering as DrawingSpecsParser._parse_single_pdf.
+    lines = [line.strip() for line in corpus if len(line.strip()) >= 6]
+    print(f"corpus: {len(lines)} lines")
+
+    scanner = DrawingSpecsParser(text_recovery=object())
+    exhaustive = ExhaustiveParser(text_recovery=object())
+    scan_elapsed, scan_specs, scan_hits = run(scanner, lines, args.rounds)
+    full_elapsed, full_specs, full_hits = run(exhaustive, lines, args.rounds)
+
+    mismatches = sum(
+        1
+        for got, want in zip(scan_specs, full_specs)
+        if (got.to_dict() if got else None) != (want.to_dict() if want else None)
+    )
+    found = sum(1 for spec in scan_specs if spec)
+    print(f"specifications: {found}")
+    print(f"scanner:    {scan_elapsed:7.3f}s, {scan_elapsed / max(len(lines), 1) * 1e6:.1f} µs/line")
+    print(f"all regexes: {full_elapsed:6.3f}s, {full_elapsed / max(len(lines), 1) * 1e6:.1f} µs/line")
+    print(f"speedup:    {full_elapsed / scan_elapsed:.1f}x")
+    equivalent = not mismatches and scan_hits == full_hits
+    print(f"equivalence: {'OK' if equivalent else f'{mismatches} spec MISMATCHES, hits {scan_hits} vs {full_hits}'}")
+    return 0 if equivalent else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Benchmark: streaming xlsxwriter export vs. in-memory openpyxl workbook.
+
+Caches a synthetic audit of ``--positions`` rows in a temporary ``DATA_DIR``,
+then exports it with ``AuditExcelExporter`` (constant-memory, rows streamed
+from the cache pages) and with the previous openpyxl approach (full workbook
+in memory, per-cell style objects).  Reports wall time and the Python heap
+peak of each (``tracemalloc``), plus the time of a repeated, cached export.
+
+    python benchmarks/bench_excel_export.py --positions 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import openpyxl  # noqa: E402
+from openpyxl.styles import Alignment, Font, PatternFill  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services import project_cache  # noqa: E402
+from app.utils.excel_exporter import POSITION_HEADERS, AuditExcelExporter  # noqa: E402
+
+WORDS = "beton bednění výztuž výkop zásyp izolace obrubník potrubí štěrkodrť asfaltový mostní římsa".split()
+CLASSES = ("GREEN", "AMBER", "RED")
+
+
+def synthetic_audit(count: int, rng: random.Random) -> dict:
+    positions = [
+        {
+            "position_id": str(index + 1),
+            "code": f"{rng.randint(100000, 999999)}",
+            "description": " ".join(rng.sample(WORDS, rng.randint(3, 8))),
+            "unit": rng.choice(("m3", "m2", "t", "kus")),
+            "quantity": round(rng.uniform(0, 500), 3),
+            "section": f"SO {rng.randint(1, 20):02d}",
+            "classification": rng.choice(CLASSES),
+            "notes": "Shoda s katalogem" if rng.random() < 0.5 else "",
+            "enrichment": {"match": "partial", "evidence": ["x" * 40]},
+        }
+        for index in range(count)
+    ]
+    totals = {name.lower(): sum(1 for item in positions if item["classification"] == name) for name in CLASSES}
+    return {"total_positions": count, **totals, "positions": positions, "audit": totals}
+
+
+def openpyxl_export(audit: dict, path: Path) -> None:
+    """The previous exporter: in-memory workbook, style objects per cell."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Positions"
+    header_fill = PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid")
+    fills = {name: PatternFill(start_color=color, end_color=color, fill_type="solid")
+             for name, color in (("GREEN", "C6EFCE"), ("AMBER", "FFEB9C"), ("RED", "FFC7CE"))}
+    for column, title in enumerate(POSITION_HEADERS, start=1):
+        cell = sheet.cell(row=1, column=column)
+        cell.value = title
+        cell.font = Font(bold=True)
+        cell.fill = header_fill
+    for row, position in enumerate(audit["positions"], start=2):
+        for column, key in enumerate(("position_id", "code", "description", "unit", "quantity", "section"), start=1):
+            sheet.cell(row=row, column=column).value = position.get(key)
+        sheet.cell(row=row, column=7).value = position["classification"]
+        sheet.cell(row=row, column=7).fill = fills[position["classification"]]
+        sheet.cell(row=row, column=8).value = position["notes"]
+        sheet.cell(row=row, column=8).alignment = Alignment(wrap_text=True, vertical="top")
+    workbook.save(path)
+
+
+def measure(label: str, func) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {elapsed:8.2f}s   heap peak {peak / 2**20:8.1f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-openpyxl", action="store_true", help="only run the streaming exporter")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATA_DIR = Path(tmp)
+        audit = synthetic_audit(args.positions, random.Random(args.seed))
+        project_cache.save_project_cache("bench", {"audit_results": audit})
+        project = {"project_id": "bench", "project_name": "Benchmark", "workflow": "A", "audit_results": audit}
+        del audit["positions"]  # the exporter reads positions from the cache pages
+        exporter = AuditExcelExporter()
+
+        print(f"positions: {args.positions}")
+        measure("xlsxwriter (streaming)", lambda: exporter.export_sync(project))
+        measure("xlsxwriter (cached)", lambda: exporter.export_sync(project))
+        if not args.skip_openpyxl:
+            audit["positions"] = list(project_cache.iter_cached_positions("bench"))
+            measure("openpyxl (in memory)", lambda: openpyxl_export(audit, Path(tmp) / "openpyxl.xlsx"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
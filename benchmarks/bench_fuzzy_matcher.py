@@ -0,0 +1,139 @@
+"""Benchmark: pruned fuzzy matcher vs. linear SequenceMatcher scan.
+
+Builds the shared catalog index from an OTSKP export (``--catalog``) or from a
+synthetic catalog of OTSKP size, generates an estimate of ``--positions``
+descriptions and compares ``FuzzyDescriptionIndex.top_matches`` with the
+previous linear scan.  Equivalence is asserted on a ``--verify`` sample (the
+linear scan is too slow to run on the whole estimate); its total time is
+extrapolated from the sample.
+
+    python benchmarks/bench_fuzzy_matcher.py --catalog data/2025_03_otskp.xml
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import types
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.catalog_index import CatalogIndex, normalise_unit  # noqa: E402
+from app.core.normalization import normalize_text  # noqa: E402
+from app.parsers.otskp_catalog import read_catalog_records  # noqa: E402
+
+WORDS = (
+    "beton železobeton prostý základové pasy desky stěny sloupy překlady schodiště mostní opěry "
+    "pilíře římsy bednění zřízení odstranění výztuž z oceli B500B sítě svařované výkop jam rýh "
+    "hornina třídy těžitelnosti I II III odvoz zeminy uložení na skládku zásyp hutnění štěrkodrť "
+    "podkladní vrstvy asfaltový beton ACO 11 ACL 16 obrusná ložná frézování izolace proti vodě "
+    "nátěr penetrační geotextilie drenáž potrubí PVC DN 150 200 300 chránička obrubník silniční"
+).split()
+CLASSES = ["C12/15", "C16/20", "C20/25", "C25/30", "C30/37", "C35/45"]
+EXPOSURES = ["XC1", "XC2", "XC4", "XF2", "XF4", "XD3", "XA2"]
+UNITS = ["M3", "M2", "M", "T", "KUS", "KG"]
+
+
+def synthetic_catalog(size: int, rng: random.Random) -> dict:
+    catalog = {}
+    for number in range(size):
+        words = rng.sample(WORDS, rng.randint(3, 9))
+        if rng.random() < 0.4:
+            words.insert(rng.randint(0, len(words)), f"{rng.choice(CLASSES)} {rng.choice(EXPOSURES)}")
+        code = f"{100000 + number * 7}"
+        catalog[code] = {"code": code, "name": " ".join(words), "unit": rng.choice(UNITS), "tech_spec": ""}
+    return catalog
+
+
+def catalog_from_file(path: Path) -> dict:
+    catalog = {}
+    for record in read_catalog_records(path):
+        if record.get("code"):
+            catalog.setdefault(record["code"], record)
+    return catalog
+
+
+def estimate(catalog: dict, count: int, rng: random.Random) -> list:
+    entries = list(catalog.values())
+    positions = []
+    for _ in range(count):
+        entry = rng.choice(entries)
+        words = str(entry.get("name") or "").split()
+        roll = rng.random()
+        if roll < 0.5 and words:
+            # Slightly edited catalog description (typical estimate wording).
+            words = words[:]
+            for _ in range(rng.randint(0, 2)):
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+            description = " ".join(words)
+        else:
+            description = " ".join(rng.sample(WORDS, rng.randint(2, 8)))
+        unit = entry.get("unit") if rng.random() < 0.9 else ""
+        positions.append((description, unit))
+    return positions
+
+
+def linear_scan(index: CatalogIndex, description: str, unit: str):
+    text = normalize_text(description)
+    if not text:
+        return []
+    candidates = index.by_unit.get(normalise_unit(unit), index.records)
+    matches = []
+    for entry in candidates:
+        ratio = SequenceMatcher(None, text, entry.normalized_text).ratio()
+        if ratio >= 0.70:
+            matches.append((ratio, entry))
+    matches.sort(key=lambda item: item[0], reverse=True)
+    return matches[:3]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog", type=Path, help="OTSKP XML export (default: synthetic catalog)")
+    parser.add_argument("--catalog-size", type=int, default=17000)
+    parser.add_argument("--positions", type=int, default=10000)
+    parser.add_argument("--verify", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = catalog_from_file(args.catalog) if args.catalog else synthetic_catalog(args.catalog_size, rng)
+    started = time.perf_counter()
+    index = CatalogIndex.build(types.SimpleNamespace(kb_b1={"otskp": catalog}))
+    fuzzy = index.fuzzy
+    print(f"catalog: {len(index.records)} records, index built in {time.perf_counter() - started:.2f}s")
+
+    positions = estimate(catalog, args.positions, rng)
+
+    started = time.perf_counter()
+    indexed = [
+        fuzzy.top_matches(normalize_text(description), normalise_unit(unit)) if normalize_text(description) else []
+        for description, unit in positions
+    ]
+    indexed_elapsed = time.perf_counter() - started
+
+    sample = positions[: args.verify]
+    started = time.perf_counter()
+    expected = [linear_scan(index, description, unit) for description, unit in sample]
+    linear_elapsed = time.perf_counter() - started
+
+    mismatches = sum(1 for got, want in zip(indexed, expected) if got != want)
+    matched = sum(1 for result in indexed if result)
+    linear_total = linear_elapsed / max(len(sample), 1) * len(positions)
+
+    print(f"positions: {len(positions)} ({matched} with fuzzy candidates)")
+    print(f"indexed:   {indexed_elapsed:8.2f}s total, {indexed_elapsed / len(positions) * 1000:.2f} ms/position")
+    print(
+        f"linear:    {linear_total:8.2f}s total (extrapolated from {len(sample)}), "
+        f"{linear_elapsed / max(len(sample), 1) * 1000:.2f} ms/position"
+    )
+    print(f"speedup:   {linear_total / indexed_elapsed:.1f}x")
+    print(f"equivalence on {len(sample)} positions: {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+"""Benchmark: column-wise Czech number/code parsing vs. per-cell replace chains.
+
+Builds synthetic estimate columns (quantities, prices with currency marks,
+OTSKP codes) of ``--rows`` cells each and converts them three ways:
+
+* ``per-cell`` — the replace/strip chain the parsers used to apply per cell;
+* ``parse_number`` — the shared rules applied per cell;
+* ``parse_numbers`` — one vectorised pass per column (current behaviour).
+
+Columns with dot-decimal or dot-thousands cells are where the old chain and
+the shared rules disagree; the run reports how many cells differ.
+
+    python benchmarks/bench_number_parsing.py --rows 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.number_parsing import parse_code, parse_codes, parse_number, parse_numbers  # noqa: E402
+
+
+def per_cell_chain(value):
+    # Previous OTSKPEstimateNormalizer._parse_number.
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace("\xa0", " ")
+    if text in {"", "-", "–", "—"}:
+        return None
+    cleaned = text.replace(" ", "").replace(".", "").replace(",", ".")
+    cleaned = re.sub(r"(?i)kč|czk|eur|€", "", cleaned)
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def synthetic_columns(rows: int, rng: random.Random):
+    def czech(value: float, decimals: int) -> str:
+        whole, _, fraction = f"{value:,.{decimals}f}".partition(".")
+        separator = rng.choice((" ", "\xa0", "."))
+        return whole.replace(",", separator) + ("," + fraction if fraction else "")
+
+    quantities = [
+        rng.choice((czech(rng.uniform(0, 5000), 3), round(rng.uniform(0, 5000), 3), "-", ""))
+        for _ in range(rows)
+    ]
+    prices = [
+        czech(rng.uniform(1, 250000), 2) + rng.choice(("", " Kč", " CZK", ",-")) if rng.random() < 0.9 else "–"
+        for _ in range(rows)
+    ]
+    codes = [
+        rng.choice((f"{rng.randint(100000, 999999)}", f"{rng.randint(1000, 99999)}.r", f" {rng.randint(100, 999)} 325"))
+        for _ in range(rows)
+    ]
+    return {"quantity": quantities, "unit_price": prices}, codes
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    columns, codes = synthetic_columns(args.rows, random.Random(args.seed))
+    for name, cells in columns.items():
+        chained, chain_time = timed(lambda: [per_cell_chain(cell) for cell in cells])
+        single, single_time = timed(lambda: [parse_number(cell) for cell in cells])
+        batch, batch_time = timed(parse_numbers, cells)
+        status = "OK" if batch == single else "MISMATCHES"
+        differ = sum(1 for old, new in zip(chained, batch) if old != new)
+        print(
+            f"{name:<11} per-cell {chain_time:6.3f}s  parse_number {single_time:6.3f}s  "
+            f"parse_numbers {batch_time:6.3f}s  ({chain_time / batch_time:4.1f}x)  {status}; "
+            f"{differ} cells differ from the per-cell chain"
+        )
+
+    single, single_time = timed(lambda: [parse_code(cell) for cell in codes])
+    batch, batch_time = timed(parse_codes, codes)
+    status = "OK" if batch == single else "MISMATCHES"
+    print(f"{'code':<11} parse_code {single_time:6.3f}s  parse_codes {batch_time:6.3f}s  {status}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
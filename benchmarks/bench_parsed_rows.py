@@ -0,0 +1,124 @@
+"""Benchmark: compact ``ParsedRow`` rows vs. per-row dicts between parser and normaliser.
+
+Parses a KROS Excel export (``--file``) or a synthetic one of ``--rows`` rows
+with ``ExcelParser`` in a child process per mode and reports the peak RSS of
+each child:
+
+* ``compact`` — rows reach ``normalize_positions`` as ``ParsedRow`` objects
+  sharing one ``RowSchema`` per header block (current behaviour);
+* ``dict`` — every row is materialised as the previous raw dict (own header
+  map copy, raw value list, source string) before normalisation.
+
+It also reports the heap held by the raw rows alone (``tracemalloc``).
+
+    python benchmarks/bench_parsed_rows.py --file export_kros.xlsx
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import openpyxl  # noqa: E402
+
+from app.parsers import excel_parser  # noqa: E402
+from app.parsers.excel_parser import ExcelParser  # noqa: E402
+
+HEADERS = (
+    "Č.", "Typ", "Kód", "Popis", "MJ", "Množství", "J.cena [CZK]", "Cena celkem [CZK]",
+    "Cenová soustava", "Hmotnost [t]", "Hmotnost celkem [t]", "Sazba DPH", "Poznámka k položce",
+)
+WORDS = "beton bednění výztuž výkop zásyp izolace obrubník potrubí štěrkodrť asfaltový mostní římsa".split()
+
+
+def synthetic_export(path: Path, rows: int, rng: random.Random) -> None:
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Rozpočet")
+    sheet.append(["Stavba: D1 modernizace, SO 201 Most"])
+    sheet.append(list(HEADERS))
+    for index in range(rows):
+        quantity = round(rng.uniform(0.1, 500), 3)
+        price = round(rng.uniform(10, 5000), 2)
+        sheet.append([
+            index + 1, "K", f"{rng.randint(100000, 999999)}", " ".join(rng.sample(WORDS, rng.randint(3, 8))),
+            rng.choice(("m3", "m2", "t", "kus")), quantity, price, round(quantity * price, 2),
+            "CS ÚRS 2024 01", round(rng.uniform(0, 3), 5), round(rng.uniform(0, 30), 5), "21%", "",
+        ])
+    workbook.save(path)
+
+
+def run_child(path: Path, mode: str) -> None:
+    logging.disable(logging.WARNING)
+    if mode == "dict":
+        normalize = excel_parser.normalize_positions
+
+        def normalize_dicts(positions, return_stats=False):
+            return normalize([row.to_dict() for row in positions], return_stats=return_stats)
+
+        excel_parser.normalize_positions = normalize_dicts
+
+    started = time.perf_counter()
+    result = ExcelParser().parse(path)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(f"{mode:<8} {len(result['positions']):>7} positions {elapsed:7.2f}s   peak RSS {peak:7.1f} MiB")
+
+
+def raw_row_heap(path: Path) -> None:
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[workbook.sheetnames[0]]
+        rows, _ = ExcelParser()._parse_sheet(sheet, sheet.title)
+    finally:
+        workbook.close()
+
+    tracemalloc.start()
+    dicts = [row.to_dict() for row in rows]
+    extra, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dicts
+
+    tracemalloc.start()
+    snapshot = [type(row)(row.schema, row.row_index, tuple(row.values)) for row in rows]
+    compact, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshot
+    print(f"raw rows: {len(rows)}; ParsedRow containers {compact / 2**20:.1f} MiB, "
+          f"dict form adds {extra / 2**20:.1f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", type=Path, help="KROS Excel export (default: synthetic)")
+    parser.add_argument("--rows", type=int, default=30000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", choices=("compact", "dict"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.file, args.child)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = Path(tmp) / "kros_export.xlsx"
+            synthetic_export(path, args.rows, random.Random(args.seed))
+        print(f"file: {path.name} ({path.stat().st_size / 2**20:.1f} MiB)")
+        for mode in ("compact", "dict"):
+            subprocess.run([sys.executable, __file__, "--file", str(path), "--child", mode], check=True)
+        raw_row_heap(path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
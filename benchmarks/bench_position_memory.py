@@ -0,0 +1,118 @@
+"""Benchmark: peak RSS of the Workflow A position stages for a large estimate.
+
+Builds ``--positions`` synthetic parsed positions (default 50 000, as a
+parser would return them) and runs schema validation → enrichment →
+validation → audit classification → audit payload in a child process per
+mode, reporting each child's peak RSS:
+
+* ``streamed`` — the generator stages of ``WorkflowA`` (current behaviour):
+  raw rows are drained into ``PositionValidator.iter_validate``, the
+  validated list is drained chunk by chunk through
+  ``PositionPipeline.iter_chunks`` and only the audit entries are kept;
+* ``materialised`` — every stage builds its full list as before: the raw rows
+  stay alive, the pipeline result list is collected and the audit entries
+  are copied from it.
+
+    python benchmarks/bench_position_memory.py --positions 50000
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.audit_classifier import AuditClassifier  # noqa: E402
+from app.services.position_enricher import PositionEnricher  # noqa: E402
+from app.services.position_pipeline import PositionPipeline  # noqa: E402
+from app.services.specifications_validator import SpecificationsValidator  # noqa: E402
+from app.services.workflow_a import WorkflowA, _drain, _normalize_audit_positions  # noqa: E402
+from app.validators import PositionValidator  # noqa: E402
+
+WORDS = "beton bednění výztuž výkop zásyp izolace obrubník potrubí štěrkodrť asfaltový mostní římsa".split()
+
+
+def synthetic_positions(count: int, rng: random.Random) -> list:
+    positions = []
+    for index in range(count):
+        quantity = round(rng.uniform(0.1, 500), 3)
+        price = round(rng.uniform(10, 5000), 2)
+        positions.append({
+            "position_number": str(index + 1),
+            "code": f"{rng.randint(100000, 999999)}",
+            "description": " ".join(rng.sample(WORDS, rng.randint(3, 8))) + f" {index}",
+            "unit": rng.choice(("M3", "M2", "T", "KUS")),
+            "quantity": quantity,
+            "unit_price": price,
+            "total_price": round(quantity * price, 2),
+            "source_ref": f"Rozpočet!A{index + 3}",
+            "sheet_name": "Rozpočet",
+        })
+    return positions
+
+
+def audit_payload(positions: list, pipeline_result, schema_stats: dict) -> dict:
+    return WorkflowA._build_audit_payload(
+        None,  # type: ignore[arg-type]
+        positions,
+        pipeline_result.enrichment_stats,
+        pipeline_result.validation_stats,
+        pipeline_result.audit_stats,
+        schema_stats,
+    )
+
+
+def run_child(count: int, seed: int, mode: str) -> None:
+    logging.disable(logging.WARNING)
+    raw = synthetic_positions(count, random.Random(seed))
+    pipeline = PositionPipeline(PositionEnricher(), SpecificationsValidator(), AuditClassifier())
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+    started = time.perf_counter()
+    if mode == "streamed":
+        schema_result = PositionValidator().validate(_drain(raw))
+        result = pipeline.new_result()
+        entries = []
+        for chunk in pipeline.iter_chunks(_drain(schema_result.positions), [], result):
+            entries.extend(_normalize_audit_positions(chunk))
+    else:
+        schema_result = PositionValidator().validate(raw)
+        result = pipeline.run(schema_result.positions, [])
+        entries = _normalize_audit_positions([dict(position) for position in result.positions])
+    payload = audit_payload(entries, result, schema_result.stats)
+    elapsed = time.perf_counter() - started
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{mode:<12} {payload['total_positions']:>7} positions {elapsed:7.2f}s   "
+        f"peak RSS {peak:7.1f} MiB (+{peak - baseline:.1f} MiB over the parsed input)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", choices=("streamed", "materialised"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.positions, args.seed, args.child)
+        return 0
+
+    for mode in ("streamed", "materialised"):
+        subprocess.run(
+            [sys.executable, __file__, "--positions", str(args.positions), "--seed", str(args.seed), "--child", mode],
+            check=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
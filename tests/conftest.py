@@ -0,0 +1,8 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Keep the project store and job queue of the test run out of data/.
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='concrete-agent-tests-')) / 'test.db'}"
+)
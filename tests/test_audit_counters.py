@@ -15,7 +15,7 @@ def test_project_store_counters_follow_audit(tmp_path):
 
     project_id = "counter-sync-test"
     audit_payload = {
-        "positions": [],
+        "positions": [{"code": "272325", "classification": "AMBER"}],
         "total_positions": 10,
         "enrichment_stats": {"matched": 0, "partial": 3},
         "validation_stats": {"warning": 2, "failed": 1},
@@ -48,5 +48,7 @@ def test_project_store_counters_follow_audit(tmp_path):
     }
     assert project["diagnostics"]["audit"] == {"green": 0, "amber": 47, "red": 6}
     assert project["audit_results"]["audit"] == {"green": 0, "amber": 47, "red": 6}
+    # Positions are served from the paged project cache, not the record.
+    assert "positions" not in project["audit_results"]
 
     project_store.clear()
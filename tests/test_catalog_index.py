@@ -0,0 +1,76 @@
+import pickle
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.catalog_index import get_catalog_index, registered_index
+from app.services.position_enricher import PositionEnricher
+
+
+def _loader() -> types.SimpleNamespace:
+    shared = {"code": "272-325", "name": "Základy C30/37 XC2", "unit": "m3", "tech_spec": ""}
+    return types.SimpleNamespace(
+        kb_b1={
+            "otskp": {"272-325": shared, "272325": shared},
+            "urs": {
+                "272-325": {"code": "272-325", "name": "Duplicate in ÚRS", "unit": "m3"},
+                "111": {"code": "111", "name": "Výkop", "unit": "m 3"},
+            },
+            "rts": {},
+        },
+        data={
+            "B1_otkskp_codes": {
+                "a.xml": [{"code": "272-325", "name": "Old", "unit": " M3 ", "unit_price": "1"}],
+                "b.xml": [{"znacka": "272325", "nazev": "New", "MJ": "m3", "jedn_cena": "2"}],
+            }
+        },
+    )
+
+
+def test_index_deduplicates_codes_across_catalogs() -> None:
+    index = get_catalog_index(_loader())
+
+    assert [(record.code, record.catalog) for record in index.records] == [
+        ("272-325", "OTSKP"),
+        ("111", "URS"),
+    ]
+    assert index.by_code["272325"].description == "Základy C30/37 XC2"
+    assert index.by_code["272325"].entities["concretes"] == frozenset({"C30/37"})
+    assert [record.code for record in index.by_unit["m3"]] == ["272-325", "111"]
+    assert index.otskp_lookup["272325"] == {"name": "New", "unit": "m3", "unit_price": "2"}
+
+
+def test_index_is_built_once_per_loader_and_shared() -> None:
+    loader = _loader()
+    first = PositionEnricher(enabled=True, kb_loader=loader)
+    second = PositionEnricher(enabled=True, kb_loader=loader)
+
+    assert get_catalog_index(loader) is get_catalog_index(loader)
+    assert first._entries is second._entries
+    assert first._code_index is second._code_index
+
+    successor = _loader()
+    assert get_catalog_index(successor) is not get_catalog_index(loader)
+
+
+def test_enricher_pickles_its_index_as_a_generation_token(monkeypatch) -> None:
+    loader = _loader()
+    enricher = PositionEnricher(enabled=True, kb_loader=loader)
+    index = get_catalog_index(loader)
+
+    def _no_kb_load():
+        raise AssertionError("the KB must not be reloaded on unpickling")
+
+    monkeypatch.setattr("app.services.position_enricher.get_knowledge_base", _no_kb_load)
+    payload = pickle.dumps(enricher)
+    assert len(payload) < len(pickle.dumps(index))
+
+    clone = pickle.loads(payload)
+    assert clone.catalog_index is index
+    assert registered_index(index.token) is index
+
+    copy = pickle.loads(pickle.dumps(index))
+    assert copy is index
+    assert [record.entities for record in copy.records] == [record.entities for record in index.records]
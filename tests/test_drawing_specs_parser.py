@@ -0,0 +1,64 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.parsers.drawing_specs_parser import DrawingSpecsParser
+
+LINES = [
+    "Beton C30/37 XC4 XF3 XD3 krytí 50 mm",
+    "Výztuž B500B Ø12@150 při obou površích",
+    "Římsa beton C30/37 XF4 XD3, povrch B, ČSN EN 206+A2",
+    "PILOTA ⌀1200 BETON C25/30 XA2, KRYTÍ 75/60 MM",
+    "Opěra O1 - dřík, vrubový kloub dle TKP 18",
+    "Ložisko R=2,5 m, niveleta 245,32 m n.m., R 12",
+    "Ocel S355 J2, položka 272-32-500 dle VL4 210.01",
+    "vodostavební beton, mrazuvzdorný",
+    "Investor: Ředitelství silnic a dálnic ČR",
+    "Stupeň dokumentace: PDPS",
+]
+
+
+class _ExhaustiveParser(DrawingSpecsParser):
+    def _scan_line(self, line: str) -> frozenset:
+        return self.LINE_FAMILIES
+
+
+def _random_lines(count: int) -> list:
+    rng = random.Random(7)
+    pieces = list("CcBbSsXxRrKkAaDdEeTtVvØ⌀@=/-., 0123456789Ččř") + [
+        "C30/37", "B500B", "XC4", "krytí ", "mm", "ČSN EN ", "TKP ", "TP ", "VL4 ", "pilota", "Opěra",
+        "Římsa", "rims", "kloub", "nivelety", "vrubový", "beton", "R=", "272-32-500", " a ",
+    ]
+    return ["".join(rng.choice(pieces) for _ in range(rng.randint(1, 20))) for _ in range(count)]
+
+
+def test_scanner_gives_the_same_specs_as_running_every_pattern() -> None:
+    parser = DrawingSpecsParser(text_recovery=object())
+    exhaustive = _ExhaustiveParser(text_recovery=object())
+    hits = parser._empty_pattern_hits()
+    expected_hits = parser._empty_pattern_hits()
+
+    for line in LINES + _random_lines(3000):
+        spec = parser._line_to_spec("d.pdf", 1, line, hits)
+        expected = exhaustive._line_to_spec("d.pdf", 1, line, expected_hits)
+        assert (spec.to_dict() if spec else None) == (expected.to_dict() if expected else None), line
+
+    assert hits == expected_hits
+    assert all(expected_hits.values())
+
+
+def test_lines_without_markers_skip_detailed_extraction(monkeypatch) -> None:
+    parser = DrawingSpecsParser(text_recovery=object())
+    hits = parser._empty_pattern_hits()
+
+    def fail(text):
+        raise AssertionError("collector called for a line without markers")
+
+    monkeypatch.setattr(parser, "_collect_geometry_tokens", fail)
+    monkeypatch.setattr(parser, "_collect_bridge_tokens", fail)
+
+    assert parser._line_to_spec("d.pdf", 1, "Zhotovitel projektové dokumentace", hits) is None
+    assert not any(hits.values())
+    assert parser._scan_line("Výztuž B500B Ø12@150") == {"steel", "numeric"}
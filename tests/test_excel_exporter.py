@@ -0,0 +1,108 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import project_cache
+from app.utils import excel_exporter
+from app.utils.excel_exporter import AuditExcelExporter
+
+
+@pytest.fixture()
+def data_dir(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "PROJECT_CACHE_PAGE_SIZE", 2)
+    return tmp_path
+
+
+def _audit(count: int, notes: str = "ok") -> dict:
+    positions = [
+        {
+            "position_id": index + 1,
+            "code": f"{index:06d}",
+            "description": "=SUM(A1:A2)" if index == 0 else f"Beton {index}",
+            "unit": "m3",
+            "quantity": index * 1.5,
+            "section": "HSV",
+            "classification": ("GREEN", "AMBER", "RED")[index % 3],
+            "notes": notes,
+        }
+        for index in range(count)
+    ]
+    return {"total_positions": count, "green": 2, "amber": 1, "red": 1, "positions": positions,
+            "audit": {"green": 2, "amber": 1, "red": 1}, "positions_preview": positions[:2]}
+
+
+def _project(audit: dict) -> dict:
+    return {"project_id": "proj_x", "project_name": "Most", "workflow": "A", "enable_enrichment": True,
+            "audit_results": audit}
+
+
+def test_export_streams_cached_positions(data_dir: Path) -> None:
+    audit = _audit(5)
+    project_cache.save_project_cache("proj_x", {"audit_results": audit})
+
+    path = asyncio.run(AuditExcelExporter().export(_project(audit)))
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ["Summary", "Positions"]
+    rows = list(workbook["Positions"].iter_rows(values_only=True))
+    assert rows[0][:3] == ("Position ID", "Code", "Description")
+    assert len(rows) == 6
+    assert rows[1] == (1, "000000", "=SUM(A1:A2)", "m3", 0, "HSV", "GREEN", "ok")
+    assert rows[5][6] == "AMBER"
+    assert workbook["Positions"]["G2"].fill.fgColor.rgb.endswith("C6EFCE")
+    assert workbook["Summary"]["B10"].value == 5
+
+
+def test_export_is_cached_by_audit_version(data_dir: Path, monkeypatch) -> None:
+    audit = _audit(4)
+    project_cache.save_project_cache("proj_x", {"audit_results": audit})
+    exporter = AuditExcelExporter()
+
+    first = exporter.export_sync(_project(audit))
+    first_inode = first.stat().st_ino
+    again = exporter.export_sync(_project(audit))
+    assert again == first and again.stat().st_ino == first_inode  # served, not rewritten
+
+    changed = _audit(4, notes="updated")
+    project_cache.save_project_cache("proj_x", {"audit_results": changed})
+    updated = exporter.export_sync(_project(changed))
+
+    assert updated != first
+    assert first.exists()  # recently served: a download may still be streaming it
+    assert openpyxl.load_workbook(updated)["Positions"]["H2"].value == "updated"
+
+    monkeypatch.setattr(excel_exporter, "EXPORT_RETENTION_SEC", 0)
+    project_cache.save_project_cache("proj_x", {"audit_results": _audit(4, notes="again")})
+    latest = exporter.export_sync(_project(changed))
+    assert latest.exists() and not first.exists() and not updated.exists()
+
+
+def test_totals_and_positions_come_from_the_same_cache_save(data_dir: Path) -> None:
+    stale = _audit(2)
+    audit = _audit(5)
+    project_cache.save_project_cache("proj_x", {"audit_results": audit})
+
+    # The project record still holds the previous run's totals.
+    path = AuditExcelExporter().export_sync(_project(stale))
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook["Summary"]["B10"].value == 5
+    assert len(list(workbook["Positions"].iter_rows(values_only=True))) == 6
+    assert AuditExcelExporter().export_sync(_project(audit)) == path
+
+
+def test_export_without_cache_uses_project_record(data_dir: Path) -> None:
+    legacy = {"summary": {"green": 1, "amber": 0, "red": 0},
+              "preview": [{"id": "P1", "code": "1", "description": "Výkop", "status": "GREEN"}]}
+
+    path = AuditExcelExporter().export_sync(_project(legacy))
+
+    rows = list(openpyxl.load_workbook(path)["Positions"].iter_rows(values_only=True))
+    assert rows[1][:3] == ("P1", "1", "Výkop")
@@ -0,0 +1,112 @@
+import re
+import sys
+import zipfile
+from pathlib import Path
+
+import openpyxl
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.parsers import excel_parser
+from app.parsers.excel_parser import ExcelParser
+from app.utils.position_normalizer import normalize_positions
+
+
+def _estimate(path: Path) -> Path:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Rozpočet"
+    sheet.append(["Stavba: Most přes potok"])
+    sheet.append([])
+    sheet.append(["Kód", "Popis", "MJ", "Množství", "J.cena"])
+    sheet.append(["272325", "Základy z betonu C30/37", "m3", 12, 2900])
+    sheet.append(["411321", "Stropy z betonu C25/30", "m3", "7,684", None])
+    sheet.append(["", "Celkem za oddíl", None, 19.684])
+    sheet.append(["----"])
+    sheet.append(["Položka", "Název", "Jednotka", "Počet"])
+    sheet.append(["1", "Výztuž B500B", "t", 3])
+    sheet.cell(row=12, column=2, value="Odvoz zeminy")
+    sheet.cell(row=12, column=4, value=100)
+    workbook.create_sheet("Prázdný")
+    workbook.save(path)
+    return path
+
+
+def test_rows_are_streamed_from_a_read_only_workbook(tmp_path: Path, monkeypatch) -> None:
+    opened = []
+    load_workbook = openpyxl.load_workbook
+
+    def spy(*args, **kwargs):
+        workbook = load_workbook(*args, **kwargs)
+        opened.append((kwargs, workbook))
+        return workbook
+
+    monkeypatch.setattr(excel_parser.openpyxl, "load_workbook", spy)
+
+    result = ExcelParser().parse(_estimate(tmp_path / "rozpocet.xlsx"))
+
+    kwargs, workbook = opened[0]
+    assert kwargs["read_only"] is True and workbook.read_only
+    assert [position["description"] for position in result["positions"]] == [
+        "Základy z betonu C30/37",
+        "Stropy z betonu C25/30",
+        "Výztuž B500B",
+        "Odvoz zeminy",
+    ]
+    assert result["positions"][1]["quantity"] == 7.684
+
+    summary, empty = result["diagnostics"]["sheet_summaries"]
+    assert [block["row"] for block in summary["header_blocks"]] == [3, 8]
+    assert [(entry["row"], entry["reason"]) for entry in summary["skipped"]] == [
+        (1, "no_active_header"),
+        (2, "empty_row"),
+        (6, "service_keyword"),
+        (7, "separator_row"),
+        (10, "empty_row"),
+        (11, "empty_row"),
+    ]
+    assert summary["summary"]["rows_scanned"] == 12
+    assert empty["reason"] == "Sheet is empty or too small"
+
+
+def test_rows_share_one_schema_per_header_block(tmp_path: Path) -> None:
+    workbook = openpyxl.load_workbook(_estimate(tmp_path / "rozpocet.xlsx"), read_only=True, data_only=True)
+    try:
+        rows, _ = ExcelParser()._parse_sheet(workbook["Rozpočet"], "Rozpočet")
+    finally:
+        workbook.close()
+
+    assert rows[0].schema is rows[1].schema
+    assert rows[2].schema is not rows[0].schema
+    assert rows[0].to_dict() == {
+        "kod": "272325",
+        "popis": "Základy z betonu C30/37",
+        "mj": "m3",
+        "mnozstvi": 12,
+        "j_cena": 2900,
+        "_source": "sheet_Rozpočet_row_4",
+        "_sheet_name": "Rozpočet",
+        "_row_values": ["272325", "Základy z betonu C30/37", "m3", "12", "2900"],
+        "_row_first_value": "272325",
+        "_header_map": {"kod": "Kód", "popis": "Popis", "mj": "MJ", "mnozstvi": "Množství", "j_cena": "J.cena"},
+    }
+    assert normalize_positions(rows, return_stats=True) == normalize_positions(
+        [row.to_dict() for row in rows], return_stats=True
+    )
+
+
+def test_stale_dimension_tag_does_not_truncate_rows(tmp_path: Path) -> None:
+    source = _estimate(tmp_path / "rozpocet.xlsx")
+    truncated = tmp_path / "truncated.xlsx"
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(truncated, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb'<dimension ref="[^"]*" ?/>', b'<dimension ref="A1"/>', data)
+                assert b'<dimension ref="A1"/>' in data
+            dst.writestr(item, data)
+
+    result = ExcelParser().parse(truncated)
+
+    assert len(result["positions"]) == 4
+    assert result["diagnostics"]["sheet_summaries"][0]["summary"]["rows_scanned"] == 12
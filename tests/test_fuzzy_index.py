@@ -0,0 +1,49 @@
+import random
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.fuzzy_index import FuzzyDescriptionIndex
+
+WORDS = [
+    "beton", "zakladova", "deska", "c30/37", "xc2", "vykop", "jam", "zelezobeton",
+    "bednen", "vyztuz", "b500b", "stena", "sloup", "m3", "pas", "izolace", "obklad",
+    "ø16", "piloty", "mostni", "opěra", "tl.", "200", "mm",
+]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 9)))
+
+
+def _brute_force(text, candidates, limit=3, threshold=0.70):
+    matches = []
+    for item, item_text in candidates:
+        ratio = SequenceMatcher(None, text, item_text).ratio()
+        if ratio >= threshold:
+            matches.append((ratio, item))
+    matches.sort(key=lambda entry: entry[0], reverse=True)
+    return matches[:limit]
+
+
+def test_top_matches_equal_linear_scan() -> None:
+    rng = random.Random(7)
+    units = ["m3", "m2", "t", ""]
+    items = list(range(300))
+    texts = [_text(rng) for _ in items]
+    texts[10] = texts[20] = texts[30] = texts[40] = "beton zakladova deska c30/37"
+    item_units = [rng.choice(units) for _ in items]
+    buckets = {}
+    for item, unit in zip(items, item_units):
+        buckets.setdefault(unit, []).append(item)
+
+    index = FuzzyDescriptionIndex(items, texts, buckets)
+
+    queries = [_text(rng) for _ in range(80)] + [texts[5], "beton zakladova deska c30/37", ""]
+    for query in queries:
+        for unit in units + ["kus"]:
+            members = buckets.get(unit, items)
+            expected = _brute_force(query, [(item, texts[item]) for item in members]) if query else []
+            assert index.top_matches(query, unit) == expected, (query, unit)
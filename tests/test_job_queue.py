@@ -0,0 +1,98 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.models.project import ProjectStatus
+from app.services.job_queue import DurableJobQueue
+from app.state.project_store import project_store
+from app.worker import JOB_HANDLERS, JobWorker
+
+
+def _queue(tmp_path: Path) -> DurableJobQueue:
+    return DurableJobQueue(f"sqlite:///{tmp_path / 'jobs.db'}")
+
+
+def test_claim_is_fifo_and_exclusive(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    first = queue.enqueue("proj_a", "workflow_a", {"args": {"generate_summary": True}})
+    time.sleep(0.01)
+    queue.enqueue("proj_b", "workflow_a")
+
+    assert queue.queue_position("proj_a") == 1
+    assert queue.queue_position("proj_b") == 2
+
+    claimed = queue.claim("worker-1")
+    assert claimed["job_id"] == first["job_id"]
+    assert claimed["payload"] == {"args": {"generate_summary": True}}
+    assert claimed["attempts"] == 1
+    assert queue.queue_position("proj_a") is None
+    assert queue.queue_position("proj_b") == 1
+
+    assert not queue.heartbeat(first["job_id"], "worker-2")
+    assert queue.heartbeat(first["job_id"], "worker-1")
+    assert queue.complete(first["job_id"], "worker-1", {"project": {"status": "AUDITED"}})
+    assert queue.result_for_project("proj_a") == {"project": {"status": "AUDITED"}}
+
+    metrics = queue.metrics()
+    assert metrics["queue_depth"] == 1
+    assert metrics["succeeded"] == 1
+    assert metrics["running"] == 0
+
+
+def test_failures_retry_then_fail(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_RETRY_DELAY_SEC", 0.0)
+    queue = _queue(tmp_path)
+    job = queue.enqueue("proj_retry", "workflow_a", max_attempts=2)
+
+    queue.claim("worker-1")
+    assert queue.fail(job["job_id"], "worker-1", "boom") == "queued"
+    queue.claim("worker-1")
+    assert queue.fail(job["job_id"], "worker-1", "boom again") == "failed"
+
+    state = queue.job_for_project("proj_retry")
+    assert state["status"] == "failed"
+    assert state["attempts"] == 2
+    assert state["error"] == "boom again"
+    assert queue.claim("worker-1") is None
+
+
+def test_stale_running_job_is_requeued(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_RETRY_DELAY_SEC", 0.0)
+    queue = _queue(tmp_path)
+    job = queue.enqueue("proj_crash", "workflow_b")
+    queue.claim("crashed-worker")
+
+    assert queue.requeue_stale(stale_after_sec=3600) == 0
+    time.sleep(0.01)
+    assert queue.requeue_stale(stale_after_sec=0) == 1
+
+    reclaimed = queue.claim("worker-2")
+    assert reclaimed["job_id"] == job["job_id"]
+    assert reclaimed["attempts"] == 2
+
+
+def test_worker_runs_handler_and_reports_project(tmp_path: Path, monkeypatch) -> None:
+    queue = _queue(tmp_path)
+    seen = []
+
+    def handler(project_id, args):
+        seen.append((project_id, args))
+        project_store.update_fields(project_id, {"status": ProjectStatus.AUDITED})
+
+    monkeypatch.setitem(JOB_HANDLERS, "workflow_a", handler)
+    project_store["proj_worker"] = {"project_id": "proj_worker", "status": ProjectStatus.UPLOADED}
+    queue.enqueue("proj_worker", "workflow_a", {"args": {"enable_enrichment": False}})
+    worker = JobWorker(queue=queue, worker_id="worker-test", poll_interval=0)
+    try:
+        assert worker.run_once()
+        assert not worker.run_once()
+        assert project_store["proj_worker"]["status"] == ProjectStatus.AUDITED
+    finally:
+        project_store.pop("proj_worker", None)
+
+    assert seen == [("proj_worker", {"enable_enrichment": False})]
+    assert queue.job_for_project("proj_worker")["status"] == "succeeded"
+    assert queue.result_for_project("proj_worker") == {"status": "AUDITED"}
@@ -0,0 +1,62 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.project import ProjectStatus
+from app.services.job_runner import JobRunner
+from app.state.project_store import project_store
+
+
+def test_jobs_queue_beyond_concurrency_limit() -> None:
+    runner = JobRunner(max_concurrent=1)
+    release = threading.Event()
+    started = threading.Event()
+    finished = []
+
+    def blocking() -> None:
+        started.set()
+        release.wait(5)
+
+    async def workflow(project_id: str) -> None:
+        finished.append(project_id)
+
+    try:
+        runner.submit("proj_first", blocking)
+        assert started.wait(5)
+        second = runner.submit("proj_second", workflow, "proj_second")
+        third = runner.submit("proj_third", workflow, "proj_third")
+
+        assert runner.queue_position("proj_first") is None
+        assert runner.queue_position("proj_second") == 1
+        assert runner.queue_position("proj_third") == 2
+        assert runner.stats() == {"max_concurrent": 1, "queued": 2, "running": 1}
+
+        release.set()
+    finally:
+        release.set()
+        runner.shutdown(wait=True, cancel_pending=False)
+
+    assert finished == ["proj_second", "proj_third"]
+    assert second.status == third.status == "succeeded"
+    assert runner.queue_position("proj_third") is None
+
+
+def test_failed_job_marks_project_failed() -> None:
+    project_store["proj_job_fail"] = {"status": ProjectStatus.PROCESSING}
+    runner = JobRunner(max_concurrent=1)
+
+    def explode() -> None:
+        raise RuntimeError("parser crashed")
+
+    try:
+        job = runner.submit("proj_job_fail", explode)
+        runner.shutdown(wait=True, cancel_pending=False)
+
+        assert job.status == "failed"
+        assert job.error == "parser crashed"
+        assert project_store["proj_job_fail"]["status"] == ProjectStatus.FAILED
+        assert runner.job_for_project("proj_job_fail") is job
+    finally:
+        project_store.pop("proj_job_fail", None)
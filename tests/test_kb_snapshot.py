@@ -0,0 +1,209 @@
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.kb_loader import KnowledgeBaseLoader
+from app.core.kb_snapshot import KnowledgeBaseSnapshot, LazyCategoryMap
+
+OTSKP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Cenik>
+  <Polozky>
+    <Polozka>
+      <znacka>272325</znacka>
+      <nazev>Základy ze železobetonu C30/37</nazev>
+      <MJ>m3</MJ>
+      <jedn_cena>4200</jedn_cena>
+    </Polozka>
+    <Polozka>
+      <znacka>0123</znacka>
+      <nazev>Výkop</nazev>
+      <MJ>m3</MJ>
+    </Polozka>
+  </Polozky>
+</Cenik>
+"""
+
+
+@pytest.fixture()
+def kb_dir(tmp_path: Path) -> Path:
+    root = tmp_path / "kb"
+    otskp = root / "B1_otkskp_codes"
+    otskp.mkdir(parents=True)
+    (otskp / "otskp.xml").write_text(OTSKP_XML, encoding="utf-8")
+    (otskp / "metadata.json").write_text(json.dumps({"version": "1.0"}), encoding="utf-8")
+    prices = root / "B3_current_prices"
+    prices.mkdir()
+    (prices / "market_prices_2025.json").write_text(
+        json.dumps({"materials": {"beton": {"C30/37": {"price_per_m3": 2900}}}}),
+        encoding="utf-8",
+    )
+    return root
+
+
+def _load(kb_dir: Path, snapshot_dir: Path) -> KnowledgeBaseLoader:
+    loader = KnowledgeBaseLoader(kb_dir, snapshot_dir=snapshot_dir)
+    loader.load_all()
+    return loader
+
+
+def test_snapshot_is_built_then_reused(kb_dir: Path, tmp_path: Path) -> None:
+    snapshot_dir = tmp_path / "snapshot"
+
+    cold = _load(kb_dir, snapshot_dir)
+    assert cold.load_stats["path"] == "rebuilt"
+    assert cold.load_stats["reason"] == "missing"
+
+    warm = _load(kb_dir, snapshot_dir)
+    assert warm.load_stats["path"] == "snapshot"
+    assert isinstance(warm.data, LazyCategoryMap)
+    assert not warm.data.is_loaded("B1_otkskp_codes")
+    assert warm.category_sizes() == cold.category_sizes()
+
+    assert warm.get_current_prices("beton") == cold.get_current_prices("beton")
+    assert warm.data["B1_otkskp_codes"] == cold.data["B1_otkskp_codes"]
+    assert warm.metadata == cold.metadata
+    assert warm.kb_b1 == cold.kb_b1
+    # Aliases keep pointing at the same record after the round trip.
+    assert warm.kb_b1["otskp"]["0123"] is warm.kb_b1["otskp"]["123"]
+
+
+def test_snapshot_survives_touch_but_not_content_change(kb_dir: Path, tmp_path: Path) -> None:
+    snapshot_dir = tmp_path / "snapshot"
+    _load(kb_dir, snapshot_dir)
+
+    source = kb_dir / "B1_otkskp_codes" / "otskp.xml"
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+    assert _load(kb_dir, snapshot_dir).load_stats["path"] == "snapshot"
+
+    source.write_text(OTSKP_XML.replace("Výkop", "Výkop zeminy"), encoding="utf-8")
+    reloaded = _load(kb_dir, snapshot_dir)
+    assert reloaded.load_stats["path"] == "rebuilt"
+    assert reloaded.load_stats["reason"] == "sources_changed"
+    assert reloaded.kb_b1["otskp"]["0123"]["name"] == "Výkop zeminy"
+
+
+def test_warm_start_matches_cold_start_for_excel_dates(kb_dir: Path, tmp_path: Path) -> None:
+    benchmarks = kb_dir / "B4_production_benchmarks"
+    benchmarks.mkdir()
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Činnost", "Výkon", "Platnost od"])
+    workbook.active.append(["Betonáž", 25, datetime(2025, 3, 1)])
+    workbook.active.append(["Bednění", 12, datetime(2025, 4, 15, 7, 30)])
+    workbook.save(benchmarks / "vykony.xlsx")
+    snapshot_dir = tmp_path / "snapshot"
+
+    cold = _load(kb_dir, snapshot_dir)
+    warm = _load(kb_dir, snapshot_dir)
+
+    assert warm.load_stats["path"] == "snapshot"
+    cold_rows = cold.data["B4_production_benchmarks"]["vykony.xlsx"]["Sheet"]
+    warm_rows = warm.data["B4_production_benchmarks"]["vykony.xlsx"]["Sheet"]
+    assert warm_rows == cold_rows
+    assert type(warm_rows[1]["Platnost od"]) is type(cold_rows[1]["Platnost od"])
+
+
+def test_parser_version_bump_invalidates_snapshot(
+    kb_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    snapshot_dir = tmp_path / "snapshot"
+    _load(kb_dir, snapshot_dir)
+
+    monkeypatch.setattr(KnowledgeBaseLoader, "PARSER_VERSION", KnowledgeBaseLoader.PARSER_VERSION + 1)
+    loader = _load(kb_dir, snapshot_dir)
+    assert loader.load_stats["path"] == "rebuilt"
+    assert loader.load_stats["reason"] == "parser_version"
+
+
+def test_loader_without_snapshot_dir_parses_sources(kb_dir: Path) -> None:
+    loader = KnowledgeBaseLoader(kb_dir)
+    loader.load_all()
+    assert loader.load_stats["path"] == "cold"
+    assert "272325" in loader.kb_b1["otskp"]
+
+
+def test_next_generation_reparses_only_changed_files(kb_dir: Path, tmp_path: Path) -> None:
+    snapshot_dir = tmp_path / "snapshot"
+    current = KnowledgeBaseLoader(kb_dir, snapshot_dir=snapshot_dir)
+    current.load_all()
+    current.kb_b1["tskp"] = {"X1": {"code": "X1"}}
+    assert current.next_generation() == (None, [])
+
+    prices_before = current.data["B3_current_prices"]
+    source = kb_dir / "B1_otkskp_codes" / "otskp.xml"
+    source.write_text(OTSKP_XML.replace("4200", "4300").replace("Výkop", "Hloubení"), encoding="utf-8")
+
+    successor, changed = current.next_generation()
+    assert changed == ["B1_otkskp_codes/otskp.xml"]
+    assert successor.generation == current.generation + 1
+    assert successor.load_stats["path"] == "reload"
+
+    # Copy-on-write: the running generation keeps its data untouched.
+    assert current.kb_b1["otskp"]["0123"]["name"] == "Výkop"
+    assert successor.kb_b1["otskp"]["0123"]["name"] == "Hloubení"
+    assert successor.kb_b1["otskp"]["123"] is successor.kb_b1["otskp"]["0123"]
+    assert successor.data["B3_current_prices"] is prices_before
+    assert successor.kb_b1["tskp"] is current.kb_b1["tskp"]
+    assert successor.next_generation() == (None, [])
+
+    # The persisted snapshot follows the new generation.
+    restored = _load(kb_dir, snapshot_dir)
+    assert restored.load_stats["path"] == "snapshot"
+    assert restored.kb_b1["otskp"]["0123"]["name"] == "Hloubení"
+
+
+def test_older_generation_keeps_its_segments_until_retention(kb_dir: Path, tmp_path: Path) -> None:
+    snapshot_dir = tmp_path / "snapshot"
+    _load(kb_dir, snapshot_dir)
+    current = _load(kb_dir, snapshot_dir)
+    expected = KnowledgeBaseLoader(kb_dir)
+    expected.load_all()
+    source = kb_dir / "B1_otkskp_codes" / "otskp.xml"
+    source.write_text(OTSKP_XML.replace("Výkop", "Hloubení"), encoding="utf-8")
+
+    successor, _ = current.next_generation()
+
+    # The running generation has not read the category yet and must not see the new payload.
+    assert not current.data.is_loaded("B1_otkskp_codes")
+    assert current.data["B1_otkskp_codes"] == expected.data["B1_otkskp_codes"]
+    assert successor.data["B1_otkskp_codes"] != expected.data["B1_otkskp_codes"]
+
+    snapshot = KnowledgeBaseSnapshot(snapshot_dir, retention_sec=0)
+    manifest = snapshot.read_manifest()
+    previous = current._snapshot_manifest
+    retired = {previous["categories"]["B1_otkskp_codes"]["segment"], previous["catalog"]["segment"]}
+    assert set(manifest["retired"]) == retired
+    assert set(snapshot.collect_garbage(manifest)) == retired
+    restored = _load(kb_dir, snapshot_dir)
+    assert restored.load_stats["path"] == "snapshot"
+    assert restored.data["B1_otkskp_codes"] == successor.data["B1_otkskp_codes"]
+
+
+def test_reload_knowledge_base_swaps_singletons(
+    kb_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.core import kb_loader as kb_module
+
+    current = _load(kb_dir, tmp_path / "snapshot")
+    monkeypatch.setattr(kb_module, "_kb_instance", current)
+    monkeypatch.setattr(kb_module, "kb_loader", current)
+
+    assert kb_module.reload_knowledge_base()["reloaded"] is False
+
+    (kb_dir / "B3_current_prices" / "market_prices_2025.json").write_text(
+        json.dumps({"materials": {"beton": {"C30/37": {"price_per_m3": 3100}}}}),
+        encoding="utf-8",
+    )
+    result = kb_module.reload_knowledge_base()
+    assert result["reloaded"] is True
+    assert result["changed"] == ["B3_current_prices/market_prices_2025.json"]
+    assert kb_module.get_knowledge_base() is kb_module.init_kb_loader()
+    assert kb_module.get_knowledge_base().get_current_prices("beton")["C30/37"]["price_per_m3"] == 3100
+    assert current.get_current_prices("beton")["C30/37"]["price_per_m3"] == 2900
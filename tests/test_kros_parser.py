@@ -0,0 +1,130 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.parsers import kros_parser
+from app.parsers.kros_parser import KROSParser
+
+UNIXML = """<?xml version="1.0" encoding="UTF-8"?>
+<UNIXML><Polozky>
+  <Polozka><Kod>272325</Kod><Popis>Základy z betonu</Popis><MJ>m3</MJ><Mnozstvi>12,5</Mnozstvi></Polozka>
+  <Polozka><Kod>411321</Kod><Popis>Stropy z betonu</Popis><MJ>m3</MJ><Mnozstvi>7,684</Mnozstvi></Polozka>
+</Polozky></UNIXML>
+"""
+
+TABULAR = """<TZ>
+  <Row><B>Kód</B><C>Popis</C></Row>
+  <Row><A>1</A><B>121151113</B><C>Sejmutí ornice</C><E>m2</E><F>123,0</F></Row>
+</TZ>
+"""
+
+ASPE = """<stavba><objekty><objekt><polozky>
+  <polozka><id_polozka>1</id_polozka><znacka>02110</znacka><popis>Beton</popis><id_mj>m3</id_mj><mnozstvi>5,5</mnozstvi></polozka>
+  <polozka><id_polozka>2</id_polozka><znacka></znacka><popis>Bez kódu</popis><id_mj>m</id_mj><mnozstvi>1</mnozstvi></polozka>
+</polozky></objekt></objekty></stavba>
+"""
+
+EMPTY_XC4_WITH_UNIXML = """<Export>
+  <XC4><CenoveSoustavy><typ_CS>RTS</typ_CS></CenoveSoustavy></XC4>
+  <Polozky><Polozka><Kod>272325</Kod><Popis>Základy</Popis><MJ>m3</MJ><Mnozstvi>1</Mnozstvi></Polozka></Polozky>
+</Export>
+"""
+
+NESTED_UNIXML = """<UNIXML><Polozky>
+  <Polozka><Kod>1</Kod><Popis>Souhrnná položka</Popis>
+    <Polozka><Kod>2</Kod><Popis>Dílčí položka</Popis><Polozka><Kod>3</Kod></Polozka></Polozka>
+  </Polozka>
+  <Polozka><Kod>4</Kod></Polozka>
+</Polozky></UNIXML>
+"""
+
+
+def _parse(tmp_path: Path, xml: str) -> dict:
+    path = tmp_path / "estimate.xml"
+    path.write_text(xml, encoding="utf-8")
+    return KROSParser().parse(path)
+
+
+def test_dialects_are_sniffed_and_streamed(tmp_path: Path) -> None:
+    unixml = _parse(tmp_path, UNIXML)
+    tabular = _parse(tmp_path, TABULAR)
+    aspe = _parse(tmp_path, ASPE)
+
+    assert unixml["diagnostics"]["kros_format"] == "KROS_UNIXML"
+    assert unixml["diagnostics"]["raw_total"] == 2
+    assert tabular["diagnostics"]["kros_format"] == "KROS_TABULAR"
+    assert tabular["diagnostics"]["raw_total"] == 1  # header row skipped
+    assert aspe["diagnostics"]["kros_format"] == "ASPE_XC4"
+    assert aspe["diagnostics"]["parsing"] == {
+        "parsed": 1,
+        "skipped": [{"row": 2, "reason": "missing code"}],
+    }
+
+
+def test_markers_beyond_the_sniffed_head_are_found(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(kros_parser, "SNIFF_BYTES", 16)
+
+    result = _parse(tmp_path, ASPE)
+
+    assert result["diagnostics"]["kros_format"] == "ASPE_XC4"
+    assert result["diagnostics"]["parsing"]["parsed"] == 1
+
+
+def test_empty_xc4_subtree_falls_back_to_document_dialect(tmp_path: Path) -> None:
+    result = _parse(tmp_path, EMPTY_XC4_WITH_UNIXML)
+
+    assert result["document_info"]["kros_format"] == "KROS_UNIXML"
+    assert result["diagnostics"]["raw_total"] == 1
+
+
+def test_malformed_xml_reports_error(tmp_path: Path) -> None:
+    result = _parse(tmp_path, "<UNIXML><Polozky></UNIXML>")
+
+    assert "error" in result["document_info"]
+    assert result["positions"] == []
+
+
+def test_consumed_elements_are_detached(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "large.xml"
+    items = "".join(f"<polozka><id_polozka>{i}</id_polozka></polozka>" for i in range(20000))
+    path.write_text(f"<stavba><polozky>{items}</polozky></stavba>", encoding="utf-8")
+
+    iterparse = kros_parser.ET.iterparse
+    containers = []
+
+    def spy(*args, **kwargs):
+        for event, element in iterparse(*args, **kwargs):
+            if event == "start" and element.tag == "polozky":
+                containers.append(element)
+            yield event, element
+
+    monkeypatch.setattr(kros_parser.ET, "iterparse", spy)
+
+    attached = []
+    for element in kros_parser._iter_elements(path, lambda tag, depth: tag == "polozka"):
+        assert len(element) == 1
+        attached.append(len(containers[0]))
+
+    assert len(attached) == 20000
+    # Consumed <polozka> elements are detached; only iterparse read-ahead stays attached.
+    assert max(attached) < 1000
+
+
+def test_nested_records_are_yielded_in_document_order(tmp_path: Path) -> None:
+    path = tmp_path / "nested.xml"
+    path.write_text(NESTED_UNIXML, encoding="utf-8")
+
+    records = [
+        kros_parser._child_texts(element)
+        for element in kros_parser._iter_elements(path, lambda tag, depth: tag == "Polozka")
+    ]
+
+    # Same items as findall(".//Polozka"); nested records are detached from their parent.
+    assert records == [
+        {"Kod": "1", "Popis": "Souhrnná položka"},
+        {"Kod": "2", "Popis": "Dílčí položka"},
+        {"Kod": "3"},
+        {"Kod": "4"},
+    ]
+    assert _parse(tmp_path, NESTED_UNIXML)["diagnostics"]["raw_total"] == 4
@@ -0,0 +1,67 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.number_parsing import parse_code, parse_codes, parse_number, parse_numbers
+from app.utils.position_normalizer import normalize_positions
+
+CASES = {
+    "1 220,168": 1220.168,
+    "1.220,168": 1220.168,
+    "1\xa0220,168": 1220.168,
+    "1 220,168": 1220.168,
+    "1 220,168 Kč": 1220.168,
+    "1.220,168 CZK": 1220.168,
+    "12,50 EUR": 12.5,
+    "99 €": 99.0,
+    "1 500,- Kč": 1500.0,
+    "7,684": 7.684,
+    "15,50": 15.5,
+    "1 000": 1000.0,
+    "12.5": 12.5,
+    "1.220.168": 1220168.0,
+    "1,220,168.5": 1220168.5,
+    "-3,5": -3.5,
+    "-": None,
+    "–": None,
+    "": None,
+    "n/a": None,
+    "m²": None,
+    None: None,
+    42: 42.0,
+    2.5: 2.5,
+}
+
+
+def test_czech_number_formats() -> None:
+    assert {value: parse_number(value) for value in CASES} == CASES
+    assert parse_numbers(list(CASES)) == list(CASES.values())
+
+
+def test_vectorised_pass_matches_single_cell_parsing() -> None:
+    rng = random.Random(7)
+    alphabet = "0123456789  ,.-+\xa0Kčeur€"
+    cells = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10))) for _ in range(5000)]
+    cells += list(CASES) * 10
+
+    assert parse_numbers(cells) == [parse_number(cell) for cell in cells]
+
+
+def test_codes_are_normalised_column_wise() -> None:
+    cells = ["272 325", "22694.r", 272325, 272325.0, "\xa011 120 ", "ab", "12", None]
+
+    assert parse_codes(cells) == ["272325", "22694.R", "272325", "272325", "11120", None, None, None]
+    assert parse_codes(cells) == [parse_code(cell) for cell in cells]
+
+
+def test_normaliser_parses_dot_decimal_text() -> None:
+    rows = [
+        {"popis": "Beton C30/37", "mj": "m3", "množství": "12.5", "cena celkem": "36 250,00 Kč"},
+        {"popis": "Výztuž B500B", "mj": "t", "množství": "1.220,168", "cena celkem": "-"},
+    ]
+
+    positions = normalize_positions(rows)
+
+    assert [(p["quantity"], p.get("total_price")) for p in positions] == [(12.5, 36250.0), (1220.168, None)]
@@ -0,0 +1,88 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services.ocr_service import OcrCache, OcrService
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> OcrCache:
+    return OcrCache(tmp_path / "ocr_cache")
+
+
+def test_batch_is_deduplicated_cached_and_completed_once(cache: OcrCache, tmp_path: Path) -> None:
+    completed = []
+    done = threading.Event()
+    service = OcrService(cache=cache, workers=2, recognise=lambda path, page: f"{path.name} p{page} C30/37")
+
+    def on_complete(recognised: int) -> None:
+        completed.append(recognised)
+        done.set()
+
+    pdf = tmp_path / "vykres.pdf"
+    counts = service.submit_batch([(pdf, "ab" * 32, 1), (pdf, "ab" * 32, 2), (pdf, "ab" * 32, 1)], on_complete)
+
+    assert done.wait(5)
+    service.shutdown(wait=True)
+    assert counts == {"queued": 2, "in_progress": 1, "dropped": 0}
+    assert completed == [2]
+    assert cache.get("ab" * 32, 2) == "vykres.pdf p2 C30/37"
+    assert service.pending() == 0
+
+
+def test_queue_is_bounded_and_failures_do_not_count(cache: OcrCache, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "OCR_QUEUE_MAX", 2)
+    release = threading.Event()
+    completed = []
+
+    def recognise(path: Path, page: int) -> str:
+        release.wait(5)
+        if page == 2:
+            raise RuntimeError("tesseract crashed")
+        return "text"
+
+    service = OcrService(cache=cache, workers=1, recognise=recognise)
+    pdf = tmp_path / "vykres.pdf"
+    counts = service.submit_batch([(pdf, "cd" * 32, page) for page in (1, 2, 3)], completed.append)
+    release.set()
+    service.shutdown(wait=True)
+
+    assert counts == {"queued": 2, "in_progress": 0, "dropped": 1}
+    assert completed == [1]
+    assert cache.get("cd" * 32, 2) is None and cache.get("cd" * 32, 3) is None
+
+
+def test_batches_sharing_a_page_are_all_completed(cache: OcrCache, tmp_path: Path) -> None:
+    release = threading.Event()
+    first, second = [], []
+
+    def recognise(path: Path, page: int) -> str:
+        release.wait(5)
+        return f"p{page}"
+
+    service = OcrService(cache=cache, workers=1, recognise=recognise)
+    pdf = tmp_path / "vykres.pdf"
+    first_counts = service.submit_batch([(pdf, "ef" * 32, 1), (pdf, "ef" * 32, 2)], first.append)
+    second_counts = service.submit_batch([(pdf, "ef" * 32, 2), (pdf, "ef" * 32, 3)], second.append)
+    release.set()
+    service.shutdown(wait=True)
+
+    assert first_counts == {"queued": 2, "in_progress": 0, "dropped": 0}
+    assert second_counts == {"queued": 1, "in_progress": 1, "dropped": 0}
+    assert first == [2]
+    assert second == [2]
+    assert service.pending() == 0
+
+
+def test_cache_key_depends_on_ocr_settings(cache: OcrCache, monkeypatch) -> None:
+    cache.put("ef" * 32, 1, "Beton C30/37")
+    assert cache.get("ef" * 32, 1) == "Beton C30/37"
+
+    monkeypatch.setattr(settings, "OCR_LANG", "ces+eng")
+
+    assert cache.get("ef" * 32, 1) is None
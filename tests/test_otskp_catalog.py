@@ -0,0 +1,74 @@
+import io
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.parsers.kros_parser import KROSParser
+from app.parsers.otskp_catalog import iter_tree_catalog_records, read_catalog_records
+
+XC4_DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<BuildingInformation>
+  <Classification><System><Items><Item><Children><Item>
+    <XC4>
+      <CenoveSoustavy>
+        <Polozky>
+          <Polozka><znacka>113472</znacka><nazev>Frézování</nazev><MJ>m2</MJ><jedn_cena>45,10</jedn_cena></Polozka>
+          <Polozka><znacka></znacka><nazev></nazev></Polozka>
+        </Polozky>
+        <typ_CS>otskp</typ_CS>
+      </CenoveSoustavy>
+      <CenoveSoustavy>
+        <typ_CS>RTS</typ_CS>
+        <Polozky><Polozka><znacka>999</znacka><nazev>Ignored</nazev></Polozka></Polozky>
+      </CenoveSoustavy>
+    </XC4>
+  </Item></Children></Item></Items></System></Classification>
+  <Polozka><Znak>FLAT-1</Znak><Nazev>Flat record</Nazev></Polozka>
+</BuildingInformation>
+"""
+
+FLAT_DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<Cenik>
+  <Polozky>
+    <Polozka><Znak>121-01-001</Znak><Nazev>Beton C20/25</Nazev><Mj>m3</Mj><Skupina>2</Skupina></Polozka>
+    <Polozka><znacka>272325</znacka><nazev>Základy</nazev><MJ>m3</MJ><jedn_cena>4200</jedn_cena></Polozka>
+    <Polozka/>
+  </Polozky>
+</Cenik>
+"""
+
+
+def test_xc4_records_keep_only_catalog_systems() -> None:
+    records = read_catalog_records(io.BytesIO(XC4_DOCUMENT.encode("utf-8")))
+
+    assert records == [
+        {
+            "code": "113472",
+            "name": "Frézování",
+            "unit": "m2",
+            "tech_spec": "",
+            "unit_price": "45,10",
+            "system": "OTSKP",
+        }
+    ]
+
+
+def test_flat_price_list_fallback() -> None:
+    records = read_catalog_records(io.BytesIO(FLAT_DOCUMENT.encode("utf-8")))
+
+    assert [record["code"] for record in records] == ["121-01-001", "272325"]
+    assert records[0]["section"] == "2"
+    assert records[0]["unit"] == "m3"
+    assert records[1]["unit_price"] == "4200"
+
+
+def test_tree_walk_matches_stream_and_leaves_tree_intact() -> None:
+    root = ET.fromstring(XC4_DOCUMENT)
+    size_before = len(list(root.iter()))
+
+    from_tree = list(iter_tree_catalog_records(root))
+    assert from_tree == read_catalog_records(io.BytesIO(XC4_DOCUMENT.encode("utf-8")))
+    assert len(list(root.iter())) == size_before
+    assert KROSParser()._parse_xc4_price_lists(root, register_runtime=False) == from_tree
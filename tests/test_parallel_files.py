@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.parsers.drawing_specs_parser import DrawingSpecsParser
+from app.services import worker_processes
+from app.services.parallel_files import run_file_tasks
+from app.services.pdf_text_recovery import PageRecovery, TextMetrics
+
+_LOCK = threading.Lock()
+
+
+def _task(item):
+    kind, value = item
+    if kind == "sleep":
+        time.sleep(value)
+    if kind == "fail":
+        raise ValueError(f"broken {value}")
+    if kind == "exit":
+        os._exit(3)
+    if kind == "lock":
+        if not _LOCK.acquire(timeout=value):
+            return False, os.getpid()
+        _LOCK.release()
+        return True, os.getpid()
+    return value, os.getpid()
+
+
+def test_results_keep_input_order_and_isolate_failures() -> None:
+    items = [("sleep", 0.3), ("ok", 1), ("fail", 2), ("exit", 0), ("ok", 4)]
+
+    results = run_file_tasks(_task, items, workers=3, timeout=10)
+
+    assert [result.ok for result in results] == [True, True, False, False, True]
+    assert results[0].value[0] == 0.3
+    assert results[1].value[0] == 1
+    assert results[2].error == "broken 2"
+    assert "exit code 3" in results[3].error
+    assert results[4].value[1] != os.getpid()
+
+
+def test_slow_file_is_killed_after_timeout() -> None:
+    started = time.monotonic()
+
+    results = run_file_tasks(_task, [("sleep", 30), ("ok", 1)], workers=2, timeout=0.5)
+
+    assert time.monotonic() - started < 10
+    assert results[0].timed_out and not results[0].ok
+    assert results[1].value[0] == 1
+
+
+def test_timeout_is_enforced_for_a_single_file() -> None:
+    started = time.monotonic()
+
+    results = run_file_tasks(_task, [("sleep", 30)], workers=4, timeout=0.5)
+
+    assert time.monotonic() - started < 10
+    assert results[0].timed_out
+
+
+def test_workers_do_not_inherit_locks_held_by_other_threads() -> None:
+    held, release = threading.Event(), threading.Event()
+
+    def _hold() -> None:
+        with _LOCK:
+            held.set()
+            release.wait(30)
+
+    holder = threading.Thread(target=_hold)
+    holder.start()
+    held.wait(5)
+    try:
+        # A plain fork would copy the held lock into the child, which then times out.
+        results = run_file_tasks(_task, [("lock", 2), ("lock", 2)], workers=2, timeout=30)
+    finally:
+        release.set()
+        holder.join()
+
+    assert [result.value[0] for result in results] == [True, True]
+
+
+def test_single_worker_runs_in_process() -> None:
+    results = run_file_tasks(_task, [("ok", 1), ("fail", 2)], workers=1)
+
+    assert results[0].value == (1, os.getpid())
+    assert results[1].error == "broken 2"
+
+
+class _FakeRecovery:
+    TEXTS = {
+        "a.pdf": "Beton C30/37 XC4 XF3 krytí 50 mm\nOpěra výztuž B500B Ø12@150",
+        "b.pdf": "Římsa beton C30/37 XF4 XD3\nPilota beton C25/30 XA2",
+        "c.pdf": "Základ beton C16/20 X0 ČSN EN 206",
+    }
+
+    def recover_iter(self, file_path: Path):
+        text = self.TEXTS[file_path.name]
+        metrics = TextMetrics(text=text, valid_ratio=1.0, pua_ratio=0.0, state="good_text")
+        yield PageRecovery(page_number=1, state="good_text", miner=metrics, accepted=metrics, extractor="pdfminer")
+
+
+def test_parallel_drawing_parse_matches_sequential(tmp_path: Path) -> None:
+    drawing_files = []
+    for name in _FakeRecovery.TEXTS:
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+        drawing_files.append({"exists": True, "path": str(tmp_path / name)})
+    parser = DrawingSpecsParser(text_recovery=_FakeRecovery())
+
+    sequential = parser.parse_files(drawing_files)
+    parallel = parser.parse_files(drawing_files, workers=3, timeout=30)
+
+    assert sequential["diagnostics"]["files_processed"] == 3
+    assert sequential["specifications"]
+    assert parallel == sequential
+
+
+def test_available_cpus_respect_the_cgroup_quota(monkeypatch, tmp_path) -> None:
+    cpu_max = tmp_path / "cpu.max"
+    monkeypatch.setattr(worker_processes, "_CGROUP_CPU_MAX", cpu_max)
+    monkeypatch.setattr(worker_processes.os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+
+    cpu_max.write_text("150000 100000\n")
+    assert worker_processes.resolve_workers(0) == 1
+    cpu_max.write_text("max 100000\n")
+    assert worker_processes.resolve_workers(0) == 16
+    cpu_max.unlink()
+    assert worker_processes.resolve_workers(0) == 16
+    assert worker_processes.resolve_workers(3) == 3
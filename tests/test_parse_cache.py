@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.parsers.smart_parser import SmartParser
+from app.services.parse_cache import ParseCache
+from app.services.workflow_a import WorkflowA
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> ParseCache:
+    return ParseCache(tmp_path / "parse_cache")
+
+
+def _file(tmp_path: Path, name: str, content: bytes) -> Path:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+def _parsed(count: int) -> dict:
+    return {
+        "document_info": {"filename": "vykaz.xml", "format": "kros_xml"},
+        "positions": [{"code": f"{index:06d}", "quantity": index * 0.5} for index in range(count)],
+        "diagnostics": {"raw_total": count, "normalized_total": count},
+    }
+
+
+def test_key_depends_on_content_suffix_settings_and_version(cache: ParseCache, tmp_path: Path, monkeypatch) -> None:
+    first = _file(tmp_path, "a.xml", b"<xml>1</xml>")
+    same = _file(tmp_path, "b.xml", b"<xml>1</xml>")
+    key = cache.key_for(first)
+
+    assert cache.key_for(same) == key
+    assert cache.key_for(_file(tmp_path, "c.xml", b"<xml>2</xml>")) != key
+    assert cache.key_for(_file(tmp_path, "a.pdf", b"<xml>1</xml>")) != key
+    monkeypatch.setattr(settings, "PARSER_H_ENABLE", not settings.PARSER_H_ENABLE)
+    assert cache.key_for(first) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(SmartParser, "PARSER_VERSION", SmartParser.PARSER_VERSION + 1)
+    assert cache.key_for(first) != key
+
+
+def test_round_trip_and_non_json_results_are_skipped(cache: ParseCache) -> None:
+    assert cache.put("ab" * 32, _parsed(3))
+    assert cache.get("ab" * 32) == _parsed(3)
+    assert cache.get("cd" * 32) is None
+
+    assert not cache.put("ef" * 32, {"positions": [{"dims": (1, 2)}]})
+    assert cache.get("ef" * 32) is None
+
+
+def test_write_errors_are_not_raised(cache: ParseCache, monkeypatch) -> None:
+    def _fail(src, dst):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("app.services.parse_cache.os.replace", _fail)
+
+    assert not cache.put("ab" * 32, _parsed(1))
+    assert cache.get("ab" * 32) is None
+    assert not list(cache.cache_dir.glob("*/*.tmp"))
+
+
+def test_least_recently_used_entries_are_evicted(cache: ParseCache, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PARSE_CACHE_MAX_MB", 0)
+
+    cache.put("ab" * 32, _parsed(1))
+
+    assert cache.get("ab" * 32) is None
+
+
+class _CountingParser:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def parse(self, file_path: Path, project_id=None) -> dict:
+        self.calls += 1
+        return _parsed(2)
+
+
+def test_workflow_skips_parsing_identical_documents(cache: ParseCache, tmp_path: Path, monkeypatch) -> None:
+    # In-process parsing, so the counting parser sees the calls.
+    monkeypatch.setattr(settings, "PARSE_WORKERS", 1)
+    monkeypatch.setattr(settings, "PARSE_FILE_TIMEOUT_SEC", 0)
+    workflow = WorkflowA.__new__(WorkflowA)
+    workflow.smart_parser = _CountingParser()
+    workflow.parse_cache = cache
+    documents = [
+        {"exists": True, "path": str(_file(tmp_path, name, b"<xml/>")), "filename": name, "file_type": "vykaz_vymer"}
+        for name in ("vykaz.xml", "vykaz_resubmitted.xml")
+    ]
+
+    summary = workflow._parse_cost_documents("proj_p", documents)
+
+    assert workflow.smart_parser.calls == 1
+    assert summary["diagnostics"]["parse_cache"] == {"hits": 1, "misses": 1}
+    assert len(summary["positions"]) == 4
+    assert summary["documents"][1]["document_info"]["filename"] == "vykaz_resubmitted.xml"
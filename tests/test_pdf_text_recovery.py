@@ -0,0 +1,172 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import pdf_text_recovery
+from app.services.page_text_cache import PageTextCache
+from app.services.pdf_text_recovery import PdfTextRecovery
+from app.utils.hashing import sha256_file
+from app.utils.pdfium_lock import pdfium_lock
+
+pytest.importorskip("pypdfium2")
+pytest.importorskip("pdfminer")
+
+
+def _write_pdf(path: Path, page_texts) -> Path:
+    """Minimal PDF with one Helvetica text line per page."""
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode('latin-1')}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(bytes(body))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def caches(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PAGE_TEXT_CACHE_DIR", tmp_path / "page_text_cache")
+    monkeypatch.setattr(settings, "OCR_CACHE_DIR", tmp_path / "ocr_cache")
+
+
+@pytest.fixture()
+def drawing(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "PDF_ENABLE_POPPLER", False)
+    monkeypatch.setattr(settings, "PDF_ENABLE_OCR", False)
+    monkeypatch.setattr(settings, "PDF_PAGES_PER_TASK", 4)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 8)
+    texts = [f"Strana {index} beton C30/37 XC4 vyztuz B500B" for index in range(1, 21)]
+    return _write_pdf(tmp_path / "vykres.pdf", texts)
+
+
+def _texts(pages) -> list:
+    return [(page.page_number, page.extractor, page.accepted.text.strip()) for page in pages]
+
+
+def test_pdfium_primary_reads_every_page_in_order(drawing: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PDF_RECOVERY_WORKERS", 1)
+
+    summary = PdfTextRecovery().recover(drawing)
+
+    assert [page.page_number for page in summary.pages] == list(range(1, 21))
+    assert summary.used_pdfium == 20
+    assert summary.pages[6].accepted.text.strip() == "Strana 7 beton C30/37 XC4 vyztuz B500B"
+
+
+def test_page_parallel_recovery_matches_sequential(drawing: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PAGE_TEXT_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "PDF_RECOVERY_WORKERS", 1)
+    sequential = _texts(PdfTextRecovery().recover_iter(drawing))
+
+    monkeypatch.setattr(settings, "PDF_RECOVERY_WORKERS", 3)
+    parallel = _texts(PdfTextRecovery().recover_iter(drawing))
+
+    assert parallel == sequential
+
+
+def test_pdfium_extraction_waits_for_the_shared_pdfium_lock(drawing: Path) -> None:
+    results = []
+    extractor = threading.Thread(target=lambda: results.append(pdf_text_recovery._pdfium_texts(drawing, [1])))
+
+    with pdfium_lock:
+        extractor.start()
+        extractor.join(0.2)
+        assert extractor.is_alive()
+    extractor.join(5)
+
+    assert results[0][1].strip() == "Strana 1 beton C30/37 XC4 vyztuz B500B"
+
+
+def test_pdfminer_primary_gives_the_same_text(drawing: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PDF_RECOVERY_WORKERS", 1)
+    monkeypatch.setattr(settings, "PDF_PRIMARY_EXTRACTOR", "pdfminer")
+
+    pages = list(PdfTextRecovery().recover_iter(drawing))
+
+    assert {page.extractor for page in pages} == {"pdfminer"}
+    assert [text for _, _, text in _texts(pages)] == [
+        f"Strana {index} beton C30/37 XC4 vyztuz B500B" for index in range(1, 21)
+    ]
+
+
+def test_poppler_reads_a_page_range_with_one_call(tmp_path: Path, monkeypatch) -> None:
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout="page three\fpage four\fpage five\f", stderr="")
+
+    recovery = PdfTextRecovery()
+    recovery._poppler_available = True
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    texts = recovery._recover_with_poppler(tmp_path / "x.pdf", 3, 5)
+
+    assert texts == {3: "page three", 4: "page four", 5: "page five"}
+    assert len(calls) == 1 and calls[0][calls[0].index("-f") + 1] == "3" and calls[0][calls[0].index("-l") + 1] == "5"
+
+
+def test_image_pages_are_queued_until_ocr_text_is_cached(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PDF_ENABLE_POPPLER", False)
+    monkeypatch.setattr(settings, "PDF_ENABLE_OCR", True)
+    monkeypatch.setattr(settings, "PDF_RECOVERY_WORKERS", 1)
+    pdf = _write_pdf(tmp_path / "scan.pdf", ["Beton C30/37 XC4 vyztuz B500B", ""])
+    recovery = PdfTextRecovery()
+
+    first = recovery.recover(pdf)
+    recovery.ocr_cache.put(sha256_file(pdf), 2, "Pilota beton C25/30 XA2")
+    second = recovery.recover(pdf)
+
+    assert first.queued_ocr_pages == [2]
+    assert second.queued_ocr_pages == [] and second.used_ocr == 1
+    assert second.pages[1].extractor == "ocr"
+    assert second.pages[1].accepted.text == "Pilota beton C25/30 XA2"
+
+
+def test_unchanged_drawing_is_served_from_the_page_text_cache(drawing: Path, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PDF_RECOVERY_WORKERS", 1)
+    first = PdfTextRecovery().recover(drawing)
+
+    def no_extraction(file_path, pages):
+        raise AssertionError("extractor called for a cached drawing")
+
+    monkeypatch.setitem(pdf_text_recovery._EXTRACTORS, "pdfium", no_extraction)
+    monkeypatch.setitem(pdf_text_recovery._EXTRACTORS, "pdfminer", no_extraction)
+    revision = tmp_path / "vykres_rev_B.pdf"
+    revision.write_bytes(drawing.read_bytes())
+    second = PdfTextRecovery().recover(revision)
+
+    assert _texts(second.pages) == _texts(first.pages)
+    assert [page.to_dict() for page in second.pages] == [page.to_dict() for page in first.pages]
+
+
+def test_page_text_key_depends_on_recovery_settings(monkeypatch) -> None:
+    key = PageTextCache.key_for("ab" * 32)
+
+    assert PageTextCache.key_for("cd" * 32) != key
+    monkeypatch.setattr(settings, "PDF_PRIMARY_EXTRACTOR", "pdfminer")
+    assert PageTextCache.key_for("ab" * 32) != key
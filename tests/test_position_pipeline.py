@@ -0,0 +1,168 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.audit_classifier import AuditClassifier
+from app.services.position_enricher import PositionEnricher
+from app.services import position_pipeline
+from app.services.position_pipeline import PositionPipeline
+from app.services.specifications_validator import SpecificationsValidator
+
+
+@pytest.fixture()
+def dummy_kb() -> types.SimpleNamespace:
+    return types.SimpleNamespace(
+        kb_b1={
+            "otskp": {
+                "AAA-001": {"code": "AAA-001", "name": "Beton C20/25 základová deska", "unit": "m3"},
+                "BBB-002": {"code": "BBB-002", "name": "Výkopové práce v hornině", "unit": "m3"},
+                "CCC-003": {"code": "CCC-003", "name": "Bednění stěn oboustranné", "unit": "m2"},
+            }
+        }
+    )
+
+
+@pytest.fixture()
+def validator() -> SpecificationsValidator:
+    validator = SpecificationsValidator()
+    validator.otskp_index = {"AAA001": {"name": "Beton", "unit": "m3", "unit_price": 100}}
+    return validator
+
+
+def _positions(count: int) -> list:
+    templates = [
+        {"code": "AAA-001", "description": "Beton C20/25", "unit": "m3", "quantity": 3, "unit_price": 100},
+        {"code": "", "description": "Betonáž základové desky C20/25", "unit": "m3", "quantity": 1},
+        {"code": "", "description": "Výkopové práce v hornine", "unit": "m3", "quantity": 0},
+        {"code": "X-1", "description": "Bednění stěn", "unit": "m2", "quantity": None},
+        {"code": "AAA-001", "description": "Beton", "unit": "t", "quantity": "abc",
+         "technical_specs": {"concrete_class": "C20/25", "exposure": ["XF4"]}},
+    ]
+    return [dict(templates[index % len(templates)], row=index) for index in range(count)]
+
+
+def _staged(enricher, validator, positions):
+    enriched, enrichment_stats = enricher.enrich(positions, drawing_payload=[])
+    validated, validation_stats = validator.validate(enriched)
+    audited, audit_stats = AuditClassifier().classify(validated)
+    return audited, enrichment_stats, validation_stats, audit_stats
+
+
+def test_fused_pass_matches_staged_services(dummy_kb, validator) -> None:
+    positions = _positions(23)
+    enricher = PositionEnricher(enabled=True, kb_loader=dummy_kb)
+    pipeline = PositionPipeline(enricher, validator, AuditClassifier(), workers=1)
+
+    result = pipeline.run(positions, [])
+
+    assert (result.positions, result.enrichment_stats, result.validation_stats, result.audit_stats) == _staged(
+        enricher, validator, positions
+    )
+    assert "enrichment" not in positions[0]
+
+
+def test_parallel_chunks_merge_deterministically(dummy_kb, validator) -> None:
+    positions = _positions(57)
+    enricher = PositionEnricher(enabled=True, kb_loader=dummy_kb)
+    sequential = PositionPipeline(enricher, validator, AuditClassifier(), workers=1).run(positions, [])
+
+    parallel = PositionPipeline(
+        enricher, validator, AuditClassifier(), workers=3, chunk_size=5, parallel_min_positions=1
+    ).run(positions, [])
+
+    assert parallel.workers == 3
+    assert parallel.chunks == 12
+    assert parallel.positions == sequential.positions
+    assert parallel.enrichment_stats == sequential.enrichment_stats
+    assert parallel.validation_stats == sequential.validation_stats
+    assert list(parallel.audit_stats["amber_by_reason"]) == list(sequential.audit_stats["amber_by_reason"])
+    assert parallel.audit_stats == sequential.audit_stats
+
+
+def test_on_chunk_receives_chunks_in_order(dummy_kb, validator) -> None:
+    positions = _positions(23)
+    enricher = PositionEnricher(enabled=True, kb_loader=dummy_kb)
+    sequential = PositionPipeline(enricher, validator, AuditClassifier(), workers=1).run(positions, [])
+    chunks = []
+
+    streamed = PositionPipeline(enricher, validator, AuditClassifier(), workers=1, chunk_size=10).run(
+        positions, [], on_chunk=chunks.append
+    )
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert [item for chunk in chunks for item in chunk] == sequential.positions
+    assert streamed.positions == sequential.positions
+    assert streamed.audit_stats == sequential.audit_stats
+
+
+def test_iter_chunks_pulls_positions_lazily(dummy_kb, validator) -> None:
+    positions = _positions(23)
+    enricher = PositionEnricher(enabled=True, kb_loader=dummy_kb)
+    sequential = PositionPipeline(enricher, validator, AuditClassifier(), workers=1).run(positions, [])
+    pipeline = PositionPipeline(enricher, validator, AuditClassifier(), workers=1, chunk_size=10)
+    pulled = []
+
+    def source():
+        for position in positions:
+            pulled.append(position)
+            yield position
+
+    stats = pipeline.new_result()
+    chunks = pipeline.iter_chunks(source(), [], stats)
+    first = next(chunks)
+
+    assert len(first) == 10 and len(pulled) <= 20
+    rest = [item for chunk in chunks for item in chunk]
+    assert first + rest == sequential.positions
+    assert stats.positions == []
+    assert stats.chunks == 3
+    assert stats.audit_stats == sequential.audit_stats
+    assert stats.enrichment_stats == sequential.enrichment_stats
+
+
+def test_input_errors_propagate_from_the_parallel_path(dummy_kb, validator) -> None:
+    positions = _positions(50)
+    enricher = PositionEnricher(enabled=True, kb_loader=dummy_kb)
+    pipeline = PositionPipeline(enricher, validator, AuditClassifier(), workers=2, chunk_size=5, parallel_min_positions=10)
+
+    def source():
+        for index, position in enumerate(positions):
+            if index == 30:
+                raise ValueError("upstream stage failed")
+            yield position
+
+    stats = pipeline.new_result()
+    received = []
+    with pytest.raises(ValueError, match="upstream stage failed"):
+        for chunk in pipeline.iter_chunks(source(), [], stats):
+            received.extend(chunk)
+
+    assert len(received) <= 30
+    assert stats.workers == 2
+
+
+def test_worker_pool_is_kept_per_catalog_generation(dummy_kb, validator) -> None:
+    positions = _positions(20)
+    enricher = PositionEnricher(enabled=True, kb_loader=dummy_kb)
+    pipeline = PositionPipeline(enricher, validator, AuditClassifier(), workers=2, chunk_size=5, parallel_min_positions=1)
+
+    first = pipeline.run(positions, [])
+    pool = position_pipeline._pools[(2, (enricher.catalog_index.token,))]
+    second = pipeline.run(positions, [])
+
+    assert first.positions == second.positions
+    assert second.workers == 2
+    assert list(position_pipeline._pools.values()) == [pool]
+
+    successor = types.SimpleNamespace(kb_b1=dict(dummy_kb.kb_b1))
+    reloaded = PositionEnricher(enabled=True, kb_loader=successor)
+    PositionPipeline(reloaded, validator, AuditClassifier(), workers=2, chunk_size=5, parallel_min_positions=1).run(
+        positions, []
+    )
+
+    assert pool.retired
+    assert list(position_pipeline._pools) == [(2, (reloaded.catalog_index.token,))]
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import project_cache
+from app.services.position_query import InvalidCursor, PositionFilter, filter_positions, query_positions
+
+
+@pytest.fixture()
+def cache_root(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "PROJECT_CACHE_PAGE_SIZE", 4)
+    return tmp_path / "projects"
+
+
+def _positions() -> list:
+    positions = []
+    for index in range(20):
+        amber = 8 <= index < 12
+        positions.append(
+            {
+                "code": f"{index // 4 + 1}{index:05d}",
+                "description": f"Position {index}",
+                "section": "HSV" if index < 10 else "PSV",
+                "classification": "AMBER" if amber else "GREEN",
+                "amber_reason": "soft_match" if amber else "",
+                "evidence": {"large": "x" * 50},
+            }
+        )
+    return positions
+
+
+def _save(project_id: str) -> list:
+    positions = _positions()
+    audit = {"total_positions": len(positions), "positions": positions, "positions_preview": positions[:2]}
+    project_cache.save_project_cache(project_id, {"audit_results": audit})
+    return positions
+
+
+def _collect(project_id: str, limit: int, filters: PositionFilter, fields=None) -> list:
+    items, cursor = [], None
+    while True:
+        page = query_positions(project_id, limit, cursor, filters, fields)
+        items.extend(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return items
+
+
+def test_cursor_pagination_walks_every_position(cache_root: Path) -> None:
+    positions = _save("proj_q")
+
+    first = query_positions("proj_q", 7)
+    assert first.items == positions[:7]
+    assert first.total_positions == 20
+    assert _collect("proj_q", 7, PositionFilter()) == positions
+
+
+def test_filters_skip_pages_using_manifest_facets(cache_root: Path) -> None:
+    positions = _save("proj_q")
+    filters = PositionFilter.from_params(classification="amber")
+
+    page = query_positions("proj_q", 50, None, filters)
+
+    assert page.items == [item for item in positions if item["classification"] == "AMBER"]
+    assert page.pages_scanned == 1
+    assert page.pages_skipped == 4
+
+
+def test_code_prefix_section_and_projection(cache_root: Path) -> None:
+    positions = _save("proj_q")
+    filters = PositionFilter.from_params(section="HSV,PSV", code_prefix="3")
+
+    items = _collect("proj_q", 2, filters, fields=["code", "classification"])
+
+    expected = [item for item in positions if item["code"].startswith("3")]
+    assert items == [{"code": item["code"], "classification": item["classification"]} for item in expected]
+
+
+def test_in_memory_fallback_and_invalid_cursor(cache_root: Path) -> None:
+    positions = _positions()
+    filters = PositionFilter.from_params(amber_reason="soft_match")
+
+    first = filter_positions(positions, 3, None, filters)
+    second = filter_positions(positions, 3, first.next_cursor, filters)
+
+    assert [item["code"] for item in first.items + second.items] == [item["code"] for item in positions[8:12]]
+    assert second.next_cursor is None
+    assert query_positions("missing", 10) is None
+    with pytest.raises(InvalidCursor):
+        query_positions("proj_q", 10, cursor="not-a-cursor")
+    with pytest.raises(InvalidCursor):
+        filter_positions(positions, 3, "LTE6MA==")  # "-1:0"
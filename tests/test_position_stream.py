@@ -0,0 +1,107 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import project_cache
+from app.services.position_stream import PositionStreamWriter, StreamStatus, iter_position_stream
+
+
+@pytest.fixture()
+def cache_root(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "POSITION_STREAM_POLL_SEC", 0.01)
+    monkeypatch.setattr(settings, "POSITION_STREAM_IDLE_TIMEOUT_SEC", 5)
+    return tmp_path / "projects"
+
+
+def _positions(start: int, count: int) -> list:
+    return [{"code": f"{index:06d}", "classification": "GREEN"} for index in range(start, start + count)]
+
+
+def _positions_of(events) -> list:
+    return [payload for kind, _, payload in events if kind == "position"]
+
+
+def _collect(project_id: str, **kwargs) -> list:
+    async def drain() -> list:
+        return [event async for event in iter_position_stream(project_id, **kwargs)]
+
+    return asyncio.run(drain())
+
+
+def test_reader_tails_positions_while_the_run_progresses(cache_root: Path) -> None:
+    writer = PositionStreamWriter("proj_s")
+    run_id = writer.begin()
+    started = threading.Event()
+    first_chunk_read = threading.Event()
+
+    def produce() -> None:
+        started.wait(5)
+        writer.append(_positions(0, 3))
+        first_chunk_read.wait(5)
+        writer.append(_positions(3, 2))
+        writer.finish()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    events = []
+
+    async def consume() -> None:
+        async for event in iter_position_stream("proj_s"):
+            events.append(event)
+            started.set()
+            if event[0] == "position" and event[1] == 2:
+                first_chunk_read.set()
+
+    asyncio.run(consume())
+    producer.join()
+
+    assert events[0] == ("start", 0, {"status": StreamStatus.PENDING, "run_id": run_id})
+    assert _positions_of(events) == _positions(0, 5)
+    assert events[-1] == ("end", 5, {"status": StreamStatus.COMPLETED, "count": 5, "run_id": run_id})
+
+
+def test_resume_from_offset_and_detect_new_run(cache_root: Path) -> None:
+    writer = PositionStreamWriter("proj_s")
+    run_id = writer.begin()
+    writer.append(_positions(0, 4))
+    writer.finish(StreamStatus.FAILED)
+
+    resumed = _collect("proj_s", run_id=run_id, offset=3)
+    assert _positions_of(resumed) == _positions(3, 1)
+    assert resumed[-1][2]["status"] == StreamStatus.FAILED
+
+    PositionStreamWriter("proj_s").begin()
+    restarted = _collect("proj_s", run_id=run_id, offset=3)
+    assert restarted[-1][0] == "end" and restarted[-1][2]["status"] == StreamStatus.RESTARTED
+    assert len(list((cache_root / "proj_s" / "stream").glob("positions.*.ndjson"))) == 1
+
+
+def test_projects_without_spool_stream_from_the_cache(cache_root: Path) -> None:
+    positions = _positions(0, 4)
+    project_cache.save_project_cache("proj_old", {"audit_results": {"positions": positions}})
+
+    events = _collect("proj_old", offset=1)
+
+    assert _positions_of(events) == positions[1:]
+    assert events[-1] == ("end", 4, {"status": StreamStatus.COMPLETED, "count": 4, "run_id": None})
+
+
+def test_stream_stops_polling_when_the_client_disconnects(cache_root: Path) -> None:
+    run_id = PositionStreamWriter("proj_s").begin()
+    polls = []
+
+    async def is_disconnected() -> bool:
+        polls.append(True)
+        return len(polls) > 2
+
+    events = _collect("proj_s", is_disconnected=is_disconnected)
+
+    assert events == [("start", 0, {"status": StreamStatus.PENDING, "run_id": run_id})]
+    assert len(polls) == 3
@@ -0,0 +1,108 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import project_cache
+
+
+@pytest.fixture()
+def cache_root(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "PROJECT_CACHE_PAGE_SIZE", 2)
+    return tmp_path / "projects"
+
+
+def _positions(count: int) -> list:
+    return [{"code": f"{index:06d}", "classification": "GREEN", "quantity": index} for index in range(count)]
+
+
+def _segment_files(cache_dir: Path) -> set:
+    return {path.relative_to(cache_dir).as_posix() for path in cache_dir.rglob("*") if path.is_file()}
+
+
+def test_round_trip_pages_positions(cache_root: Path) -> None:
+    audit = {"total_positions": 5, "green": 5, "amber": 0, "red": 0, "positions": _positions(5),
+             "audit": {"green": 5, "amber": 0, "red": 0}, "positions_preview": _positions(2)}
+    data = {"project_id": "proj_c", "status": "AUDITED", "positions": _positions(5), "audit_results": audit}
+
+    cache_dir = project_cache.save_project_cache("proj_c", data)
+    loaded, _ = project_cache.load_project_cache("proj_c")
+
+    assert cache_dir == cache_root / "proj_c"
+    assert loaded["positions"] == data["positions"]
+    assert loaded["audit_results"] == audit
+    manifest = json.loads((cache_dir / "manifest.json").read_text())
+    assert [page["count"] for page in manifest["pages"]["positions"]["pages"]] == [2, 2, 1]
+    assert list(project_cache.iter_cached_positions("proj_c")) == audit["positions"]
+    assert project_cache.load_field("proj_c", "status") == "AUDITED"
+
+
+def test_only_changed_segments_are_rewritten(cache_root: Path) -> None:
+    data = {"project_id": "proj_d", "status": "PARSED", "positions": _positions(6), "diagnostics": {"a": 1},
+            "updated_at": "2025-01-01T10:00:00"}
+    cache_dir = project_cache.save_project_cache("proj_d", data)
+    before = {name: (cache_dir / name).stat().st_mtime_ns for name in _segment_files(cache_dir)}
+
+    data["positions"][5]["classification"] = "RED"
+    project_cache.save_project_cache("proj_d", data)
+    after = _segment_files(cache_dir)
+
+    changed = {name for name in after if name not in before}
+    assert len([name for name in changed if name.startswith("pages/")]) == 1
+    assert not [name for name in changed if name.startswith("fields/")]
+
+    project_cache.save_field("proj_d", "status", "AUDITED")
+    assert len(_segment_files(cache_dir) - after) == 1
+    loaded, _ = project_cache.load_project_cache("proj_d")
+    assert loaded["status"] == "AUDITED"
+    assert loaded["positions"][5]["classification"] == "RED"
+
+
+def test_replaced_pages_stay_readable_until_retention(cache_root: Path, monkeypatch) -> None:
+    project_cache.save_project_cache("proj_r", {"positions": _positions(6)})
+    reader = project_cache.iter_cached_positions("proj_r", "positions")
+    first = next(reader)
+
+    project_cache.save_project_cache("proj_r", {"positions": [dict(row, classification="RED") for row in _positions(6)]})
+
+    # The reader took the old manifest; its later pages are still on disk.
+    assert [first, *reader] == _positions(6)
+    cache_dir = cache_root / "proj_r"
+    retired = json.loads((cache_dir / "manifest.json").read_text())["retired"]
+    assert len([name for name in retired if name.startswith("pages/")]) == 3
+
+    monkeypatch.setattr(project_cache, "SEGMENT_RETENTION_SEC", 0.0)
+    project_cache.save_field("proj_r", "status", "AUDITED")
+
+    assert json.loads((cache_dir / "manifest.json").read_text())["retired"] == {}
+    assert not set(retired) & _segment_files(cache_dir)
+    assert [row["classification"] for row in project_cache.iter_cached_positions("proj_r", "positions")] == ["RED"] * 6
+
+
+def test_legacy_single_file_cache_is_migrated(cache_root: Path) -> None:
+    cache_root.mkdir(parents=True, exist_ok=True)
+    legacy = cache_root / "proj_old.json"
+    legacy.write_text(json.dumps({"project_id": "proj_old", "positions": _positions(3)}), encoding="utf-8")
+
+    loaded, cache_dir = project_cache.load_project_cache("proj_old")
+
+    assert loaded["positions"] == _positions(3)
+    assert loaded["audit_results"]["total_positions"] == 0
+    assert not legacy.exists()
+    assert (cache_dir / "manifest.json").exists()
+    again, _ = project_cache.load_project_cache("proj_old")
+    assert again["positions"] == _positions(3)
+
+
+def test_corrupt_manifest_reinitialises(cache_root: Path) -> None:
+    cache_dir = project_cache.save_project_cache("proj_bad", {"status": "PARSED"})
+    (cache_dir / "manifest.json").write_text("{not json", encoding="utf-8")
+
+    assert project_cache.load_project_cache("proj_bad")[0] is None
+    data, _, created = project_cache.load_or_create_project_cache("proj_bad", {"workflow": "A"})
+    assert created and data["workflow"] == "A"
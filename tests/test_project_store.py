@@ -0,0 +1,144 @@
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.project import ProjectStatus
+from app.state.project_store import ProjectStore
+
+
+@pytest.fixture()
+def store(tmp_path: Path) -> ProjectStore:
+    return ProjectStore(f"sqlite:///{tmp_path / 'projects.db'}")
+
+
+def _record(project_id: str, minute: int, status: ProjectStatus = ProjectStatus.UPLOADED) -> dict:
+    return {
+        "project_id": project_id,
+        "project_name": f"Project {project_id}",
+        "workflow": "A",
+        "status": status,
+        "created_at": f"2025-01-01T10:{minute:02d}:00+00:00",
+        "updated_at": f"2025-01-01T10:{minute:02d}:00+00:00",
+        "enable_enrichment": True,
+        "positions_total": minute,
+        "diagnostics": {"parsing": {"raw_total": minute}},
+    }
+
+
+def test_records_round_trip_and_counters_follow_status(store: ProjectStore) -> None:
+    store["proj_a"] = _record("proj_a", 1)
+    store["proj_b"] = _record("proj_b", 2)
+
+    record = store["proj_a"]
+    assert record["status"] is ProjectStatus.UPLOADED
+    assert record["diagnostics"] == {"parsing": {"raw_total": 1}}
+    assert "proj_a" in store and "missing" not in store
+    assert store.get("missing") is None
+
+    record["status"] = ProjectStatus.AUDITED
+    assert store.status_counts() == {"UPLOADED": 2}
+    store["proj_a"] = record
+    store.update_fields("proj_b", {"status": ProjectStatus.FAILED, "error": "boom"})
+    assert store.status_counts() == {"AUDITED": 1, "FAILED": 1}
+    assert store["proj_b"]["error"] == "boom"
+
+    del store["proj_a"]
+    assert store.status_counts() == {"FAILED": 1}
+    assert len(store) == 1
+    assert list(store) == ["proj_b"]
+
+    store.clear()
+    assert len(store) == 0
+    assert store.update_fields("proj_b", {"status": ProjectStatus.FAILED}) is None
+
+
+def test_page_is_newest_first_with_cursor(store: ProjectStore) -> None:
+    for minute in range(5):
+        store[f"proj_{minute}"] = _record(f"proj_{minute}", minute)
+
+    first, cursor = store.page(2)
+    assert [item["project_id"] for item in first] == ["proj_4", "proj_3"]
+    assert first[0] == {
+        "project_id": "proj_4",
+        "project_name": "Project proj_4",
+        "workflow": "A",
+        "status": ProjectStatus.UPLOADED,
+        "enrichment_enabled": True,
+        "created_at": "2025-01-01T10:04:00",
+        "positions_count": 4,
+    }
+
+    second, cursor = store.page(2, cursor=cursor)
+    assert [item["project_id"] for item in second] == ["proj_2", "proj_1"]
+    third, cursor = store.page(2, cursor=cursor)
+    assert [item["project_id"] for item in third] == ["proj_0"]
+    assert cursor is None
+
+    by_offset, _ = store.page(2, offset=2)
+    assert by_offset == second
+    assert store.summary("proj_4") == first[0]
+    assert store.summary("missing") is None
+
+    with pytest.raises(ValueError):
+        store.page(2, cursor="not-a-cursor")
+
+
+def test_timestamps_are_stored_as_utc(store: ProjectStore) -> None:
+    local = datetime(2025, 1, 1, 12, 0)
+    store["proj_local"] = dict(_record("proj_local", 0), created_at=local.isoformat())
+    store["proj_east"] = dict(_record("proj_east", 0), created_at="2025-01-01T10:00:00+02:00")
+    store["proj_utc"] = dict(_record("proj_utc", 0), created_at="2025-01-01T09:00:00+00:00")
+
+    assert store.summary("proj_local")["created_at"] == local.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+    assert store.summary("proj_east")["created_at"] == "2025-01-01T08:00:00"
+    east_and_utc = [item["project_id"] for item in store.page(3)[0] if item["project_id"] != "proj_local"]
+    assert east_and_utc == ["proj_utc", "proj_east"]
+
+
+def test_concurrent_update_fields_keep_every_change(store: ProjectStore) -> None:
+    store["proj_c"] = _record("proj_c", 1)
+
+    def _writer(prefix: str) -> None:
+        for index in range(15):
+            store.update_fields("proj_c", {f"{prefix}{index}": index})
+
+    threads = [threading.Thread(target=_writer, args=(prefix,)) for prefix in "abc"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    record = store["proj_c"]
+    assert all(f"{prefix}{index}" in record for prefix in "abc" for index in range(15))
+    assert store.status_counts() == {"UPLOADED": 1}
+
+
+def test_status_reads_columns_and_record_only_fields(store: ProjectStore) -> None:
+    store["proj_s"] = dict(_record("proj_s", 3), progress=40, green_count=2, error=None, message="Parsing")
+
+    assert store.status("proj_s") == {
+        "project_id": "proj_s",
+        "project_name": "Project proj_s",
+        "workflow": "A",
+        "status": ProjectStatus.UPLOADED,
+        "enrichment_enabled": True,
+        "created_at": "2025-01-01T10:03:00",
+        "positions_count": 3,
+        "updated_at": "2025-01-01T10:03:00",
+        "green_count": 2,
+        "amber_count": 0,
+        "red_count": 0,
+        "error": None,
+        "progress": 40,
+        "positions_processed": None,
+        "positions_raw": None,
+        "positions_skipped": None,
+        "diagnostics": {"parsing": {"raw_total": 3}},
+        "message": "Parsing",
+    }
+    assert store.status("missing") is None
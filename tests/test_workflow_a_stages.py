@@ -0,0 +1,82 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import workflow_a as workflow_module
+from app.services.ocr_service import OcrCache, OcrService
+from app.services.workflow_a import WorkflowA
+from app.state.project_store import project_store
+
+
+@pytest.fixture()
+def data_dir(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "PIPELINE_WORKERS", 1)
+    return tmp_path
+
+
+def test_drawings_are_extracted_while_cost_documents_are_parsed(data_dir: Path, monkeypatch) -> None:
+    project_id = "proj_stages"
+    project_store[project_id] = {"project_id": project_id, "project_name": "Stages", "workflow": "A"}
+    workflow = WorkflowA()
+    both_running = threading.Barrier(2, timeout=5)
+
+    def parse(project_id, cost_documents):
+        both_running.wait()
+        time.sleep(0.2)
+        positions = [{"code": "272325", "description": "Beton C30/37", "unit": "m3", "quantity": 1.0}]
+        diagnostics = {"documents_processed": 1, "normalized_total": 1, "errors": []}
+        return {"positions": positions, "documents": [], "diagnostics": diagnostics}
+
+    def drawings(project_id, drawing_files):
+        both_running.wait()
+        time.sleep(0.2)
+        return {"specifications": [], "diagnostics": {"files_processed": 1, "specifications_found": 0, "errors": []}}
+
+    uploads = {"files_by_type": {}, "cost_documents": [], "drawing_files": [], "all_files": [], "missing_files": []}
+    monkeypatch.setattr(workflow, "_resolve_uploads", lambda project_id, meta: uploads)
+    monkeypatch.setattr(workflow, "_parse_cost_documents", parse)
+    monkeypatch.setattr(workflow, "_extract_drawing_specs", drawings)
+
+    try:
+        result = asyncio.run(workflow.execute(project_id, enable_enrichment=False))
+    finally:
+        del project_store[project_id]
+
+    timings = result["stage_timings"]
+    assert result["positions_total"] == 1
+    assert timings["parsing"] >= 0.2 and timings["drawings"] >= 0.2
+    assert timings["total"] < timings["parsing"] + timings["drawings"]
+    assert {"uploads", "schema_validation", "parse_cache_save", "pipeline", "audit_save"} <= set(timings)
+
+
+def test_ocr_pages_are_queued_and_trigger_one_rerun(data_dir: Path, monkeypatch) -> None:
+    drawing = data_dir / "scan.pdf"
+    drawing.write_bytes(b"%PDF-1.4 scan")
+    service = OcrService(cache=OcrCache(data_dir / "ocr_cache"), workers=1, recognise=lambda path, page: "C30/37")
+    reruns = []
+    rerun_scheduled = threading.Event()
+    monkeypatch.setattr(workflow_module, "get_ocr_service", lambda: service)
+    monkeypatch.setattr(
+        workflow_module,
+        "_schedule_ocr_rerun",
+        lambda *args: (reruns.append(args), rerun_scheduled.set()),
+    )
+
+    counts = WorkflowA.__new__(WorkflowA)._queue_ocr(
+        "proj_ocr",
+        [{"file": "scan.pdf", "path": str(drawing), "pages": [2, 3]}],
+        False,
+        True,
+    )
+
+    assert rerun_scheduled.wait(5)
+    assert counts["queued"] == 2
+    assert reruns == [("proj_ocr", False, True, 2)]